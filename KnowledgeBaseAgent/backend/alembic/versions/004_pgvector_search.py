@@ -0,0 +1,45 @@
+"""Add pgvector embedding column, ANN index and full-text search index
+
+Revision ID: 004_pgvector_search
+Revises: 003_twitter_x_integration
+Create Date: 2025-08-20 10:00:00.000000
+
+"""
+import os
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '004_pgvector_search'
+down_revision = '003_twitter_x_integration'
+branch_labels = None
+depends_on = None
+
+VECTOR_DIMENSION = int(os.getenv('VECTOR_DIMENSION', '384'))
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS vector")
+
+    # Store the embedding vector next to its chunk metadata
+    op.execute(f"ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding vector({VECTOR_DIMENSION})")
+
+    # HNSW cosine index; VectorStore.ensure_indexes can swap it for IVFFlat
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_embeddings_embedding_hnsw ON embeddings "
+        "USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64)"
+    )
+
+    # Expression must match knowledge_tsvector_sql() in app/services/vector_store.py
+    op.execute(
+        "CREATE INDEX IF NOT EXISTS ix_knowledge_items_search_tsv ON knowledge_items "
+        "USING gin (to_tsvector('english', coalesce(display_title, '') || ' ' || "
+        "coalesce(summary, '') || ' ' || coalesce(enhanced_content, '')))"
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_knowledge_items_search_tsv")
+    op.execute("DROP INDEX IF EXISTS ix_embeddings_embedding_ivfflat")
+    op.execute("DROP INDEX IF EXISTS ix_embeddings_embedding_hnsw")
+    op.execute("ALTER TABLE embeddings DROP COLUMN IF EXISTS embedding")
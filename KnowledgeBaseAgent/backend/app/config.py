@@ -57,6 +57,23 @@ class Settings(BaseSettings):
     MEDIA_DIR: str = Field(default="./data/media", env="MEDIA_DIR")
     KNOWLEDGE_BASE_DIR: str = Field(default="./data/knowledge_base", env="KNOWLEDGE_BASE_DIR")
     
+    # Vector search settings
+    VECTOR_STORE_BACKEND: str = Field(default="auto", env="VECTOR_STORE_BACKEND")  # auto, pgvector or local
+    VECTOR_DIMENSION: int = Field(default=384, env="VECTOR_DIMENSION")
+    VECTOR_INDEX_TYPE: str = Field(default="hnsw", env="VECTOR_INDEX_TYPE")  # hnsw or ivfflat
+    VECTOR_HNSW_M: int = Field(default=16, env="VECTOR_HNSW_M")
+    VECTOR_HNSW_EF_CONSTRUCTION: int = Field(default=64, env="VECTOR_HNSW_EF_CONSTRUCTION")
+    VECTOR_HNSW_EF_SEARCH: int = Field(default=100, env="VECTOR_HNSW_EF_SEARCH")
+    VECTOR_IVFFLAT_LISTS: int = Field(default=100, env="VECTOR_IVFFLAT_LISTS")
+    VECTOR_IVFFLAT_PROBES: int = Field(default=10, env="VECTOR_IVFFLAT_PROBES")
+    VECTOR_LOCAL_STORE_PATH: str = Field(default="./data/vector_store.db", env="VECTOR_LOCAL_STORE_PATH")
+    HYBRID_SEARCH_RRF_K: int = Field(default=60, env="HYBRID_SEARCH_RRF_K")  # reciprocal rank fusion constant
+    
+    # WebSocket fan-out settings
+    WEBSOCKET_SEND_QUEUE_SIZE: int = Field(default=256, env="WEBSOCKET_SEND_QUEUE_SIZE")  # messages queued per connection
+    WEBSOCKET_SLOW_CONSUMER_POLICY: str = Field(default="coalesce", env="WEBSOCKET_SLOW_CONSUMER_POLICY")  # drop_oldest, coalesce or disconnect
+    WEBSOCKET_SEND_TIMEOUT: float = Field(default=10.0, env="WEBSOCKET_SEND_TIMEOUT")  # seconds before a stalled send drops the connection
+    
     # Security settings
     SECRET_KEY: str = Field(..., env="SECRET_KEY")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = Field(default=30, env="ACCESS_TOKEN_EXPIRE_MINUTES")
@@ -81,6 +81,10 @@ async def init_db():
             # Create all tables
             await conn.run_sync(Base.metadata.create_all)
             logger.info("Database tables created successfully")
+        
+        # Vector column plus ANN and full-text indexes used by search
+        from app.services.vector_store import get_vector_store
+        await get_vector_store().ensure_indexes()
             
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}")
@@ -11,10 +11,13 @@ from dataclasses import dataclass
 
 from app.services.ai_service import get_ai_service
 from app.ai.base import EmbeddingConfig, ModelType
-from app.models.knowledge import KnowledgeItem, Embedding
-from app.schemas.knowledge import EmbeddingCreate
+from sqlalchemy import select
+
+from app.models.content import ContentItem
+from app.models.knowledge import KnowledgeItem
+from app.services.vector_store import get_vector_store, VectorRecord
 from app.repositories.knowledge import get_knowledge_repository
-from app.database.connection import get_db_session
+from app.database.connection import get_db_session, get_session_factory
 
 logger = logging.getLogger(__name__)
 
@@ -227,46 +230,57 @@ class EmbeddingService:
         overlap_words = words[-overlap_tokens:]
         return " ".join(overlap_words)
     
-    async def save_embeddings(self, embedding_results: List[EmbeddingResult]) -> List[Embedding]:
+    async def save_embeddings(self, embedding_results: List[EmbeddingResult]) -> int:
         """
-        Save embedding results to the database.
+        Save embedding results to the vector store.
+        
+        The vector store writes the full embedding row, so every result goes
+        through one batched upsert. Each record carries its item's categories
+        for category-filtered search.
         
         Args:
             embedding_results: List of embedding results to save
             
         Returns:
-            List of saved embedding objects
+            Number of embeddings written
         """
         if not embedding_results:
-            return []
-        
-        knowledge_repo = get_knowledge_repository()
-        saved_embeddings = []
+            return 0
         
-        async with get_db_session() as db:
-            for result in embedding_results:
-                try:
-                    embedding_create = EmbeddingCreate(
-                        id=result.embedding_id,
-                        knowledge_item_id=result.knowledge_item_id,
-                        model=result.model,
-                        chunk_index=result.chunk_index,
-                        chunk_text=result.chunk_text,
-                        embedding_dimension=result.embedding_dimension,
-                        token_count=result.token_count,
-                        # Note: embedding vector would be stored in a separate vector column
-                        # This would require pgvector integration
-                    )
-                    
-                    embedding = await knowledge_repo.create_embedding(db, embedding_create)
-                    saved_embeddings.append(embedding)
-                    
-                except Exception as e:
-                    logger.error(f"Failed to save embedding {result.embedding_id}: {e}")
-                    continue
+        categories = await self._categories_for_items({result.knowledge_item_id for result in embedding_results})
+        saved = await get_vector_store().upsert([
+            VectorRecord(
+                embedding_id=result.embedding_id,
+                knowledge_item_id=result.knowledge_item_id,
+                model=result.model,
+                chunk_index=result.chunk_index,
+                chunk_text=result.chunk_text,
+                vector=result.embedding_vector,
+                token_count=result.token_count,
+                main_category=categories.get(result.knowledge_item_id, (None, None))[0],
+                sub_category=categories.get(result.knowledge_item_id, (None, None))[1]
+            )
+            for result in embedding_results
+        ])
         
-        logger.info(f"Saved {len(saved_embeddings)} embeddings to database")
-        return saved_embeddings
+        logger.info(f"Saved {saved} embeddings to the vector store")
+        return saved
+    
+    async def _categories_for_items(self, knowledge_item_ids) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """Look up (main_category, sub_category) of each knowledge item's content item."""
+        if not knowledge_item_ids:
+            return {}
+        try:
+            async with get_session_factory()() as db:
+                result = await db.execute(
+                    select(KnowledgeItem.id, ContentItem.main_category, ContentItem.sub_category)
+                    .join(ContentItem, ContentItem.id == KnowledgeItem.content_item_id)
+                    .where(KnowledgeItem.id.in_(list(knowledge_item_ids)))
+                )
+                return {row[0]: (row[1], row[2]) for row in result}
+        except Exception as e:
+            logger.warning(f"Could not load categories for embeddings, saving them without: {e}")
+            return {}
     
     async def batch_generate_embeddings(
         self,
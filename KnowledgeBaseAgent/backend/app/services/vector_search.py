@@ -4,16 +4,19 @@ Vector similarity search service using pgvector for semantic search.
 
 import asyncio
 import logging
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Hashable, Optional, Sequence, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
+from sqlalchemy import select, func
+
 from app.services.ai_service import get_ai_service
 from app.services.embedding_service import get_embedding_service
+from app.services.vector_store import TextMatch, VectorMatch, get_vector_store
 from app.ai.base import EmbeddingConfig
-from app.models.knowledge import KnowledgeItem, Embedding
-from app.repositories.knowledge import get_knowledge_repository
-from app.database.connection import get_db_session
+from app.config import get_settings
+from app.models.knowledge import KnowledgeItem
+from app.database.connection import get_session_factory
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +38,7 @@ class SearchResult:
     chunk_index: int
     embedding_id: str
     rank: int
+    fused_score: Optional[float] = None
 
 
 @dataclass
@@ -43,12 +47,31 @@ class SearchQuery:
     query_text: str
     search_type: SearchType = SearchType.HYBRID
     limit: int = 10
+    offset: int = 0
     similarity_threshold: float = 0.7
     categories: Optional[List[str]] = None
     model_name: Optional[str] = None
     include_content: bool = True
 
 
+def reciprocal_rank_fusion(ranked_lists: Sequence[Sequence[Hashable]], k: int = 60) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse ranked lists with reciprocal rank fusion.
+    
+    Each key scores sum(1 / (k + rank)) over the lists it appears in (ranks
+    start at 1), so results found by both searches rise to the top without
+    having to compare cosine similarities with text ranks.
+    
+    Returns:
+        List of (key, fused_score) tuples, best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranked in ranked_lists:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
 class VectorSearchService:
     """Service for performing vector similarity search."""
     
@@ -56,6 +79,7 @@ class VectorSearchService:
         self.default_model = None
         self.similarity_threshold = 0.7
         self.max_results = 50
+        self.store = get_vector_store()
     
     async def search(self, query: SearchQuery) -> List[SearchResult]:
         """
@@ -81,84 +105,112 @@ class VectorSearchService:
     
     async def _vector_search(self, query: SearchQuery) -> List[SearchResult]:
         """Perform vector similarity search."""
-        # Generate embedding for query
-        query_embedding = await self._generate_query_embedding(query.query_text, query.model_name)
-        
-        if not query_embedding:
+        matches = await self._vector_matches(query, query.offset + query.limit)
+        if matches is None:
             logger.warning("Failed to generate query embedding, falling back to text search")
             return await self._text_search(query)
         
-        # Perform vector similarity search
-        knowledge_repo = get_knowledge_repository()
+        page = matches[query.offset:]
+        knowledge_items = {}
+        if query.include_content:
+            knowledge_items = await self._load_knowledge_items([m.knowledge_item_id for m in page])
         
-        async with get_db_session() as db:
-            # This would use pgvector for similarity search
-            # For now, we'll simulate the search
-            similar_embeddings = await self._simulate_vector_search(
-                db, query_embedding, query.limit, query.similarity_threshold
-            )
-            
-            # Convert to search results
-            results = []
-            for i, (embedding, similarity) in enumerate(similar_embeddings):
-                knowledge_item = None
-                if query.include_content:
-                    knowledge_item = await knowledge_repo.get(db, embedding.knowledge_item_id)
-                
-                result = SearchResult(
-                    knowledge_item_id=embedding.knowledge_item_id,
-                    knowledge_item=knowledge_item,
-                    similarity_score=similarity,
-                    chunk_text=embedding.chunk_text,
-                    chunk_index=embedding.chunk_index,
-                    embedding_id=embedding.id,
-                    rank=i + 1
-                )
-                results.append(result)
-            
-            # Filter by categories if specified
-            if query.categories:
-                results = await self._filter_by_categories(results, query.categories)
-        
-        return results
+        return [
+            self._vector_result(match, knowledge_items, query.offset + i + 1)
+            for i, match in enumerate(page)
+        ]
     
     async def _text_search(self, query: SearchQuery) -> List[SearchResult]:
-        """Perform traditional text search."""
-        knowledge_repo = get_knowledge_repository()
+        """Perform full-text search ranked by relevance."""
+        matches = await self._text_matches(query, query.offset + query.limit)
         
-        async with get_db_session() as db:
-            # This would use full-text search capabilities
-            # For now, we'll simulate text search
-            knowledge_items = await self._simulate_text_search(
-                db, query.query_text, query.limit, query.categories
-            )
-            
-            results = []
-            for i, item in enumerate(knowledge_items):
-                # Create a mock search result for text search
-                result = SearchResult(
-                    knowledge_item_id=item.id,
-                    knowledge_item=item if query.include_content else None,
-                    similarity_score=0.8,  # Mock similarity score
-                    chunk_text=item.summary or item.enhanced_content[:200] + "...",
-                    chunk_index=0,
-                    embedding_id="",
-                    rank=i + 1
-                )
-                results.append(result)
+        page = matches[query.offset:]
+        knowledge_items = {}
+        if query.include_content:
+            knowledge_items = await self._load_knowledge_items([m.knowledge_item_id for m in page])
         
-        return results
+        return [
+            self._text_result(match, knowledge_items, query.offset + i + 1)
+            for i, match in enumerate(page)
+        ]
+    
+    async def _vector_matches(self, query: SearchQuery, limit: int) -> Optional[List[VectorMatch]]:
+        """Fetch the nearest chunks; None when the query could not be embedded."""
+        query_embedding = await self._generate_query_embedding(query.query_text, query.model_name)
+        if not query_embedding:
+            return None
+        
+        # Threshold, model and category filters are applied by the store
+        return await self.store.similarity_search(
+            query_embedding,
+            limit=limit,
+            threshold=query.similarity_threshold,
+            model=query.model_name,
+            categories=query.categories
+        )
+    
+    async def _text_matches(self, query: SearchQuery, limit: int) -> List[TextMatch]:
+        """Fetch the best full-text matches."""
+        return await self.store.text_search(
+            query.query_text,
+            limit=limit,
+            categories=query.categories
+        )
+    
+    @staticmethod
+    def _vector_result(match: VectorMatch, knowledge_items: Dict[str, KnowledgeItem], rank: int) -> SearchResult:
+        return SearchResult(
+            knowledge_item_id=match.knowledge_item_id,
+            knowledge_item=knowledge_items.get(match.knowledge_item_id),
+            similarity_score=match.similarity,
+            chunk_text=match.chunk_text,
+            chunk_index=match.chunk_index,
+            embedding_id=match.embedding_id,
+            rank=rank
+        )
+    
+    @staticmethod
+    def _text_result(match: TextMatch, knowledge_items: Dict[str, KnowledgeItem], rank: int) -> SearchResult:
+        return SearchResult(
+            knowledge_item_id=match.knowledge_item_id,
+            knowledge_item=knowledge_items.get(match.knowledge_item_id),
+            similarity_score=match.score,
+            chunk_text=match.snippet,
+            chunk_index=0,
+            embedding_id="",
+            rank=rank
+        )
+    
+    async def _load_knowledge_items(self, item_ids: List[str]) -> Dict[str, KnowledgeItem]:
+        """Load knowledge items for search hits with a single IN query."""
+        unique_ids = list(dict.fromkeys(item_ids))
+        if not unique_ids:
+            return {}
+        
+        session_factory = get_session_factory()
+        async with session_factory() as db:
+            result = await db.execute(select(KnowledgeItem).where(KnowledgeItem.id.in_(unique_ids)))
+            return {item.id: item for item in result.scalars().all()}
     
     async def _hybrid_search(self, query: SearchQuery) -> List[SearchResult]:
-        """Perform hybrid search combining vector and text search."""
-        # Perform both searches
-        vector_results = await self._vector_search(query)
-        text_results = await self._text_search(query)
+        """
+        Perform hybrid search combining vector and text search.
         
-        # Combine and re-rank results
-        combined_results = self._combine_search_results(vector_results, text_results, query.limit)
+        Both searches run concurrently and only fetch enough candidates for the
+        requested page; their rankings are merged with reciprocal rank fusion
+        and only the page's knowledge items are loaded.
+        """
+        # Candidates deeper than the page let items ranked moderately by both
+        # searches overtake items ranked highly by only one of them
+        depth = 2 * (query.offset + query.limit)
+        vector_matches, text_matches = await asyncio.gather(
+            self._vector_matches(query, depth),
+            self._text_matches(query, depth)
+        )
         
-        return combined_results
+        return await self._combine_search_results(
+            vector_matches or [], text_matches, query.limit, query.offset, query.include_content
+        )
     
     async def _generate_query_embedding(
         self, 
@@ -200,138 +252,44 @@ class VectorSearchService:
             logger.error(f"Error generating query embedding: {e}")
             return None
     
-    async def _simulate_vector_search(
-        self,
-        db,
-        query_embedding: List[float],
-        limit: int,
-        threshold: float
-    ) -> List[Tuple[Embedding, float]]:
-        """
-        Simulate vector similarity search.
-        In production, this would use pgvector's similarity functions.
-        """
-        # This is a placeholder - in real implementation, this would be:
-        # SELECT *, embedding <-> %s AS similarity 
-        # FROM embeddings 
-        # WHERE embedding <-> %s < %s 
-        # ORDER BY similarity 
-        # LIMIT %s
-        
-        # For now, return mock results
-        mock_embeddings = []
-        for i in range(min(limit, 5)):  # Mock 5 results
-            embedding = Embedding(
-                id=f"embedding_{i}",
-                knowledge_item_id=f"knowledge_item_{i}",
-                model="mock_model",
-                chunk_index=0,
-                chunk_text=f"Mock chunk text {i} related to the query",
-                embedding_dimension=768,
-                token_count=50
-            )
-            similarity = 0.9 - (i * 0.1)  # Decreasing similarity
-            mock_embeddings.append((embedding, similarity))
-        
-        return mock_embeddings
-    
-    async def _simulate_text_search(
+    async def _combine_search_results(
         self,
-        db,
-        query_text: str,
+        vector_matches: List[VectorMatch],
+        text_matches: List[TextMatch],
         limit: int,
-        categories: Optional[List[str]] = None
-    ) -> List[KnowledgeItem]:
-        """
-        Simulate text search.
-        In production, this would use PostgreSQL full-text search.
-        """
-        # This is a placeholder - in real implementation, this would use:
-        # SELECT *, ts_rank(to_tsvector(enhanced_content), plainto_tsquery(%s)) AS rank
-        # FROM knowledge_items
-        # WHERE to_tsvector(enhanced_content) @@ plainto_tsquery(%s)
-        # ORDER BY rank DESC
-        # LIMIT %s
-        
-        # For now, return mock results
-        mock_items = []
-        for i in range(min(limit, 3)):  # Mock 3 results
-            item = KnowledgeItem(
-                id=f"knowledge_item_{i}",
-                content_item_id=f"content_item_{i}",
-                display_title=f"Mock Knowledge Item {i}",
-                summary=f"Mock summary {i} containing query terms",
-                enhanced_content=f"Mock enhanced content {i} with detailed information about the query topic",
-                key_points=[f"Key point {i}.1", f"Key point {i}.2"],
-                entities=[],
-                quality_score=0.8,
-                completeness_score=0.7
-            )
-            mock_items.append(item)
-        
-        return mock_items
-    
-    def _combine_search_results(
-        self,
-        vector_results: List[SearchResult],
-        text_results: List[SearchResult],
-        limit: int
+        offset: int = 0,
+        include_content: bool = True
     ) -> List[SearchResult]:
-        """Combine and re-rank vector and text search results."""
-        # Create a map to avoid duplicates
-        results_map = {}
-        
-        # Add vector results with higher weight
-        for result in vector_results:
-            key = result.knowledge_item_id
-            if key not in results_map:
-                # Boost vector similarity scores
-                boosted_score = min(1.0, result.similarity_score * 1.2)
-                result.similarity_score = boosted_score
-                results_map[key] = result
-        
-        # Add text results with lower weight
-        for result in text_results:
-            key = result.knowledge_item_id
-            if key not in results_map:
-                # Reduce text search scores slightly
-                reduced_score = result.similarity_score * 0.9
-                result.similarity_score = reduced_score
-                results_map[key] = result
-            else:
-                # Boost existing result if found in both searches
-                existing = results_map[key]
-                existing.similarity_score = min(1.0, existing.similarity_score * 1.1)
+        """Fuse vector and text rankings with RRF and build one page of results."""
+        # An item can have several matching chunks; its best chunk sets its rank
+        best_vector: Dict[str, VectorMatch] = {}
+        for match in vector_matches:
+            best_vector.setdefault(match.knowledge_item_id, match)
+        best_text: Dict[str, TextMatch] = {}
+        for match in text_matches:
+            best_text.setdefault(match.knowledge_item_id, match)
         
-        # Sort by similarity score and limit results
-        combined_results = list(results_map.values())
-        combined_results.sort(key=lambda x: x.similarity_score, reverse=True)
+        fused = reciprocal_rank_fusion(
+            [list(best_vector), list(best_text)],
+            k=get_settings().HYBRID_SEARCH_RRF_K
+        )
+        page = fused[offset:offset + limit]
         
-        # Update ranks
-        for i, result in enumerate(combined_results[:limit]):
-            result.rank = i + 1
+        knowledge_items = {}
+        if include_content:
+            knowledge_items = await self._load_knowledge_items([item_id for item_id, _ in page])
         
-        return combined_results[:limit]
-    
-    async def _filter_by_categories(
-        self,
-        results: List[SearchResult],
-        categories: List[str]
-    ) -> List[SearchResult]:
-        """Filter search results by categories."""
-        if not categories:
-            return results
-        
-        filtered_results = []
-        
-        for result in results:
-            if result.knowledge_item:
-                # Check if knowledge item's content item has matching categories
-                # This would require loading the content item
-                # For now, we'll keep all results
-                filtered_results.append(result)
+        results = []
+        for i, (item_id, fused_score) in enumerate(page):
+            rank = offset + i + 1
+            if item_id in best_vector:
+                result = self._vector_result(best_vector[item_id], knowledge_items, rank)
+            else:
+                result = self._text_result(best_text[item_id], knowledge_items, rank)
+            result.fused_score = fused_score
+            results.append(result)
         
-        return filtered_results
+        return results
     
     async def find_similar_items(
         self,
@@ -351,28 +309,24 @@ class VectorSearchService:
             List of similar items
         """
         try:
-            knowledge_repo = get_knowledge_repository()
+            knowledge_item = (await self._load_knowledge_items([knowledge_item_id])).get(knowledge_item_id)
+            if not knowledge_item:
+                raise ValueError(f"Knowledge item {knowledge_item_id} not found")
             
-            async with get_db_session() as db:
-                # Get the knowledge item
-                knowledge_item = await knowledge_repo.get(db, knowledge_item_id)
-                if not knowledge_item:
-                    raise ValueError(f"Knowledge item {knowledge_item_id} not found")
-                
-                # Use the item's content as query
-                query = SearchQuery(
-                    query_text=knowledge_item.enhanced_content[:500],  # Use first 500 chars
-                    search_type=SearchType.VECTOR_ONLY,
-                    limit=limit + 1,  # +1 to account for the item itself
-                    similarity_threshold=similarity_threshold
-                )
-                
-                results = await self._vector_search(query)
-                
-                # Remove the original item from results
-                filtered_results = [r for r in results if r.knowledge_item_id != knowledge_item_id]
-                
-                return filtered_results[:limit]
+            # Use the item's content as query
+            query = SearchQuery(
+                query_text=knowledge_item.enhanced_content[:500],  # Use first 500 chars
+                search_type=SearchType.VECTOR_ONLY,
+                limit=limit + 1,  # +1 to account for the item itself
+                similarity_threshold=similarity_threshold
+            )
+            
+            results = await self._vector_search(query)
+            
+            # Remove the original item from results
+            filtered_results = [r for r in results if r.knowledge_item_id != knowledge_item_id]
+            
+            return filtered_results[:limit]
                 
         except Exception as e:
             logger.error(f"Failed to find similar items for {knowledge_item_id}: {e}")
@@ -409,20 +363,16 @@ class VectorSearchService:
     async def get_search_stats(self) -> Dict[str, Any]:
         """Get search system statistics."""
         try:
-            knowledge_repo = get_knowledge_repository()
+            session_factory = get_session_factory()
+            async with session_factory() as db:
+                total_items = await db.scalar(select(func.count()).select_from(KnowledgeItem))
             
-            async with get_db_session() as db:
-                # This would get actual statistics from the database
-                # For now, return mock stats
-                stats = {
-                    "total_knowledge_items": 100,  # Mock count
-                    "total_embeddings": 500,  # Mock count
-                    "embedding_models": ["mock_model_1", "mock_model_2"],
-                    "average_similarity_threshold": 0.75,
-                    "search_performance_ms": 45
-                }
-                
-                return stats
+            return {
+                "total_knowledge_items": int(total_items or 0),
+                "total_embeddings": await self.store.count(),
+                "vector_store": type(self.store).__name__,
+                "average_similarity_threshold": self.similarity_threshold,
+            }
                 
         except Exception as e:
             logger.error(f"Failed to get search stats: {e}")
@@ -0,0 +1,513 @@
+"""
+Vector store backends for semantic and full-text search.
+
+``PgVectorStore`` keeps embedding vectors in a pgvector column on the
+``embeddings`` table and pushes similarity thresholds, category filters and
+``ts_rank`` full-text ranking down into PostgreSQL. ``LocalVectorStore`` offers
+the same interface on SQLite (FTS5) plus an in-memory numpy matrix so search
+can be exercised without a Postgres server.
+"""
+
+import asyncio
+import logging
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import text
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class VectorRecord:
+    """Embedding vector to be written to a vector store."""
+    embedding_id: str
+    knowledge_item_id: str
+    model: str
+    chunk_index: int
+    chunk_text: str
+    vector: List[float]
+    token_count: Optional[int] = None
+    main_category: Optional[str] = None
+    sub_category: Optional[str] = None
+
+
+@dataclass
+class VectorMatch:
+    """Embedding chunk returned by a similarity search."""
+    embedding_id: str
+    knowledge_item_id: str
+    chunk_text: str
+    chunk_index: int
+    similarity: float
+
+
+@dataclass
+class TextMatch:
+    """Knowledge item returned by a full-text search."""
+    knowledge_item_id: str
+    score: float
+    snippet: str
+
+
+class VectorStore(ABC):
+    """Interface shared by all vector store backends."""
+
+    @abstractmethod
+    async def ensure_indexes(self) -> None:
+        """Create the vector column and search indexes if they are missing."""
+
+    @abstractmethod
+    async def upsert(self, records: Sequence[VectorRecord]) -> int:
+        """Insert or replace embedding vectors. Returns the number written."""
+
+    @abstractmethod
+    async def delete_for_item(self, knowledge_item_id: str) -> int:
+        """Remove all vectors for a knowledge item. Returns the number removed."""
+
+    @abstractmethod
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        threshold: float = 0.0,
+        model: Optional[str] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[VectorMatch]:
+        """Return the closest chunks by cosine similarity, best first."""
+
+    @abstractmethod
+    async def text_search(
+        self,
+        query_text: str,
+        limit: int,
+        categories: Optional[List[str]] = None
+    ) -> List[TextMatch]:
+        """Return knowledge items ranked by full-text relevance, best first."""
+
+    @abstractmethod
+    async def count(self, model: Optional[str] = None) -> int:
+        """Return the number of stored vectors."""
+
+
+def _vector_literal(vector: Sequence[float]) -> str:
+    """Format a vector as a pgvector text literal."""
+    return "[" + ",".join(f"{float(v):.8g}" for v in vector) + "]"
+
+
+def knowledge_tsvector_sql(alias: str = "") -> str:
+    """
+    Full-text document expression for knowledge items.
+
+    The GIN index and the text search query must use the same expression for
+    PostgreSQL to use the index; migration 004_pgvector_search creates it too.
+    """
+    prefix = f"{alias}." if alias else ""
+    return (
+        f"to_tsvector('english', coalesce({prefix}display_title, '') || ' ' || "
+        f"coalesce({prefix}summary, '') || ' ' || coalesce({prefix}enhanced_content, ''))"
+    )
+
+
+class PgVectorStore(VectorStore):
+    """pgvector-backed store using HNSW or IVFFlat cosine indexes."""
+
+    def __init__(self, session_factory=None, settings=None):
+        self.settings = settings or get_settings()
+        self._session_factory = session_factory
+        self.dimension = self.settings.VECTOR_DIMENSION
+        self.index_type = self.settings.VECTOR_INDEX_TYPE.lower()
+
+    def _sessions(self):
+        if self._session_factory is None:
+            from app.database.connection import get_session_factory
+            self._session_factory = get_session_factory()
+        return self._session_factory()
+
+    def index_statements(self) -> List[str]:
+        """DDL that brings the vector column and search indexes up to date."""
+        statements = [
+            "CREATE EXTENSION IF NOT EXISTS vector",
+            f"ALTER TABLE embeddings ADD COLUMN IF NOT EXISTS embedding vector({int(self.dimension)})",
+        ]
+        if self.index_type == "ivfflat":
+            statements += [
+                "DROP INDEX IF EXISTS ix_embeddings_embedding_hnsw",
+                "CREATE INDEX IF NOT EXISTS ix_embeddings_embedding_ivfflat ON embeddings "
+                f"USING ivfflat (embedding vector_cosine_ops) WITH (lists = {int(self.settings.VECTOR_IVFFLAT_LISTS)})",
+            ]
+        else:
+            statements += [
+                "DROP INDEX IF EXISTS ix_embeddings_embedding_ivfflat",
+                "CREATE INDEX IF NOT EXISTS ix_embeddings_embedding_hnsw ON embeddings "
+                f"USING hnsw (embedding vector_cosine_ops) WITH (m = {int(self.settings.VECTOR_HNSW_M)}, "
+                f"ef_construction = {int(self.settings.VECTOR_HNSW_EF_CONSTRUCTION)})",
+            ]
+        statements.append(
+            "CREATE INDEX IF NOT EXISTS ix_knowledge_items_search_tsv ON knowledge_items "
+            f"USING gin ({knowledge_tsvector_sql()})"
+        )
+        return statements
+
+    async def ensure_indexes(self) -> None:
+        async with self._sessions() as db:
+            for statement in self.index_statements():
+                await db.execute(text(statement))
+            await db.commit()
+        logger.info(f"pgvector {self.index_type} index ensured for {self.dimension}-dimensional embeddings")
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> int:
+        if not records:
+            return 0
+
+        statement = text(
+            "INSERT INTO embeddings (id, knowledge_item_id, model, chunk_index, chunk_text, "
+            "embedding_dimension, token_count, created_at, embedding) "
+            "VALUES (:id, :knowledge_item_id, :model, :chunk_index, :chunk_text, "
+            ":embedding_dimension, :token_count, now(), CAST(:embedding AS vector)) "
+            "ON CONFLICT (id) DO UPDATE SET embedding = EXCLUDED.embedding, "
+            "chunk_text = EXCLUDED.chunk_text, model = EXCLUDED.model, "
+            "embedding_dimension = EXCLUDED.embedding_dimension"
+        )
+        params = [
+            {
+                "id": record.embedding_id,
+                "knowledge_item_id": record.knowledge_item_id,
+                "model": record.model,
+                "chunk_index": record.chunk_index,
+                "chunk_text": record.chunk_text,
+                "embedding_dimension": len(record.vector),
+                "token_count": record.token_count,
+                "embedding": _vector_literal(record.vector),
+            }
+            for record in records
+        ]
+        async with self._sessions() as db:
+            await db.execute(statement, params)
+            await db.commit()
+        return len(params)
+
+    async def delete_for_item(self, knowledge_item_id: str) -> int:
+        async with self._sessions() as db:
+            result = await db.execute(
+                text("DELETE FROM embeddings WHERE knowledge_item_id = :knowledge_item_id"),
+                {"knowledge_item_id": knowledge_item_id}
+            )
+            await db.commit()
+            return result.rowcount or 0
+
+    @staticmethod
+    def _category_join_and_filter(categories: Optional[List[str]], item_alias: str) -> Tuple[str, str]:
+        if not categories:
+            return "", ""
+        join = f" JOIN content_items c ON c.id = {item_alias}.content_item_id"
+        where = " AND (c.main_category = ANY(:categories) OR c.sub_category = ANY(:categories))"
+        return join, where
+
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        threshold: float = 0.0,
+        model: Optional[str] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[VectorMatch]:
+        params: Dict[str, Any] = {
+            "query": _vector_literal(query_embedding),
+            "max_distance": 1.0 - threshold,
+            "limit": limit,
+        }
+        join, category_filter = self._category_join_and_filter(categories, "k")
+        if categories:
+            join = " JOIN knowledge_items k ON k.id = e.knowledge_item_id" + join
+            params["categories"] = list(categories)
+        model_filter = ""
+        if model:
+            model_filter = " AND e.model = :model"
+            params["model"] = model
+
+        statement = text(
+            "SELECT e.id, e.knowledge_item_id, e.chunk_text, e.chunk_index, "
+            "1 - (e.embedding <=> CAST(:query AS vector)) AS similarity "
+            f"FROM embeddings e{join} "
+            "WHERE e.embedding IS NOT NULL "
+            "AND (e.embedding <=> CAST(:query AS vector)) <= :max_distance"
+            f"{model_filter}{category_filter} "
+            "ORDER BY e.embedding <=> CAST(:query AS vector) "
+            "LIMIT :limit"
+        )
+
+        async with self._sessions() as db:
+            # Widen the ANN candidate list so post-filtering still fills the limit
+            if self.index_type == "ivfflat":
+                await db.execute(text(f"SET LOCAL ivfflat.probes = {int(self.settings.VECTOR_IVFFLAT_PROBES)}"))
+            else:
+                ef_search = max(int(self.settings.VECTOR_HNSW_EF_SEARCH), int(limit))
+                await db.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+            rows = (await db.execute(statement, params)).all()
+
+        return [
+            VectorMatch(
+                embedding_id=row.id,
+                knowledge_item_id=row.knowledge_item_id,
+                chunk_text=row.chunk_text,
+                chunk_index=row.chunk_index,
+                similarity=float(row.similarity),
+            )
+            for row in rows
+        ]
+
+    async def text_search(
+        self,
+        query_text: str,
+        limit: int,
+        categories: Optional[List[str]] = None
+    ) -> List[TextMatch]:
+        params: Dict[str, Any] = {"query_text": query_text, "limit": limit}
+        join, category_filter = self._category_join_and_filter(categories, "k")
+        if categories:
+            params["categories"] = list(categories)
+
+        tsvector = knowledge_tsvector_sql("k")
+        # OR the query terms so long chat messages still match partially;
+        # ts_rank then favours items matching more of them.
+        statement = text(
+            "SELECT k.id, ts_rank(" + tsvector + ", q.query, 32) AS score, "
+            "coalesce(k.summary, left(k.enhanced_content, 200)) AS snippet "
+            f"FROM knowledge_items k{join}, "
+            "(SELECT replace(plainto_tsquery('english', :query_text)::text, '&', '|')::tsquery AS query) q "
+            f"WHERE {tsvector} @@ q.query{category_filter} "
+            "ORDER BY score DESC "
+            "LIMIT :limit"
+        )
+
+        async with self._sessions() as db:
+            rows = (await db.execute(statement, params)).all()
+
+        return [TextMatch(knowledge_item_id=row.id, score=float(row.score), snippet=row.snippet or "") for row in rows]
+
+    async def count(self, model: Optional[str] = None) -> int:
+        query = "SELECT count(*) FROM embeddings WHERE embedding IS NOT NULL"
+        params = {}
+        if model:
+            query += " AND model = :model"
+            params["model"] = model
+        async with self._sessions() as db:
+            return int((await db.execute(text(query), params)).scalar() or 0)
+
+
+class LocalVectorStore(VectorStore):
+    """
+    SQLite + numpy store with the same interface as PgVectorStore.
+
+    Vectors are persisted in SQLite and searched from a pre-normalized float32
+    matrix that is rebuilt lazily after writes. Full-text search uses FTS5
+    bm25 ranking over the stored chunk text.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.RLock()
+        self._matrix: Optional[np.ndarray] = None
+        self._rows: List[Dict[str, Any]] = []
+        self._create_schema()
+
+    def _create_schema(self) -> None:
+        with self._lock:
+            self._conn.executescript(
+                "CREATE TABLE IF NOT EXISTS embeddings ("
+                " id TEXT PRIMARY KEY, knowledge_item_id TEXT NOT NULL, model TEXT NOT NULL,"
+                " chunk_index INTEGER NOT NULL, chunk_text TEXT NOT NULL,"
+                " main_category TEXT, sub_category TEXT, vector BLOB NOT NULL);"
+                "CREATE INDEX IF NOT EXISTS ix_local_embeddings_item ON embeddings (knowledge_item_id);"
+                "CREATE VIRTUAL TABLE IF NOT EXISTS embeddings_fts USING fts5(embedding_id UNINDEXED, chunk_text);"
+            )
+            self._conn.commit()
+
+    async def ensure_indexes(self) -> None:
+        self._create_schema()
+
+    async def upsert(self, records: Sequence[VectorRecord]) -> int:
+        if not records:
+            return 0
+        with self._lock:
+            ids = [(record.embedding_id,) for record in records]
+            self._conn.executemany("DELETE FROM embeddings_fts WHERE embedding_id = ?", ids)
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings "
+                "(id, knowledge_item_id, model, chunk_index, chunk_text, main_category, sub_category, vector) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        record.embedding_id, record.knowledge_item_id, record.model, record.chunk_index,
+                        record.chunk_text, record.main_category, record.sub_category,
+                        np.asarray(record.vector, dtype=np.float32).tobytes()
+                    )
+                    for record in records
+                ]
+            )
+            self._conn.executemany(
+                "INSERT INTO embeddings_fts (embedding_id, chunk_text) VALUES (?, ?)",
+                [(record.embedding_id, record.chunk_text) for record in records]
+            )
+            self._conn.commit()
+            self._matrix = None
+        return len(records)
+
+    async def delete_for_item(self, knowledge_item_id: str) -> int:
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM embeddings WHERE knowledge_item_id = ?", (knowledge_item_id,)
+            )]
+            self._conn.executemany("DELETE FROM embeddings_fts WHERE embedding_id = ?", [(i,) for i in ids])
+            self._conn.execute("DELETE FROM embeddings WHERE knowledge_item_id = ?", (knowledge_item_id,))
+            self._conn.commit()
+            self._matrix = None
+            return len(ids)
+
+    def _load_matrix(self) -> None:
+        """Rebuild the normalized vector matrix after writes."""
+        rows = self._conn.execute(
+            "SELECT id, knowledge_item_id, model, chunk_index, chunk_text, main_category, sub_category, vector "
+            "FROM embeddings ORDER BY rowid"
+        ).fetchall()
+        self._rows = [
+            {
+                "id": row[0], "knowledge_item_id": row[1], "model": row[2], "chunk_index": row[3],
+                "chunk_text": row[4], "main_category": row[5], "sub_category": row[6],
+            }
+            for row in rows
+        ]
+        if not rows:
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            return
+        matrix = np.vstack([np.frombuffer(row[7], dtype=np.float32) for row in rows])
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        norms[norms == 0] = 1e-9
+        self._matrix = matrix / norms
+
+    def _search_matrix(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        threshold: float,
+        model: Optional[str],
+        categories: Optional[List[str]]
+    ) -> List[VectorMatch]:
+        with self._lock:
+            if self._matrix is None:
+                self._load_matrix()
+            matrix, rows = self._matrix, self._rows
+
+        if not rows or limit <= 0:
+            return []
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        query = query / (norm if norm else 1e-9)
+        if query.shape[0] != matrix.shape[1]:
+            logger.warning(f"Query dimension {query.shape[0]} does not match stored dimension {matrix.shape[1]}")
+            return []
+
+        scores = matrix @ query
+        mask = scores >= threshold
+        if model:
+            mask &= np.array([row["model"] == model for row in rows])
+        if categories:
+            wanted = set(categories)
+            mask &= np.array([row["main_category"] in wanted or row["sub_category"] in wanted for row in rows])
+
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > limit:
+            top = np.argpartition(-scores[candidates], limit - 1)[:limit]
+            candidates = candidates[top]
+        ordered = candidates[np.argsort(-scores[candidates])]
+
+        return [
+            VectorMatch(
+                embedding_id=rows[i]["id"],
+                knowledge_item_id=rows[i]["knowledge_item_id"],
+                chunk_text=rows[i]["chunk_text"],
+                chunk_index=rows[i]["chunk_index"],
+                similarity=float(scores[i]),
+            )
+            for i in ordered
+        ]
+
+    async def similarity_search(
+        self,
+        query_embedding: List[float],
+        limit: int,
+        threshold: float = 0.0,
+        model: Optional[str] = None,
+        categories: Optional[List[str]] = None
+    ) -> List[VectorMatch]:
+        return await asyncio.to_thread(self._search_matrix, query_embedding, limit, threshold, model, categories)
+
+    async def text_search(
+        self,
+        query_text: str,
+        limit: int,
+        categories: Optional[List[str]] = None
+    ) -> List[TextMatch]:
+        terms = re.findall(r"\w+", query_text.lower())
+        if not terms:
+            return []
+        match_query = " OR ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+        params: List[Any] = [match_query]
+        category_filter = ""
+        if categories:
+            placeholders = ",".join("?" for _ in categories)
+            category_filter = f" AND (e.main_category IN ({placeholders}) OR e.sub_category IN ({placeholders}))"
+            params += list(categories) * 2
+
+        with self._lock:
+            rows = self._conn.execute(
+                "WITH hits AS MATERIALIZED ("
+                " SELECT embedding_id, bm25(embeddings_fts) AS rank FROM embeddings_fts"
+                " WHERE embeddings_fts MATCH ?) "
+                "SELECT e.knowledge_item_id, min(hits.rank) AS rank, e.chunk_text "
+                f"FROM hits JOIN embeddings e ON e.id = hits.embedding_id WHERE 1 = 1{category_filter} "
+                "GROUP BY e.knowledge_item_id ORDER BY rank LIMIT ?",
+                params + [limit]
+            ).fetchall()
+
+        # bm25() is negative with lower being better; map to a 0..1 score
+        return [
+            TextMatch(knowledge_item_id=row[0], score=float(-row[1] / (1.0 - row[1])), snippet=row[2][:200])
+            for row in rows
+        ]
+
+    async def count(self, model: Optional[str] = None) -> int:
+        with self._lock:
+            if model:
+                return self._conn.execute("SELECT count(*) FROM embeddings WHERE model = ?", (model,)).fetchone()[0]
+            return self._conn.execute("SELECT count(*) FROM embeddings").fetchone()[0]
+
+
+# Global store instance
+_vector_store: Optional[VectorStore] = None
+
+
+def get_vector_store() -> VectorStore:
+    """Get the global vector store selected by VECTOR_STORE_BACKEND."""
+    global _vector_store
+    if _vector_store is None:
+        settings = get_settings()
+        backend = settings.VECTOR_STORE_BACKEND.lower()
+        if backend == "local" or (backend == "auto" and settings.DATABASE_URL.startswith("sqlite")):
+            _vector_store = LocalVectorStore(settings.VECTOR_LOCAL_STORE_PATH)
+        else:
+            _vector_store = PgVectorStore(settings=settings)
+    return _vector_store
@@ -7,6 +7,8 @@ from .connection_manager import (
     WebSocketMessage,
     MessageType,
     ConnectionInfo,
+    ConnectionSendQueue,
+    SlowConsumerPolicy,
     get_connection_manager
 )
 
@@ -22,6 +24,8 @@ __all__ = [
     "WebSocketMessage", 
     "MessageType",
     "ConnectionInfo",
+    "ConnectionSendQueue",
+    "SlowConsumerPolicy",
     "get_connection_manager",
     "RedisPubSubManager",
     "WebSocketNotificationService",
@@ -6,12 +6,15 @@ import asyncio
 import json
 import logging
 import time
-from typing import Dict, List, Set, Optional, Any
+from collections import deque
+from typing import Deque, Dict, List, Set, Optional, Any
 from dataclasses import dataclass, asdict
 from enum import Enum
 from fastapi import WebSocket, WebSocketDisconnect
 import uuid
 
+from app.config import get_settings
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,6 +34,17 @@ class MessageType(str, Enum):
     ERROR = "error"
 
 
+class SlowConsumerPolicy(str, Enum):
+    """What to do when a connection's send queue is full."""
+    DROP_OLDEST = "drop_oldest"  # Discard the oldest queued message
+    COALESCE = "coalesce"  # Replace queued progress with newer progress, else drop the oldest
+    DISCONNECT = "disconnect"  # Close the connection
+
+
+# Message types where only the latest queued message per task matters
+COALESCIBLE_TYPES = {MessageType.TASK_PROGRESS, MessageType.HEARTBEAT}
+
+
 @dataclass
 class WebSocketMessage:
     """WebSocket message structure."""
@@ -47,6 +61,105 @@ class WebSocketMessage:
     def to_json(self) -> str:
         """Convert to JSON string."""
         return json.dumps(self.to_dict())
+    
+    def coalesce_key(self) -> Optional[str]:
+        """Key under which a newer message supersedes this one in a send queue."""
+        if self.type not in COALESCIBLE_TYPES:
+            return None
+        return f"{self.type.value}:{self.channel}:{self.data.get('task_id')}"
+
+
+@dataclass
+class _QueuedFrame:
+    """A serialized message waiting in one connection's send queue."""
+    payload: str
+    coalesce_key: Optional[str] = None
+
+
+class ConnectionSendQueue:
+    """
+    Bounded send queue of one connection, drained by that connection's writer task.
+    
+    Payloads are serialized once per message and shared by every queue they
+    are put in; entries are per queue so coalescing can replace them in place.
+    """
+    
+    def __init__(self, maxsize: int, policy: SlowConsumerPolicy):
+        self.maxsize = max(1, maxsize)
+        self.policy = policy
+        self._frames: Deque[_QueuedFrame] = deque()
+        self._by_key: Dict[str, _QueuedFrame] = {}
+        self._ready = asyncio.Event()
+        self.sent = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.high_water = 0
+    
+    def __len__(self) -> int:
+        return len(self._frames)
+    
+    def put(self, payload: str, coalesce_key: Optional[str] = None) -> bool:
+        """
+        Queue a serialized message.
+        
+        Returns:
+            False if the queue is full and the policy is to disconnect
+        """
+        if coalesce_key and self.policy == SlowConsumerPolicy.COALESCE:
+            queued = self._by_key.get(coalesce_key)
+            if queued is not None:
+                # Keep the queue position, send the newest state
+                queued.payload = payload
+                self.coalesced += 1
+                return True
+        
+        if len(self._frames) >= self.maxsize:
+            if self.policy == SlowConsumerPolicy.DISCONNECT:
+                return False
+            self._evict()
+        
+        frame = _QueuedFrame(payload, coalesce_key)
+        self._frames.append(frame)
+        if coalesce_key:
+            self._by_key[coalesce_key] = frame
+        self.high_water = max(self.high_water, len(self._frames))
+        self._ready.set()
+        return True
+    
+    def _evict(self):
+        """Make room for one frame, preferring to drop superseded progress."""
+        victim = None
+        if self.policy == SlowConsumerPolicy.COALESCE:
+            victim = next((frame for frame in self._frames if frame.coalesce_key), None)
+        if victim is None:
+            victim = self._frames[0]
+        self._frames.remove(victim)
+        self._forget(victim)
+        self.dropped += 1
+    
+    def _forget(self, frame: _QueuedFrame):
+        if frame.coalesce_key and self._by_key.get(frame.coalesce_key) is frame:
+            del self._by_key[frame.coalesce_key]
+    
+    async def get(self) -> str:
+        """Wait for and remove the next payload."""
+        while not self._frames:
+            self._ready.clear()
+            await self._ready.wait()
+        frame = self._frames.popleft()
+        self._forget(frame)
+        return frame.payload
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Queue-depth metrics for this connection."""
+        return {
+            "depth": len(self._frames),
+            "max_size": self.maxsize,
+            "high_water": self.high_water,
+            "sent": self.sent,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced
+        }
 
 
 @dataclass
@@ -59,6 +172,8 @@ class ConnectionInfo:
     connected_at: float = 0.0
     last_heartbeat: float = 0.0
     subscriptions: Set[str] = None
+    send_queue: Optional[ConnectionSendQueue] = None
+    writer_task: Optional[asyncio.Task] = None
     
     def __post_init__(self):
         if self.subscriptions is None:
@@ -70,9 +185,20 @@ class ConnectionInfo:
 
 
 class WebSocketConnectionManager:
-    """Manages WebSocket connections and message broadcasting."""
+    """
+    Manages WebSocket connections and message broadcasting.
+    
+    Each message is serialized once and put in the bounded send queue of every
+    recipient; a writer task per connection drains its queue, so a slow client
+    only ever delays itself.
+    """
     
-    def __init__(self):
+    def __init__(self, send_queue_size: int = 256,
+                 slow_consumer_policy: SlowConsumerPolicy = SlowConsumerPolicy.COALESCE,
+                 send_timeout: float = 10.0):
+        self.send_queue_size = send_queue_size
+        self.slow_consumer_policy = SlowConsumerPolicy(slow_consumer_policy)
+        self.send_timeout = send_timeout
         self.connections: Dict[str, ConnectionInfo] = {}
         self.user_connections: Dict[str, Set[str]] = {}  # user_id -> connection_ids
         self.channel_subscriptions: Dict[str, Set[str]] = {}  # channel -> connection_ids
@@ -89,7 +215,10 @@ class WebSocketConnectionManager:
             self._cleanup_task = asyncio.create_task(self._cleanup_loop())
     
     async def stop_background_tasks(self):
-        """Stop background tasks."""
+        """Stop background tasks, including the writers of live connections."""
+        for connection_info in list(self.connections.values()):
+            await self._stop_writer(connection_info)
+        
         if self._heartbeat_task:
             self._heartbeat_task.cancel()
             try:
@@ -121,10 +250,12 @@ class WebSocketConnectionManager:
         connection_id = str(uuid.uuid4())
         connection_info = ConnectionInfo(
             connection_id=connection_id,
-            websocket=websocket
+            websocket=websocket,
+            send_queue=ConnectionSendQueue(self.send_queue_size, self.slow_consumer_policy)
         )
         
         self.connections[connection_id] = connection_info
+        connection_info.writer_task = asyncio.create_task(self._writer_loop(connection_info))
         
         logger.info(f"WebSocket connection established: {connection_id}")
         
@@ -171,8 +302,22 @@ class WebSocketConnectionManager:
         # Remove connection
         del self.connections[connection_id]
         
+        await self._stop_writer(connection_info)
+        
         logger.info(f"WebSocket connection disconnected: {connection_id}")
     
+    async def _stop_writer(self, connection_info: ConnectionInfo):
+        """Cancel and await a connection's writer, unless the writer is the caller."""
+        writer_task = connection_info.writer_task
+        if not writer_task or writer_task is asyncio.current_task():
+            return
+        writer_task.cancel()
+        try:
+            await writer_task
+        except asyncio.CancelledError:
+            pass
+        connection_info.writer_task = None
+    
     async def authenticate_connection(self, connection_id: str, user_id: str) -> bool:
         """
         Authenticate a WebSocket connection.
@@ -267,14 +412,8 @@ class WebSocketConnectionManager:
         message.channel = channel
         connection_ids = self.channel_subscriptions[channel].copy()
         
-        # Send to all subscribers
-        tasks = []
-        for connection_id in connection_ids:
-            task = asyncio.create_task(self._send_to_connection(connection_id, message))
-            tasks.append(task)
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        # Serialize once, queue for every subscriber
+        await self._enqueue_many(connection_ids, message)
         
         logger.debug(f"Broadcasted message to {len(connection_ids)} connections on channel {channel}")
     
@@ -292,14 +431,7 @@ class WebSocketConnectionManager:
         
         connection_ids = self.user_connections[user_id].copy()
         
-        # Send to all user connections
-        tasks = []
-        for connection_id in connection_ids:
-            task = asyncio.create_task(self._send_to_connection(connection_id, message))
-            tasks.append(task)
-        
-        if tasks:
-            await asyncio.gather(*tasks, return_exceptions=True)
+        await self._enqueue_many(connection_ids, message)
         
         logger.debug(f"Sent message to {len(connection_ids)} connections for user {user_id}")
     
@@ -314,18 +446,53 @@ class WebSocketConnectionManager:
         await self._send_to_connection(connection_id, message)
     
     async def _send_to_connection(self, connection_id: str, message: WebSocketMessage):
-        """Internal method to send message to connection."""
-        if connection_id not in self.connections:
-            return
-        
-        connection_info = self.connections[connection_id]
+        """Internal method to queue a message for a connection."""
+        await self._enqueue_many([connection_id], message)
+    
+    async def _enqueue_many(self, connection_ids, message: WebSocketMessage):
+        """Serialize a message once and put it in each connection's send queue."""
+        payload = message.to_json()
+        coalesce_key = message.coalesce_key()
         
+        overflowed = []
+        for connection_id in connection_ids:
+            connection_info = self.connections.get(connection_id)
+            if connection_info is None:
+                continue
+            if not connection_info.send_queue.put(payload, coalesce_key):
+                overflowed.append(connection_id)
+        
+        for connection_id in overflowed:
+            logger.warning(f"Send queue full for connection {connection_id}, disconnecting slow consumer")
+            await self._close_connection(connection_id, code=1013)
+    
+    async def _writer_loop(self, connection_info: ConnectionInfo):
+        """Drain one connection's send queue into its WebSocket."""
+        connection_id = connection_info.connection_id
+        send_queue = connection_info.send_queue
+        while True:
+            payload = await send_queue.get()
+            try:
+                await asyncio.wait_for(connection_info.websocket.send_text(payload), self.send_timeout)
+                send_queue.sent += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Failed to send message to connection {connection_id}: {e!r}")
+                # Remove broken or stalled connection
+                await self._close_connection(connection_id, code=1011)
+                return
+    
+    async def _close_connection(self, connection_id: str, code: int):
+        """Unregister a connection and close its socket."""
+        connection_info = self.connections.get(connection_id)
+        if connection_info is None:
+            return
+        await self.disconnect(connection_id)
         try:
-            await connection_info.websocket.send_text(message.to_json())
-        except Exception as e:
-            logger.error(f"Failed to send message to connection {connection_id}: {e}")
-            # Remove broken connection
-            await self.disconnect(connection_id)
+            await connection_info.websocket.close(code=code)
+        except Exception:
+            pass
     
     async def handle_message(self, connection_id: str, message_data: str):
         """
@@ -410,14 +577,7 @@ class WebSocketConnectionManager:
                 )
                 
                 # Send heartbeat to all connections
-                connection_ids = list(self.connections.keys())
-                tasks = []
-                for connection_id in connection_ids:
-                    task = asyncio.create_task(self._send_to_connection(connection_id, heartbeat_message))
-                    tasks.append(task)
-                
-                if tasks:
-                    await asyncio.gather(*tasks, return_exceptions=True)
+                await self._enqueue_many(list(self.connections.keys()), heartbeat_message)
                 
             except asyncio.CancelledError:
                 break
@@ -447,8 +607,17 @@ class WebSocketConnectionManager:
             except Exception as e:
                 logger.error(f"Error in cleanup loop: {e}")
     
+    def get_send_queue_stats(self, connection_id: str) -> Optional[Dict[str, int]]:
+        """Get send queue metrics for one connection."""
+        connection_info = self.connections.get(connection_id)
+        return connection_info.send_queue.get_stats() if connection_info else None
+    
     def get_connection_stats(self) -> Dict[str, Any]:
         """Get connection statistics."""
+        send_queues = {
+            connection_id: info.send_queue.get_stats()
+            for connection_id, info in self.connections.items()
+        }
         return {
             "total_connections": len(self.connections),
             "authenticated_connections": sum(1 for conn in self.connections.values() if conn.authenticated),
@@ -457,7 +626,13 @@ class WebSocketConnectionManager:
             "channel_stats": {
                 channel: len(connections) 
                 for channel, connections in self.channel_subscriptions.items()
-            }
+            },
+            "slow_consumer_policy": self.slow_consumer_policy.value,
+            "queued_messages": sum(stats["depth"] for stats in send_queues.values()),
+            "max_queue_depth": max((stats["depth"] for stats in send_queues.values()), default=0),
+            "dropped_messages": sum(stats["dropped"] for stats in send_queues.values()),
+            "coalesced_messages": sum(stats["coalesced"] for stats in send_queues.values()),
+            "send_queues": send_queues
         }
 
 
@@ -469,5 +644,10 @@ def get_connection_manager() -> WebSocketConnectionManager:
     """Get the global WebSocket connection manager."""
     global _connection_manager
     if _connection_manager is None:
-        _connection_manager = WebSocketConnectionManager()
+        settings = get_settings()
+        _connection_manager = WebSocketConnectionManager(
+            send_queue_size=settings.WEBSOCKET_SEND_QUEUE_SIZE,
+            slow_consumer_policy=settings.WEBSOCKET_SLOW_CONSUMER_POLICY,
+            send_timeout=settings.WEBSOCKET_SEND_TIMEOUT
+        )
     return _connection_manager
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""Tests for the local vector store backend."""
+
+import asyncio
+
+import pytest
+
+from app.services.vector_store import LocalVectorStore, PgVectorStore, VectorRecord
+
+
+def _record(embedding_id, item_id, vector, text, category=None, model="embed-model"):
+    return VectorRecord(
+        embedding_id=embedding_id,
+        knowledge_item_id=item_id,
+        model=model,
+        chunk_index=0,
+        chunk_text=text,
+        vector=vector,
+        main_category=category
+    )
+
+
+@pytest.fixture
+def local_store():
+    """Create an in-memory local vector store with a few records."""
+    store = LocalVectorStore(":memory:")
+    asyncio.run(store.upsert([
+        _record("e1", "k1", [1.0, 0.0, 0.0], "Python asyncio event loop internals", "programming"),
+        _record("e2", "k2", [0.8, 0.6, 0.0], "Tuning PostgreSQL vacuum settings", "databases"),
+        _record("e3", "k3", [0.0, 0.0, 1.0], "Sourdough starter hydration", "cooking"),
+        _record("e4", "k4", [1.0, 0.1, 0.0], "Python packaging with wheels", "programming", model="other-model"),
+    ]))
+    return store
+
+
+class TestLocalVectorStore:
+    """Test cases for LocalVectorStore."""
+
+    @pytest.mark.asyncio
+    async def test_similarity_search_orders_and_thresholds(self, local_store):
+        """Results are ordered by cosine similarity and cut at the threshold."""
+        matches = await local_store.similarity_search([1.0, 0.2, 0.0], limit=10, threshold=0.5)
+
+        assert [m.embedding_id for m in matches] == ["e4", "e1", "e2"]
+        assert all(m.similarity >= 0.5 for m in matches)
+
+    @pytest.mark.asyncio
+    async def test_similarity_search_filters_model_and_category(self, local_store):
+        """Model and category filters are applied before the top-k cut."""
+        matches = await local_store.similarity_search(
+            [1.0, 0.2, 0.0], limit=1, model="embed-model", categories=["databases"]
+        )
+
+        assert [m.embedding_id for m in matches] == ["e2"]
+
+    @pytest.mark.asyncio
+    async def test_upsert_replaces_vector(self, local_store):
+        """Upserting an existing id replaces its vector and text."""
+        await local_store.upsert([_record("e3", "k3", [1.0, 0.0, 0.0], "Python sourdough", "cooking")])
+
+        matches = await local_store.similarity_search([1.0, 0.0, 0.0], limit=2, model="embed-model")
+        text_matches = await local_store.text_search("hydration", limit=5)
+
+        assert {m.embedding_id for m in matches} == {"e1", "e3"}
+        assert text_matches == []
+        assert await local_store.count() == 4
+
+    @pytest.mark.asyncio
+    async def test_text_search_ranks_by_term_overlap(self, local_store):
+        """Items matching more query terms rank first."""
+        matches = await local_store.text_search("python asyncio tutorial", limit=5)
+
+        assert [m.knowledge_item_id for m in matches][:2] == ["k1", "k4"]
+        assert 0 < matches[1].score < matches[0].score < 1
+
+    @pytest.mark.asyncio
+    async def test_delete_for_item(self, local_store):
+        """Deleting an item removes its vectors from both search paths."""
+        assert await local_store.delete_for_item("k1") == 1
+
+        matches = await local_store.similarity_search([1.0, 0.0, 0.0], limit=10)
+        assert "e1" not in {m.embedding_id for m in matches}
+        assert await local_store.text_search("asyncio", limit=5) == []
+
+
+class TestPgVectorStore:
+    """Test cases for PgVectorStore DDL generation."""
+
+    def test_index_statements_follow_index_type(self, test_settings):
+        """The configured index type is created and the other one dropped."""
+        test_settings.VECTOR_INDEX_TYPE = "ivfflat"
+        statements = PgVectorStore(session_factory=object(), settings=test_settings).index_statements()
+
+        assert any("USING ivfflat" in s for s in statements)
+        assert "DROP INDEX IF EXISTS ix_embeddings_embedding_hnsw" in statements
+        assert any(f"vector({test_settings.VECTOR_DIMENSION})" in s for s in statements)
+        assert any("USING gin" in s for s in statements)
+
+
+class TestSaveEmbeddings:
+    """Test cases for EmbeddingService.save_embeddings."""
+
+    @pytest.mark.asyncio
+    async def test_every_result_reaches_the_store_with_its_categories(self, monkeypatch):
+        """All results are upserted and carry categories for the category filter."""
+        from app.services import embedding_service
+        from app.services.embedding_service import EmbeddingResult, EmbeddingService
+
+        store = LocalVectorStore(":memory:")
+        monkeypatch.setattr(embedding_service, "get_vector_store", lambda: store)
+        service = EmbeddingService()
+
+        async def categories_for_items(knowledge_item_ids):
+            return {"k1": ("databases", "postgres")}
+
+        monkeypatch.setattr(service, "_categories_for_items", categories_for_items)
+        results = [
+            EmbeddingResult(embedding_id=f"e{i}", knowledge_item_id="k1", model="embed-model", chunk_index=i,
+                            embedding_vector=[1.0, float(i), 0.0], chunk_text=f"Vacuum tuning part {i}",
+                            token_count=5, embedding_dimension=3)
+            for i in range(2)
+        ]
+
+        assert await service.save_embeddings(results) == 2
+        matches = await store.similarity_search([1.0, 0.0, 0.0], limit=5, categories=["databases"])
+        assert sorted(m.embedding_id for m in matches) == ["e0", "e1"]
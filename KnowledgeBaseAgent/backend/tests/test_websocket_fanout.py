@@ -0,0 +1,158 @@
+"""Tests for WebSocket fan-out with per-connection send queues."""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+from app.websocket.connection_manager import (
+    ConnectionSendQueue, MessageType, SlowConsumerPolicy, WebSocketConnectionManager, WebSocketMessage
+)
+
+
+class FakeWebSocket:
+    """WebSocket that records what it is sent, optionally blocking every send."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.closed_with = code
+
+
+def _progress(task_id: str, progress: int) -> WebSocketMessage:
+    return WebSocketMessage(
+        type=MessageType.TASK_PROGRESS,
+        data={"task_id": task_id, "progress": progress},
+        timestamp=time.time(),
+        message_id=str(uuid.uuid4())
+    )
+
+
+def _notification(text: str) -> WebSocketMessage:
+    return WebSocketMessage(
+        type=MessageType.NOTIFICATION,
+        data={"message": text},
+        timestamp=time.time(),
+        message_id=str(uuid.uuid4())
+    )
+
+
+class TestConnectionSendQueue:
+    """Test cases for slow consumer policies."""
+
+    def test_coalesce_replaces_queued_progress(self):
+        """Test that newer progress for a task replaces the queued one in place."""
+        queue = ConnectionSendQueue(maxsize=3, policy=SlowConsumerPolicy.COALESCE)
+        queue.put("p1", "progress:a")
+        queue.put("n1")
+        queue.put("p2", "progress:a")
+        assert len(queue) == 2
+        assert queue.coalesced == 1
+
+        # When full, superseded progress goes before notifications
+        queue.put("p3", "progress:b")
+        queue.put("n2")
+        assert queue.dropped == 1
+        assert [frame.payload for frame in queue._frames] == ["n1", "p3", "n2"]
+
+    def test_drop_oldest_and_disconnect(self):
+        """Test the other two policies when the queue is full."""
+        drop = ConnectionSendQueue(maxsize=2, policy=SlowConsumerPolicy.DROP_OLDEST)
+        for payload in ["a", "b", "c"]:
+            assert drop.put(payload)
+        assert [frame.payload for frame in drop._frames] == ["b", "c"]
+        assert drop.get_stats()["dropped"] == 1
+
+        disconnect = ConnectionSendQueue(maxsize=1, policy=SlowConsumerPolicy.DISCONNECT)
+        assert disconnect.put("a")
+        assert not disconnect.put("b")
+
+
+@pytest.fixture
+async def make_manager():
+    """Create connection managers and shut each one down after the test."""
+    managers = []
+
+    def factory(**kwargs):
+        managers.append(WebSocketConnectionManager(**kwargs))
+        return managers[-1]
+
+    yield factory
+
+    for manager in managers:
+        await manager.stop_background_tasks()
+
+
+class TestWebSocketFanOut:
+    """Test cases for broadcasting through send queues."""
+
+    @pytest.mark.asyncio
+    async def test_broadcast_serializes_once_and_slow_clients_do_not_block(self, make_manager, monkeypatch):
+        """Test that a stalled client neither delays broadcasts nor other clients."""
+        manager = make_manager(send_queue_size=8)
+        fast = [FakeWebSocket() for _ in range(5)]
+        slow = FakeWebSocket(delay=10)
+        connection_ids = [await manager.connect(ws) for ws in fast + [slow]]
+        for connection_id in connection_ids:
+            await manager.subscribe_to_channel(connection_id, "task_updates")
+
+        serializations = []
+        original_to_json = WebSocketMessage.to_json
+        monkeypatch.setattr(WebSocketMessage, "to_json",
+                            lambda self: serializations.append(1) or original_to_json(self))
+
+        started = time.monotonic()
+        for progress in range(20):
+            await manager.broadcast_to_channel("task_updates", _progress("t1", progress))
+            # Let the writers run between events, as they would between real updates
+            await asyncio.sleep(0.001)
+        assert time.monotonic() - started < 1
+        assert len(serializations) == 20
+
+        await asyncio.sleep(0.05)
+        for ws in fast:
+            # Welcome message plus every progress update
+            assert len(ws.sent) == 21
+        slow_stats = manager.get_send_queue_stats(connection_ids[-1])
+        assert slow_stats["depth"] == 1
+        assert slow_stats["coalesced"] == 19
+
+        for connection_id in connection_ids:
+            await manager.disconnect(connection_id)
+
+    @pytest.mark.asyncio
+    async def test_disconnect_policy_closes_slow_consumer(self, make_manager):
+        """Test that a full queue under the disconnect policy drops the connection."""
+        manager = make_manager(send_queue_size=2, slow_consumer_policy="disconnect")
+        slow = FakeWebSocket(delay=10)
+        connection_id = await manager.connect(slow)
+        await manager.subscribe_to_channel(connection_id, "notifications")
+
+        for index in range(4):
+            await manager.broadcast_to_channel("notifications", _notification(f"n{index}"))
+
+        assert connection_id not in manager.connections
+        assert slow.closed_with == 1013
+        assert manager.get_connection_stats()["total_connections"] == 0
+
+    @pytest.mark.asyncio
+    async def test_shutdown_stops_writers_of_live_connections(self, make_manager):
+        """Test that stopping background tasks leaves no writer running."""
+        manager = make_manager()
+        connection_id = await manager.connect(FakeWebSocket(delay=10))
+        writer_task = manager.connections[connection_id].writer_task
+
+        await manager.stop_background_tasks()
+        assert writer_task.done()
@@ -4,10 +4,11 @@ import asyncio
 import json
 import re
 from typing import Tuple, Optional, Dict, Any, List
-from knowledge_base_agent.naming_utils import normalize_name_for_filesystem, is_valid_item_name, fix_invalid_name, fallback_snippet_based_name
+from knowledge_base_agent.naming_utils import normalize_name_for_filesystem, is_valid_item_name, fix_invalid_name, fallback_snippet_based_name, create_fallback_short_name
 from knowledge_base_agent.exceptions import KnowledgeBaseError, AIError
 from knowledge_base_agent.http_client import HTTPClient
 from knowledge_base_agent.prompts_replacement import LLMPrompts
+from knowledge_base_agent.prompt_prefix import assemble_message, assemble_prompt, mark_item_value, mark_run_value
 
 def process_category_response(response_text: str, tweet_id: str) -> Tuple[str, str, str]:
     """
@@ -88,26 +89,8 @@ def process_category_response(response_text: str, tweet_id: str) -> Tuple[str, s
         raise ValueError(f"Unexpected error processing category JSON response: {e}")
 
 
-async def categorize_and_name_content(
-    http_client: HTTPClient,
-    tweet_data: Dict[str, Any],
-    text_model: str,  # Keep for backward compatibility
-    tweet_id: str,
-    category_manager, # Instance of CategoryManager
-    max_retries: int = 5,
-    fallback_model: str = "",
-    gpu_device: int = 0
-) -> Tuple[str, str, str]:
-    """Categorize content using text and image descriptions, with robust retries, expecting JSON output."""
-    
-    # Use backend-aware categorization model selection
-    model_to_use = http_client.config.get_model_for_backend('categorization')
-    text_model_for_backend = http_client.config.get_model_for_backend('text')
-    if model_to_use != text_model_for_backend:
-        logging.info(f"Using dedicated categorization model for {http_client.config.inference_backend}: {model_to_use} for tweet {tweet_id}")
-    else:
-        logging.info(f"Using text model for categorization on {http_client.config.inference_backend}: {model_to_use} for tweet {tweet_id}")
-    
+def build_categorization_context(tweet_data: Dict[str, Any], tweet_id: str) -> str:
+    """Build the text used to categorize a tweet: its (thread) text plus media descriptions."""
     raw_tweet_text = ""
     thread_segments = tweet_data.get("thread_tweets", [])
 
@@ -173,22 +156,109 @@ async def categorize_and_name_content(
     logging.debug(f"[AI_CAT] Tweet {tweet_id} - Image descriptions for context: {image_descriptions}")
     logging.debug(f"[AI_CAT] Tweet {tweet_id} - Final context_content before strip: '''{context_content[:300]}...''' (Length: {len(context_content)})")
 
+    return context_content
+
+
+async def categorize_and_name_content(
+    http_client: HTTPClient,
+    tweet_data: Dict[str, Any],
+    text_model: str,  # Keep for backward compatibility
+    tweet_id: str,
+    category_manager, # Instance of CategoryManager
+    max_retries: int = 5,
+    fallback_model: str = "",
+    gpu_device: int = 0
+) -> Tuple[str, str, str]:
+    """Categorize content using text and image descriptions, with robust retries, expecting JSON output."""
+    
+    # Use backend-aware categorization model selection
+    model_to_use = http_client.config.get_model_for_backend('categorization')
+    text_model_for_backend = http_client.config.get_model_for_backend('text')
+    if model_to_use != text_model_for_backend:
+        logging.info(f"Using dedicated categorization model for {http_client.config.inference_backend}: {model_to_use} for tweet {tweet_id}")
+    else:
+        logging.info(f"Using text model for categorization on {http_client.config.inference_backend}: {model_to_use} for tweet {tweet_id}")
+    
+    thread_segments = tweet_data.get("thread_tweets", [])
+    context_content = build_categorization_context(tweet_data, tweet_id)
+
     if not context_content.strip():
         logging.error(f"No text or image description content found for tweet {tweet_id}. Cannot categorize.")
         raise AIError(f"Cannot categorize tweet {tweet_id}: No content available.")
 
-    # category_manager here is an instance of CategoryManager passed from content_processor
-    # We can use its get_all_categories() method to provide existing categories to the LLM.
-    # This helps the LLM choose existing ones or create compatible new ones.
+    preclassifier = getattr(category_manager, 'preclassifier', None)
+    prediction = None
+    if preclassifier is not None:
+        prediction = await preclassifier.predict(context_content, tweet_id)
+        if prediction is not None and prediction.accepted:
+            item_name = await _name_preclassified_item(category_manager, context_content, prediction, tweet_id)
+            if item_name:
+                preclassifier.learn(tweet_id, prediction.main_category, prediction.sub_category,
+                                    prediction, source='classifier')
+                logging.info(f"Pre-classified tweet {tweet_id} as {prediction.main_category}/{prediction.sub_category} "
+                             f"(margin {prediction.confidence:.3f}) without the categorization prompt")
+                return prediction.main_category, prediction.sub_category, item_name
+
+    formatted_existing_categories = _format_existing_categories(category_manager, prediction)
+
+    main_cat, sub_cat, item_name = await _request_llm_categorization(
+        http_client, model_to_use, context_content, formatted_existing_categories,
+        bool(thread_segments), tweet_id, max_retries, gpu_device
+    )
+    if preclassifier is not None:
+        preclassifier.learn(tweet_id, main_cat, sub_cat, prediction)
+    return main_cat, sub_cat, item_name
+
+
+def _format_existing_categories(category_manager, prediction) -> str:
+    """List the existing categories for the prompt so the LLM reuses them or creates compatible new ones."""
     existing_categories_structure = category_manager.get_categories() # Gets the dict
-    # Format existing categories for the prompt to be more helpful
+    if prediction is not None and prediction.narrow_prompt:
+        # The correct category is almost always among the closest few; list only those
+        existing_categories_structure = _restrict_to_candidates(existing_categories_structure, prediction.candidates)
     formatted_existing_categories = "\n".join(
         [f"- {main_cat}: {', '.join(sub_cats) if isinstance(sub_cats, list) else list(sub_cats.keys()) if isinstance(sub_cats, dict) else ''}"
          for main_cat, sub_cats in existing_categories_structure.items()]
     )
     if not formatted_existing_categories:
         formatted_existing_categories = "No existing categories defined yet. You can define new ones."
+    return formatted_existing_categories
+
 
+def _restrict_to_candidates(categories: Dict[str, Any], candidates: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Keep only the candidate (main, sub) pairs, in the candidates' order."""
+    restricted: Dict[str, List[str]] = {}
+    for main_cat, sub_cat in candidates:
+        restricted.setdefault(main_cat, [])
+        if sub_cat not in restricted[main_cat]:
+            restricted[main_cat].append(sub_cat)
+    return restricted
+
+
+async def _name_preclassified_item(category_manager, context_content: str, prediction, tweet_id: str) -> Optional[str]:
+    """Name an item whose category was assigned by the pre-classifier, or None to fall back to the full prompt."""
+    try:
+        item_name = await category_manager.generate_item_name(
+            context_content, prediction.main_category, prediction.sub_category, tweet_id
+        )
+    except Exception as e:
+        logging.warning(f"Item naming failed for pre-classified tweet {tweet_id}, using full categorization: {e}")
+        return None
+    item_name = normalize_name_for_filesystem(item_name)
+    return item_name or None
+
+
+async def _request_llm_categorization(
+    http_client: HTTPClient,
+    model_to_use: str,
+    context_content: str,
+    formatted_existing_categories: str,
+    is_thread: bool,
+    tweet_id: str,
+    max_retries: int,
+    gpu_device: int
+) -> Tuple[str, str, str]:
+    """Ask the categorization model for (main_category, sub_category, item_name), with retries and fallback model."""
     # Check if the model supports reasoning mode - prioritize categorization model setting
     use_reasoning = False
     if hasattr(http_client.config, 'categorization_model_thinking') and http_client.config.categorization_model_thinking:
@@ -198,17 +268,18 @@ async def categorize_and_name_content(
         use_reasoning = True
         logging.info(f"Using reasoning mode from text_model_thinking setting for tweet {tweet_id}")
     
-    is_thread = bool(thread_segments)
-
     if use_reasoning:
         from knowledge_base_agent.prompts_replacement import ReasoningPrompts
         
         logging.info(f"Using reasoning mode for categorization of tweet {tweet_id}")
         
-        # Create the messages list with system message and user prompt
+        # Create the messages list with system message and user prompt; the tweet goes
+        # last so the server can reuse the cached instructions and categories
         messages = [
             ReasoningPrompts.get_system_message(),
-            ReasoningPrompts.get_categorization_prompt(context_content, formatted_existing_categories, is_thread)
+            assemble_message(ReasoningPrompts.get_categorization_prompt(
+                mark_item_value(context_content), mark_run_value(formatted_existing_categories), is_thread
+            ))
         ]
         
         # Loop for retries
@@ -221,7 +292,8 @@ async def categorize_and_name_content(
                     temperature=0.7,
                     top_p=0.9,
                     timeout=http_client.config.content_generation_timeout,
-                    options={"gpu_device": gpu_device}
+                    options={"gpu_device": gpu_device},
+                    cache_phase="categorization"
                 )
                 
                 if response and response.strip():
@@ -253,7 +325,8 @@ async def categorize_and_name_content(
                             temperature=0.7,
                             top_p=0.9,
                             timeout=http_client.config.content_generation_timeout,
-                            options={"gpu_device": gpu_device}
+                            options={"gpu_device": gpu_device},
+                            cache_phase="categorization"
                         )
                         
                         if response and response.strip():
@@ -270,14 +343,14 @@ async def categorize_and_name_content(
         raise AIError(f"Failed to categorize tweet {tweet_id} after {max_retries} attempts")
     else:
         # Determine if the content is a thread for the prompt
-        source_type_indicator = "Tweet Thread Content" if thread_segments else "Tweet Content"
+        source_type_indicator = "Tweet Thread Content" if is_thread else "Tweet Content"
 
-        # Use the centralized prompt
-        prompt_text = LLMPrompts.get_categorization_prompt_standard(
-            context_content=context_content,
-            formatted_existing_categories=formatted_existing_categories,
-            is_thread=bool(thread_segments) # Pass is_thread directly
-        )
+        # Use the centralized prompt, with the tweet last so its shared prefix stays cached
+        prompt_text = assemble_prompt(LLMPrompts.get_categorization_prompt_standard(
+            context_content=mark_item_value(context_content),
+            formatted_existing_categories=mark_run_value(formatted_existing_categories),
+            is_thread=is_thread
+        ))
 
         # Loop for retries
         for attempt in range(max_retries):
@@ -289,7 +362,8 @@ async def categorize_and_name_content(
                     temperature=0.7,
                     top_p=0.9,
                     timeout=http_client.config.content_generation_timeout,
-                    options={"json_mode": use_json_mode, "gpu_device": gpu_device} if use_json_mode else {"gpu_device": gpu_device}
+                    options={"json_mode": use_json_mode, "gpu_device": gpu_device} if use_json_mode else {"gpu_device": gpu_device},
+                    cache_phase="categorization"
                 )
                 
                 if response and response.strip():
@@ -315,7 +389,8 @@ async def categorize_and_name_content(
                             temperature=0.7,
                             top_p=0.9,
                             timeout=http_client.config.content_generation_timeout,
-                            options={"json_mode": use_json_mode, "gpu_device": gpu_device} if use_json_mode else {"gpu_device": gpu_device}
+                            options={"json_mode": use_json_mode, "gpu_device": gpu_device} if use_json_mode else {"gpu_device": gpu_device},
+                            cache_phase="categorization"
                         )
                         
                         if response and response.strip():
@@ -332,6 +407,177 @@ async def categorize_and_name_content(
         raise AIError(f"Failed to categorize tweet {tweet_id} after {max_retries} attempts")
 
 
+# Fields returned by the fused categorization call, in the order they are requested
+FUSED_CATEGORIZATION_FIELDS = ('main_category', 'sub_category', 'item_name', 'display_title')
+
+_FUSED_FIELD_DESCRIPTIONS = {
+    'main_category': 'highly specific technical domain, lowercase with underscores',
+    'sub_category': 'more precise technical area within main_category, lowercase with underscores',
+    'item_name': '2-4 word filesystem-friendly name, lowercase with underscores',
+    'display_title': 'human-readable Title Case title, at most 100 characters',
+}
+DISPLAY_TITLE_MAX_LENGTH = 100
+
+
+def fused_categorization_schema(fields) -> Dict[str, Any]:
+    """JSON schema that constrains the model's output to exactly the requested fields."""
+    properties = {}
+    for field in fields:
+        if field == 'display_title':
+            properties[field] = {"type": "string", "minLength": 3, "maxLength": DISPLAY_TITLE_MAX_LENGTH}
+        else:
+            properties[field] = {"type": "string", "pattern": "^[a-z0-9_]+$", "minLength": 3, "maxLength": 50}
+    return {"type": "object", "properties": properties, "required": list(fields), "additionalProperties": False}
+
+
+def parse_fused_response(response_text: str, fields, tweet_id: str) -> Tuple[Dict[str, str], List[str]]:
+    """
+    Validate each requested field of a fused categorization response on its own.
+
+    Returns:
+        Tuple of (valid fields normalized like process_category_response, names of the fields to ask for again)
+    """
+    if "```json" in response_text:
+        response_text = response_text.split("```json")[1].split("```")[0]
+    elif "```" in response_text:
+        response_text = response_text.split("```")[1]
+    try:
+        data = json.loads(response_text.strip())
+    except json.JSONDecodeError as e:
+        logging.warning(f"Invalid JSON in fused categorization response for tweet {tweet_id}: {e}. Response: '{response_text}'")
+        return {}, list(fields)
+    if not isinstance(data, dict):
+        return {}, list(fields)
+
+    valid: Dict[str, str] = {}
+    invalid: List[str] = []
+    for field in fields:
+        value = str(data.get(field) or '').strip()
+        if field == 'display_title':
+            value = ' '.join(value.split())
+            ok = 3 <= len(value) <= DISPLAY_TITLE_MAX_LENGTH
+        else:
+            value = normalize_name_for_filesystem(value) if value else ''
+            ok = bool(value) and (field != 'item_name' or is_valid_item_name(value))
+        if ok:
+            valid[field] = value
+        else:
+            logging.warning(f"Invalid {field} {data.get(field)!r} in fused categorization response for tweet {tweet_id}")
+            invalid.append(field)
+    return valid, invalid
+
+
+async def categorize_name_and_title_content(
+    http_client: HTTPClient,
+    tweet_data: Dict[str, Any],
+    tweet_id: str,
+    category_manager, # Instance of CategoryManager
+    max_retries: int = 5,
+    gpu_device: int = 0
+) -> Tuple[str, str, str, str]:
+    """
+    Categorize, name and title content in one schema-constrained LLM call.
+
+    Fields that fail validation are requested again on their own, with the
+    valid ones passed back as settled, instead of repeating the whole call.
+    When the pre-classifier accepts a category, only the item name and display
+    title are requested.
+
+    Returns:
+        Tuple of (main_category, sub_category, item_name, display_title)
+    """
+    model_to_use = http_client.config.get_model_for_backend('categorization')
+    context_content = build_categorization_context(tweet_data, tweet_id)
+
+    if not context_content.strip():
+        logging.error(f"No text or image description content found for tweet {tweet_id}. Cannot categorize.")
+        raise AIError(f"Cannot categorize tweet {tweet_id}: No content available.")
+
+    preclassifier = getattr(category_manager, 'preclassifier', None)
+    prediction = None
+    settled: Dict[str, str] = {}
+    if preclassifier is not None:
+        prediction = await preclassifier.predict(context_content, tweet_id)
+        if prediction is not None and prediction.accepted:
+            settled = {'main_category': prediction.main_category, 'sub_category': prediction.sub_category}
+
+    formatted_existing_categories = _format_existing_categories(category_manager, prediction)
+    result = await _request_fused_categorization(
+        http_client, model_to_use, context_content, formatted_existing_categories, settled,
+        bool(tweet_data.get("thread_tweets")), tweet_id, max_retries, gpu_device
+    )
+    if preclassifier is not None:
+        if settled:
+            preclassifier.learn(tweet_id, result['main_category'], result['sub_category'], prediction, source='classifier')
+        else:
+            preclassifier.learn(tweet_id, result['main_category'], result['sub_category'], prediction)
+    logging.info(f"Fused categorization for tweet {tweet_id}: {result['main_category']}/{result['sub_category']}/"
+                 f"{result['item_name']} '{result['display_title']}'")
+    return tuple(result[field] for field in FUSED_CATEGORIZATION_FIELDS)
+
+
+async def _request_fused_categorization(
+    http_client: HTTPClient,
+    model_to_use: str,
+    context_content: str,
+    formatted_existing_categories: str,
+    settled: Dict[str, str],
+    is_thread: bool,
+    tweet_id: str,
+    max_retries: int,
+    gpu_device: int
+) -> Dict[str, str]:
+    """Request the fields not yet settled until all validate, then fall back for naming fields that never did."""
+    result = dict(settled)
+    missing = [field for field in FUSED_CATEGORIZATION_FIELDS if field not in result]
+    backend_fallback_model = http_client.config.get_model_for_backend('fallback')
+    last_error: Optional[Exception] = None
+
+    for attempt in range(max_retries):
+        if not missing:
+            break
+        settled_lines = [f"- {field}: {result[field]}" for field in FUSED_CATEGORIZATION_FIELDS if field in result]
+        settled_fields = "Already decided (use these, do not return them):\n" + "\n".join(settled_lines) if settled_lines else ""
+        # Instructions and categories first so their prefix stays cached across tweets
+        prompt_text = assemble_prompt(LLMPrompts.get_fused_categorization_prompt_standard(
+            context_content=mark_item_value(context_content),
+            formatted_existing_categories=mark_run_value(formatted_existing_categories),
+            requested_fields="\n".join(f"- {field}: {_FUSED_FIELD_DESCRIPTIONS[field]}" for field in missing),
+            settled_fields=mark_item_value(settled_fields),
+            is_thread=is_thread
+        ))
+        model = backend_fallback_model if last_error and attempt == max_retries - 1 and backend_fallback_model else model_to_use
+        try:
+            response = await http_client.generate(
+                model=model,
+                prompt=prompt_text,
+                temperature=0.7,
+                top_p=0.9,
+                timeout=http_client.config.content_generation_timeout,
+                options={"json_schema": fused_categorization_schema(missing), "gpu_device": gpu_device},
+                cache_phase="categorization"
+            )
+        except AIError as e:
+            last_error = e
+            logging.warning(f"Attempt {attempt+1}/{max_retries}: AI error during fused categorization for tweet {tweet_id}: {e}")
+            await asyncio.sleep(2 ** attempt)
+            continue
+
+        valid, missing = parse_fused_response(response or "", missing, tweet_id)
+        result.update(valid)
+        if missing:
+            logging.warning(f"Attempt {attempt+1}/{max_retries}: re-requesting {', '.join(missing)} for tweet {tweet_id}")
+
+    if 'main_category' not in result or 'sub_category' not in result:
+        raise AIError(f"Failed to categorize tweet {tweet_id} after {max_retries} attempts")
+    if 'item_name' not in result:
+        result['item_name'] = fallback_snippet_based_name(context_content)
+        logging.warning(f"Using snippet-based item name '{result['item_name']}' for tweet {tweet_id}")
+    if 'display_title' not in result:
+        result['display_title'] = create_fallback_short_name(result['item_name'])
+    return result
+
+
 # --- Keep infer_basic_category and re_categorize_offline as they might be used elsewhere, ---
 # --- but they are NOT used as fallbacks in the main categorize_and_name_content anymore. ---
 def infer_basic_category(text: str) -> Tuple[str, str]:
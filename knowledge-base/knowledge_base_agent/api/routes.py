@@ -1,4 +1,4 @@
-from flask import Blueprint, jsonify, request, current_app, send_from_directory, url_for, abort
+from flask import Blueprint, jsonify, request, current_app, send_from_directory, url_for, abort, Response, stream_with_context
 from ..models import db, KnowledgeBaseItem, SubcategorySynthesis, Setting, AgentState, CeleryTaskState, TaskLog
 from ..preferences import UserPreferences, save_user_preferences, load_user_preferences
 from ..task_state_manager import TaskStateManager
@@ -8,6 +8,7 @@ from ..agent import KnowledgeBaseAgent
 from .logs import list_logs
 from .log_content import get_log_content
 from ..postgresql_logging import LogQueryService
+from ..kb_toc import get_kb_toc
 import shutil
 from pathlib import Path
 import os
@@ -21,8 +22,9 @@ import platform
 import psutil
 from dataclasses import asdict
 from sqlalchemy import text
-import markdown
 import concurrent.futures
+import queue
+import threading
 import tempfile
 import glob
 
@@ -71,6 +73,56 @@ def run_async_in_gevent_context(coro):
             future = executor.submit(run_with_app_context)
             return future.result(timeout=150)
 
+def iterate_async_in_gevent_context(agen):
+    """
+    Iterate an async generator from synchronous (gevent) request code.
+    
+    The generator runs on its own event loop in a worker thread, like
+    run_async_in_gevent_context, and hands each item over through a queue so
+    the caller can yield it (e.g. to a streaming response) as soon as it exists.
+    Closing the returned generator, such as when the client disconnects, stops
+    the async generator at its next item.
+    """
+    from flask import current_app
+    
+    app = current_app._get_current_object()
+    items = queue.Queue()
+    stop = threading.Event()
+    finished = object()
+    
+    async def consume():
+        try:
+            async for item in agen:
+                if stop.is_set():
+                    break
+                items.put(item)
+        finally:
+            await agen.aclose()
+    
+    def run_with_app_context():
+        try:
+            with app.app_context():
+                asyncio.run(consume())
+        except Exception as e:
+            items.put(e)
+        finally:
+            items.put(finished)
+    
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+    executor.submit(run_with_app_context)
+    try:
+        while True:
+            item = items.get()
+            if item is finished:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        executor.shutdown(wait=False)
+
+
 bp = Blueprint('api', __name__)
 logger = logging.getLogger(__name__)
 
@@ -1417,12 +1469,81 @@ def api_chat_legacy():
         logging.error(f"Error in legacy chat API: {e}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
+def _get_or_create_chat_session(message, session_id):
+    """Return (session, session_id) for a chat request, creating the session if none is given."""
+    from ..models import ChatSession
+    
+    if session_id:
+        return ChatSession.query.filter_by(session_id=session_id).first(), session_id
+    
+    session_id = str(uuid.uuid4())
+    session = ChatSession(
+        session_id=session_id,
+        title=message[:50] + "..." if len(message) > 50 else message,
+        created_at=datetime.now(timezone.utc),
+        last_updated=datetime.now(timezone.utc)
+    )
+    db.session.add(session)
+    return session, session_id
+
+def _resolve_chat_search_context(search_context):
+    """Resolve client-provided search_context into concrete source metadata (titles and short content)."""
+    resolved_sources = []
+    try:
+        for src in (search_context or []):
+            stype = src.get('type')
+            sid = src.get('id')
+            if stype == 'kb' and sid is not None:
+                ut = db.session.execute(text("SELECT id, kb_display_title, main_category, sub_category, kb_content FROM unified_tweet WHERE id=:id"), {"id": sid}).first()
+                if ut:
+                    resolved_sources.append({
+                        'type': 'kb_item',
+                        'id': ut.id,
+                        'title': ut.kb_display_title,
+                        'main_category': ut.main_category,
+                        'sub_category': ut.sub_category,
+                        'content': (ut.kb_content or '')[:500]
+                    })
+            elif stype == 'synthesis' and sid is not None:
+                syn = db.session.execute(text("SELECT id, synthesis_title, main_category, sub_category, synthesis_content FROM subcategory_synthesis WHERE id=:id"), {"id": sid}).first()
+                if syn:
+                    resolved_sources.append({
+                        'type': 'synthesis',
+                        'id': syn.id,
+                        'title': syn.synthesis_title,
+                        'main_category': syn.main_category,
+                        'sub_category': syn.sub_category,
+                        'content': (syn.synthesis_content or '')[:500]
+                    })
+    except Exception as _e:
+        pass
+    return resolved_sources
+
+def _save_assistant_chat_message(session, session_id, model, result, message_count_increment):
+    """Store the assistant reply with its sources and metrics and bump the session counters."""
+    from ..models import ChatMessage
+    
+    assistant_message = ChatMessage(
+        session_id=session_id,
+        role='assistant',
+        content=result.get('response', ''),
+        created_at=datetime.now(timezone.utc),
+        model_used=model or 'default',
+        sources=json.dumps(result.get('sources', [])),
+        context_stats=json.dumps(result.get('context_stats', {})),
+        performance_metrics=json.dumps(result.get('performance_metrics', {}))
+    )
+    db.session.add(assistant_message)
+    
+    # Update session
+    session.message_count = (session.message_count or 0) + message_count_increment
+    session.last_updated = datetime.now(timezone.utc)
+
 @bp.route('/chat/enhanced', methods=['POST'])
 def api_chat_enhanced():
     """Enhanced chat API endpoint with technical expertise and rich source metadata."""
     try:
-        from ..models import ChatSession, ChatMessage, db
-        from datetime import datetime, timezone
+        from ..models import ChatMessage
         
         data = request.get_json()
         if not data or 'message' not in data:
@@ -1433,23 +1554,12 @@ def api_chat_enhanced():
             return jsonify({'error': 'Message cannot be empty'}), 400
         
         model = data.get('model')
-        session_id = data.get('session_id')
         use_knowledge_base = data.get('use_knowledge_base', True)
         
         # Get or create session
-        if session_id:
-            session = ChatSession.query.filter_by(session_id=session_id).first()
-            if not session:
-                return jsonify({'error': 'Session not found'}), 404
-        else:
-            session_id = str(uuid.uuid4())
-            session = ChatSession(
-                session_id=session_id,
-                title=message[:50] + "..." if len(message) > 50 else message,
-                created_at=datetime.now(timezone.utc),
-                last_updated=datetime.now(timezone.utc)
-            )
-            db.session.add(session)
+        session, session_id = _get_or_create_chat_session(message, data.get('session_id'))
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
         
         # Save user message
         user_message = ChatMessage(
@@ -1466,49 +1576,9 @@ def api_chat_enhanced():
         if not chat_mgr:
             return jsonify({'error': 'Chat functionality not available'}), 503
 
-        # If provided, use search_context from client. Otherwise, consult FTS for top hits
-        search_context = data.get('search_context')
-        if not search_context and use_knowledge_base:
-            try:
-                kb_rows = db.session.execute(text("SELECT id, title FROM kb_item_fts WHERE kb_item_fts MATCH :q LIMIT 5"), {"q": message}).all()
-                syn_rows = db.session.execute(text("SELECT id, title FROM synthesis_fts WHERE synthesis_fts MATCH :q LIMIT 5"), {"q": message}).all()
-                search_context = (
-                    [{'type': 'kb', 'id': r.id, 'title': r.title} for r in kb_rows] +
-                    [{'type': 'synthesis', 'id': r.id, 'title': r.title} for r in syn_rows]
-                )
-            except Exception:
-                search_context = []
-
-        # Resolve search_context into concrete source metadata (fetch titles and short content)
-        resolved_sources = []
-        try:
-            for src in (search_context or []):
-                stype = src.get('type')
-                sid = src.get('id')
-                if stype == 'kb' and sid is not None:
-                    ut = db.session.execute(text("SELECT id, kb_display_title, main_category, sub_category, markdown_content FROM unified_tweet WHERE id=:id"), {"id": sid}).first()
-                    if ut:
-                        resolved_sources.append({
-                            'type': 'kb_item',
-                            'id': ut.id,
-                            'title': ut.kb_display_title,
-                            'main_category': ut.main_category,
-                            'sub_category': ut.sub_category,
-                            'content': (ut.markdown_content or '')[:500]
-                        })
-                elif stype == 'synthesis' and sid is not None:
-                    syn = db.session.execute(text("SELECT id, synthesis_title, main_category, sub_category, synthesis_content FROM subcategory_synthesis WHERE id=:id"), {"id": sid}).first()
-                    if syn:
-                        resolved_sources.append({
-                            'type': 'synthesis',
-                            'id': syn.id,
-                            'title': syn.synthesis_title,
-                            'main_category': syn.main_category,
-                            'sub_category': syn.sub_category,
-                            'content': (syn.synthesis_content or '')[:500]
-                        })
-        except Exception as _e:
-            pass
+        # Client-provided search_context (UI pre-search) is merged into the hybrid
+        # retrieval results by the chat manager
+        resolved_sources = _resolve_chat_search_context(data.get('search_context'))
 
         result = run_async_in_gevent_context(
             chat_mgr.handle_chat_query(message, model, use_knowledge_base=use_knowledge_base, search_context=resolved_sources)
@@ -1518,22 +1588,7 @@ def api_chat_enhanced():
             return jsonify(result), 500
         
         # Save assistant response
-        assistant_message = ChatMessage(
-            session_id=session_id,
-            role='assistant',
-            content=result.get('response', ''),
-            created_at=datetime.now(timezone.utc),
-            model_used=model or 'default',
-            sources=json.dumps(result.get('sources', [])),
-            context_stats=json.dumps(result.get('context_stats', {})),
-            performance_metrics=json.dumps(result.get('performance_metrics', {}))
-        )
-        db.session.add(assistant_message)
-        
-        # Update session
-        session.message_count = (session.message_count or 0) + 2
-        session.last_updated = datetime.now(timezone.utc)
-        
+        _save_assistant_chat_message(session, session_id, model, result, message_count_increment=2)
         db.session.commit()
         
         result['session_id'] = session_id
@@ -1544,6 +1599,83 @@ def api_chat_enhanced():
         logging.error(f"Error in enhanced chat API: {e}", exc_info=True)
         return jsonify({'error': 'Internal server error'}), 500
 
+@bp.route('/chat/enhanced/stream', methods=['POST'])
+def api_chat_enhanced_stream():
+    """
+    Streaming variant of /chat/enhanced that answers with server-sent events.
+    
+    Events: 'session' (session_id), 'sources' (retrieved context, before generation),
+    'token' (coalesced response text), then 'done' (formatted response and
+    performance metrics, including time-to-first-token) or 'error'. The
+    assistant message is stored when 'done' is sent.
+    """
+    try:
+        from ..models import ChatMessage
+        
+        data = request.get_json()
+        if not data or 'message' not in data:
+            return jsonify({'error': 'Message is required'}), 400
+        
+        message = data['message'].strip()
+        if not message:
+            return jsonify({'error': 'Message cannot be empty'}), 400
+        
+        model = data.get('model')
+        use_knowledge_base = data.get('use_knowledge_base', True)
+        
+        from ..web import get_chat_manager
+        chat_mgr = get_chat_manager()
+        if not chat_mgr:
+            return jsonify({'error': 'Chat functionality not available'}), 503
+        
+        session, session_id = _get_or_create_chat_session(message, data.get('session_id'))
+        if not session:
+            return jsonify({'error': 'Session not found'}), 404
+        
+        # The user message is stored before streaming starts so it survives a dropped stream
+        db.session.add(ChatMessage(
+            session_id=session_id,
+            role='user',
+            content=message,
+            created_at=datetime.now(timezone.utc)
+        ))
+        session.message_count = (session.message_count or 0) + 1
+        session.last_updated = datetime.now(timezone.utc)
+        db.session.commit()
+        
+        resolved_sources = _resolve_chat_search_context(data.get('search_context'))
+        
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error in enhanced chat stream API: {e}", exc_info=True)
+        return jsonify({'error': 'Internal server error'}), 500
+    
+    def sse(event, payload):
+        return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+    
+    def generate():
+        yield sse('session', {'session_id': session_id})
+        try:
+            for event in iterate_async_in_gevent_context(chat_mgr.stream_chat_query(
+                message, model, use_knowledge_base=use_knowledge_base, search_context=resolved_sources
+            )):
+                name = event.pop('event')
+                if name == 'done':
+                    _save_assistant_chat_message(session, session_id, model, event, message_count_increment=1)
+                    db.session.commit()
+                    event['session_id'] = session_id
+                yield sse(name, event)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Error streaming enhanced chat response: {e}", exc_info=True)
+            yield sse('error', {'error': 'Internal server error'})
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @bp.route('/chat/models/available', methods=['GET'])
 def api_chat_models_available():
     """Get available chat models."""
@@ -1913,6 +2045,9 @@ def get_preferences():
             # Legacy/combined flag
             'force_reprocess_content': preferences.force_reprocess_content,
             
+            # Categorization options
+            'fused_categorization': preferences.fused_categorization,
+            
             # Additional options
             'synthesis_mode': preferences.synthesis_mode,
             'synthesis_min_items': preferences.synthesis_min_items,
@@ -2105,11 +2240,11 @@ def clear_celery_queue():
         
         # Also purge specific queues
         queues_to_purge = ['agent', 'processing', 'chat']
-        for queue in queues_to_purge:
+        for queue_name in queues_to_purge:
             try:
-                celery_app.control.purge(queue)
+                celery_app.control.purge(queue_name)
             except Exception as e:
-                logging.warning(f"Failed to purge queue {queue}: {e}")
+                logging.warning(f"Failed to purge queue {queue_name}: {e}")
         
         return jsonify({
             'success': True,
@@ -3148,28 +3283,17 @@ def get_environment_settings():
 def get_kb_all():
     """Returns a JSON object with all KB items and syntheses for the TOC from unified database."""
     try:
-        from ..models import UnifiedTweet
-        # Get KB items from unified database using only modern markdown_content
-        items = db.session.query(UnifiedTweet).filter(
-            UnifiedTweet.kb_item_created == True,
-            UnifiedTweet.markdown_content.isnot(None)
-        ).order_by(UnifiedTweet.main_category, UnifiedTweet.sub_category, UnifiedTweet.kb_display_title).all()
-        syntheses = db.session.query(SubcategorySynthesis).order_by(SubcategorySynthesis.main_category, SubcategorySynthesis.sub_category).all()  # type: ignore
-        
-        items_data = [{
-            'id': item.id, 
-            'title': item.kb_display_title or item.kb_item_name or f'Tweet {item.tweet_id}', 
-            'display_title': item.kb_display_title,
-            'main_category': item.main_category, 
-            'sub_category': item.sub_category
-        } for item in items]
-        
-        syntheses_data = [{
-            'id': synth.id, 'synthesis_title': synth.synthesis_title,
-            'main_category': synth.main_category, 'sub_category': synth.sub_category
-        } for synth in syntheses]
-
-        return jsonify({'items': items_data, 'syntheses': syntheses_data})
+        etag, body, compressed = get_kb_toc(current_app.config.get('APP_CONFIG')).snapshot()
+        
+        gzipped = request.accept_encodings['gzip'] > 0
+        response = current_app.response_class(compressed if gzipped else body, mimetype='application/json')
+        if gzipped:
+            response.headers['Content-Encoding'] = 'gzip'
+        response.vary.add('Accept-Encoding')
+        # Each encoding is its own representation, so it gets its own strong ETag
+        response.set_etag(f"{etag}-gzip" if gzipped else etag)
+        response.cache_control.no_cache = True
+        return response.make_conditional(request)
     except Exception as e:
         logging.error(f"Error fetching KB index: {e}", exc_info=True)
         return jsonify({'error': 'Failed to fetch Knowledge Base index'}), 500
@@ -3249,6 +3373,14 @@ def validate_kb_items():
         logging.error(f"Error validating KB items: {e}", exc_info=True)
         return jsonify({'error': f'Failed to validate KB items: {str(e)}'}), 500
 
+def _conditional_json(data):
+    """JSON response with a strong ETag that answers a matching If-None-Match with 304."""
+    response = jsonify(data)
+    response.add_etag()
+    # Let browsers keep the body but revalidate it on every use
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
 @bp.route('/items/<int:item_id>')
 def get_kb_item(item_id: int):
     """API endpoint for getting KB item data in JSON format.
@@ -3257,8 +3389,9 @@ def get_kb_item(item_id: int):
     """
     try:
         from flask import url_for
-        from ..models import UnifiedTweet, RenderCache
-        import json, hashlib
+        from ..models import UnifiedTweet
+        from ..render_cache import get_render_cache
+        import json
 
         def _normalize_list(value):
             if value is None:
@@ -3290,23 +3423,13 @@ def get_kb_item(item_id: int):
         kb_media_paths = _normalize_list(ut.kb_media_paths)
         media_files = _normalize_list(ut.media_files)
 
-        # Use only modern markdown_content and serve HTML from render cache
+        # Use only modern markdown_content; HTML is rendered when the item is written
         content_md = ut.markdown_content or ""
-        content_html = ""
-        if content_md.strip():
-            h = hashlib.sha256(content_md.encode('utf-8')).hexdigest()
-            rc = db.session.query(RenderCache).filter_by(document_type='kb_item', document_id=ut.id, content_hash=h).first()
-            if rc:
-                content_html = rc.html
-            else:
-                content_html = markdown.markdown(content_md, extensions=['extra','codehilite'])
-                try:
-                    db.session.add(RenderCache(document_type='kb_item', document_id=ut.id, content_hash=h, html=content_html))
-                    db.session.commit()
-                except Exception:
-                    db.session.rollback()
+        content_html = get_render_cache(current_app.config.get('APP_CONFIG')).get(
+            'kb_item', ut.id, content_md, ut.content_hash
+        )
 
-        return jsonify({
+        return _conditional_json({
             'id': ut.id,
             'tweet_id': ut.tweet_id,
             'title': ut.kb_display_title or ut.kb_item_name or f'Tweet {ut.tweet_id}',
@@ -3334,6 +3457,7 @@ def get_kb_item(item_id: int):
 def get_synthesis_item(synthesis_id):
     """API endpoint for getting synthesis data in JSON format."""
     try:
+        from ..render_cache import get_render_cache
         synth = SubcategorySynthesis.query.get_or_404(synthesis_id)
         
         # Parse raw JSON content if it exists
@@ -3358,9 +3482,12 @@ def get_synthesis_item(synthesis_id):
             'file_path': synth.file_path,
             'created_at': synth.created_at.isoformat() if synth.created_at else None,
             'last_updated': synth.last_updated.isoformat() if synth.last_updated else None,
-            'synthesis_content_html': markdown.markdown(synth.synthesis_content or "", extensions=['extra','codehilite'])
+            # synth.content_hash tracks the source items, so the render key is hashed from the content
+            'synthesis_content_html': get_render_cache(current_app.config.get('APP_CONFIG')).get(
+                'synthesis', synth.id, synth.synthesis_content
+            )
         }
-        return jsonify(synthesis_data)
+        return _conditional_json(synthesis_data)
     except Exception as e:
         return jsonify({'error': f'Failed to fetch synthesis: {str(e)}'}), 500
 
@@ -3645,7 +3772,8 @@ def explore_tweets():
     Explore and search tweets with pagination, filtering, and search capabilities.
     
     Query Parameters:
-        - page: Page number (default: 1)
+        - cursor: pagination.next_cursor of the previous page (preferred over page)
+        - page: Page number (default: 1); without a cursor, pages after the first are skipped to with OFFSET
         - per_page: Items per page (default: 50, max: 200)
         - search: Full-text search query
         - main_category: Filter by main category
@@ -3654,18 +3782,20 @@ def explore_tweets():
         - has_media: Filter tweets with/without media
         - has_categories: Filter tweets with/without categories
         - has_kb_item: Filter tweets with/without KB items
-        - sort_by: Sort field (created_at, updated_at, tweet_id)
+        - sort_by: Sort field (created_at, updated_at, tweet_id, main_category, relevance when searching)
         - sort_order: Sort order (asc, desc)
         - created_after: Filter by creation date (ISO format)
         - created_before: Filter by creation date (ISO format)
     """
     try:
         from ..repositories import TweetCacheRepository, TweetProcessingQueueRepository
+        from ..tweet_explore import InvalidCursorError
         
         tweet_repo = TweetCacheRepository()
         queue_repo = TweetProcessingQueueRepository()
         
         # Parse query parameters
+        cursor = request.args.get('cursor', '').strip() or None
         page = max(1, int(request.args.get('page', 1)))
         per_page = min(200, max(1, int(request.args.get('per_page', 50))))
         search = request.args.get('search', '').strip()
@@ -3713,18 +3843,26 @@ def explore_tweets():
             except ValueError:
                 return jsonify({'success': False, 'error': 'Invalid created_before date format'}), 400
         
-        # Get filtered and paginated tweets
-        offset = (page - 1) * per_page
-        tweets, total_count = tweet_repo.get_filtered_tweets(
-            filters=filters,
-            limit=per_page,
-            offset=offset,
-            sort_by=sort_by,
-            sort_order=sort_order
-        )
+        # Get one page of projected rows (keyset pagination when a cursor is given)
+        config = current_app.config.get('APP_CONFIG')
+        try:
+            result = tweet_repo.explore_tweets(
+                filters=filters,
+                limit=per_page,
+                cursor=cursor,
+                sort_by=sort_by,
+                sort_order=sort_order,
+                offset=0 if cursor else (page - 1) * per_page,
+                count_cache_seconds=getattr(config, 'explore_count_cache_seconds', None),
+                resync_seconds=getattr(config, 'tweet_stats_resync_seconds', None)
+            )
+        except InvalidCursorError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        tweets = result['tweets']
+        total_count = result['total_count']
         
         # Get processing queue status for each tweet
-        tweet_ids = [tweet.tweet_id for tweet in tweets]
+        tweet_ids = [tweet['tweet_id'] for tweet in tweets]
         queue_entries = {
             entry.tweet_id: entry 
             for entry in queue_repo.get_by_tweet_ids(tweet_ids)
@@ -3733,33 +3871,33 @@ def explore_tweets():
         # Format response data
         tweet_data = []
         for tweet in tweets:
-            queue_entry = queue_entries.get(tweet.tweet_id)
+            queue_entry = queue_entries.get(tweet['tweet_id'])
             
             tweet_data.append({
-                'tweet_id': tweet.tweet_id,
-                'bookmarked_tweet_id': tweet.bookmarked_tweet_id,
-                'is_thread': tweet.is_thread,
-                'display_title': tweet.display_title,
-                'main_category': tweet.main_category,
-                'sub_category': tweet.sub_category,
-                'source': tweet.source,
+                'tweet_id': tweet['tweet_id'],
+                'bookmarked_tweet_id': tweet['bookmarked_tweet_id'],
+                'is_thread': tweet['is_thread'],
+                'display_title': tweet['display_title'],
+                'main_category': tweet['main_category'],
+                'sub_category': tweet['sub_category'],
+                'source': tweet['source'],
                 
                 # Processing flags
                 'processing_status': {
-                    'cache_complete': tweet.cache_complete,
-                    'media_processed': tweet.media_processed,
-                    'categories_processed': tweet.categories_processed,
-                    'kb_item_created': tweet.kb_item_created,
-                    'urls_expanded': tweet.urls_expanded,
-                    'db_synced': tweet.db_synced
+                    'cache_complete': tweet['cache_complete'],
+                    'media_processed': tweet['media_processed'],
+                    'categories_processed': tweet['categories_processed'],
+                    'kb_item_created': tweet['kb_item_created'],
+                    'urls_expanded': tweet['urls_expanded'],
+                    'db_synced': tweet['db_synced']
                 },
                 
                 # Reprocessing controls
                 'reprocessing': {
-                    'force_reprocess_pipeline': tweet.force_reprocess_pipeline,
-                    'force_recache': tweet.force_recache,
-                    'reprocess_requested_at': tweet.reprocess_requested_at.isoformat() if tweet.reprocess_requested_at else None,
-                    'reprocess_requested_by': tweet.reprocess_requested_by
+                    'force_reprocess_pipeline': tweet['force_reprocess_pipeline'],
+                    'force_recache': tweet['force_recache'],
+                    'reprocess_requested_at': tweet['reprocess_requested_at'].isoformat() if tweet['reprocess_requested_at'] else None,
+                    'reprocess_requested_by': tweet['reprocess_requested_by']
                 },
                 
                 # Queue information
@@ -3771,21 +3909,21 @@ def explore_tweets():
                 'processed_at': queue_entry.processed_at.isoformat() if queue_entry and queue_entry.processed_at else None,
                 
                 # Metadata
-                'has_media': bool(tweet.all_downloaded_media_for_thread),
-                'media_count': len(tweet.all_downloaded_media_for_thread or []),
-                'thread_length': len(tweet.thread_tweets or []),
-                'recategorization_attempts': tweet.recategorization_attempts,
-                'kb_item_path': tweet.kb_item_path,
+                'has_media': tweet['media_count'] > 0,
+                'media_count': tweet['media_count'],
+                'thread_length': tweet['thread_length'],
+                'recategorization_attempts': tweet['recategorization_attempts'],
+                'kb_item_path': tweet['kb_item_path'],
                 
                 # Timestamps
-                'created_at': tweet.created_at.isoformat() if tweet.created_at else None,
-                'updated_at': tweet.updated_at.isoformat() if tweet.updated_at else None,
+                'created_at': tweet['created_at'].isoformat() if tweet['created_at'] else None,
+                'updated_at': tweet['updated_at'].isoformat() if tweet['updated_at'] else None,
             })
         
         # Calculate pagination metadata
         total_pages = (total_count + per_page - 1) // per_page
-        has_next = page < total_pages
-        has_prev = page > 1
+        has_next = result['next_cursor'] is not None
+        has_prev = page > 1 or cursor is not None
         
         return jsonify({
             'success': True,
@@ -3797,7 +3935,8 @@ def explore_tweets():
                     'total_count': total_count,
                     'total_pages': total_pages,
                     'has_next': has_next,
-                    'has_prev': has_prev
+                    'has_prev': has_prev,
+                    'next_cursor': result['next_cursor']
                 },
                 'filters_applied': filters,
                 'sort': {
@@ -4471,8 +4610,9 @@ def get_tweet_statistics():
         queue_repo = TweetProcessingQueueRepository()
         category_repo = CategoryRepository()
         
-        # Get basic counts
-        stats = tweet_repo.get_processing_statistics()
+        # Get basic counts (materialized counters, recounted only when stale)
+        config = current_app.config.get('APP_CONFIG')
+        stats = tweet_repo.get_processing_statistics(getattr(config, 'tweet_stats_resync_seconds', None))
         queue_stats = queue_repo.get_queue_statistics()
         
         # Get category statistics
@@ -4739,55 +4879,58 @@ def get_all_tweets():
 
 @bp.route('/search', methods=['GET'])
 def search_documents():
-    """Unified search across KB items and Synthesis using SQLite FTS5.
+    """Unified hybrid search across KB items and Synthesis.
+
+    Full-text (FTS5 bm25) and embedding similarity rankings are fused with
+    reciprocal rank fusion; see knowledge_base_agent.hybrid_search.
 
     Query params:
       - q: search query
       - type: 'kb' | 'synthesis' | 'all' (default 'all')
       - limit: max results (default 50)
+      - offset: number of results to skip (default 0)
+      - main_category / sub_category: optional category filters
     """
     try:
+        from ..hybrid_search import HybridSearchEngine
+        from ..web import get_chat_manager
+
         q = request.args.get('q', '').strip()
         doc_type = request.args.get('type', 'all').lower()
         try:
             limit = min(200, max(1, int(request.args.get('limit', 50))))
+            offset = max(0, int(request.args.get('offset', 0)))
         except ValueError:
-            limit = 50
+            limit, offset = 50, 0
 
         if not q:
             return jsonify({'success': True, 'results': []})
 
-        results = []
-        # Use raw SQL for FTS5 queries, but tolerate missing tables gracefully
-        if doc_type in ('all', 'kb'):
-            try:
-                sql_kb = "SELECT id, title, snippet(kb_item_fts, 1, '<b>', '</b>', '…', 10) AS snippet FROM kb_item_fts WHERE kb_item_fts MATCH :query LIMIT :limit"
-                rows = db.session.execute(text(sql_kb), {"query": q, "limit": limit}).all()
-                for r in rows:
-                    results.append({
-                        'type': 'kb',
-                        'id': r.id,
-                        'title': r.title,
-                        'snippet': r.snippet
-                    })
-            except Exception:
-                # FTS table not available; skip silently
-                pass
+        doc_types = {'kb': ['kb_item'], 'synthesis': ['synthesis']}.get(doc_type, ['kb_item', 'synthesis'])
 
-        if doc_type in ('all', 'synthesis'):
-            try:
-                sql_syn = "SELECT id, title, snippet(synthesis_fts, 1, '<b>', '</b>', '…', 10) AS snippet FROM synthesis_fts WHERE synthesis_fts MATCH :query LIMIT :limit"
-                rows = db.session.execute(text(sql_syn), {"query": q, "limit": limit}).all()
-                for r in rows:
-                    results.append({
-                        'type': 'synthesis',
-                        'id': r.id,
-                        'title': r.title,
-                        'snippet': r.snippet
-                    })
-            except Exception:
-                # FTS table not available; skip silently
-                pass
+        # Reuse the chat manager's engine (and its embedding manager) when available;
+        # otherwise fall back to full-text ranking only
+        chat_mgr = get_chat_manager()
+        engine = chat_mgr.search_engine if chat_mgr else HybridSearchEngine(current_app.config.get('APP_CONFIG'))
+        hits = run_async_in_gevent_context(engine.search(
+            q,
+            limit=limit,
+            offset=offset,
+            doc_types=doc_types,
+            main_category=request.args.get('main_category') or None,
+            sub_category=request.args.get('sub_category') or None
+        ))
+        engine.add_snippets(q, hits)
+
+        results = [{
+            'type': 'kb' if hit['type'] == 'kb_item' else hit['type'],
+            'id': hit['id'],
+            'title': hit['title'],
+            'snippet': hit['snippet'],
+            'main_category': hit['category'],
+            'sub_category': hit['subcategory'],
+            'score': hit['rrf_score']
+        } for hit in hits]
 
         return jsonify({'success': True, 'results': results})
     except Exception as e:
@@ -5,6 +5,7 @@ This module provides automated backup creation, validation, and recovery capabil
 for the Knowledge Base Agent's database and file systems.
 """
 
+import fnmatch
 import os
 import shutil
 import gzip
@@ -12,14 +13,17 @@ import hashlib
 import json
 import logging
 import subprocess
+import tempfile
 import threading
 import time
+from contextlib import contextmanager
 from datetime import datetime, timedelta
 from dataclasses import dataclass
-from typing import Dict, List, Optional, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from pathlib import Path
 from sqlalchemy.exc import SQLAlchemyError
 
+from .backup_chunk_store import IncrementalBackupEngine
 from .config import Config
 from .database import get_db_session_context
 
@@ -38,6 +42,8 @@ class BackupMetadata:
     validation_status: str  # 'pending', 'valid', 'invalid', 'failed'
     restore_tested: bool
     file_paths: Dict[str, str]  # component -> file_path mapping
+    storage: str = 'archive'  # 'archive' (tar/gzip files) or 'chunked' (manifest + chunk store)
+    parent_backup_id: Optional[str] = None  # Manifest the chunked backup is a delta against
 
 
 @dataclass
@@ -93,6 +99,15 @@ class BackupManager:
         (self.backup_base_dir / "files").mkdir(exist_ok=True)
         (self.backup_base_dir / "logs").mkdir(exist_ok=True)
         
+        # Content-addressed incremental backups
+        self.incremental = getattr(self.config, 'backup_incremental', True)
+        self.chunk_engine = IncrementalBackupEngine(
+            self.backup_base_dir,
+            chunk_size=getattr(self.config, 'backup_chunk_size_mb', 4) * 1024 * 1024,
+            workers=getattr(self.config, 'backup_compression_workers', 0),
+            max_chain_length=getattr(self.config, 'backup_max_chain_length', 14)
+        )
+        
         # Monitoring and alerts
         self.alert_handlers = []
         self.backup_running = False
@@ -106,7 +121,7 @@ class BackupManager:
         }
 
     def create_backup(self, backup_type: str = 'manual', description: str = '', 
-                     components: Optional[List[str]] = None) -> str:
+                     components: Optional[List[str]] = None, incremental: Optional[bool] = None) -> str:
         """
         Create a comprehensive backup with specified type and components.
         
@@ -114,6 +129,8 @@ class BackupManager:
             backup_type: Type of backup ('daily', 'weekly', 'manual', 'pre_migration')
             description: Human-readable description of the backup
             components: List of components to backup ['database', 'json_files', 'media', 'logs']
+            incremental: Store chunks in the shared chunk store instead of archives
+                (defaults to BACKUP_INCREMENTAL)
         
         Returns:
             backup_id: Unique identifier for the created backup
@@ -121,7 +138,7 @@ class BackupManager:
         if self.backup_running:
             raise RuntimeError("Backup operation already in progress")
         
-        backup_id = f"{backup_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        backup_id = self._new_backup_id(backup_type)
         start_time = datetime.now()
         
         if components is None:
@@ -130,46 +147,16 @@ class BackupManager:
         self.logger.info(f"Starting {backup_type} backup: {backup_id}")
         self.backup_running = True
         
+        if incremental is None:
+            incremental = self.incremental
+        
         try:
-            backup_paths = {}
-            total_size = 0
-            
-            # Create backup directory
-            backup_dir = self.backup_base_dir / backup_id
-            backup_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Backup database
-            if 'database' in components:
-                db_backup_path = self._backup_database(backup_dir, backup_id)
-                backup_paths['database'] = str(db_backup_path)
-                total_size += db_backup_path.stat().st_size
-                self.logger.info(f"Database backup completed: {db_backup_path}")
-            
-            # Backup JSON files
-            if 'json_files' in components:
-                json_backup_path = self._backup_json_files(backup_dir, backup_id)
-                backup_paths['json_files'] = str(json_backup_path)
-                total_size += json_backup_path.stat().st_size
-                self.logger.info(f"JSON files backup completed: {json_backup_path}")
-            
-            # Backup media files
-            if 'media' in components:
-                media_backup_path = self._backup_media_files(backup_dir, backup_id)
-                if media_backup_path and media_backup_path.exists():
-                    backup_paths['media'] = str(media_backup_path)
-                    total_size += media_backup_path.stat().st_size
-                    self.logger.info(f"Media files backup completed: {media_backup_path}")
-            
-            # Backup logs
-            if 'logs' in components:
-                logs_backup_path = self._backup_logs(backup_dir, backup_id)
-                if logs_backup_path and logs_backup_path.exists():
-                    backup_paths['logs'] = str(logs_backup_path)
-                    total_size += logs_backup_path.stat().st_size
-                    self.logger.info(f"Logs backup completed: {logs_backup_path}")
-            
-            # Calculate backup checksum
-            backup_checksum = self._calculate_backup_checksum(backup_paths)
+            parent_backup_id = None
+            if incremental:
+                backup_paths, total_size, backup_checksum, parent_backup_id = self._backup_chunked(backup_id, components)
+            else:
+                backup_paths, total_size = self._backup_archives(backup_id, components)
+                backup_checksum = self._calculate_backup_checksum(backup_paths)
             
             # Create backup metadata
             metadata = BackupMetadata(
@@ -183,7 +170,9 @@ class BackupManager:
                 components=components,
                 validation_status='pending',
                 restore_tested=False,
-                file_paths=backup_paths
+                file_paths=backup_paths,
+                storage='chunked' if incremental else 'archive',
+                parent_backup_id=parent_backup_id
             )
             
             # Save metadata
@@ -236,31 +225,34 @@ class BackupManager:
             
             self.logger.info(f"Validating backup: {backup_id}")
             
-            # Verify checksum
-            current_checksum = self._calculate_backup_checksum(metadata.file_paths)
-            checksum_verified = current_checksum == metadata.checksum
-            
-            if not checksum_verified:
-                errors.append(f"Checksum mismatch: expected {metadata.checksum}, got {current_checksum}")
-            
-            # Verify content integrity
-            content_verified = True
-            for component, file_path in metadata.file_paths.items():
-                if not Path(file_path).exists():
-                    errors.append(f"Backup file missing: {file_path}")
-                    content_verified = False
-                    continue
+            if metadata.storage == 'chunked':
+                checksum_verified, content_verified = self._validate_chunked_backup(metadata, errors)
+            else:
+                # Verify checksum
+                current_checksum = self._calculate_backup_checksum(metadata.file_paths)
+                checksum_verified = current_checksum == metadata.checksum
                 
-                # Verify component-specific integrity
-                if component == 'database':
-                    if not self._verify_database_backup(file_path):
-                        errors.append(f"Database backup corruption detected: {file_path}")
-                        content_verified = False
-                elif component == 'json_files':
-                    if not self._verify_json_backup(file_path):
-                        errors.append(f"JSON backup corruption detected: {file_path}")
+                if not checksum_verified:
+                    errors.append(f"Checksum mismatch: expected {metadata.checksum}, got {current_checksum}")
+                
+                # Verify content integrity
+                content_verified = True
+                for component, file_path in metadata.file_paths.items():
+                    if not Path(file_path).exists():
+                        errors.append(f"Backup file missing: {file_path}")
                         content_verified = False
-            
+                        continue
+                
+                    # Verify component-specific integrity
+                    if component == 'database':
+                        if not self._verify_database_backup(file_path):
+                            errors.append(f"Database backup corruption detected: {file_path}")
+                            content_verified = False
+                    elif component == 'json_files':
+                        if not self._verify_json_backup(file_path):
+                            errors.append(f"JSON backup corruption detected: {file_path}")
+                            content_verified = False
+                
             # Test restore (optional, resource-intensive)
             restore_tested = False
             if hasattr(self.config, 'enable_restore_testing') and self.config.enable_restore_testing:
@@ -370,7 +362,10 @@ class BackupManager:
                     continue
                 
                 try:
-                    if component == 'database':
+                    if metadata.storage == 'chunked':
+                        self._restore_chunked_component(backup_id, component, target_directory)
+                        components_restored.append(component)
+                    elif component == 'database':
                         self._restore_database(metadata.file_paths[component], target_directory)
                         components_restored.append(component)
                     elif component == 'json_files':
@@ -432,6 +427,7 @@ class BackupManager:
             'expired_found': 0,
             'successfully_deleted': 0,
             'failed_deletions': 0,
+            'retained_as_parent': 0,
             'space_freed_bytes': 0
         }
         
@@ -441,9 +437,20 @@ class BackupManager:
             # Get all backup metadata
             backups = self.list_backups()
             cleanup_stats['total_checked'] = len(backups)
+            all_metadata = {backup_id: self._load_backup_metadata(backup_id) for backup_id in backups}
+            
+            # Manifests that unexpired chunked backups are deltas against must stay
+            required_parents = set()
+            for backup_id, metadata in all_metadata.items():
+                if metadata and metadata.storage == 'chunked' and current_time <= metadata.retention_date:
+                    try:
+                        required_parents.update(self.chunk_engine.chain(backup_id)[:-1])
+                    except (OSError, ValueError) as e:
+                        self.logger.warning(f"Could not read manifest chain of {backup_id}: {e}")
             
+            chunked_deleted = False
             for backup_id in backups:
-                metadata = self._load_backup_metadata(backup_id)
+                metadata = all_metadata[backup_id]
                 if not metadata:
                     continue
                 
@@ -451,7 +458,15 @@ class BackupManager:
                 if current_time > metadata.retention_date:
                     cleanup_stats['expired_found'] += 1
                     
+                    if backup_id in required_parents:
+                        cleanup_stats['retained_as_parent'] += 1
+                        continue
+                    
                     try:
+                        if metadata.storage == 'chunked':
+                            self.chunk_engine.delete(backup_id)
+                            chunked_deleted = True
+                        
                         # Delete backup files
                         backup_dir = self.backup_base_dir / backup_id
                         if backup_dir.exists():
@@ -471,6 +486,17 @@ class BackupManager:
                         cleanup_stats['failed_deletions'] += 1
                         self.logger.error(f"Failed to delete backup {backup_id}: {e}")
             
+            # Chunks are shared between backups; drop only those no remaining manifest uses
+            if chunked_deleted:
+                live_chunked = []
+                for backup_id in self.list_backups():
+                    metadata = self._load_backup_metadata(backup_id)
+                    if metadata and metadata.storage == 'chunked' and self.chunk_engine.manifest_path(backup_id).exists():
+                        live_chunked.append(backup_id)
+                gc_stats = self.chunk_engine.collect_garbage(live_chunked)
+                cleanup_stats['space_freed_bytes'] += gc_stats['bytes_freed']
+                self.logger.info(f"Removed {gc_stats['chunks_deleted']} unreferenced backup chunks")
+            
             self.logger.info(f"Backup cleanup completed. Deleted {cleanup_stats['successfully_deleted']} backups, "
                            f"freed {cleanup_stats['space_freed_bytes']:,} bytes")
             
@@ -558,33 +584,174 @@ class BackupManager:
         """Add a custom alert handler function."""
         self.alert_handlers.append(handler_func)
 
-    def _backup_database(self, backup_dir: Path, backup_id: str) -> Path:
-        """Create database backup using pg_dump."""
-        db_backup_file = backup_dir / f"database_{backup_id}.sql.gz"
+    def _new_backup_id(self, backup_type: str) -> str:
+        """Timestamped backup id, suffixed if a backup with that id already exists."""
+        base_id = f"{backup_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        backup_id = base_id
+        counter = 1
+        while ((self.backup_base_dir / "metadata" / f"{backup_id}.json").exists()
+               or (self.backup_base_dir / backup_id).exists()):
+            backup_id = f"{base_id}_{counter}"
+            counter += 1
+        return backup_id
+
+    def _backup_chunked(self, backup_id: str, components: List[str]) -> Tuple[Dict[str, str], int, str, Optional[str]]:
+        """
+        Back up components into the shared chunk store.
         
-        # Build pg_dump command
-        cmd = [
-            'pg_dump',
+        Only files that changed since the parent backup are read, and only chunks
+        not already in the store are compressed and written.
+        
+        Returns:
+            Tuple of (component -> manifest path, bytes written, manifest checksum, parent backup id)
+        """
+        directories = {}
+        streams = {}
+        
+        if 'database' in components:
+            streams['database'] = ('database.sql', self._database_dump_stream)
+        
+        if 'json_files' in components:
+            data_dir = Path(getattr(self.config, 'data_directory', 'data'))
+            if data_dir.exists():
+                directories['json_files'] = (data_dir, self._is_backup_source)
+            else:
+                self.logger.warning(f"Data directory not found: {data_dir}")
+        
+        if 'media' in components:
+            media_dir = Path(getattr(self.config, 'media_directory', 'media'))
+            if media_dir.exists():
+                directories['media'] = (media_dir, self._is_backup_source)
+            else:
+                self.logger.info(f"Media directory not found, skipping: {media_dir}")
+        
+        if 'logs' in components:
+            logs_dir = Path(getattr(self.config, 'log_directory', 'logs'))
+            if logs_dir.exists():
+                # Recent log files (last 30 days), as in archive backups
+                cutoff = (datetime.now() - timedelta(days=30)).timestamp()
+                directories['logs'] = (logs_dir, lambda path: (
+                    path.parent == logs_dir and fnmatch.fnmatch(path.name, '*.log*')
+                    and path.stat().st_mtime > cutoff
+                ))
+            else:
+                self.logger.info(f"Logs directory not found, skipping: {logs_dir}")
+        
+        parent_backup_id = self._latest_chunked_backup(components)
+        manifest_path, checksum, stats = self.chunk_engine.create(backup_id, directories, streams, parent_backup_id)
+        manifest = self.chunk_engine.load(backup_id)
+        
+        self.logger.info(
+            f"Chunked backup {backup_id} ({'full' if manifest['full'] else 'delta against ' + manifest['parent']}): "
+            f"{stats['files_changed']} changed / {stats['files_unchanged']} unchanged / {stats['files_deleted']} deleted files, "
+            f"{stats['new_chunks']} new / {stats['reused_chunks']} reused chunks, {stats['bytes_written']:,} bytes written"
+        )
+        
+        backup_paths = {component: str(manifest_path) for component in manifest['components']}
+        return backup_paths, stats['bytes_written'], checksum, manifest['parent']
+
+    def _latest_chunked_backup(self, components: List[str]) -> Optional[str]:
+        """Most recent chunked backup covering the components, to write a delta against."""
+        latest = None
+        for backup_id in self.list_backups():
+            metadata = self._load_backup_metadata(backup_id)
+            if (not metadata or metadata.storage != 'chunked' or metadata.validation_status == 'invalid'
+                    or not set(components) <= set(metadata.components)
+                    or not self.chunk_engine.manifest_path(backup_id).exists()):
+                continue
+            if latest is None or metadata.created_at > latest.created_at:
+                latest = metadata
+        return latest.backup_id if latest else None
+
+    def _is_backup_source(self, path: Path) -> bool:
+        """Exclude the backup directory itself when it lives inside a backed-up directory."""
+        return self.backup_base_dir.resolve() not in path.resolve().parents
+
+    @contextmanager
+    def _database_dump_stream(self):
+        """Stream pg_dump output; raises on exit if pg_dump failed."""
+        with tempfile.TemporaryFile() as stderr:
+            process = subprocess.Popen(self._pg_dump_command(), stdout=subprocess.PIPE,
+                                       stderr=stderr, env=self._pg_env())
+            try:
+                yield process.stdout
+            finally:
+                process.stdout.close()
+                returncode = process.wait()
+            if returncode != 0:
+                stderr.seek(0)
+                message = stderr.read().decode('utf-8', errors='replace')
+                self.logger.error(f"Database backup failed: {message}")
+                raise RuntimeError(f"Database backup failed: {message}")
+
+    def _pg_connection_args(self) -> List[str]:
+        return [
             '--host', getattr(self.config, 'db_host', 'localhost'),
             '--port', str(getattr(self.config, 'db_port', 5432)),
             '--username', getattr(self.config, 'db_user', 'postgres'),
-            '--dbname', getattr(self.config, 'db_name', 'knowledge_base'),
-            '--verbose',
-            '--clean',
-            '--if-exists',
-            '--create'
+            '--dbname', getattr(self.config, 'db_name', 'knowledge_base')
         ]
-        
+
+    def _pg_dump_command(self) -> List[str]:
+        return ['pg_dump'] + self._pg_connection_args() + ['--verbose', '--clean', '--if-exists', '--create']
+
+    def _pg_env(self) -> Dict[str, str]:
         # Set password via environment variable
         env = os.environ.copy()
         if hasattr(self.config, 'db_password'):
             env['PGPASSWORD'] = self.config.db_password
+        return env
+
+    def _backup_archives(self, backup_id: str, components: List[str]) -> Tuple[Dict[str, str], int]:
+        """Write each component as a full tar/gzip archive; returns (file paths, total size)."""
+        backup_paths = {}
+        total_size = 0
+        
+        # Create backup directory
+        backup_dir = self.backup_base_dir / backup_id
+        backup_dir.mkdir(parents=True, exist_ok=True)
+        
+        # Backup database
+        if 'database' in components:
+            db_backup_path = self._backup_database(backup_dir, backup_id)
+            backup_paths['database'] = str(db_backup_path)
+            total_size += db_backup_path.stat().st_size
+            self.logger.info(f"Database backup completed: {db_backup_path}")
+        
+        # Backup JSON files
+        if 'json_files' in components:
+            json_backup_path = self._backup_json_files(backup_dir, backup_id)
+            backup_paths['json_files'] = str(json_backup_path)
+            total_size += json_backup_path.stat().st_size
+            self.logger.info(f"JSON files backup completed: {json_backup_path}")
+        
+        # Backup media files
+        if 'media' in components:
+            media_backup_path = self._backup_media_files(backup_dir, backup_id)
+            if media_backup_path and media_backup_path.exists():
+                backup_paths['media'] = str(media_backup_path)
+                total_size += media_backup_path.stat().st_size
+                self.logger.info(f"Media files backup completed: {media_backup_path}")
+        
+        # Backup logs
+        if 'logs' in components:
+            logs_backup_path = self._backup_logs(backup_dir, backup_id)
+            if logs_backup_path and logs_backup_path.exists():
+                backup_paths['logs'] = str(logs_backup_path)
+                total_size += logs_backup_path.stat().st_size
+                self.logger.info(f"Logs backup completed: {logs_backup_path}")
+        
+        return backup_paths, total_size
+
+    def _backup_database(self, backup_dir: Path, backup_id: str) -> Path:
+        """Create database backup using pg_dump."""
+        db_backup_file = backup_dir / f"database_{backup_id}.sql.gz"
         
         try:
             # Run pg_dump and compress output
             with gzip.open(db_backup_file, 'wt') as f:
-                result = subprocess.run(cmd, stdout=f, stderr=subprocess.PIPE, 
-                                      env=env, text=True, check=True)
+                result = subprocess.run(self._pg_dump_command(), stdout=f, stderr=subprocess.PIPE, 
+                                      env=self._pg_env(), text=True, check=True)
             
             return db_backup_file
             
@@ -676,7 +843,9 @@ class BackupManager:
             'components': metadata.components,
             'validation_status': metadata.validation_status,
             'restore_tested': metadata.restore_tested,
-            'file_paths': metadata.file_paths
+            'file_paths': metadata.file_paths,
+            'storage': metadata.storage,
+            'parent_backup_id': metadata.parent_backup_id
         }
         
         with open(metadata_file, 'w') as f:
@@ -704,7 +873,9 @@ class BackupManager:
                 components=data['components'],
                 validation_status=data['validation_status'],
                 restore_tested=data['restore_tested'],
-                file_paths=data['file_paths']
+                file_paths=data['file_paths'],
+                storage=data.get('storage', 'archive'),
+                parent_backup_id=data.get('parent_backup_id')
             )
         except Exception as e:
             self.logger.error(f"Failed to load backup metadata {backup_id}: {e}")
@@ -738,6 +909,65 @@ class BackupManager:
         self.logger.info(f"Restore test for {backup_id} skipped (not implemented)")
         return False
 
+    def _validate_chunked_backup(self, metadata: BackupMetadata, errors: List[str]) -> Tuple[bool, bool]:
+        """
+        Validate a chunked backup from its manifest chain and stored chunk hashes.
+        
+        Returns:
+            Tuple of (checksum verified, content verified)
+        """
+        manifest_path = self.chunk_engine.manifest_path(metadata.backup_id)
+        if not manifest_path.exists():
+            errors.append(f"Backup manifest missing: {manifest_path}")
+            return False, False
+        
+        current_checksum = self.chunk_engine.checksum(metadata.backup_id)
+        checksum_verified = current_checksum == metadata.checksum
+        if not checksum_verified:
+            errors.append(f"Checksum mismatch: expected {metadata.checksum}, got {current_checksum}")
+        
+        chunk_errors = self.chunk_engine.validate(metadata.backup_id)
+        errors.extend(chunk_errors)
+        content_verified = not chunk_errors
+        
+        if content_verified and 'database' in metadata.file_paths:
+            # The first chunk is enough to recognise a SQL dump
+            header = next(self.chunk_engine.stream_file(metadata.backup_id, 'database'), b'')[:1000]
+            text = header.decode('utf-8', errors='replace')
+            if 'PostgreSQL database dump' not in text and 'CREATE DATABASE' not in text:
+                errors.append(f"Database backup corruption detected: {metadata.backup_id}")
+                content_verified = False
+        
+        return checksum_verified, content_verified
+
+    def _restore_chunked_component(self, backup_id: str, component: str, target_directory: Optional[str]):
+        """Restore one component of a chunked backup by reassembling its files from the chunk store."""
+        if component == 'database':
+            self.logger.info(f"Starting database restoration from chunked backup {backup_id}")
+            with tempfile.TemporaryFile() as stderr:
+                process = subprocess.Popen(['psql'] + self._pg_connection_args(), stdin=subprocess.PIPE,
+                                           stderr=stderr, env=self._pg_env())
+                try:
+                    for data in self.chunk_engine.stream_file(backup_id, component):
+                        process.stdin.write(data)
+                finally:
+                    process.stdin.close()
+                    returncode = process.wait()
+                if returncode != 0:
+                    stderr.seek(0)
+                    raise RuntimeError(f"Database restoration failed: {stderr.read().decode('utf-8', errors='replace')}")
+            return
+        
+        default_dirs = {
+            'json_files': getattr(self.config, 'data_directory', 'data'),
+            'media': getattr(self.config, 'media_directory', 'media'),
+            'logs': getattr(self.config, 'log_directory', 'logs')
+        }
+        target_dir = Path(target_directory or default_dirs[component])
+        self.logger.info(f"Restoring {component} to {target_dir}")
+        restored = self.chunk_engine.restore_tree(backup_id, component, target_dir)
+        self.logger.info(f"Restored {restored} {component} files from {backup_id}")
+
     def _restore_database(self, backup_file: str, target_directory: Optional[str]):
         """Restore database from backup."""
         self.logger.info(f"Starting database restoration from {backup_file}")
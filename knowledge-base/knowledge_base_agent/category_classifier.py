@@ -0,0 +1,421 @@
+"""
+Category Pre-Classifier
+
+Nearest-centroid classifier over the embeddings of already-categorized tweets.
+Each (main_category, sub_category) pair is represented by the normalized sum
+of its members' unit-length embeddings, so a new tweet is scored against every
+category with one matrix product and a new training sample only adds one
+vector to one sum.
+
+Confidence is the cosine margin between the best and second-best category.
+The acceptance threshold is calibrated by leave-one-out over a reservoir of
+training samples to the lowest margin whose accepted predictions still reach
+the target precision. Above it the category is assigned without the LLM;
+below it only the closest categories are listed in the LLM prompt, and the
+LLM's answer becomes a new training sample.
+
+Samples live in the ``category_embedding_sample`` table. On first use the
+table is backfilled from UnifiedTweets that were categorized before the
+pre-classifier existed. Categories the classifier assigned itself are stored
+for reference but never trained on, so it cannot reinforce its own mistakes.
+"""
+
+import asyncio
+import logging
+import random
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from .config import Config
+from .models import db, CategoryEmbeddingSample, UnifiedTweet
+
+logger = logging.getLogger(__name__)
+
+# Samples kept for threshold calibration
+CALIBRATION_RESERVOIR_SIZE = 2000
+
+# Held-out samples needed before any threshold is trusted
+MIN_CALIBRATION_SAMPLES = 30
+
+# Texts per embedding request while backfilling
+BACKFILL_BATCH_SIZE = 32
+
+# Characters of tweet content embedded; categories are decided by the opening text
+MAX_EMBED_CHARS = 4000
+
+CategoryKey = Tuple[str, str]
+
+
+@dataclass
+class CategoryPrediction:
+    """Outcome of scoring one tweet against the category centroids."""
+    main_category: str
+    sub_category: str
+    similarity: float
+    confidence: float  # margin over the second-best category
+    accepted: bool
+    candidates: List[CategoryKey] = field(default_factory=list)
+    narrow_prompt: bool = False
+    embedding: Optional[np.ndarray] = field(default=None, repr=False)
+
+
+def _unit(vector: Any) -> Optional[np.ndarray]:
+    array = np.asarray(vector, dtype=np.float32)
+    norm = float(np.linalg.norm(array))
+    if array.ndim != 1 or norm == 0.0:
+        return None
+    return array / norm
+
+
+def calibrate_margin_threshold(margins: np.ndarray, correct: np.ndarray, target_precision: float) -> Optional[float]:
+    """
+    Return the lowest margin at which predictions with at least that margin
+    reach the target precision, or None if no margin does.
+    """
+    if len(margins) == 0:
+        return None
+    order = np.argsort(-margins, kind='stable')
+    sorted_margins = margins[order]
+    cumulative_correct = np.cumsum(correct[order])
+    precision = cumulative_correct / np.arange(1, len(order) + 1)
+
+    threshold = None
+    for index in range(len(order)):
+        # Only cut between distinct margins so ties are accepted or rejected together
+        if index + 1 < len(order) and sorted_margins[index + 1] == sorted_margins[index]:
+            continue
+        if precision[index] >= target_precision:
+            threshold = float(sorted_margins[index])
+    return threshold
+
+
+class CategoryPreClassifier:
+    """Embedding nearest-centroid classifier placed in front of LLM categorization."""
+
+    def __init__(self, config: Config, http_client):
+        self.config = config
+        self.http_client = http_client
+        self.model = config.get_model_for_backend('embedding')
+        self.target_precision = getattr(config, 'category_preclassifier_target_precision', 0.95)
+        self.candidate_count = max(1, getattr(config, 'category_preclassifier_candidates', 5))
+        self.min_samples = max(1, getattr(config, 'category_preclassifier_min_samples', 5))
+        self.backfill_limit = max(0, getattr(config, 'category_preclassifier_backfill_limit', 2000))
+        self.recalibrate_every = max(1, getattr(config, 'category_preclassifier_recalibrate_every', 50))
+
+        self._sums: Dict[CategoryKey, np.ndarray] = {}
+        self._counts: Dict[CategoryKey, int] = {}
+        self._centroids: Optional[Tuple[List[CategoryKey], np.ndarray]] = None
+        # Per trained tweet, the label and vector it contributed, so a relabel can take it back
+        self._samples: Dict[str, Tuple[CategoryKey, np.ndarray]] = {}
+        self._reservoir: List[Tuple[str, np.ndarray, CategoryKey]] = []
+        self._reservoir_seen = 0
+        self._random = random.Random(0)
+        self._since_calibration = 0
+
+        self.threshold: Optional[float] = None
+        self.calibrated_precision: Optional[float] = None
+        self.candidate_recall: Optional[float] = None
+        self.stats = {'predictions': 0, 'accepted': 0, 'narrowed': 0, 'learned': 0}
+
+        self._loaded = False
+        self._load_lock: Optional[asyncio.Lock] = None
+        self._load_lock_loop = None
+        self._table_ready = False
+
+    # --- Persistence -----------------------------------------------------
+
+    def _open_session(self) -> Session:
+        """Open a session of our own so sample commits never flush the caller's work."""
+        session = Session(db.engine)
+        if not self._table_ready:
+            CategoryEmbeddingSample.__table__.create(session.get_bind(), checkfirst=True)
+            self._table_ready = True
+        return session
+
+    def _store_samples(self, samples: List[Tuple[str, CategoryKey, np.ndarray, str]]) -> None:
+        try:
+            with self._open_session() as session:
+                now = datetime.now(timezone.utc)
+                for tweet_id, (main_category, sub_category), vector, source in samples:
+                    entry = session.query(CategoryEmbeddingSample).filter_by(tweet_id=tweet_id).first()
+                    if entry is None:
+                        entry = CategoryEmbeddingSample(tweet_id=tweet_id)
+                        session.add(entry)
+                    entry.main_category = main_category
+                    entry.sub_category = sub_category
+                    entry.model = self.model
+                    entry.embedding = vector.astype(np.float32).tobytes()
+                    entry.source = source
+                    entry.created_at = now
+                session.commit()
+        except Exception as e:
+            logger.warning(f"Could not store {len(samples)} category embedding sample(s): {e}")
+
+    def _load_samples(self) -> List[Tuple[str, CategoryKey, np.ndarray]]:
+        with self._open_session() as session:
+            rows = session.query(
+                CategoryEmbeddingSample.tweet_id,
+                CategoryEmbeddingSample.main_category,
+                CategoryEmbeddingSample.sub_category,
+                CategoryEmbeddingSample.embedding,
+            ).filter(
+                CategoryEmbeddingSample.model == self.model,
+                CategoryEmbeddingSample.source != 'classifier',
+            ).all()
+        return [(row.tweet_id, (row.main_category, row.sub_category), np.frombuffer(row.embedding, dtype=np.float32))
+                for row in rows]
+
+    def _find_backfill_tweets(self, limit: int) -> List[Tuple[str, CategoryKey, Dict[str, Any]]]:
+        with self._open_session() as session:
+            known_ids = select(CategoryEmbeddingSample.tweet_id)
+            rows = session.query(
+                UnifiedTweet.tweet_id,
+                UnifiedTweet.main_category,
+                UnifiedTweet.sub_category,
+                UnifiedTweet.full_text,
+                UnifiedTweet.thread_tweets,
+                UnifiedTweet.image_descriptions,
+            ).filter(
+                UnifiedTweet.categories_processed.is_(True),
+                UnifiedTweet.main_category.isnot(None),
+                UnifiedTweet.sub_category.isnot(None),
+                ~UnifiedTweet.tweet_id.in_(known_ids),
+            ).order_by(UnifiedTweet.id.desc()).limit(limit).all()
+        return [(row.tweet_id, (row.main_category, row.sub_category),
+                 {'full_text': row.full_text or '', 'thread_tweets': row.thread_tweets or [],
+                  'image_descriptions': row.image_descriptions or []})
+                for row in rows if row.main_category and row.sub_category]
+
+    # --- Training --------------------------------------------------------
+
+    async def ensure_loaded(self) -> None:
+        """Load stored samples, backfill from categorized tweets and calibrate, once."""
+        if self._loaded:
+            return
+        loop = asyncio.get_running_loop()
+        if self._load_lock is None or self._load_lock_loop is not loop:
+            self._load_lock = asyncio.Lock()
+            self._load_lock_loop = loop
+        async with self._load_lock:
+            if self._loaded:
+                return
+            try:
+                for tweet_id, key, vector in self._load_samples():
+                    self._add(tweet_id, key, vector)
+                missing = self.backfill_limit - len(self._samples)
+                if missing > 0:
+                    await self._backfill(missing)
+                self.calibrate()
+                logger.info(f"Category pre-classifier ready: {len(self._samples)} samples, "
+                            f"{len(self._sums)} categories, threshold={self.threshold}")
+            except Exception as e:
+                logger.warning(f"Category pre-classifier could not be trained, LLM categorization unchanged: {e}")
+            self._loaded = True
+
+    async def _backfill(self, limit: int) -> None:
+        from .ai_categorization import build_categorization_context
+
+        pending = self._find_backfill_tweets(limit)
+        if not pending:
+            return
+        logger.info(f"Embedding {len(pending)} already-categorized tweets for the category pre-classifier")
+        for start in range(0, len(pending), BACKFILL_BATCH_SIZE):
+            batch = []
+            for tweet_id, key, tweet_data in pending[start:start + BACKFILL_BATCH_SIZE]:
+                text = build_categorization_context(tweet_data, tweet_id)
+                if text.strip():
+                    batch.append((tweet_id, key, text[:MAX_EMBED_CHARS]))
+            if not batch:
+                continue
+            vectors = await self.http_client.embed_batch(model=self.model, texts=[text for _, _, text in batch])
+            stored = []
+            for (tweet_id, key, _), vector in zip(batch, vectors):
+                unit = _unit(vector)
+                if unit is not None:
+                    self._add(tweet_id, key, unit)
+                    stored.append((tweet_id, key, unit, 'backfill'))
+            self._store_samples(stored)
+
+    def _add(self, tweet_id: str, key: CategoryKey, vector: np.ndarray) -> None:
+        previous = self._samples.get(tweet_id)
+        if previous is not None and previous[0] == key:
+            return
+        if self._sums and len(vector) != len(next(iter(self._sums.values()))):
+            logger.debug(f"Skipping category sample {tweet_id}: embedding dimension changed")
+            return
+        if previous is not None:
+            # Recategorized: take the old label's contribution back before learning the new one
+            self._remove(tweet_id)
+        self._samples[tweet_id] = (key, vector)
+        self._centroids = None
+        if key in self._sums:
+            self._sums[key] = self._sums[key] + vector
+            self._counts[key] += 1
+        else:
+            self._sums[key] = vector.astype(np.float32).copy()
+            self._counts[key] = 1
+
+        if previous is not None:
+            for index, (sample_id, _, _) in enumerate(self._reservoir):
+                if sample_id == tweet_id:
+                    self._reservoir[index] = (tweet_id, vector, key)
+                    return
+
+        # Reservoir sampling keeps a uniform calibration set of bounded size
+        self._reservoir_seen += 1
+        if len(self._reservoir) < CALIBRATION_RESERVOIR_SIZE:
+            self._reservoir.append((tweet_id, vector, key))
+        else:
+            slot = self._random.randrange(self._reservoir_seen)
+            if slot < CALIBRATION_RESERVOIR_SIZE:
+                self._reservoir[slot] = (tweet_id, vector, key)
+
+    def _remove(self, tweet_id: str) -> None:
+        key, vector = self._samples.pop(tweet_id)
+        self._counts[key] -= 1
+        if self._counts[key]:
+            self._sums[key] = self._sums[key] - vector
+        else:
+            del self._counts[key]
+            del self._sums[key]
+
+    def learn(self, tweet_id: str, main_category: str, sub_category: str,
+              prediction: Optional[CategoryPrediction] = None, source: str = 'llm') -> None:
+        """
+        Record the category a tweet ended up with.
+
+        Args:
+            tweet_id: Tweet identifier
+            main_category: Final main category
+            sub_category: Final sub category
+            prediction: The prediction made for this tweet, whose embedding is reused
+            source: 'llm' for categories decided by the model (trained on) or
+                'classifier' for categories assigned here (stored only)
+        """
+        if prediction is None or prediction.embedding is None:
+            return
+        key = (main_category, sub_category)
+        self._store_samples([(tweet_id, key, prediction.embedding, source)])
+        if source == 'classifier':
+            return
+        self._add(tweet_id, key, prediction.embedding)
+        self.stats['learned'] += 1
+        self._since_calibration += 1
+        if self._since_calibration >= self.recalibrate_every:
+            self.calibrate()
+
+    def calibrate(self) -> None:
+        """Pick the acceptance threshold by leave-one-out over the reservoir."""
+        self._since_calibration = 0
+        keys = list(self._sums)
+        if len(keys) < 2 or len(self._reservoir) < MIN_CALIBRATION_SAMPLES:
+            self.threshold = None
+            self.calibrated_precision = None
+            self.candidate_recall = None
+            return
+
+        key_index = {key: index for index, key in enumerate(keys)}
+        sums = np.stack([self._sums[key] for key in keys])
+        counts = np.array([self._counts[key] for key in keys])
+        sum_norms_sq = np.einsum('ij,ij->i', sums, sums)
+        vectors = np.stack([vector for _, vector, _ in self._reservoir])
+        labels = np.array([key_index[key] for _, _, key in self._reservoir])
+        rows = np.arange(len(labels))
+
+        dots = vectors @ sums.T
+        scores = dots / np.sqrt(np.maximum(sum_norms_sq, 1e-12))
+        # Remove each sample from its own centroid: |s - v|^2 = |s|^2 - 2 s.v + 1
+        own_dot = dots[rows, labels] - 1.0
+        own_norm_sq = sum_norms_sq[labels] - 2.0 * dots[rows, labels] + 1.0
+        own_score = np.where(counts[labels] > 1, own_dot / np.sqrt(np.maximum(own_norm_sq, 1e-12)), -np.inf)
+        scores[rows, labels] = own_score
+
+        ranked = np.argsort(-scores, axis=1)
+        best = ranked[:, 0]
+        margins = scores[rows, best] - scores[rows, ranked[:, 1]]
+        # A category held only by the sample itself cannot be predicted; leave it out
+        eligible = counts[labels] > 1
+        correct = (best == labels)[eligible]
+        accept_margins = np.where(counts[best] - (best == labels) >= self.min_samples, margins, -np.inf)[eligible]
+
+        self.threshold = calibrate_margin_threshold(accept_margins[np.isfinite(accept_margins)],
+                                                    correct[np.isfinite(accept_margins)],
+                                                    self.target_precision)
+        if self.threshold is not None:
+            accepted = accept_margins >= self.threshold
+            self.calibrated_precision = float(correct[accepted].mean()) if accepted.any() else None
+        else:
+            self.calibrated_precision = None
+        top_candidates = ranked[:, :self.candidate_count]
+        self.candidate_recall = float((top_candidates == labels[:, None]).any(axis=1)[eligible].mean()) if eligible.any() else None
+        logger.debug(f"Category pre-classifier calibrated: threshold={self.threshold}, "
+                     f"precision={self.calibrated_precision}, top-{self.candidate_count} recall={self.candidate_recall}")
+
+    # --- Prediction ------------------------------------------------------
+
+    async def predict(self, text: str, tweet_id: str) -> Optional[CategoryPrediction]:
+        """
+        Score a tweet against the category centroids.
+
+        Returns None when the classifier has no categories yet or the tweet
+        could not be embedded; callers then categorize with the full taxonomy.
+        """
+        await self.ensure_loaded()
+        if not self._sums or not text.strip():
+            return None
+        try:
+            vector = _unit(await self.http_client.embed(model=self.model, text=text[:MAX_EMBED_CHARS]))
+        except Exception as e:
+            logger.warning(f"Category pre-classifier could not embed tweet {tweet_id}: {e}")
+            return None
+        if vector is None:
+            return None
+
+        if self._centroids is None:
+            keys = list(self._sums)
+            sums = np.stack([self._sums[key] for key in keys])
+            self._centroids = (keys, sums / np.maximum(np.linalg.norm(sums, axis=1, keepdims=True), 1e-12))
+        keys, centroids = self._centroids
+        if centroids.shape[1] != len(vector):
+            return None
+        scores = centroids @ vector
+        ranked = np.argsort(-scores)
+        best = keys[ranked[0]]
+        second_score = float(scores[ranked[1]]) if len(ranked) > 1 else 0.0
+        margin = float(scores[ranked[0]]) - second_score
+
+        accepted = (self.threshold is not None and margin >= self.threshold
+                    and self._counts[best] >= self.min_samples)
+        narrow_prompt = (not accepted and self.candidate_recall is not None
+                         and self.candidate_recall >= self.target_precision)
+        self.stats['predictions'] += 1
+        if accepted:
+            self.stats['accepted'] += 1
+        elif narrow_prompt:
+            self.stats['narrowed'] += 1
+        return CategoryPrediction(
+            main_category=best[0],
+            sub_category=best[1],
+            similarity=float(scores[ranked[0]]),
+            confidence=margin,
+            accepted=accepted,
+            candidates=[keys[index] for index in ranked[:self.candidate_count]],
+            narrow_prompt=narrow_prompt,
+            embedding=vector,
+        )
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Training size, calibration and how often the LLM was skipped or narrowed."""
+        return {
+            'samples': len(self._samples),
+            'categories': len(self._sums),
+            'threshold': self.threshold,
+            'calibrated_precision': self.calibrated_precision,
+            'candidate_recall': self.candidate_recall,
+            **self.stats,
+        }
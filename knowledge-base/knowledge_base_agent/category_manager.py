@@ -38,6 +38,7 @@ from knowledge_base_agent.config import Config
 from knowledge_base_agent.http_client import HTTPClient
 from datetime import datetime
 from knowledge_base_agent.ai_categorization import categorize_and_name_content
+from knowledge_base_agent.category_classifier import CategoryPreClassifier
 
 @dataclass
 class Category:
@@ -184,6 +185,12 @@ class CategoryManager:
         self.config = config
         self.http_client = http_client  # Use provided client or None
         self.knowledge_base_dir = Path(config.knowledge_base_dir)
+        # Embedding classifier that answers confident cases without the categorization prompt
+        self.preclassifier = (
+            CategoryPreClassifier(config, http_client)
+            if http_client is not None and getattr(config, 'category_preclassifier_enabled', False)
+            else None
+        )
         self._initialized = False
         
         # Ensure knowledge base directory exists
@@ -832,12 +839,21 @@ class CategoryManager:
     async def classify_content(self, text: str, tweet_id: str) -> Tuple[str, str]:
         """Classify content into main and sub categories."""
         try:
-            prompt = f"""Given this content:
-{text}
+            prediction = await self.preclassifier.predict(text, tweet_id) if self.preclassifier else None
+            if prediction is not None and prediction.accepted:
+                self.preclassifier.learn(tweet_id, prediction.main_category, prediction.sub_category,
+                                         prediction, source='classifier')
+                return prediction.main_category, prediction.sub_category
 
-Either classify it into one of these existing categories:
-{json.dumps(self.categories, indent=2)}
+            categories = self.categories
+            if prediction is not None and prediction.narrow_prompt:
+                categories = {}
+                for main_cat, sub_cat in prediction.candidates:
+                    categories.setdefault(main_cat, []).append(sub_cat)
 
+            # Instructions and categories come before the content, so consecutive
+            # requests share a prompt prefix the server can keep cached
+            prompt = f"""Classify the content below. Either classify it into one of the existing categories,
 OR, if none of the existing categories fit well, suggest a new category and subcategory.
 The new category should be specific but generalizable to similar content.
 
@@ -847,13 +863,20 @@ Return as a JSON object:
     "subcategory": "subcategory_name",
     "is_new": true/false,
     "reason": "Brief explanation if suggesting new category"
-}}"""
+}}
+
+Existing categories:
+{json.dumps(categories, indent=2)}
+
+Content:
+{text}"""
 
             # Get classification from model
             response = await self.http_client.generate(
                 model=self.config.get_model_for_backend('text'),
                 prompt=prompt,
-                temperature=0.1
+                temperature=0.1,
+                cache_phase="categorization"
             )
 
             # Extract JSON from response using regex
@@ -882,6 +905,8 @@ Return as a JSON object:
                         self._save_categories()
                         logging.info(f"Added new category combination: {main_cat}/{sub_cat}")
                 
+                if self.preclassifier:
+                    self.preclassifier.learn(tweet_id, main_cat, sub_cat, prediction)
                 return main_cat, sub_cat
                 
             except json.JSONDecodeError as e:
@@ -895,10 +920,7 @@ Return as a JSON object:
     async def generate_item_name(self, text: str, main_category: str, sub_category: str, tweet_id: str) -> str:
         """Generate a descriptive name for the content."""
         try:
-            prompt = f"""Given this content and its categories, generate a short descriptive name.
-Content: {text}
-Main Category: {main_category}
-Sub Category: {sub_category}
+            prompt = f"""Given the content below and its categories, generate a short descriptive name.
 
 The name should be:
 - Brief but descriptive
@@ -906,11 +928,16 @@ The name should be:
 - No special characters
 - Max 50 characters
 
-Respond with just the name, no explanation."""
+Respond with just the name, no explanation.
+
+Main Category: {main_category}
+Sub Category: {sub_category}
+Content: {text}"""
 
             name = await self.http_client.generate(
                 model=self.config.get_model_for_backend('text'),
-                prompt=prompt
+                prompt=prompt,
+                cache_phase="categorization"
             )
             
             # Clean up the name
@@ -6,17 +6,89 @@ providing expert-level technical guidance through optimized prompts, intelligent
 context preparation, and query-type specialization.
 """
 
+import asyncio
 import logging
 import re
-from typing import List, Dict, Any, Optional, Tuple
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
 import time
 
 from .config import Config
 from .http_client import HTTPClient
 from .embedding_manager import EmbeddingManager
+from .hybrid_search import HybridSearchEngine
 from .json_prompt_manager import JsonPromptManager
 from .response_formatter import get_response_formatter
 
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate token count using character-based method with adjustments for code/technical content.
+    
+    Based on OpenAI's rule of thumb of ~4 characters per token for English text,
+    made more conservative at 3.5 characters per token.
+    """
+    if not text:
+        return 0
+    
+    # Count characters, excluding whitespace
+    char_count = len(text.replace(' ', '').replace('\n', '').replace('\t', ''))
+    
+    # Base estimation: 3.5 chars per token for technical content
+    base_tokens = char_count / 3.5
+    
+    # Adjust for special content
+    # Code blocks and technical terms tend to have more tokens
+    if '```' in text or 'def ' in text or 'class ' in text:
+        base_tokens *= 1.2  # 20% more tokens for code
+    
+    # URLs and technical identifiers are often single tokens despite length
+    url_count = len(re.findall(r'http[s]?://\S+', text))
+    if url_count > 0:
+        base_tokens *= 0.9  # Slightly fewer tokens due to URL compression
+    
+    return int(base_tokens)
+
+
+class TokenCoalescer:
+    """
+    Groups streamed response fragments into small chunks.
+    
+    Models emit one or two characters per fragment; sending each one as its own
+    event costs more in framing and client re-rendering than the text itself.
+    The first fragment is released immediately so time-to-first-token is not
+    delayed, after which fragments are held until max_chars characters have
+    accumulated or max_delay seconds have passed since the last chunk.
+    """
+
+    def __init__(self, max_chars: int = 24, max_delay: float = 0.05):
+        self.max_chars = max(1, max_chars)
+        self.max_delay = max(0.0, max_delay)
+        self.chunks = 0
+        self._buffer: List[str] = []
+        self._buffered_chars = 0
+        self._last_flush: Optional[float] = None
+
+    def add(self, fragment: str) -> Optional[str]:
+        """Buffer a fragment, returning a chunk when one is due."""
+        self._buffer.append(fragment)
+        self._buffered_chars += len(fragment)
+        if (self._last_flush is None
+                or self._buffered_chars >= self.max_chars
+                or time.monotonic() - self._last_flush >= self.max_delay):
+            return self.flush()
+        return None
+
+    def flush(self) -> Optional[str]:
+        """Return everything buffered as one chunk, or None if nothing is buffered."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return None
+        chunk = ''.join(self._buffer)
+        self._buffer = []
+        self._buffered_chars = 0
+        self.chunks += 1
+        return chunk
+
+
 class ChatManager:
     """
     Enhanced Chat Manager with modern AI agent design patterns.
@@ -33,6 +105,7 @@ class ChatManager:
         self.config = config
         self.http_client = http_client
         self.embedding_manager = embedding_manager
+        self.search_engine = HybridSearchEngine(config, embedding_manager)
         self.text_model = config.text_model
         self.chat_model = config.chat_model
         self.logger = logging.getLogger(__name__)
@@ -405,79 +478,92 @@ Provide expert technical assistance based on the knowledge base context below.""
         
         return sorted(list(technical_terms))[:15]  # Return top 15 terms
 
-    async def handle_chat_query(
+    def _merge_search_context(
+        self,
+        similar_docs: List[Dict[str, Any]],
+        search_context: Optional[List[Dict[str, Any]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        Merge client-provided search_context (from UI pre-search) into the retrieved
+        documents so the assistant can leverage those hints alongside embeddings.
+        """
+        if not search_context:
+            return similar_docs
+        
+        formatted_context: List[Dict[str, Any]] = []
+        for src in search_context:
+            src_type = src.get('type')
+            # Normalize type names
+            if src_type in ('kb', 'kb_item'):
+                norm_type = 'kb_item'
+            elif src_type == 'synthesis':
+                norm_type = 'synthesis'
+            else:
+                norm_type = src_type or 'unknown'
+            formatted_context.append({
+                'title': src.get('title', 'Untitled'),
+                'score': float(src.get('score', 0.78)),  # reasonable default score
+                'content': src.get('content', ''),
+                'type': norm_type,
+                'id': src.get('id'),
+                'category': src.get('main_category') or src.get('category', ''),
+                'subcategory': src.get('sub_category') or src.get('subcategory', ''),
+            })
+        # Deduplicate by (type, id), preferring earlier (UI-provided) items
+        combined: List[Dict[str, Any]] = []
+        seen: set = set()
+        for doc in (formatted_context + (similar_docs or [])):
+            key = f"{doc.get('type')}:{doc.get('id')}"
+            if key in seen:
+                continue
+            seen.add(key)
+            combined.append(doc)
+        return combined
+
+    async def _prepare_chat_request(
         self,
         query: str,
-        model: Optional[str] = None,
-        use_knowledge_base: bool = True,
-        search_context: Optional[List[Dict[str, Any]]] = None,
+        model: Optional[str],
+        use_knowledge_base: bool,
+        search_context: Optional[List[Dict[str, Any]]]
     ) -> Dict[str, Any]:
         """
-        Enhanced chat query handler with modern AI agent design patterns.
+        Retrieve context and assemble the chat messages for a query.
         
-        Features:
-        - Query type detection and specialized prompts
-        - Enhanced document retrieval (increased from 8 to 12)
-        - Intelligent context preparation with relevance scoring
-        - Performance metrics and comprehensive response metadata
+        Hybrid retrieval starts first and runs while the query type is detected
+        and the system prompt is loaded, so the query embedding request is in
+        flight during prompt assembly instead of before it.
         """
+        retrieval = None
+        if use_knowledge_base:
+            # 1. Hybrid retrieval (full-text and vector rankings fused with RRF) runs in the background
+            retrieval = asyncio.ensure_future(self.search_engine.search(query, limit=12))
+            await asyncio.sleep(0)
+        
         try:
-            # 1. Enhanced query type detection
+            # 2. Enhanced query type detection
             query_type = self._detect_query_type(query)
             self.logger.info(f"Detected query type: {query_type} for query: '{query[:50]}...'")
-
-            similar_docs = []
-            if use_knowledge_base:
-                # 2. Enhanced document retrieval with increased top_k
-                similar_docs = await self.embedding_manager.find_similar_documents(
-                    query,
-                    top_k=12,  # Increased from 8 to 12 for better coverage
-                    include_scores=True
-                )
-            
-            # 2b. Merge any client-provided search_context (from UI pre-search) into similar_docs
-            #     so the assistant can leverage those hints alongside embeddings.
-            if search_context:
-                formatted_context: List[Dict[str, Any]] = []
-                for src in search_context:
-                    src_type = src.get('type')
-                    # Normalize type names
-                    if src_type in ('kb', 'kb_item'):
-                        norm_type = 'kb_item'
-                    elif src_type == 'synthesis':
-                        norm_type = 'synthesis'
-                    else:
-                        norm_type = src_type or 'unknown'
-                    formatted_context.append({
-                        'title': src.get('title', 'Untitled'),
-                        'score': float(src.get('score', 0.78)),  # reasonable default score
-                        'content': src.get('content', ''),
-                        'type': norm_type,
-                        'id': src.get('id'),
-                        'category': src.get('main_category') or src.get('category', ''),
-                        'subcategory': src.get('sub_category') or src.get('subcategory', ''),
-                    })
-                # Deduplicate by (type, id), preferring earlier (UI-provided) items
-                combined: List[Dict[str, Any]] = []
-                seen: set = set()
-                for doc in (formatted_context + (similar_docs or [])):
-                    key = f"{doc.get('type')}:{doc.get('id')}"
-                    if key in seen:
-                        continue
-                    seen.add(key)
-                    combined.append(doc)
-                similar_docs = combined
             
-            self.logger.info(f"Retrieved {len(similar_docs)} similar documents")
-
-            # 3. Enhanced context preparation with intelligent summarization
-            context, enhanced_sources = self._prepare_enhanced_context(similar_docs, query)
-            
-            # 4. Get specialized prompt based on query type
+            # 3. Get specialized prompt based on query type
             system_prompt = self._get_specialized_prompt(query_type)
+            target_model = model or self.config.get_model_for_backend('chat') or self.config.get_model_for_backend('text')
             
-            # 5. Construct enhanced user message with clear structure
-            user_message = f"""**USER QUERY:** {query}
+            similar_docs = await retrieval if retrieval is not None else []
+        except BaseException:
+            if retrieval is not None:
+                retrieval.cancel()
+            raise
+        
+        # 4. Merge any client-provided search_context into similar_docs
+        similar_docs = self._merge_search_context(similar_docs, search_context)
+        self.logger.info(f"Retrieved {len(similar_docs)} similar documents")
+
+        # 5. Enhanced context preparation with intelligent summarization
+        context, enhanced_sources = self._prepare_enhanced_context(similar_docs, query)
+        
+        # 6. Construct enhanced user message with clear structure
+        user_message = f"""**USER QUERY:** {query}
 
 **KNOWLEDGE BASE CONTEXT:**
 {context}
@@ -494,106 +580,117 @@ Provide expert technical assistance based on the knowledge base context below.""
 
 Please provide your comprehensive technical response."""
 
-            # 6. Generate response with optimized parameters (using backend-aware model selection)
-            target_model = model or self.config.get_model_for_backend('chat') or self.config.get_model_for_backend('text')
-            
-            messages = [
+        return {
+            'query_type': query_type,
+            'target_model': target_model,
+            'system_prompt': system_prompt,
+            'user_message': user_message,
+            'messages': [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_message}
-            ]
+            ],
+            'enhanced_sources': enhanced_sources,
+        }
+
+    def _format_chat_response(self, response_text: str, query_type: str, target_model: str) -> str:
+        """Format the response for better readability, returning it unchanged on failure."""
+        if not self.response_formatter:
+            return response_text
+        try:
+            formatted_response = self.response_formatter.format_response(
+                response_text, 
+                context={'query_type': query_type, 'model': target_model}
+            )
+            self.logger.info("Applied response formatting for improved readability")
+            return formatted_response
+        except Exception as e:
+            self.logger.warning(f"Failed to format response: {e}")
+            # Continue with unformatted response
+            return response_text
+
+    @staticmethod
+    def _context_stats(enhanced_sources: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "total_sources": len(enhanced_sources),
+            "synthesis_docs": sum(1 for s in enhanced_sources if s['type'] == 'synthesis'),
+            "kb_items": sum(1 for s in enhanced_sources if s['type'] == 'kb_item'),
+            "categories_covered": len(set(s['category'] for s in enhanced_sources if s.get('category')))
+        }
 
-            # Track performance metrics
+    @staticmethod
+    def _performance_metrics(
+        request: Dict[str, Any],
+        response_text: str,
+        response_time: float,
+        generation_time: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the performance metrics stored with an assistant message.
+        
+        tokens_per_second is measured over generation_time when given (the span
+        in which tokens were streamed) and over the whole response time otherwise.
+        """
+        input_tokens = estimate_tokens(request['system_prompt']) + estimate_tokens(request['user_message'])
+        output_tokens = estimate_tokens(response_text)
+        total_tokens = input_tokens + output_tokens
+        
+        rate_window = generation_time if generation_time else response_time
+        tokens_per_second = output_tokens / rate_window if rate_window > 0 else 0
+        
+        return {
+            "response_time_ms": round(response_time * 1000, 2),
+            "response_time_seconds": round(response_time, 2),
+            "estimated_input_tokens": round(input_tokens),
+            "estimated_output_tokens": round(output_tokens),
+            "estimated_total_tokens": round(total_tokens),
+            "tokens_per_second": round(tokens_per_second, 1),
+            "model": request['target_model'],
+            "context_length": len(request['enhanced_sources'])
+        }
+
+    async def handle_chat_query(
+        self,
+        query: str,
+        model: Optional[str] = None,
+        use_knowledge_base: bool = True,
+        search_context: Optional[List[Dict[str, Any]]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Enhanced chat query handler with modern AI agent design patterns.
+        
+        Features:
+        - Query type detection and specialized prompts
+        - Enhanced document retrieval (increased from 8 to 12)
+        - Intelligent context preparation with relevance scoring
+        - Performance metrics and comprehensive response metadata
+        """
+        try:
+            request = await self._prepare_chat_request(query, model, use_knowledge_base, search_context)
+            target_model = request['target_model']
+
+            # 7. Generate response with optimized parameters (using backend-aware model selection)
             start_time = time.time()
             
             response_text = await self.http_client.chat(
                 model=target_model,
-                messages=messages,
+                messages=request['messages'],
                 temperature=0.1,  # Lower temperature for more consistent, technical responses
                 top_p=0.9,
                 timeout=self.config.chat_timeout  # Use configurable chat timeout
             )
             
-            end_time = time.time()
-            response_time = end_time - start_time
-            
-            # Format the response for better readability
-            if self.response_formatter:
-                try:
-                    formatted_response = self.response_formatter.format_response(
-                        response_text, 
-                        context={'query_type': query_type, 'model': target_model}
-                    )
-                    self.logger.info("Applied response formatting for improved readability")
-                    response_text = formatted_response
-                except Exception as e:
-                    self.logger.warning(f"Failed to format response: {e}")
-                    # Continue with unformatted response
-            
-            # Calculate more accurate token counts using improved estimation
-            # Based on OpenAI's rule of thumb: ~4 characters per token for English text
-            # We'll be more conservative and use 3.5 characters per token
-            def estimate_tokens(text: str) -> int:
-                """Estimate token count using character-based method with adjustments for code/technical content."""
-                if not text:
-                    return 0
-                
-                # Count characters, excluding whitespace
-                char_count = len(text.replace(' ', '').replace('\n', '').replace('\t', ''))
-                
-                # Base estimation: 3.5 chars per token for technical content
-                base_tokens = char_count / 3.5
-                
-                # Adjust for special content
-                # Code blocks and technical terms tend to have more tokens
-                if '```' in text or 'def ' in text or 'class ' in text:
-                    base_tokens *= 1.2  # 20% more tokens for code
-                
-                # URLs and technical identifiers are often single tokens despite length
-                import re
-                url_count = len(re.findall(r'http[s]?://\S+', text))
-                if url_count > 0:
-                    base_tokens *= 0.9  # Slightly fewer tokens due to URL compression
-                
-                return int(base_tokens)
-            
-            # Calculate system prompt tokens
-            system_prompt_tokens = estimate_tokens(system_prompt)
-            
-            # Calculate user message tokens (including context)
-            user_message_tokens = estimate_tokens(user_message)
-            
-            # Calculate response tokens
-            output_tokens = estimate_tokens(response_text)
-            
-            # Total input tokens
-            input_tokens = system_prompt_tokens + user_message_tokens
-            total_tokens = input_tokens + output_tokens
-            
-            # Calculate tokens per second (based on output generation)
-            tokens_per_second = output_tokens / response_time if response_time > 0 else 0
+            response_time = time.time() - start_time
+            response_text = self._format_chat_response(response_text, request['query_type'], target_model)
 
-            # 7. Format and return enhanced response
+            # 8. Format and return enhanced response
+            enhanced_sources = request['enhanced_sources']
             return {
                 "response": response_text,
-                "query_type": query_type,
-                "context_stats": {
-                    "total_sources": len(enhanced_sources),
-                    "synthesis_docs": sum(1 for s in enhanced_sources if s['type'] == 'synthesis'),
-                    "kb_items": sum(1 for s in enhanced_sources if s['type'] == 'kb_item'),
-                    "categories_covered": len(set(s['category'] for s in enhanced_sources if s.get('category')))
-                },
+                "query_type": request['query_type'],
+                "context_stats": self._context_stats(enhanced_sources),
                 "sources": enhanced_sources[:5],  # Limit displayed sources but keep full metadata
                 "model_used": target_model,
-                "performance_metrics": {
-                    "response_time_ms": round(response_time * 1000, 2),
-                    "response_time_seconds": round(response_time, 2),
-                    "estimated_input_tokens": round(input_tokens),
-                    "estimated_output_tokens": round(output_tokens),
-                    "estimated_total_tokens": round(total_tokens),
-                    "tokens_per_second": round(tokens_per_second, 1),
-                    "model": target_model,
-                    "context_length": len(enhanced_sources)
-                }
+                "performance_metrics": self._performance_metrics(request, response_text, response_time)
             }
             
         except Exception as e:
@@ -602,6 +699,100 @@ Please provide your comprehensive technical response."""
                 "error": "An error occurred while processing your query. Please try again."
             }
 
+    async def stream_chat_query(
+        self,
+        query: str,
+        model: Optional[str] = None,
+        use_knowledge_base: bool = True,
+        search_context: Optional[List[Dict[str, Any]]] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Streaming variant of handle_chat_query.
+        
+        Yields event dicts in order:
+        - {'event': 'sources', ...} once retrieval is done, before generation starts
+        - {'event': 'token', 'content': ...} for each coalesced chunk of the response
+        - {'event': 'done', ...} with the formatted response and performance metrics,
+          or {'event': 'error', 'error': ...} if the query fails
+        
+        Fragments are coalesced into chunks of CHAT_STREAM_FLUSH_CHARS characters or
+        CHAT_STREAM_FLUSH_MS milliseconds, whichever comes first; the first fragment
+        is sent immediately.
+        """
+        query_start = time.time()
+        try:
+            request = await self._prepare_chat_request(query, model, use_knowledge_base, search_context)
+            target_model = request['target_model']
+            enhanced_sources = request['enhanced_sources']
+            retrieval_time = time.time() - query_start
+            
+            yield {
+                'event': 'sources',
+                'query_type': request['query_type'],
+                'context_stats': self._context_stats(enhanced_sources),
+                'sources': enhanced_sources[:5],
+                'model_used': target_model,
+            }
+            
+            coalescer = TokenCoalescer(
+                max_chars=getattr(self.config, 'chat_stream_flush_chars', 24),
+                max_delay=getattr(self.config, 'chat_stream_flush_ms', 50) / 1000.0
+            )
+            fragments: List[str] = []
+            first_token_at = None
+            start_time = time.time()
+            
+            async for fragment in self.http_client.chat_stream(
+                model=target_model,
+                messages=request['messages'],
+                temperature=0.1,
+                top_p=0.9,
+                timeout=self.config.chat_timeout
+            ):
+                if first_token_at is None:
+                    first_token_at = time.time()
+                fragments.append(fragment)
+                chunk = coalescer.add(fragment)
+                if chunk:
+                    yield {'event': 'token', 'content': chunk}
+            
+            chunk = coalescer.flush()
+            if chunk:
+                yield {'event': 'token', 'content': chunk}
+            
+            end_time = time.time()
+            response_text = ''.join(fragments).strip()
+            if not response_text:
+                raise ValueError(f"Model {target_model} streamed an empty response")
+            
+            performance_metrics = self._performance_metrics(
+                request, response_text, end_time - start_time,
+                generation_time=end_time - first_token_at
+            )
+            performance_metrics.update({
+                "streamed": True,
+                "retrieval_time_ms": round(retrieval_time * 1000, 2),
+                "time_to_first_token_ms": round((first_token_at - query_start) * 1000, 2),
+                "stream_chunks": coalescer.chunks
+            })
+            
+            yield {
+                'event': 'done',
+                'response': self._format_chat_response(response_text, request['query_type'], target_model),
+                'query_type': request['query_type'],
+                'context_stats': self._context_stats(enhanced_sources),
+                'sources': enhanced_sources[:5],
+                'model_used': target_model,
+                'performance_metrics': performance_metrics,
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error streaming chat query: {e}", exc_info=True)
+            yield {
+                'event': 'error',
+                'error': "An error occurred while processing your query. Please try again."
+            }
+
     async def get_available_models(self) -> List[Dict[str, str]]:
         """Get list of available chat models from config and Ollama API."""
         models = []
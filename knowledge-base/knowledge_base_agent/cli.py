@@ -178,6 +178,7 @@ def interactive():
         'force_reprocess_kb_item': prefs.force_reprocess_kb_item,
         # 'force_reprocess_db_sync' removed - using unified database approach
         'force_reprocess_content': prefs.force_reprocess_content,
+        'fused_categorization': prefs.fused_categorization,
         'synthesis_mode': prefs.synthesis_mode,
         'synthesis_min_items': prefs.synthesis_min_items,
         'synthesis_max_items': prefs.synthesis_max_items
@@ -65,6 +65,50 @@ class Config(BaseSettings):
     # Backend Selection
     inference_backend: str = Field("ollama", alias="INFERENCE_BACKEND", 
                                   description="Inference backend to use: 'ollama' or 'localai'")
+    inference_endpoints: List[str] = Field([], alias="INFERENCE_ENDPOINTS",
+                                           description="Server URLs for the inference backend (JSON array or comma-separated), load balanced when set; list position is the GPU index")
+    inference_endpoint_max_concurrent: int = Field(1, alias="INFERENCE_ENDPOINT_MAX_CONCURRENT",
+                                                   description="Maximum concurrent requests per inference endpoint")
+    inference_endpoint_failure_threshold: int = Field(3, alias="INFERENCE_ENDPOINT_FAILURE_THRESHOLD",
+                                                      description="Consecutive connection or timeout failures before an endpoint is ejected")
+    inference_endpoint_ejection_seconds: float = Field(30.0, alias="INFERENCE_ENDPOINT_EJECTION_SECONDS",
+                                                       description="Seconds an ejected endpoint stays out of rotation before it is health checked")
+    
+    # LLM Response Cache
+    llm_cache_enabled: bool = Field(True, alias="LLM_CACHE_ENABLED",
+                                    description="Reuse stored responses for identical categorization, KB item and synthesis LLM requests")
+    llm_cache_memory_entries: int = Field(512, alias="LLM_CACHE_MEMORY_ENTRIES",
+                                          description="Responses kept in the in-process LRU in front of the database cache")
+    llm_cache_max_entries: int = Field(20000, alias="LLM_CACHE_MAX_ENTRIES",
+                                       description="Maximum responses kept in the database cache; least recently used are pruned")
+    llm_cache_ttl_hours: float = Field(720.0, alias="LLM_CACHE_TTL_HOURS",
+                                       description="Hours a cached LLM response stays valid")
+    llm_cache_disabled_phases: List[str] = Field([], alias="LLM_CACHE_DISABLED_PHASES",
+                                                 description="Phases that always call the model: any of 'categorization', 'kb_item', 'synthesis', 'vision' (JSON array or comma-separated)")
+    
+    # Embedding Category Pre-Classifier
+    category_preclassifier_enabled: bool = Field(True, alias="CATEGORY_PRECLASSIFIER_ENABLED",
+                                                 description="Assign categories from embeddings of already-categorized tweets when confident, and narrow the LLM prompt to the closest categories otherwise")
+    category_preclassifier_target_precision: float = Field(0.95, alias="CATEGORY_PRECLASSIFIER_TARGET_PRECISION",
+                                                           description="Precision the confidence threshold is calibrated to reach on held-out categorized tweets")
+    category_preclassifier_candidates: int = Field(5, alias="CATEGORY_PRECLASSIFIER_CANDIDATES",
+                                                   description="Closest categories passed to the LLM when the pre-classifier is not confident")
+    category_preclassifier_min_samples: int = Field(5, alias="CATEGORY_PRECLASSIFIER_MIN_SAMPLES",
+                                                    description="Categorized tweets a category needs before the pre-classifier assigns it without the LLM")
+    category_preclassifier_backfill_limit: int = Field(2000, alias="CATEGORY_PRECLASSIFIER_BACKFILL_LIMIT",
+                                                       description="Already-categorized tweets embedded to train the pre-classifier when it has fewer samples")
+    category_preclassifier_recalibrate_every: int = Field(50, alias="CATEGORY_PRECLASSIFIER_RECALIBRATE_EVERY",
+                                                          description="New training samples between confidence threshold recalibrations")
+    
+    # Rendered HTML Cache
+    render_cache_memory_entries: int = Field(256, alias="RENDER_CACHE_MEMORY_ENTRIES",
+                                             description="Rendered KB item and synthesis HTML documents kept in the in-process LRU in front of the render_cache table")
+    kb_toc_refresh_seconds: float = Field(60.0, alias="KB_TOC_REFRESH_SECONDS",
+                                          description="Seconds between knowledge base TOC reloads when the Redis version counter is unreachable")
+    tweet_stats_resync_seconds: float = Field(3600.0, alias="TWEET_STATS_RESYNC_SECONDS",
+                                              description="Seconds before the materialized tweet statistics counters are recomputed from the tweet table")
+    explore_count_cache_seconds: float = Field(30.0, alias="EXPLORE_COUNT_CACHE_SECONDS",
+                                               description="Seconds a filtered tweet explorer total is reused before it is counted again")
     
     # LocalAI Configuration
     localai_api_url: HttpUrl = Field("http://localhost:8080", alias="LOCALAI_API_URL",
@@ -99,6 +143,7 @@ class Config(BaseSettings):
     github_user_name: str = Field(..., alias="GITHUB_USER_NAME", min_length=1)
     github_repo_url: HttpUrl = Field(..., alias="GITHUB_REPO_URL")
     github_user_email: str = Field(..., alias="GITHUB_USER_EMAIL", min_length=1)
+    git_export_incremental: bool = Field(True, alias="GIT_EXPORT_INCREMENTAL", description="Export only KB items, syntheses and media changed since the last Git sync, tracked in a local manifest")
     # File paths (will be resolved to absolute paths)
     # These should be defined as relative paths in .env or defaults
     data_processing_dir_rel: Path = Field(..., alias="DATA_PROCESSING_DIR")
@@ -126,6 +171,9 @@ class Config(BaseSettings):
     # Logging and performance
     log_level: str = Field("DEBUG", alias="LOG_LEVEL")
     log_format: str = Field("%(asctime)s - %(levelname)s - %(message)s", alias="LOG_FORMAT")
+    task_log_batch_size: int = Field(200, alias="TASK_LOG_BATCH_SIZE", description="Maximum task log rows written to the database per INSERT")
+    task_log_flush_seconds: float = Field(0.5, alias="TASK_LOG_FLUSH_SECONDS", description="Maximum seconds a task log row waits in the queue before it is written")
+    task_log_queue_size: int = Field(10000, alias="TASK_LOG_QUEUE_SIZE", description="Task log rows that can wait for the background writer before new lines go to the Python logger only")
     max_pool_size: int = Field(1, alias="MAX_POOL_SIZE")
     rate_limit_requests: int = Field(100, alias="RATE_LIMIT_REQUESTS")
     rate_limit_period: int = Field(
@@ -157,6 +205,21 @@ class Config(BaseSettings):
     process_kb_items: bool = Field(True, alias="PROCESS_KB_ITEMS")
     regenerate_readme: bool = Field(True, alias="REGENERATE_README")
     process_videos: bool = Field(True, alias="PROCESS_VIDEOS", description="Whether to process video files with the vision model")
+    vision_image_max_dimension: int = Field(1344, alias="VISION_IMAGE_MAX_DIMENSION", description="Longest image side in pixels sent to the vision model; larger images are downscaled first (0 sends originals)")
+    video_max_keyframes: int = Field(5, alias="VIDEO_MAX_KEYFRAMES", description="Maximum distinct keyframes per video sent to the vision model")
+    video_scene_threshold: float = Field(0.3, alias="VIDEO_SCENE_THRESHOLD", description="ffmpeg scene-change score (0-1) above which a frame becomes a keyframe candidate")
+    video_frame_duplicate_distance: int = Field(6, alias="VIDEO_FRAME_DUPLICATE_DISTANCE", description="Maximum difference-hash Hamming distance (of 64 bits) at which two keyframes count as duplicates")
+    video_max_ffmpeg_processes: int = Field(2, alias="VIDEO_MAX_FFMPEG_PROCESSES", description="Maximum concurrent ffmpeg/ffprobe processes for keyframe extraction")
+    video_ffmpeg_timeout_seconds: float = Field(300.0, alias="VIDEO_FFMPEG_TIMEOUT_SECONDS", description="Seconds before an ffmpeg/ffprobe process for keyframe extraction is killed")
+    pipeline_mode: bool = Field(False, alias="PIPELINE_MODE", description="Stream each tweet through cache, media, LLM and KB item stages as soon as its previous stage finishes instead of running each phase over all tweets")
+    pipeline_queue_size: int = Field(16, alias="PIPELINE_QUEUE_SIZE", description="Maximum number of tweets waiting in each pipeline stage queue")
+    pipeline_cache_workers: int = Field(4, alias="PIPELINE_CACHE_WORKERS", description="Concurrent tweet caching workers in pipeline mode")
+    pipeline_media_workers: int = Field(1, alias="PIPELINE_MEDIA_WORKERS", description="Concurrent media analysis workers in pipeline mode")
+    pipeline_kb_item_workers: int = Field(1, alias="PIPELINE_KB_ITEM_WORKERS", description="Concurrent KB item generation workers in pipeline mode (LLM categorization uses NUM_GPUS_AVAILABLE workers)")
+    llm_result_batch_size: int = Field(20, alias="LLM_RESULT_BATCH_SIZE", description="Number of LLM categorization results committed to the database together")
+    llm_result_flush_seconds: float = Field(5.0, alias="LLM_RESULT_FLUSH_SECONDS", description="Maximum seconds an LLM categorization result waits before its batch is committed")
+    state_write_batch_size: int = Field(200, alias="STATE_WRITE_BATCH_SIZE", description="Number of queued tweet updates written with one bulk UPDATE and commit during processing")
+    state_write_flush_seconds: float = Field(2.0, alias="STATE_WRITE_FLUSH_SECONDS", description="Maximum seconds a queued tweet update waits before it is written")
     
     # Request settings
     batch_size: int = Field(1, alias="BATCH_SIZE")
@@ -164,7 +227,15 @@ class Config(BaseSettings):
     max_concurrent_requests: int = Field(1, alias="MAX_CONCURRENT_REQUESTS")
     request_timeout: int = Field(180, alias="REQUEST_TIMEOUT")
     chat_timeout: int = Field(300, alias="CHAT_TIMEOUT", description="Timeout for chat/conversation requests in seconds (default: 5 minutes)")
+    chat_stream_flush_chars: int = Field(24, alias="CHAT_STREAM_FLUSH_CHARS", description="Characters of a streamed chat response buffered before they are sent as one chunk")
+    chat_stream_flush_ms: int = Field(50, alias="CHAT_STREAM_FLUSH_MS", description="Maximum milliseconds streamed chat response text is buffered before it is sent")
     retry_backoff: bool = Field(True, alias="RETRY_BACKOFF")
+    http_pool_enabled: bool = Field(True, alias="HTTP_POOL_ENABLED", description="Reuse keep-alive HTTP connections per event loop instead of opening a session per request")
+    http_pool_limit: int = Field(100, alias="HTTP_POOL_LIMIT", description="Maximum simultaneous pooled HTTP connections per event loop")
+    http_pool_limit_per_host: int = Field(16, alias="HTTP_POOL_LIMIT_PER_HOST", description="Maximum simultaneous pooled HTTP connections to a single host")
+    http_keepalive_timeout: float = Field(60.0, alias="HTTP_KEEPALIVE_TIMEOUT", description="Seconds an idle pooled HTTP connection is kept open for reuse")
+    embedding_batch_size: int = Field(32, alias="EMBEDDING_BATCH_SIZE", description="Maximum number of texts sent in a single batched embedding request")
+    embedding_batch_token_budget: int = Field(16000, alias="EMBEDDING_BATCH_TOKEN_BUDGET", description="Approximate token budget for a single batched embedding request")
     
     # Reprocessing flags
     reprocess_media: bool = Field(
@@ -191,6 +262,8 @@ class Config(BaseSettings):
     # Vector store configuration
     vector_store_path: str = Field("./data/vector_store", alias="VECTOR_STORE_PATH", description="Path to the vector store database directory")
     vector_collection_name: str = Field("knowledge_base", alias="VECTOR_COLLECTION_NAME", description="Name of the vector collection in the database")
+    vector_index_path: str = Field("./data/vector_index", alias="VECTOR_INDEX_PATH", description="Directory where the in-memory SQL embedding index is persisted for fast worker startup")
+    hybrid_search_rrf_k: int = Field(60, alias="HYBRID_SEARCH_RRF_K", description="Rank constant k for reciprocal rank fusion of full-text and vector search results")
 
     # === New Ollama Performance & GPU Optimization Configuration ===
     # GPU and Performance Optimization
@@ -201,6 +274,7 @@ class Config(BaseSettings):
 
     # Model Loading & Memory Management
     ollama_keep_alive: str = Field("5m", alias="OLLAMA_KEEP_ALIVE", description="How long to keep models loaded in memory (e.g., '5m', '1h', '0' for immediately unload)")
+    ollama_phase_keep_alive: str = Field("30m", alias="OLLAMA_PHASE_KEEP_ALIVE", description="How long models pinned for the running pipeline phase stay loaded, so their KV cache survives between items")
     ollama_use_mmap: bool = Field(True, alias="OLLAMA_USE_MMAP", description="Use memory mapping for faster model loading")
     ollama_use_mlock: bool = Field(False, alias="OLLAMA_USE_MLOCK", description="Lock model in memory to prevent swapping")
     ollama_num_threads: int = Field(0, alias="OLLAMA_NUM_THREADS", description="Number of CPU threads to use (0 for auto)")
@@ -250,6 +324,18 @@ class Config(BaseSettings):
     redis_progress_url: str = Field("redis://localhost:6379/1", alias="REDIS_PROGRESS_URL", description="Redis URL for progress tracking")
     redis_logs_url: str = Field("redis://localhost:6379/2", alias="REDIS_LOGS_URL", description="Redis URL for log streaming")
 
+    # Backup Configuration
+    backup_incremental: bool = Field(True, alias="BACKUP_INCREMENTAL", description="Store backups as deduplicated chunks with per-backup manifests instead of full tar/gzip archives")
+    backup_chunk_size_mb: int = Field(4, alias="BACKUP_CHUNK_SIZE_MB", description="Size of the chunks files are split into for incremental backups")
+    backup_compression_workers: int = Field(0, alias="BACKUP_COMPRESSION_WORKERS", description="Processes compressing new backup chunks (0 uses the CPU count, 1 compresses inline)")
+    backup_max_chain_length: int = Field(14, alias="BACKUP_MAX_CHAIN_LENGTH", description="Incremental backups written against a parent before the next one stores a full manifest")
+
+    # Realtime Event Coalescing
+    realtime_coalesce_enabled: bool = Field(True, alias="REALTIME_COALESCE_ENABLED", description="Coalesce superseded progress/phase updates per task and phase before emitting them over Socket.IO")
+    realtime_coalesce_min_window_ms: int = Field(100, alias="REALTIME_COALESCE_MIN_WINDOW_MS", description="Shortest coalescing window, used at low event rates with few clients")
+    realtime_coalesce_max_window_ms: int = Field(1000, alias="REALTIME_COALESCE_MAX_WINDOW_MS", description="Longest coalescing window the event rate and client count can stretch it to")
+    realtime_full_state_every: int = Field(20, alias="REALTIME_FULL_STATE_EVERY", description="Coalesced emissions per task and phase between full states (the rest are deltas)")
+
     # Backward-compatible alias used by older realtime emitters
     @property
     def redis_url(self) -> str:
@@ -618,6 +704,32 @@ class Config(BaseSettings):
                 raise ValueError("AVAILABLE_CHAT_MODELS is not a valid JSON string")
         return v
 
+    @field_validator('llm_cache_disabled_phases', mode='before')
+    def parse_llm_cache_disabled_phases(cls, v):
+        if isinstance(v, str):
+            import json
+            text = v.strip()
+            if text.startswith('['):
+                try:
+                    return json.loads(text)
+                except json.JSONDecodeError:
+                    raise ValueError("LLM_CACHE_DISABLED_PHASES is not a valid JSON string")
+            return [phase.strip() for phase in text.split(',') if phase.strip()]
+        return v
+
+    @field_validator('inference_endpoints', mode='before')
+    def parse_inference_endpoints(cls, v):
+        if isinstance(v, str):
+            import json
+            text = v.strip()
+            if text.startswith('['):
+                try:
+                    return json.loads(text)
+                except json.JSONDecodeError:
+                    raise ValueError("INFERENCE_ENDPOINTS is not a valid JSON string")
+            return [url.strip().rstrip('/') for url in text.split(',') if url.strip()]
+        return v
+
     @field_validator('localai_available_chat_models', mode='before')
     def parse_localai_json_string(cls, v):
         if isinstance(v, str):
@@ -21,6 +21,7 @@ import time
 import copy
 import asyncio
 import traceback
+from contextlib import nullcontext
 from statistics import median
 from itertools import cycle
 
@@ -39,9 +40,10 @@ from knowledge_base_agent.tweet_cacher import cache_tweets
 from knowledge_base_agent.media_processor import process_media
 # MarkdownWriter removed - no longer writing to disk, using unified DB only
 from knowledge_base_agent.custom_types import KnowledgeBaseItem
-from knowledge_base_agent.phase_execution_helper import PhaseExecutionHelper, ProcessingPhase, PhaseExecutionPlan
+from knowledge_base_agent.phase_execution_helper import PhaseExecutionHelper, ProcessingPhase, PhaseExecutionPlan, PER_TWEET_PHASES
 from knowledge_base_agent.tweet_retry_manager import TweetRetryManager, RetryConfig
 from knowledge_base_agent.ai_categorization import categorize_and_name_content as ai_categorize_and_name
+from knowledge_base_agent.ai_categorization import categorize_name_and_title_content
 from knowledge_base_agent.kb_item_generator import create_knowledge_base_item
 from knowledge_base_agent.models import KnowledgeBaseItem as DBKnowledgeBaseItem
 from knowledge_base_agent.preferences import UserPreferences
@@ -205,32 +207,19 @@ class StreamlinedContentProcessor:
         # Execute each phase and regenerate plans after phases that change eligibility
         # NOTE: Database sync is now a standalone phase, not part of content processing
         try:
-            # Cache phase
-            await self._execute_cache_phase(execution_plans[ProcessingPhase.CACHE], tweets_data_map, preferences, stats)
-            
-            # Regenerate plans after cache phase since it affects eligibility for subsequent phases
-            if execution_plans[ProcessingPhase.CACHE].needs_processing_count > 0:
-                self.socketio_emit_log("🔄 Regenerating execution plans after cache phase...", "DEBUG")
-                execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
-            
-            # Media phase  
-            await self._execute_media_phase(execution_plans[ProcessingPhase.MEDIA], tweets_data_map, preferences, stats)
-            
-            # Regenerate plans after media phase since it affects LLM phase eligibility
-            if execution_plans[ProcessingPhase.MEDIA].needs_processing_count > 0:
-                self.socketio_emit_log("🔄 Regenerating execution plans after media phase...", "DEBUG")
-                execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
-            
-            # LLM phase
-            await self._execute_llm_phase(execution_plans[ProcessingPhase.LLM], tweets_data_map, preferences, stats, category_manager)
-            
-            # Regenerate plans after LLM phase since it affects KB item phase eligibility
-            if execution_plans[ProcessingPhase.LLM].needs_processing_count > 0:
-                self.socketio_emit_log("🔄 Regenerating execution plans after LLM phase...", "DEBUG")
-                execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
-            
-            # KB Item phase
-            await self._execute_kb_item_phase(execution_plans[ProcessingPhase.KB_ITEM], tweets_data_map, preferences, stats)
+            # Tweet state updates are queued and written in batches; leaving the
+            # block (completion, error or stop) writes whatever is still pending
+            with self._state_write_behind():
+                try:
+                    if self.config.pipeline_mode:
+                        # Streaming mode: tweets flow between stages individually
+                        await self._pin_phase_models('media', 'categorization', 'kb_item')
+                        await self._execute_pipeline(tweets_data_map, force_flags, preferences, stats, category_manager)
+                    else:
+                        await self._execute_phases_in_sequence(execution_plans, tweets_data_map, force_flags,
+                                                               preferences, stats, category_manager)
+                finally:
+                    await self._release_phase_models()
             # Database operations are handled directly within each phase using unified database approach
         except Exception as e:
             self.socketio_emit_log(f"Error during phase execution: {e}", "ERROR")
@@ -263,6 +252,76 @@ class StreamlinedContentProcessor:
 
         return phase_details_results
 
+    def _state_write_behind(self):
+        """Batch tweet state writes for the duration of a run, if the state manager supports it."""
+        write_behind = getattr(self.state_manager, 'write_behind', None)
+        return write_behind() if write_behind else nullcontext()
+
+    async def _pin_phase_models(self, *phases: str) -> None:
+        """Keep the models of the upcoming phase(s) loaded, if the HTTP client supports it."""
+        preload_models = getattr(self.http_client, 'preload_models', None)
+        if preload_models:
+            try:
+                await preload_models(*phases)
+            except Exception as e:
+                self.socketio_emit_log(f"Could not preload models for {', '.join(phases)}: {e}", "WARNING")
+
+    async def _release_phase_models(self) -> None:
+        """Return pinned models to the default keep-alive at the end of a run."""
+        release_models = getattr(self.http_client, 'release_models', None)
+        if release_models:
+            try:
+                await release_models()
+            except Exception as e:
+                self.socketio_emit_log(f"Could not release pinned models: {e}", "WARNING")
+
+    def _flush_state_updates(self) -> None:
+        """Write queued tweet state updates at a phase boundary."""
+        flush_pending_updates = getattr(self.state_manager, 'flush_pending_updates', None)
+        if flush_pending_updates:
+            flush_pending_updates()
+
+    async def _execute_phases_in_sequence(self, execution_plans: Dict[ProcessingPhase, PhaseExecutionPlan],
+                                          tweets_data_map: Dict[str, Any], force_flags: Dict[str, bool],
+                                          preferences, stats, category_manager) -> None:
+        """Run each phase over all tweets before starting the next one."""
+        # Cache phase
+        await self._execute_cache_phase(execution_plans[ProcessingPhase.CACHE], tweets_data_map, preferences, stats)
+        self._flush_state_updates()
+        
+        # Regenerate plans after cache phase since it affects eligibility for subsequent phases
+        if execution_plans[ProcessingPhase.CACHE].needs_processing_count > 0:
+            self.socketio_emit_log("🔄 Regenerating execution plans after cache phase...", "DEBUG")
+            execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
+        
+        # Media phase  
+        if execution_plans[ProcessingPhase.MEDIA].needs_processing_count > 0:
+            await self._pin_phase_models('media')
+        await self._execute_media_phase(execution_plans[ProcessingPhase.MEDIA], tweets_data_map, preferences, stats)
+        self._flush_state_updates()
+        
+        # Regenerate plans after media phase since it affects LLM phase eligibility
+        if execution_plans[ProcessingPhase.MEDIA].needs_processing_count > 0:
+            self.socketio_emit_log("🔄 Regenerating execution plans after media phase...", "DEBUG")
+            execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
+        
+        # LLM phase
+        if execution_plans[ProcessingPhase.LLM].needs_processing_count > 0:
+            await self._pin_phase_models('categorization')
+        await self._execute_llm_phase(execution_plans[ProcessingPhase.LLM], tweets_data_map, preferences, stats, category_manager)
+        self._flush_state_updates()
+        
+        # Regenerate plans after LLM phase since it affects KB item phase eligibility
+        if execution_plans[ProcessingPhase.LLM].needs_processing_count > 0:
+            self.socketio_emit_log("🔄 Regenerating execution plans after LLM phase...", "DEBUG")
+            execution_plans = self.phase_helper.create_all_execution_plans(tweets_data_map, force_flags)
+        
+        # KB Item phase
+        if execution_plans[ProcessingPhase.KB_ITEM].needs_processing_count > 0:
+            await self._pin_phase_models('kb_item')
+        await self._execute_kb_item_phase(execution_plans[ProcessingPhase.KB_ITEM], tweets_data_map, preferences, stats)
+        self._flush_state_updates()
+
     async def _execute_cache_phase(self, plan: PhaseExecutionPlan, tweets_data_map: Dict[str, Any], preferences, stats):
         """Execute caching phase using execution plan."""
         if plan.should_skip_phase:
@@ -418,7 +477,6 @@ class StreamlinedContentProcessor:
                 break
 
             try:
-                tweet_data = tweets_data_map[tweet_id]
                 self.socketio_emit_log(f"🔄 Processing media ({i+1} of {plan.needs_processing_count})", "INFO")
                 
                 # Emit progress update as we start processing this item
@@ -433,20 +491,7 @@ class StreamlinedContentProcessor:
                         stats.error_count
                     )
                 
-                updated_tweet_data = await process_media(
-                    tweet_data=dict(tweet_data), 
-                    http_client=self.http_client,
-                    config=self.config,
-                    force_reprocess=preferences.force_reprocess_media
-                )
-                tweets_data_map[tweet_id] = updated_tweet_data
-                
-                # Validate data integrity before updating database
-                is_valid, validation_issues = self.validate_tweet_data_integrity(tweet_id, updated_tweet_data)
-                if not is_valid:
-                    self.socketio_emit_log(f"⚠️ Data validation issues for tweet {tweet_id}: {', '.join(validation_issues[:3])}", "WARNING")
-                
-                self.state_manager.update_tweet_data(tweet_id, updated_tweet_data)
+                await self._process_tweet_media(tweet_id, tweets_data_map, preferences)
                 
                 # Don't log individual completions - too verbose for Live Logs
                 
@@ -466,21 +511,7 @@ class StreamlinedContentProcessor:
                 logging.error(f"Error in media processing for tweet {tweet_id}: {e}")
                 self.socketio_emit_log(f"Error in media processing for tweet {tweet_id}: {e}", "ERROR")
                 stats.error_count += 1
-                
-                # Enhanced error handling with retry logic
-                tweets_data_map[tweet_id]['_media_error'] = str(e)
-                tweets_data_map[tweet_id]['media_processed'] = False
-                
-                # Check if this tweet should be scheduled for retry
-                if self.retry_manager.should_retry(tweet_id, tweets_data_map[tweet_id], e):
-                    retry_data = self.retry_manager.schedule_retry(tweet_id, tweets_data_map[tweet_id], e)
-                    tweets_data_map[tweet_id].update(retry_data)
-                    self.socketio_emit_log(f"🔁 Scheduled media processing retry for tweet {tweet_id}", "INFO")
-                else:
-                    self.socketio_emit_log(f"❌ Tweet {tweet_id} media processing failed permanently", "ERROR")
-                
-                # Update the tweet data in database with error information
-                self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
+                self._handle_tweet_phase_error(tweet_id, tweets_data_map, e, '_media_error', 'media_processed', 'media processing')
 
         if not stop_flag.is_set():
             # Create rich completion message for media phase
@@ -557,7 +588,8 @@ class StreamlinedContentProcessor:
         num_gpus = self.config.num_gpus_available
         if num_gpus <= 0: 
             num_gpus = 1
-        num_parallel_jobs = num_gpus
+        # With several inference endpoints, keep each one busy
+        num_parallel_jobs = max(num_gpus, len(getattr(self.config, 'inference_endpoints', None) or []))
 
         self.socketio_emit_log(f"Running LLM categorization with {num_parallel_jobs} parallel workers", "INFO")
         
@@ -575,75 +607,111 @@ class StreamlinedContentProcessor:
 
         phase_start_time = time.monotonic()
         items_successfully_processed = 0
-
-        # Create parallel processing tasks
-        semaphore = asyncio.Semaphore(num_parallel_jobs)
-        gpu_idx_cycle = cycle(range(num_gpus))
-        
-        async def worker_llm(tweet_id: str, tweet_data: Dict[str, Any], assigned_gpu: int):
-            async with semaphore:
+        preclassifier = getattr(category_manager, 'preclassifier', None)
+        preclassifier_stats_before = dict(preclassifier.stats) if preclassifier is not None else None
+
+        # Bounded worker pool fed from a queue: results are handled in completion
+        # order and persisted in batches, so memory does not grow with the run size
+        # and a crash only loses the current unflushed batch
+        work_queue: asyncio.Queue = asyncio.Queue(maxsize=num_parallel_jobs * 2)
+        batch_size = max(1, self.config.llm_result_batch_size)
+        flush_interval = self.config.llm_result_flush_seconds
+        pending_writes: Dict[str, Dict[str, Any]] = {}
+        last_flush = time.monotonic()
+        progress = {'completed': 0, 'errors': 0}
+
+        def flush_results() -> None:
+            nonlocal last_flush
+            if pending_writes:
+                if hasattr(self.state_manager, 'update_tweets_data_batch'):
+                    self.state_manager.update_tweets_data_batch(dict(pending_writes))
+                else:
+                    for pending_id, pending_data in pending_writes.items():
+                        self.state_manager.update_tweet_data(pending_id, pending_data)
+                pending_writes.clear()
+            last_flush = time.monotonic()
+
+        async def worker_llm(assigned_gpu: int):
+            nonlocal items_successfully_processed
+            while True:
+                tweet_id = await work_queue.get()
+                if tweet_id is None or stop_flag.is_set():
+                    return
                 try:
-                    result = await self._process_single_categorization(
-                        tweet_id, tweet_data, category_manager, preferences, assigned_gpu
+                    result_data = await self._process_single_categorization(
+                        tweet_id, tweets_data_map[tweet_id], category_manager, preferences, assigned_gpu
                     )
-                    return tweet_id, result, None 
+                    self._apply_categorization_result(tweet_id, tweets_data_map, result_data, persist=False)
+                    pending_writes[tweet_id] = tweets_data_map[tweet_id]
+                    items_successfully_processed += 1
                 except Exception as e:
                     logging.error(f"Error in LLM Processing for tweet {tweet_id}: {e}", exc_info=True)
-                    return tweet_id, None, e
-
-        # Create tasks for tweets that need processing
-        all_tasks = []
-        for tweet_id in plan.tweets_needing_processing:
-            if stop_flag.is_set():
-                break
-            assigned_gpu = next(gpu_idx_cycle)
-            tweet_data = tweets_data_map[tweet_id]
-            all_tasks.append(worker_llm(tweet_id, tweet_data, assigned_gpu))
+                    stats.error_count += 1
+                    progress['errors'] += 1
+                    self.socketio_emit_log(f"Error in LLM Processing for tweet {tweet_id}: {e}", "ERROR")
+                    self._handle_tweet_phase_error(tweet_id, tweets_data_map, e, '_llm_error', 'categories_processed', 'LLM processing')
+                
+                progress['completed'] += 1
+                if len(pending_writes) >= batch_size or time.monotonic() - last_flush >= flush_interval:
+                    flush_results()
+                if self.phase_emitter_func:
+                    self.phase_emitter_func(
+                        'llm_processing', 
+                        'active', 
+                        f'Categorized {progress["completed"]} of {plan.needs_processing_count}',
+                        False,
+                        progress['completed'],
+                        plan.needs_processing_count,
+                        progress['errors']
+                    )
 
-        # Execute all tasks in parallel
-        if all_tasks:
-            results = await asyncio.gather(*all_tasks, return_exceptions=False)
-            
-            for tweet_id, result_data, error_obj in results:
+        async def feed_queue():
+            for tweet_id in plan.tweets_needing_processing:
                 if stop_flag.is_set():
                     break
+                await work_queue.put(tweet_id)
+            for _ in range(num_parallel_jobs):
+                await work_queue.put(None)
 
-                if error_obj:
-                    stats.error_count += 1
-                    self.socketio_emit_log(f"Error in LLM Processing for tweet {tweet_id}: {error_obj}", "ERROR")
-                    
-                    # Enhanced error handling with retry logic
-                    tweets_data_map[tweet_id]['_llm_error'] = str(error_obj)
-                    tweets_data_map[tweet_id]['categories_processed'] = False
-                    
-                    # Check if this tweet should be scheduled for retry
-                    if self.retry_manager.should_retry(tweet_id, tweets_data_map[tweet_id], error_obj):
-                        retry_data = self.retry_manager.schedule_retry(tweet_id, tweets_data_map[tweet_id], error_obj)
-                        tweets_data_map[tweet_id].update(retry_data)
-                        self.socketio_emit_log(f"🔁 Scheduled LLM processing retry for tweet {tweet_id}", "INFO")
-                    else:
-                        self.socketio_emit_log(f"❌ Tweet {tweet_id} LLM processing failed permanently", "ERROR")
-                    
-                    # Update the tweet data in database with error information
-                    self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
-                elif result_data:
-                    main_cat, sub_cat, item_name = result_data
-                    tweets_data_map[tweet_id]['main_category'] = main_cat
-                    tweets_data_map[tweet_id]['sub_category'] = sub_cat
-                    tweets_data_map[tweet_id]['item_name_suggestion'] = item_name
-                    tweets_data_map[tweet_id]['categories_processed'] = True
-                    tweets_data_map[tweet_id]['categories'] = {
-                        'main_category': main_cat,
-                        'sub_category': sub_cat,
-                        'item_name': item_name
-                    }
-                    self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
-                    items_successfully_processed += 1
+        gpu_idx_cycle = cycle(range(num_gpus))
+        workers = [asyncio.create_task(worker_llm(next(gpu_idx_cycle))) for _ in range(num_parallel_jobs)]
+        feeder = asyncio.create_task(feed_queue())
+        try:
+            # Poll so stop_flag and the flush interval are honoured while LLM calls are in flight
+            pending_workers = set(workers)
+            while pending_workers:
+                done, pending_workers = await asyncio.wait(pending_workers, timeout=0.5)
+                for task in done:
+                    task.result()
+                if stop_flag.is_set():
+                    self.socketio_emit_log("LLM processing stopped by flag.", "WARNING")
+                    for task in pending_workers:
+                        task.cancel()
+                    await asyncio.gather(*pending_workers, return_exceptions=True)
+                    if self.phase_emitter_func:
+                        self.phase_emitter_func('llm_processing', 'interrupted', 'LLM processing stopped.')
+                    break
+                if pending_writes and time.monotonic() - last_flush >= flush_interval:
+                    flush_results()
+        finally:
+            feeder.cancel()
+            for task in workers:
+                task.cancel()
+            flush_results()
 
         # Update historical stats
         phase_end_time = time.monotonic()
         duration_this_run = phase_end_time - phase_start_time
         
+        if preclassifier_stats_before is not None:
+            predicted = preclassifier.stats['predictions'] - preclassifier_stats_before['predictions']
+            if predicted:
+                accepted = preclassifier.stats['accepted'] - preclassifier_stats_before['accepted']
+                narrowed = preclassifier.stats['narrowed'] - preclassifier_stats_before['narrowed']
+                self.socketio_emit_log(
+                    f"Category pre-classifier: {accepted} of {predicted} tweets categorized without the categorization prompt, "
+                    f"{narrowed} prompts narrowed to {preclassifier.candidate_count} candidate categories", "INFO")
+
         if items_successfully_processed > 0:
             update_phase_stats(
                 phase_id="llm_categorization",
@@ -753,32 +821,7 @@ class StreamlinedContentProcessor:
                         stats.error_count
                     )
                 
-                # Create KB item object
-                kb_item_obj: KnowledgeBaseItem = await create_knowledge_base_item(
-                    tweet_id=tweet_id, tweet_data=tweet_data, config=self.config,
-                    http_client=self.http_client, state_manager=self.state_manager
-                )
-                
-                # UNIFIED DB APPROACH: Store all KB item data directly in the unified database
-                # No disk writing - everything goes to the UnifiedTweet model
-                
-                # Update tweet data with KB item content for unified database storage
-                tweet_data['kb_item_created'] = True
-                tweet_data['display_title'] = kb_item_obj.display_title
-                tweet_data['description'] = kb_item_obj.description
-                tweet_data['markdown_content'] = kb_item_obj.markdown_content
-                tweet_data['raw_json_content'] = kb_item_obj.raw_json_content
-                
-                # Store media paths as JSON list (not JSON string)
-                if hasattr(kb_item_obj, 'media_files') and kb_item_obj.media_files:
-                    tweet_data['kb_media_paths'] = list(kb_item_obj.media_files)
-                else:
-                    tweet_data['kb_media_paths'] = []
-                
-                # Mark processing as complete
-                tweet_data['processing_complete'] = True
-                
-                self.state_manager.update_tweet_data(tweet_id, tweet_data)
+                await self._generate_kb_item(tweet_id, tweet_data)
                 items_successfully_processed += 1
                 
                 # Update progress when completing this item
@@ -799,21 +842,7 @@ class StreamlinedContentProcessor:
                 logging.error(f"Error in KB item generation for tweet {tweet_id}: {e}", exc_info=True)
                 self.socketio_emit_log(f"Error in KB item generation for tweet {tweet_id}: {e}", "ERROR")
                 stats.error_count += 1
-                
-                # Enhanced error handling with retry logic
-                tweets_data_map[tweet_id]['_kbitem_error'] = str(e)
-                tweets_data_map[tweet_id]['kb_item_created'] = False
-                
-                # Check if this tweet should be scheduled for retry
-                if self.retry_manager.should_retry(tweet_id, tweets_data_map[tweet_id], e):
-                    retry_data = self.retry_manager.schedule_retry(tweet_id, tweets_data_map[tweet_id], e)
-                    tweets_data_map[tweet_id].update(retry_data)
-                    self.socketio_emit_log(f"🔁 Scheduled KB item generation retry for tweet {tweet_id}", "INFO")
-                else:
-                    self.socketio_emit_log(f"❌ Tweet {tweet_id} KB item generation failed permanently", "ERROR")
-                
-                # Update the tweet data in database with error information
-                self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
+                self._handle_tweet_phase_error(tweet_id, tweets_data_map, e, '_kbitem_error', 'kb_item_created', 'KB item generation')
 
         # Update historical stats
         phase_end_time = time.monotonic()
@@ -854,6 +883,300 @@ class StreamlinedContentProcessor:
                 self.unified_logger.emit_phase_complete('kb_item_generation', completion_result)
 
 
+    # ===== PER-TWEET PHASE WORK (shared by phase-at-a-time and pipeline modes) =====
+
+    async def _process_tweet_media(self, tweet_id: str, tweets_data_map: Dict[str, Any], preferences) -> None:
+        """Run media analysis for one tweet and persist the result."""
+        updated_tweet_data = await process_media(
+            tweet_data=dict(tweets_data_map[tweet_id]), 
+            http_client=self.http_client,
+            config=self.config,
+            force_reprocess=preferences.force_reprocess_media
+        )
+        tweets_data_map[tweet_id] = updated_tweet_data
+        
+        # Validate data integrity before updating database
+        is_valid, validation_issues = self.validate_tweet_data_integrity(tweet_id, updated_tweet_data)
+        if not is_valid:
+            self.socketio_emit_log(f"⚠️ Data validation issues for tweet {tweet_id}: {', '.join(validation_issues[:3])}", "WARNING")
+        
+        self.state_manager.update_tweet_data(tweet_id, updated_tweet_data)
+
+    def _apply_categorization_result(self, tweet_id: str, tweets_data_map: Dict[str, Any], 
+                                     result_data: Tuple[str, ...], persist: bool = True) -> None:
+        """Store an LLM categorization result on the tweet and, unless batching, persist it."""
+        main_cat, sub_cat, item_name = result_data[:3]
+        if len(result_data) > 3:
+            # Fused categorization also titled the item
+            tweets_data_map[tweet_id]['display_title'] = result_data[3]
+        tweets_data_map[tweet_id]['main_category'] = main_cat
+        tweets_data_map[tweet_id]['sub_category'] = sub_cat
+        tweets_data_map[tweet_id]['item_name_suggestion'] = item_name
+        tweets_data_map[tweet_id]['categories_processed'] = True
+        tweets_data_map[tweet_id]['categories'] = {
+            'main_category': main_cat,
+            'sub_category': sub_cat,
+            'item_name': item_name
+        }
+        if persist:
+            self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
+
+    async def _generate_kb_item(self, tweet_id: str, tweet_data: Dict[str, Any]) -> None:
+        """Generate the KB item for one tweet and store it in the unified database."""
+        kb_item_obj: KnowledgeBaseItem = await create_knowledge_base_item(
+            tweet_id=tweet_id, tweet_data=tweet_data, config=self.config,
+            http_client=self.http_client, state_manager=self.state_manager
+        )
+        
+        # UNIFIED DB APPROACH: Store all KB item data directly in the unified database
+        # No disk writing - everything goes to the UnifiedTweet model
+        tweet_data['kb_item_created'] = True
+        tweet_data['display_title'] = kb_item_obj.display_title
+        tweet_data['description'] = kb_item_obj.description
+        tweet_data['markdown_content'] = kb_item_obj.markdown_content
+        tweet_data['raw_json_content'] = kb_item_obj.raw_json_content
+        
+        # Store media paths as JSON list (not JSON string)
+        if hasattr(kb_item_obj, 'media_files') and kb_item_obj.media_files:
+            tweet_data['kb_media_paths'] = list(kb_item_obj.media_files)
+        else:
+            tweet_data['kb_media_paths'] = []
+        
+        # Mark processing as complete
+        tweet_data['processing_complete'] = True
+        
+        self.state_manager.update_tweet_data(tweet_id, tweet_data)
+
+    def _handle_tweet_phase_error(self, tweet_id: str, tweets_data_map: Dict[str, Any], error: Exception,
+                                  error_key: str, flag_key: str, phase_label: str) -> None:
+        """Record a per-tweet phase failure, schedule a retry when allowed and persist the error state."""
+        tweets_data_map[tweet_id][error_key] = str(error)
+        tweets_data_map[tweet_id][flag_key] = False
+        
+        # Check if this tweet should be scheduled for retry
+        if self.retry_manager.should_retry(tweet_id, tweets_data_map[tweet_id], error):
+            retry_data = self.retry_manager.schedule_retry(tweet_id, tweets_data_map[tweet_id], error)
+            tweets_data_map[tweet_id].update(retry_data)
+            self.socketio_emit_log(f"🔁 Scheduled {phase_label} retry for tweet {tweet_id}", "INFO")
+        else:
+            self.socketio_emit_log(f"❌ Tweet {tweet_id} {phase_label} failed permanently", "ERROR")
+        
+        # Update the tweet data in database with error information
+        self.state_manager.update_tweet_data(tweet_id, tweets_data_map[tweet_id])
+
+    # ===== STREAMING PIPELINE MODE =====
+
+    # Phase id used for progress events and the verb used in completion messages
+    PIPELINE_STAGE_INFO = {
+        ProcessingPhase.CACHE: ('tweet_caching', 'Cached'),
+        ProcessingPhase.MEDIA: ('media_analysis', 'Analyzed media for'),
+        ProcessingPhase.LLM: ('llm_processing', 'Categorized'),
+        ProcessingPhase.KB_ITEM: ('kb_item_generation', 'Generated KB items for'),
+    }
+
+    async def _execute_pipeline(self, tweets_data_map: Dict[str, Any], force_flags: Dict[str, bool],
+                                preferences, stats, category_manager) -> None:
+        """
+        Stream tweets through the cache, media, LLM and KB item stages.
+        
+        Every stage has its own bounded queue and worker pool. A tweet is handed to
+        the next stage it needs (as decided by PhaseExecutionHelper) as soon as its
+        current stage finishes, so KB items are produced while other tweets are
+        still being cached. Stages are closed in order: once a stage and everything
+        upstream of it has drained, nothing more can arrive, and its phase
+        completion event is emitted.
+        """
+        num_gpus = max(self.config.num_gpus_available, 1)
+        worker_counts = {
+            ProcessingPhase.CACHE: max(1, self.config.pipeline_cache_workers),
+            ProcessingPhase.MEDIA: max(1, self.config.pipeline_media_workers),
+            ProcessingPhase.LLM: num_gpus,
+            ProcessingPhase.KB_ITEM: max(1, self.config.pipeline_kb_item_workers),
+        }
+        queue_size = max(1, self.config.pipeline_queue_size)
+        queues = {phase: asyncio.Queue(maxsize=queue_size) for phase in PER_TWEET_PHASES}
+        counters = {
+            phase: {'expected': 0, 'processed': 0, 'errors': 0, 'started_at': None}
+            for phase in PER_TWEET_PHASES
+        }
+        
+        # Stages each tweet can still reach; 'expected' counts tweets that reached
+        # or may still reach a stage, and shrinks as tweets skip stages or drop out
+        reachable: Dict[str, List[ProcessingPhase]] = {}
+        entry_points: List[Tuple[str, ProcessingPhase]] = []
+        for tweet_id, tweet_data in tweets_data_map.items():
+            first_phase = self.phase_helper.next_phase_for_tweet(tweet_data or {}, force_flags)
+            if first_phase is None:
+                continue
+            reachable[tweet_id] = PER_TWEET_PHASES[PER_TWEET_PHASES.index(first_phase):]
+            for phase in reachable[tweet_id]:
+                counters[phase]['expected'] += 1
+            entry_points.append((tweet_id, first_phase))
+        
+        self.socketio_emit_log(
+            f"🔄 Pipeline mode: streaming {len(entry_points)} tweets through "
+            + ", ".join(f"{self.PIPELINE_STAGE_INFO[p][0]} ({worker_counts[p]} worker(s))" for p in PER_TWEET_PHASES),
+            "INFO"
+        )
+        for phase in PER_TWEET_PHASES:
+            if self.phase_emitter_func:
+                self.phase_emitter_func(
+                    self.PIPELINE_STAGE_INFO[phase][0], 'active',
+                    f'Waiting for {counters[phase]["expected"]} tweets...',
+                    False, 0, counters[phase]['expected'], 0
+                )
+
+        async def route(tweet_id: str, finished_phase: Optional[ProcessingPhase]) -> None:
+            next_phase = None
+            if finished_phase is not None:
+                next_phase = self.phase_helper.next_phase_for_tweet(
+                    tweets_data_map[tweet_id], force_flags, after=finished_phase
+                )
+            remaining = reachable.get(tweet_id, [])
+            cut = remaining.index(next_phase) if next_phase in remaining else len(remaining)
+            for skipped_phase in remaining[:cut]:
+                counters[skipped_phase]['expected'] -= 1
+            reachable[tweet_id] = remaining[cut:]
+            if next_phase is not None:
+                await queues[next_phase].put(tweet_id)
+
+        async def run_stage_item(phase: ProcessingPhase, tweet_id: str, gpu_index: int) -> bool:
+            tweet_data = tweets_data_map[tweet_id]
+            if phase == ProcessingPhase.CACHE:
+                await cache_tweets([tweet_id], self.config, self.http_client,
+                                   self.state_manager, preferences.force_recache_tweets)
+                updated_data = self.state_manager.get_tweet(tweet_id)
+                if updated_data:
+                    tweets_data_map[tweet_id] = updated_data
+                return bool(tweets_data_map[tweet_id].get('cache_complete'))
+            
+            try:
+                if phase == ProcessingPhase.MEDIA:
+                    await self._process_tweet_media(tweet_id, tweets_data_map, preferences)
+                elif phase == ProcessingPhase.LLM:
+                    result_data = await self._process_single_categorization(
+                        tweet_id, tweet_data, category_manager, preferences, gpu_index
+                    )
+                    self._apply_categorization_result(tweet_id, tweets_data_map, result_data)
+                else:
+                    await self._generate_kb_item(tweet_id, tweet_data)
+                return True
+            except Exception as e:
+                error_keys = {
+                    ProcessingPhase.MEDIA: ('_media_error', 'media_processed', 'media processing'),
+                    ProcessingPhase.LLM: ('_llm_error', 'categories_processed', 'LLM processing'),
+                    ProcessingPhase.KB_ITEM: ('_kbitem_error', 'kb_item_created', 'KB item generation'),
+                }[phase]
+                logging.error(f"Error in {error_keys[2]} for tweet {tweet_id}: {e}", exc_info=True)
+                self.socketio_emit_log(f"Error in {error_keys[2]} for tweet {tweet_id}: {e}", "ERROR")
+                stats.error_count += 1
+                self._handle_tweet_phase_error(tweet_id, tweets_data_map, e, *error_keys)
+                return False
+
+        async def worker(phase: ProcessingPhase, gpu_index: int) -> None:
+            phase_id = self.PIPELINE_STAGE_INFO[phase][0]
+            counter = counters[phase]
+            while True:
+                tweet_id = await queues[phase].get()
+                if tweet_id is None:
+                    return
+                reachable[tweet_id] = reachable[tweet_id][1:]
+                if stop_flag.is_set():
+                    # Keep draining so upstream stages never block on a full queue
+                    continue
+                if counter['started_at'] is None:
+                    counter['started_at'] = time.monotonic()
+                
+                try:
+                    succeeded = await run_stage_item(phase, tweet_id, gpu_index)
+                except Exception as e:
+                    logging.error(f"Pipeline stage {phase_id} failed for tweet {tweet_id}: {e}", exc_info=True)
+                    succeeded = False
+                
+                if succeeded:
+                    counter['processed'] += 1
+                else:
+                    counter['errors'] += 1
+                if self.phase_emitter_func:
+                    self.phase_emitter_func(
+                        phase_id, 'active',
+                        f'Completed {counter["processed"]} of {counter["expected"]}',
+                        False, counter['processed'], counter['expected'], counter['errors']
+                    )
+                
+                # A failed tweet is dropped from the pipeline (route() releases its
+                # remaining stages); a successful one moves straight on
+                await route(tweet_id, phase if succeeded else None)
+
+        workers = {
+            phase: [asyncio.create_task(worker(phase, i % num_gpus)) for i in range(worker_counts[phase])]
+            for phase in PER_TWEET_PHASES
+        }
+        try:
+            for tweet_id, first_phase in entry_points:
+                if stop_flag.is_set():
+                    break
+                await queues[first_phase].put(tweet_id)
+            
+            for phase in PER_TWEET_PHASES:
+                for _ in workers[phase]:
+                    await queues[phase].put(None)
+                await asyncio.gather(*workers[phase])
+                self._complete_pipeline_stage(phase, counters[phase])
+        except BaseException:
+            for tasks in workers.values():
+                for task in tasks:
+                    task.cancel()
+            raise
+
+    def _complete_pipeline_stage(self, phase: ProcessingPhase, counter: Dict[str, Any]) -> None:
+        """Emit the phase-level completion events for a drained pipeline stage."""
+        phase_id, verb = self.PIPELINE_STAGE_INFO[phase]
+        self._flush_state_updates()
+        if stop_flag.is_set():
+            if self.phase_emitter_func:
+                self.phase_emitter_func(phase_id, 'interrupted', f'{phase_id} stopped.')
+            return
+        
+        duration = time.monotonic() - counter['started_at'] if counter['started_at'] else 0.0
+        completion_msg = f"{verb} {counter['processed']} tweets"
+        if counter['errors']:
+            completion_msg += f" • {counter['errors']} failed"
+        self.socketio_emit_log(f"✅ {completion_msg}", "INFO")
+        
+        if self.phase_emitter_func:
+            self.phase_emitter_func(
+                phase_id, 'completed', completion_msg,
+                False, counter['processed'], counter['expected'], counter['errors']
+            )
+        
+        stats_phase_id = {'llm_processing': 'llm_categorization', 'kb_item_generation': 'kb_item_generation'}.get(phase_id)
+        if stats_phase_id and counter['processed'] > 0:
+            update_phase_stats(
+                phase_id=stats_phase_id,
+                items_processed_this_run=counter['processed'],
+                duration_this_run_seconds=duration
+            )
+        
+        if self.task_id and self.realtime_emitter:
+            from .realtime_communication import emit_phase_complete
+            emit_phase_complete(
+                task_id=self.task_id,
+                phase_id=phase_id,
+                processed_count=counter['processed'],
+                total_count=counter['expected'],
+                error_count=counter['errors'],
+                config=self.config
+            )
+        
+        if self.unified_logger:
+            self.unified_logger.emit_phase_complete(phase_id, {
+                'processed_count': counter['processed'],
+                'total_count': counter['expected'],
+                'error_count': counter['errors'],
+                'duration_seconds': duration
+            })
+
 
     # Database validation and sync methods removed - using unified database approach
     # All data is now written directly to UnifiedTweet during processing phases
@@ -1398,11 +1721,22 @@ class StreamlinedContentProcessor:
 
     async def _process_single_categorization(self, tweet_id: str, tweet_data: Dict[str, Any], 
                                            category_manager: CategoryManager, preferences: UserPreferences, 
-                                           gpu_device: int) -> Tuple[str, str, str]:
+                                           gpu_device: int) -> Tuple[str, ...]:
         """Helper method to process a single tweet for categorization and naming."""
         try:
             self.socketio_emit_log(f"Invoking AI for categorization and naming of {tweet_id}...", "DEBUG")
             
+            if getattr(preferences, 'fused_categorization', False):
+                result = await categorize_name_and_title_content(
+                    http_client=self.http_client, tweet_data=tweet_data, tweet_id=tweet_id,
+                    category_manager=category_manager, max_retries=self.config.max_retries,
+                    gpu_device=gpu_device
+                )
+                await category_manager.ensure_category_exists(result[0], result[1])
+                self.socketio_emit_log(f"LLM processing complete for {tweet_id}: Cat={result[0]}, SubCat={result[1]}, "
+                                       f"Name={result[2]}, Title={result[3]}", "INFO")
+                return result
+            
             main_cat, sub_cat, item_name = await ai_categorize_and_name(
                 http_client=self.http_client, tweet_data=tweet_data, text_model=self.text_model,
                 tweet_id=tweet_id, category_manager=category_manager,
@@ -29,6 +29,7 @@ from .models import db, KnowledgeBaseItem, SubcategorySynthesis, Embedding
 from .custom_types import Synthesis
 from .file_utils import async_json_load, async_write_text
 from .exceptions import AIError
+from .vector_index import get_embedding_index
 
 class EmbeddingManager:
     """Enhanced embedding manager with vector store support and optimization."""
@@ -49,10 +50,14 @@ class EmbeddingManager:
         self.chroma_client = None
         self.collection = None
         
+        # Process-resident similarity index for the SQL storage path
+        self.sql_index = None
+        
         if self.use_vector_store:
             self._initialize_chroma()
         else:
             self.logger.info("Using SQL storage for embeddings (Chroma not available or not configured)")
+            self.sql_index = get_embedding_index(self.embedding_model, getattr(config, 'vector_index_path', None))
 
     def _initialize_chroma(self):
         """Initialize Chroma vector database."""
@@ -186,51 +191,71 @@ class EmbeddingManager:
 
         processed_count = 0
         error_count = 0
-        batch_size = 10  # Process in batches for better performance
-
-        for i in range(0, total_items, batch_size):
-            batch = items_to_process[i:i + batch_size]
-            
-            # Process batch
-            for item_data in batch:
-                try:
-                    # Skip if already exists (unless force regenerating)
-                    if not force_regenerate and await self._embedding_exists(item_data):
-                        self.logger.debug(f"Skipping existing embedding for {item_data['type']} {item_data['id']}")
-                        processed_count += 1
-                        continue
 
-                    # Generate embedding with retry logic
-                    start_time = time.time()
-                    embedding_vector = await self._generate_embedding_with_retry(item_data['content'])
-                    generation_time = time.time() - start_time
-                    
-                    # Save embedding
-                    await self._save_embedding_optimized(
-                        item_data=item_data,
-                        embedding_vector=embedding_vector
+        # Skip documents that already have embeddings with a single bulk lookup
+        if not force_regenerate and items_to_process:
+            existing_keys = await self._get_existing_embedding_keys(items_to_process)
+            if existing_keys:
+                self.logger.info(f"Skipping {len(existing_keys)} documents that already have embeddings")
+                items_to_process = [
+                    item_data for item_data in items_to_process
+                    if (item_data['type'], item_data['id']) not in existing_keys
+                ]
+                processed_count = total_items - len(items_to_process)
+
+        batches = self._build_embedding_batches(items_to_process)
+        max_concurrent = max(1, getattr(self.config, 'max_concurrent_requests', 1))
+        semaphore = asyncio.Semaphore(max_concurrent)
+        self.logger.info(f"Embedding {len(items_to_process)} documents in {len(batches)} batches "
+                         f"(up to {max_concurrent} concurrent requests)")
+
+        async def run_batch(batch: List[Dict[str, Any]]):
+            async with semaphore:
+                start_time = time.time()
+                results = await self._embed_batch_with_fallback(batch)
+                return results, time.time() - start_time
+
+        tasks = [asyncio.ensure_future(run_batch(batch)) for batch in batches]
+        try:
+            for completed in asyncio.as_completed(tasks):
+                results, generation_time = await completed
+
+                successful = []
+                for item_data, embedding_vector, error in results:
+                    if error is not None:
+                        self.logger.error(f"Error generating embedding for {item_data['type']} {item_data['id']}: {error}")
+                        error_count += 1
+                    else:
+                        successful.append((item_data, embedding_vector))
+
+                if successful:
+                    try:
+                        await self._save_embeddings_bulk(successful)
+                        processed_count += len(successful)
+                    except Exception as e:
+                        self.logger.error(f"Error saving batch of {len(successful)} embeddings: {e}", exc_info=True)
+                        error_count += len(successful)
+
+                self.logger.debug(f"Embedded batch of {len(results)} documents in {generation_time:.2f}s")
+
+                if phase_emitter_func:
+                    phase_emitter_func(
+                        "embedding_generation",
+                        "in_progress",
+                        f"Processing item {processed_count}/{total_items}",
+                        is_sub_step_update=True,
+                        processed_count=processed_count,
+                        total_count=total_items,
+                        error_count=error_count
                     )
-                    
-                    self.logger.debug(f"Generated embedding for {item_data['type']} {item_data['id']} in {generation_time:.2f}s")
-                    processed_count += 1
-                    
-                    if phase_emitter_func:
-                        phase_emitter_func(
-                            "embedding_generation",
-                            f"Processing item {processed_count}/{total_items}",
-                            "in_progress",
-                            is_sub_step_update=True,
-                            processed_count=processed_count,
-                            total_count=total_items,
-                            error_count=error_count
-                        )
-                        
-                except Exception as e:
-                    self.logger.error(f"Error generating embedding for {item_data['type']} {item_data['id']}: {e}", exc_info=True)
-                    error_count += 1
-
-            # Small delay between batches to avoid overwhelming the API
-            await asyncio.sleep(0.1)
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+        if self.sql_index is not None:
+            # Sync and persist the index so other workers can memory-map it on startup
+            self.sql_index.ensure_current()
 
         self.logger.info(f"Embedding generation finished. Processed: {processed_count}, Errors: {error_count}")
         
@@ -421,6 +446,158 @@ class EmbeddingManager:
             db.session.add(new_embedding)
         
         db.session.commit()
+        
+        if self.sql_index is not None:
+            self.sql_index.upsert_many([(item_data['type'], item_data['id'], embedding_vector)])
+
+    def _estimate_tokens(self, text: str) -> int:
+        """Rough token estimate used for batch sizing (~4 characters per token)."""
+        return len(text) // 4 + 1
+
+    def _build_embedding_batches(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Group documents into embedding batches.
+
+        A batch is closed when it reaches EMBEDDING_BATCH_SIZE documents or when
+        adding the next document would exceed EMBEDDING_BATCH_TOKEN_BUDGET, so
+        short documents are packed densely and long ones travel in small batches.
+        """
+        max_items = max(1, getattr(self.config, 'embedding_batch_size', 32))
+        token_budget = max(1, getattr(self.config, 'embedding_batch_token_budget', 16000))
+
+        batches: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_tokens = 0
+
+        for item_data in items:
+            item_tokens = self._estimate_tokens(item_data['content'])
+            if current and (len(current) >= max_items or current_tokens + item_tokens > token_budget):
+                batches.append(current)
+                current = []
+                current_tokens = 0
+            current.append(item_data)
+            current_tokens += item_tokens
+
+        if current:
+            batches.append(current)
+        return batches
+
+    async def _embed_batch_with_fallback(
+        self,
+        batch: List[Dict[str, Any]]
+    ) -> List[Tuple[Dict[str, Any], Optional[List[float]], Optional[Exception]]]:
+        """
+        Embed a batch of documents with a single request.
+
+        If the batched request fails, the batch is split in half and retried so a
+        single bad document only costs its own embedding; single documents fall
+        back to the per-document retry path.
+
+        Returns:
+            List of (item_data, embedding_vector, error) tuples in batch order
+        """
+        if len(batch) == 1:
+            item_data = batch[0]
+            try:
+                embedding = await self._generate_embedding_with_retry(item_data['content'])
+                return [(item_data, embedding, None)]
+            except Exception as e:
+                return [(item_data, None, e)]
+
+        try:
+            embeddings = await self.http_client.embed_batch(
+                model=self.embedding_model,
+                texts=[item_data['content'] for item_data in batch]
+            )
+            if len(embeddings) != len(batch):
+                raise ValueError(f"Expected {len(batch)} embeddings, received {len(embeddings)}")
+            for embedding in embeddings:
+                if not embedding or len(embedding) < 100:
+                    raise ValueError(f"Embedding dimension too small: {len(embedding) if embedding else 0}")
+            return [(item_data, embedding, None) for item_data, embedding in zip(batch, embeddings)]
+        except Exception as e:
+            self.logger.warning(f"Batched embedding of {len(batch)} documents failed, splitting batch: {e}")
+
+        middle = len(batch) // 2
+        first_half = await self._embed_batch_with_fallback(batch[:middle])
+        second_half = await self._embed_batch_with_fallback(batch[middle:])
+        return first_half + second_half
+
+    async def _get_existing_embedding_keys(self, items: List[Dict[str, Any]]) -> set:
+        """Return the (type, id) keys of documents that already have embeddings."""
+        try:
+            if self.use_vector_store:
+                doc_ids = [f"{item_data['type']}_{item_data['id']}" for item_data in items]
+                result = self.collection.get(ids=doc_ids, include=[])
+                existing = set()
+                for doc_id in result.get('ids', []):
+                    doc_type, _, raw_id = doc_id.rpartition('_')
+                    try:
+                        existing.add((doc_type, int(raw_id)))
+                    except ValueError:
+                        continue
+                return existing
+            else:
+                rows = db.session.query(Embedding.document_type, Embedding.document_id).filter(
+                    Embedding.model == self.embedding_model
+                ).all()
+                return {(doc_type, doc_id) for doc_type, doc_id in rows}
+        except Exception as e:
+            self.logger.warning(f"Error checking existing embeddings: {e}")
+            return set()
+
+    async def _save_embeddings_bulk(self, results: List[Tuple[Dict[str, Any], List[float]]]):
+        """Save a batch of embeddings using the optimal storage method."""
+        if self.use_vector_store:
+            self.collection.upsert(
+                ids=[f"{item_data['type']}_{item_data['id']}" for item_data, _ in results],
+                embeddings=[embedding_vector for _, embedding_vector in results],
+                documents=[item_data['content'] for item_data, _ in results],
+                metadatas=[self._create_document_metadata(item_data['document'], item_data['type'])
+                           for item_data, _ in results]
+            )
+            return
+
+        now = datetime.now(timezone.utc)
+        doc_ids_by_type: Dict[str, List[int]] = {}
+        for item_data, _ in results:
+            doc_ids_by_type.setdefault(item_data['type'], []).append(item_data['id'])
+
+        existing_records = {}
+        for doc_type, doc_ids in doc_ids_by_type.items():
+            records = Embedding.query.filter(
+                Embedding.document_type == doc_type,
+                Embedding.document_id.in_(doc_ids),
+                Embedding.model == self.embedding_model
+            ).all()
+            for record in records:
+                existing_records[(record.document_type, record.document_id)] = record
+
+        try:
+            for item_data, embedding_vector in results:
+                embedding_bytes = np.array(embedding_vector).astype(np.float32).tobytes()
+                existing_embedding = existing_records.get((item_data['type'], item_data['id']))
+                if existing_embedding:
+                    existing_embedding.embedding = embedding_bytes
+                    existing_embedding.created_at = now
+                else:
+                    db.session.add(Embedding(
+                        document_id=item_data['id'],
+                        document_type=item_data['type'],
+                        embedding=embedding_bytes,
+                        model=self.embedding_model,
+                        created_at=now
+                    ))
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+        if self.sql_index is not None:
+            self.sql_index.upsert_many([
+                (item_data['type'], item_data['id'], embedding_vector)
+                for item_data, embedding_vector in results
+            ])
 
     def _create_document_metadata(self, document: Union[KnowledgeBaseItem, SubcategorySynthesis], doc_type: str) -> Dict[str, Any]:
         """Create comprehensive metadata for vector store."""
@@ -526,39 +703,45 @@ class EmbeddingManager:
             return []
 
     async def _search_sql_embeddings(self, query: str, top_k: int) -> List[Dict[str, Any]]:
-        """Search using SQL embeddings (legacy method)."""
+        """Search SQL-stored embeddings through the in-memory similarity index."""
         query_embedding = await self._generate_embedding_with_retry(query)
         
-        all_embeddings = Embedding.query.filter_by(model=self.embedding_model).all()
-        
-        if not all_embeddings:
+        self.sql_index.ensure_current()
+        hits = self.sql_index.search(query_embedding, top_k)
+        if not hits:
             return []
-
-        # Convert stored byte embeddings back to numpy arrays
-        doc_embeddings = np.array([np.frombuffer(e.embedding, dtype=np.float32) for e in all_embeddings])
-        query_embedding_np = np.array(query_embedding).astype(np.float32)
-
-        # Calculate cosine similarity
-        similarities = self._cosine_similarity(query_embedding_np, doc_embeddings)
         
-        # Get top k results
-        top_k_indices = np.argsort(similarities)[-top_k:][::-1]
+        documents = self._get_documents_by_keys([(doc_type, doc_id) for doc_type, doc_id, _ in hits])
         
         results = []
-        for i in top_k_indices:
-            embedding_record = all_embeddings[i]
-            document = self._get_document_by_embedding(embedding_record)
+        for doc_type, doc_id, score in hits:
+            document = documents.get((doc_type, doc_id))
             if document:
                 results.append({
                     "title": document.title if hasattr(document, 'title') else document.synthesis_title,
-                    "score": float(similarities[i]),
+                    "score": score,
                     "content": document.content if hasattr(document, 'content') else document.synthesis_content,
-                    "type": embedding_record.document_type,
-                    "id": embedding_record.document_id
+                    "type": doc_type,
+                    "id": doc_id
                 })
         
         return results
 
+    def _get_documents_by_keys(self, keys: List[Tuple[str, int]]) -> Dict[Tuple[str, int], Any]:
+        """Load several documents with one IN query per document type."""
+        models = {'kb_item': KnowledgeBaseItem, 'synthesis': SubcategorySynthesis}
+        ids_by_type: Dict[str, List[int]] = {}
+        for doc_type, doc_id in keys:
+            if doc_type in models:
+                ids_by_type.setdefault(doc_type, []).append(doc_id)
+        
+        documents = {}
+        for doc_type, doc_ids in ids_by_type.items():
+            model = models[doc_type]
+            for document in model.query.filter(model.id.in_(doc_ids)).all():
+                documents[(doc_type, document.id)] = document
+        return documents
+
     def _get_document_by_id(self, doc_id: int, doc_type: str) -> Optional[Union[KnowledgeBaseItem, SubcategorySynthesis]]:
         """Get document by ID and type."""
         if doc_type == 'kb_item':
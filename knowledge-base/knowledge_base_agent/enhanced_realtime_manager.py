@@ -431,6 +431,156 @@ class ConnectionHealthMonitor:
         }
 
 
+class ProgressEventCompactor:
+    """
+    Coalesces progress and phase updates before they are emitted.
+    
+    Within a window only the latest state per (task_id, phase_id) and event
+    type is kept; emissions are stamped with that ``type`` and carry only the
+    fields that changed since the last state sent for that key
+    (``delta: True``), with a full state every
+    ``full_state_every`` emissions and after a client connects. Terminal
+    states are never coalesced: they discard the pending state they supersede
+    and pass straight through, so the final state is always delivered.
+    
+    The window grows with the incoming event rate and with the number of
+    connected clients, since every emission fans out to each of them.
+    """
+    
+    COALESCIBLE_TYPES = {'progress_update', 'phase_update'}
+    TERMINAL_STATUSES = {'completed', 'error', 'failed', 'skipped', 'interrupted'}
+    IDENTITY_FIELDS = ('type', 'task_id', 'phase_id', 'operation', 'status')
+    TARGET_EVENTS_PER_SECOND = 20.0
+    CLIENTS_PER_WINDOW_STEP = 25
+    
+    def __init__(self, min_window_seconds: float = 0.1, max_window_seconds: float = 1.0,
+                 full_state_every: int = 20):
+        self.min_window_seconds = min_window_seconds
+        self.max_window_seconds = max(min_window_seconds, max_window_seconds)
+        self.full_state_every = max(1, full_state_every)
+        self._lock = threading.Lock()
+        self._pending: Dict[tuple, Dict[str, Any]] = {}
+        self._last_sent: Dict[tuple, Dict[str, Any]] = {}
+        self._sends_since_full: Dict[tuple, int] = defaultdict(int)
+        self._window_started = time.monotonic()
+        self._event_rate = 0.0
+        self._last_offer = time.monotonic()
+        self.client_count = 0
+        self.stats = {'events_coalesced': 0, 'events_emitted': 0, 'deltas_emitted': 0}
+    
+    @staticmethod
+    def _key(event: Dict[str, Any]) -> tuple:
+        data = event['data']
+        task_id = event.get('task_id') or data.get('task_id')
+        phase_id = data.get('phase_id') or data.get('operation')
+        return (task_id, phase_id, event['type'])
+    
+    def is_terminal(self, event: Dict[str, Any]) -> bool:
+        return str(event['data'].get('status', '')).lower() in self.TERMINAL_STATUSES
+    
+    def offer(self, event: Dict[str, Any]) -> bool:
+        """
+        Offer an event for coalescing.
+        
+        Returns:
+            bool: True if the compactor took the event, False if it must be emitted as usual
+        """
+        if event['type'] not in self.COALESCIBLE_TYPES:
+            return False
+        
+        key = self._key(event)
+        with self._lock:
+            now = time.monotonic()
+            # Exponentially weighted events/second
+            elapsed = max(now - self._last_offer, 1e-3)
+            self._event_rate = 0.9 * self._event_rate + 0.1 * (1.0 / elapsed)
+            self._last_offer = now
+            
+            if self.is_terminal(event):
+                # The terminal state supersedes anything pending for this task and phase
+                for pending_key in [k for k in self._pending if k[:2] == key[:2]]:
+                    del self._pending[pending_key]
+                    self.stats['events_coalesced'] += 1
+                for sent_key in [k for k in self._last_sent if k[:2] == key[:2]]:
+                    del self._last_sent[sent_key]
+                    self._sends_since_full.pop(sent_key, None)
+                return False
+            
+            if key in self._pending:
+                self.stats['events_coalesced'] += 1
+            elif not self._pending:
+                self._window_started = now
+            self._pending[key] = event
+            return True
+    
+    def current_window(self) -> float:
+        """Coalescing window in seconds for the current event rate and client count."""
+        window = self.min_window_seconds * max(1.0, self._event_rate / self.TARGET_EVENTS_PER_SECOND)
+        window *= 1 + self.client_count / self.CLIENTS_PER_WINDOW_STEP
+        return min(window, self.max_window_seconds)
+    
+    def seconds_until_due(self) -> Optional[float]:
+        """Seconds until pending events should be emitted, or None if nothing is pending."""
+        with self._lock:
+            if not self._pending:
+                return None
+            return max(0.0, self._window_started + self.current_window() - time.monotonic())
+    
+    def drain(self, force: bool = False) -> List[Dict[str, Any]]:
+        """Return the coalesced events whose window has closed, as deltas where possible."""
+        with self._lock:
+            if not self._pending:
+                return []
+            if not force and time.monotonic() < self._window_started + self.current_window():
+                return []
+            pending, self._pending = self._pending, {}
+            return [self._as_delta(key, event) for key, event in pending.items()]
+    
+    def _as_delta(self, key: tuple, event: Dict[str, Any]) -> Dict[str, Any]:
+        # Clients merge deltas by task, phase and originating type: progress and phase
+        # updates share the task_progress event, so full states carry all three
+        data = {**event['data'], 'type': key[2]}
+        if key[0] is not None and 'task_id' not in data:
+            data['task_id'] = key[0]
+        event = {**event, 'data': data}
+        previous = self._last_sent.get(key)
+        self._last_sent[key] = data
+        self.stats['events_emitted'] += 1
+        
+        if previous is None or self._sends_since_full[key] + 1 >= self.full_state_every:
+            self._sends_since_full[key] = 0
+            return event
+        
+        self._sends_since_full[key] += 1
+        delta = {name: value for name, value in data.items() if previous.get(name) != value}
+        for name in self.IDENTITY_FIELDS:
+            if name in data:
+                delta[name] = data[name]
+        delta['delta'] = True
+        self.stats['deltas_emitted'] += 1
+        return {**event, 'data': delta}
+    
+    def client_connected(self):
+        """Track a new client; everyone gets full states next so it starts from a complete picture."""
+        with self._lock:
+            self.client_count += 1
+            self._last_sent.clear()
+            self._sends_since_full.clear()
+    
+    def client_disconnected(self):
+        with self._lock:
+            self.client_count = max(0, self.client_count - 1)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **self.stats,
+            'pending': len(self._pending),
+            'window_seconds': round(self.current_window(), 3),
+            'event_rate': round(self._event_rate, 1),
+            'clients': self.client_count
+        }
+
+
 class EnhancedRealtimeManager:
     """
     Enhanced real-time update manager with comprehensive features.
@@ -439,6 +589,7 @@ class EnhancedRealtimeManager:
     - Event validation and sanitization
     - Event routing to multiple SocketIO channels
     - Event batching for efficiency
+    - Coalescing of superseded progress updates into deltas
     - Rate limiting to prevent overwhelming
     - Connection health monitoring
     - Automatic reconnection
@@ -499,6 +650,15 @@ class EnhancedRealtimeManager:
         self.event_buffer = deque(maxlen=1000)
         self.buffer_enabled = False
         
+        # Progress coalescing
+        self.compactor = None
+        if getattr(self.config, 'realtime_coalesce_enabled', True) is not False:
+            self.compactor = ProgressEventCompactor(
+                min_window_seconds=self._config_number('realtime_coalesce_min_window_ms', 100) / 1000,
+                max_window_seconds=self._config_number('realtime_coalesce_max_window_ms', 1000) / 1000,
+                full_state_every=int(self._config_number('realtime_full_state_every', 20))
+            )
+        
         # Statistics
         self.stats = {
             'events_processed': 0,
@@ -509,6 +669,20 @@ class EnhancedRealtimeManager:
             'reconnections': 0
         }
     
+    def _config_number(self, name: str, default: float) -> float:
+        value = getattr(self.config, name, default)
+        return value if isinstance(value, (int, float)) and not isinstance(value, bool) else default
+    
+    def client_connected(self):
+        """Record a connected Socket.IO client (adapts the coalescing window)."""
+        if self.compactor:
+            self.compactor.client_connected()
+    
+    def client_disconnected(self):
+        """Record a disconnected Socket.IO client."""
+        if self.compactor:
+            self.compactor.client_disconnected()
+    
     def start_listener(self):
         """Start the Redis pub/sub listener and batch processor."""
         if self.pubsub_thread_progress and self.pubsub_thread_progress.is_alive():
@@ -683,12 +857,6 @@ class EnhancedRealtimeManager:
         
         self.stats['events_validated'] += 1
         
-        # Check rate limiting
-        if not self.rate_limiter.is_allowed():
-            logging.debug(f"Event rate limited: {event_type}")
-            self.stats['events_rate_limited'] += 1
-            return
-        
         # Route event to appropriate SocketIO channels
         socketio_events = self.router.get_socketio_events(channel, event_type)
         
@@ -699,12 +867,27 @@ class EnhancedRealtimeManager:
         # Create event for emission
         emission_event = {
             'type': event_type,
+            'task_id': data.get('task_id'),
             'data': sanitized_data,
             'timestamp': datetime.now().isoformat(),
             'channel': channel,
             'socketio_events': socketio_events
         }
         
+        # Superseded progress is coalesced rather than rate limited; terminal states always pass
+        if self.compactor and not self.buffer_enabled:
+            if self.compactor.offer(emission_event):
+                return
+            if self.compactor.is_terminal(emission_event):
+                self._add_to_batch(emission_event)
+                return
+        
+        # Check rate limiting
+        if not self.rate_limiter.is_allowed():
+            logging.debug(f"Event rate limited: {event_type}")
+            self.stats['events_rate_limited'] += 1
+            return
+        
         # Add to batch or buffer
         if self.buffer_enabled:
             self.event_buffer.append(emission_event)
@@ -766,15 +949,24 @@ class EnhancedRealtimeManager:
         """Process event batches in a separate thread."""
         while not self._stop_event.is_set():
             try:
+                # Wake up in time for the coalescing window as well as for batches
+                timeout = 0.5
+                if self.compactor:
+                    due_in = self.compactor.seconds_until_due()
+                    if due_in is not None:
+                        timeout = min(timeout, max(due_in, 0.01))
+                
                 # Check for ready batches with timeout
                 try:
-                    event_type, events = self.batch_queue.get(timeout=0.5)
+                    event_type, events = self.batch_queue.get(timeout=timeout)
                     self._emit_batch(events)
                     self.batch_queue.task_done()
                 except queue.Empty:
                     # Check for aged batches that need to be sent
                     self._check_aged_batches()
-                    continue
+                
+                if self.compactor:
+                    self._emit_batch(self.compactor.drain())
                 
             except Exception as e:
                 logging.error(f"Error processing event batch: {e}", exc_info=True)
@@ -881,7 +1073,8 @@ class EnhancedRealtimeManager:
             'buffer_size': len(self.event_buffer),
             'buffer_enabled': self.buffer_enabled,
             'active_batches': len(self.event_batches),
-            'batch_queue_size': self.batch_queue.qsize()
+            'batch_queue_size': self.batch_queue.qsize(),
+            'coalescing': self.compactor.get_stats() if self.compactor else None
         }
     
     def reset_stats(self):
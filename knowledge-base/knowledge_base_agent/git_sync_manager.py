@@ -11,6 +11,7 @@ Key Features:
 - Generates comprehensive README.md with navigation and statistics
 - Handles media file synchronization
 - Provides clean Git repository management
+- Incremental exports driven by a manifest, staging only changed paths
 """
 
 import asyncio
@@ -19,7 +20,7 @@ import shutil
 import subprocess
 import os
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, List, Optional, Set, Tuple, Any
 from datetime import datetime
 import json
 import hashlib
@@ -31,6 +32,19 @@ from .readme_generator import generate_root_readme, write_readme_file
 from .category_manager import CategoryManager
 from .http_client import HTTPClient
 
+# Local export state (document and media paths with their content hashes); never committed
+MANIFEST_FILENAME = ".kb_export_manifest.json"
+MANIFEST_VERSION = 1
+
+# Rows loaded at once when re-rendering changed documents
+EXPORT_QUERY_CHUNK = 500
+
+# Paths passed to one git ls-files call, well below the OS argument length limit
+LS_FILES_PATH_CHUNK = 200
+
+VIDEO_SUFFIXES = ['.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm']
+IMAGE_SUFFIXES = ['.jpg', '.jpeg', '.png', '.gif', '.webp']
+
 
 class GitSyncManager:
     """
@@ -53,6 +67,8 @@ class GitSyncManager:
         self.kb_items_dir = self.repo_dir / "knowledge-base"
         self.synthesis_dir = self.repo_dir / "syntheses"
         self.media_dir = self.repo_dir / "media"
+        self.manifest_path = self.repo_dir / MANIFEST_FILENAME
+        self.incremental = getattr(config, 'git_export_incremental', True)
         
         # Git configuration
         self.git_executable = None
@@ -84,7 +100,7 @@ class GitSyncManager:
         else:
             getattr(self.logger, level.lower())(message)
 
-    async def export_database_to_git(self, commit_message: str = "Update knowledge base content") -> None:
+    async def export_database_to_git(self, commit_message: str = "Update knowledge base content", incremental: Optional[bool] = None) -> None:
         """
         Main entry point: Export all database content to Git repository.
         
@@ -95,7 +111,15 @@ class GitSyncManager:
         4. Copy media files
         5. Generate comprehensive README
         6. Commit and push to Git
+        
+        In incremental mode (the default, see GIT_EXPORT_INCREMENTAL) only
+        documents and media that changed since the last export are written,
+        and only their paths are staged.
         """
+        if incremental if incremental is not None else self.incremental:
+            await self._export_incremental(commit_message)
+            return
+        
         try:
             self._log("Starting database-to-Git export process")
             
@@ -123,6 +147,330 @@ class GitSyncManager:
             self._log(f"❌ Database-to-Git export failed: {e}", "ERROR")
             raise GitSyncError(f"Export failed: {e}") from e
 
+    async def _export_incremental(self, commit_message: str) -> None:
+        """Export only what changed since the last export, as recorded in the manifest."""
+        try:
+            self._log("Starting incremental database-to-Git export")
+            await self._prepare_repository_structure()
+            
+            manifest = self._load_manifest()
+            full_rebuild = manifest is None
+            if full_rebuild:
+                self._log("No export manifest found, exporting everything once")
+                manifest = {'version': MANIFEST_VERSION, 'documents': {}, 'media': {}, 'pending_paths': []}
+            
+            # Paths written by an export whose commit did not complete
+            changed_paths: Set[str] = set(manifest.get('pending_paths', []))
+            
+            kb_stats = await self._sync_knowledge_base_items(manifest, changed_paths)
+            synthesis_stats = await self._sync_synthesis_documents(manifest, changed_paths)
+            media_stats = await self._sync_media_files(manifest, changed_paths)
+            
+            if not changed_paths and not full_rebuild:
+                self._log("No content changes since the last export")
+                return
+            
+            await self._generate_comprehensive_readme(kb_stats, synthesis_stats, media_stats)
+            changed_paths.update({"README.md", ".gitignore"})
+            
+            manifest['pending_paths'] = sorted(changed_paths)
+            self._save_manifest(manifest)
+            
+            self._log(f"Incremental export changed {len(changed_paths)} paths")
+            await self._commit_and_push(commit_message, kb_stats, synthesis_stats, media_stats,
+                                        paths=None if full_rebuild else sorted(changed_paths))
+            
+            manifest['pending_paths'] = []
+            self._save_manifest(manifest)
+            self._log("✅ Incremental database-to-Git export completed successfully")
+            
+        except Exception as e:
+            self._log(f"❌ Incremental database-to-Git export failed: {e}", "ERROR")
+            raise GitSyncError(f"Export failed: {e}") from e
+
+    def _load_manifest(self) -> Optional[Dict[str, Any]]:
+        """Load the export manifest, or None if there is no usable one."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+            self._log("Export manifest has an old format, rebuilding it", "WARNING")
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            self._log(f"Export manifest is unreadable, rebuilding it: {e}", "WARNING")
+        return None
+
+    def _save_manifest(self, manifest: Dict[str, Any]) -> None:
+        """Write the manifest atomically so a crash never leaves it half written."""
+        tmp_path = self.manifest_path.with_suffix('.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _sync_documents(self, manifest: Dict[str, Any], changed_paths: Set[str], prefix: str,
+                        current: Dict[str, Tuple[str, str]], load, render) -> Tuple[int, int]:
+        """
+        Bring one document type in the repository in line with the database.
+        
+        Args:
+            manifest: Export manifest, updated in place
+            changed_paths: Repository-relative paths to stage, updated in place
+            prefix: Manifest key prefix ('kb' or 'synthesis')
+            current: Manifest key -> (relative path, last_updated) for every row in the database
+            load: Callable taking the changed keys and yielding (key, database row)
+            render: Callable taking a row and returning (markdown, media sources)
+        
+        Returns:
+            Tuple of (documents written, documents that failed)
+        """
+        documents = manifest['documents']
+        stale = [key for key, (path, last_updated) in current.items()
+                 if documents.get(key, {}).get('path') != path
+                 or documents.get(key, {}).get('last_updated') != last_updated]
+        
+        written = failed = 0
+        for key, row in load(stale):
+            path, last_updated = current[key]
+            try:
+                # Rendered per item so one bad row only fails its own document
+                markdown_content, media_sources = render(row)
+                content_hash = hashlib.sha256(markdown_content.encode('utf-8')).hexdigest()
+                entry = documents.get(key)
+                moved = entry is not None and entry['path'] != path
+                if moved:
+                    self._remove_export_path(manifest, key, entry['path'], changed_paths)
+                if moved or entry is None or entry['hash'] != content_hash:
+                    self._write_document(path, markdown_content, media_sources)
+                    changed_paths.add(path)
+                    written += 1
+                documents[key] = {'path': path, 'hash': content_hash, 'last_updated': last_updated}
+            except Exception as e:
+                self._log(f"Failed to export {key}: {e}", "ERROR")
+                failed += 1
+        
+        # Documents deleted from the database
+        for key in [key for key in documents if key.startswith(f"{prefix}:") and key not in current]:
+            self._remove_export_path(manifest, key, documents[key]['path'], changed_paths)
+            del documents[key]
+        
+        return written, failed
+
+    def _write_document(self, path: str, markdown_content: str, media_sources: List[Path]) -> None:
+        target = self.repo_dir / path
+        if path.endswith('.md'):
+            target.parent.mkdir(parents=True, exist_ok=True)
+            target.write_text(markdown_content, encoding='utf-8')
+            return
+        # KB items are a directory holding README.md and the item's media
+        target.mkdir(parents=True, exist_ok=True)
+        (target / "README.md").write_text(markdown_content, encoding='utf-8')
+        for source_path in media_sources:
+            if source_path.exists():
+                self._link_or_copy(source_path, target / source_path.name)
+
+    def _remove_export_path(self, manifest: Dict[str, Any], key: str, path: str, changed_paths: Set[str]) -> None:
+        """Delete an exported document unless another document was exported to the same path."""
+        if any(other != key and entry['path'] == path for other, entry in manifest['documents'].items()):
+            return
+        target = self.repo_dir / path
+        if target.is_dir():
+            shutil.rmtree(target, ignore_errors=True)
+        elif target.exists():
+            target.unlink()
+        changed_paths.add(path)
+
+    async def _sync_knowledge_base_items(self, manifest: Dict[str, Any], changed_paths: Set[str]) -> Dict[str, Any]:
+        """Write, move or delete only the KB items that changed since the last export."""
+        self._log("Checking knowledge base items for changes")
+        
+        # Projection only; full rows are loaded just for items that need rendering
+        rows = db.session.query(
+            KnowledgeBaseItem.id, KnowledgeBaseItem.main_category, KnowledgeBaseItem.sub_category,
+            KnowledgeBaseItem.item_name, KnowledgeBaseItem.title, KnowledgeBaseItem.last_updated
+        ).all()
+        
+        stats = {
+            'total_items': len(rows),
+            'categories': set(),
+            'subcategories': set(),
+            'exported_files': 0,
+            'failed_exports': 0
+        }
+        current = {}
+        for row in rows:
+            main_cat = self._sanitize_filename(row.main_category)
+            sub_cat = self._sanitize_filename(row.sub_category)
+            item_name = self._sanitize_filename(row.item_name or row.title)
+            stats['categories'].add(main_cat)
+            stats['subcategories'].add(f"{main_cat}/{sub_cat}")
+            current[f"kb:{row.id}"] = (f"knowledge-base/{main_cat}/{sub_cat}/{item_name}",
+                                       row.last_updated.isoformat() if row.last_updated else None)
+        
+        def load(keys):
+            ids = [int(key.split(':', 1)[1]) for key in keys]
+            for start in range(0, len(ids), EXPORT_QUERY_CHUNK):
+                for kb_item in KnowledgeBaseItem.query.filter(KnowledgeBaseItem.id.in_(ids[start:start + EXPORT_QUERY_CHUNK])):
+                    yield f"kb:{kb_item.id}", kb_item
+        
+        def render(kb_item):
+            return self._generate_kb_item_markdown(kb_item), self._kb_item_media_sources(kb_item)
+        
+        stats['exported_files'], stats['failed_exports'] = self._sync_documents(manifest, changed_paths, 'kb', current, load, render)
+        self._log(f"Exported {stats['exported_files']} changed KB items of {stats['total_items']} ({stats['failed_exports']} failed)")
+        return stats
+
+    async def _sync_synthesis_documents(self, manifest: Dict[str, Any], changed_paths: Set[str]) -> Dict[str, Any]:
+        """Write, move or delete only the synthesis documents that changed since the last export."""
+        self._log("Checking synthesis documents for changes")
+        
+        rows = db.session.query(
+            SubcategorySynthesis.id, SubcategorySynthesis.main_category,
+            SubcategorySynthesis.sub_category, SubcategorySynthesis.last_updated
+        ).all()
+        
+        stats = {
+            'total_syntheses': len(rows),
+            'categories': set(),
+            'exported_files': 0,
+            'failed_exports': 0
+        }
+        current = {}
+        for row in rows:
+            main_cat = self._sanitize_filename(row.main_category)
+            stats['categories'].add(main_cat)
+            filename = f"synthesis_{self._sanitize_filename(row.sub_category)}.md" if row.sub_category else "synthesis_overview.md"
+            current[f"synthesis:{row.id}"] = (f"syntheses/{main_cat}/{filename}",
+                                              row.last_updated.isoformat() if row.last_updated else None)
+        
+        def load(keys):
+            ids = [int(key.split(':', 1)[1]) for key in keys]
+            for start in range(0, len(ids), EXPORT_QUERY_CHUNK):
+                for synthesis in SubcategorySynthesis.query.filter(SubcategorySynthesis.id.in_(ids[start:start + EXPORT_QUERY_CHUNK])):
+                    yield f"synthesis:{synthesis.id}", synthesis
+        
+        def render(synthesis):
+            return self._generate_synthesis_markdown(synthesis), []
+        
+        stats['exported_files'], stats['failed_exports'] = self._sync_documents(manifest, changed_paths, 'synthesis', current, load, render)
+        self._log(f"Exported {stats['exported_files']} changed synthesis documents of {stats['total_syntheses']} ({stats['failed_exports']} failed)")
+        return stats
+
+    async def _sync_media_files(self, manifest: Dict[str, Any], changed_paths: Set[str]) -> Dict[str, Any]:
+        """Link new or changed media into the media directory and remove media no longer referenced."""
+        self._log("Checking media files for changes")
+        
+        stats = {
+            'total_files': 0,
+            'copied_files': 0,
+            'linked_files': 0,
+            'failed_copies': 0,
+            'total_size_mb': 0
+        }
+        media = manifest['media']
+        seen: Set[str] = set()
+        
+        rows = db.session.query(UnifiedTweet.tweet_id, UnifiedTweet.media_files).filter(UnifiedTweet.media_files.isnot(None)).all()
+        for tweet_id, media_files in rows:
+            try:
+                media_files = media_files if isinstance(media_files, list) else json.loads(media_files)
+            except (json.JSONDecodeError, TypeError) as e:
+                self._log(f"Failed to process media for tweet {tweet_id}: {e}", "WARNING")
+                continue
+            for media_path in media_files or []:
+                source_path = Path(media_path)
+                key = str(source_path)
+                if key in seen or source_path.suffix.lower() in VIDEO_SUFFIXES:
+                    continue
+                try:
+                    source_stat = source_path.stat()
+                except OSError:
+                    continue
+                seen.add(key)
+                stats['total_files'] += 1
+                entry = media.get(key)
+                if (entry and entry['size'] == source_stat.st_size and entry['mtime_ns'] == source_stat.st_mtime_ns
+                        and (self.repo_dir / entry['path']).exists()):
+                    stats['copied_files'] += 1
+                    stats['total_size_mb'] += source_stat.st_size / (1024 * 1024)
+                    continue
+                try:
+                    target_path = self.repo_dir / entry['path'] if entry else self._unique_media_target(source_path)
+                    target_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._link_or_copy(source_path, target_path)
+                    relative_path = target_path.relative_to(self.repo_dir).as_posix()
+                    media[key] = {'path': relative_path, 'size': source_stat.st_size, 'mtime_ns': source_stat.st_mtime_ns}
+                    changed_paths.add(relative_path)
+                    stats['copied_files'] += 1
+                    stats['linked_files'] += 1
+                    stats['total_size_mb'] += source_stat.st_size / (1024 * 1024)
+                except OSError as e:
+                    stats['failed_copies'] += 1
+                    self._log(f"Failed to link media file {media_path}: {e}", "WARNING")
+        
+        for key in [key for key in media if key not in seen]:
+            target = self.repo_dir / media.pop(key)['path']
+            if target.exists():
+                target.unlink()
+            changed_paths.add(target.relative_to(self.repo_dir).as_posix())
+        
+        self._log(f"Linked {stats['linked_files']} new or changed media files ({stats['copied_files']} total, {stats['total_size_mb']:.1f} MB)")
+        return stats
+
+    def _unique_media_target(self, source_path: Path) -> Path:
+        """Pick a free path in the media directory for a source file."""
+        if source_path.suffix.lower() in IMAGE_SUFFIXES:
+            target_dir = self.media_dir / "images"
+        else:
+            target_dir = self.media_dir / "other"
+        target_path = target_dir / source_path.name
+        counter = 1
+        while target_path.exists():
+            target_path = target_dir / f"{source_path.stem}_{counter}{source_path.suffix}"
+            counter += 1
+        return target_path
+
+    def _link_or_copy(self, source_path: Path, target_path: Path) -> str:
+        """
+        Place a media file in the repository without copying its bytes when possible.
+        
+        Tries a hardlink, then a reflink (copy-on-write clone on filesystems that
+        support it), then a regular copy.
+        
+        Returns:
+            'hardlink', 'reflink' or 'copy'
+        """
+        if target_path.exists() or target_path.is_symlink():
+            if target_path.samefile(source_path):
+                return 'hardlink'
+            target_path.unlink()
+        try:
+            os.link(source_path, target_path)
+            return 'hardlink'
+        except OSError:
+            pass
+        cp_executable = shutil.which("cp")
+        if cp_executable:
+            result = subprocess.run(
+                [cp_executable, "--reflink=always", "--preserve=timestamps", str(source_path), str(target_path)],
+                capture_output=True
+            )
+            if result.returncode == 0:
+                return 'reflink'
+        shutil.copy2(source_path, target_path)
+        return 'copy'
+
+    def _kb_item_media_sources(self, kb_item: KnowledgeBaseItem) -> List[Path]:
+        if not kb_item.kb_media_paths:
+            return []
+        try:
+            media_paths = json.loads(kb_item.kb_media_paths) if isinstance(kb_item.kb_media_paths, str) else kb_item.kb_media_paths
+            return [Path(media_path) for media_path in media_paths or []]
+        except (json.JSONDecodeError, TypeError) as e:
+            self._log(f"Failed to read media for KB item {kb_item.id}: {e}", "WARNING")
+            return []
+
     async def _prepare_repository_structure(self) -> None:
         """Prepare clean repository directory structure."""
         self._log("Preparing repository directory structure")
@@ -186,6 +534,8 @@ class GitSyncManager:
             "Thumbs.db",
             "# Temporary files",
             "*.tmp", "*.temp",
+            "# Local export state",
+            MANIFEST_FILENAME,
             "# Images are included for GitHub sync (PNG, JPG, GIF, WebP)",
             ""
         ]
@@ -309,8 +659,8 @@ class GitSyncManager:
                 source_path = Path(media_path)
                 if source_path.exists():
                     target_path = target_dir / source_path.name
-                    shutil.copy2(source_path, target_path)
-                    self._log(f"Copied media file: {source_path.name}")
+                    method = self._link_or_copy(source_path, target_path)
+                    self._log(f"Placed media file ({method}): {source_path.name}")
         except (json.JSONDecodeError, TypeError, OSError) as e:
             self._log(f"Failed to copy media for KB item {kb_item.id}: {e}", "WARNING")
 
@@ -456,8 +806,8 @@ class GitSyncManager:
                 target_path = target_dir / f"{stem}_{counter}{suffix}"
                 counter += 1
             
-            # Copy file
-            shutil.copy2(source_path, target_path)
+            # Link the file, copying only across filesystems
+            self._link_or_copy(source_path, target_path)
             
             # Update stats
             file_size_mb = target_path.stat().st_size / (1024 * 1024)
@@ -728,32 +1078,48 @@ This repository contains {kb_stats['total_items']} knowledge base items and {syn
         with open(readme_path, 'w', encoding='utf-8') as f:
             f.write(content)
 
-    async def _commit_and_push(self, commit_message: str, kb_stats: Dict[str, Any], synthesis_stats: Dict[str, Any], media_stats: Dict[str, Any]) -> None:
-        """Commit changes and push to remote repository."""
+    async def _commit_and_push(self, commit_message: str, kb_stats: Dict[str, Any], synthesis_stats: Dict[str, Any], media_stats: Dict[str, Any], paths: Optional[List[str]] = None) -> None:
+        """
+        Commit changes and push to remote repository.
+        
+        When paths is given only those repository-relative paths (including
+        deletions) are staged, so git never has to scan the whole tree.
+        """
         self._log("Committing and pushing changes to Git repository")
         
         try:
             # Configure remote if needed
             await self._configure_remote()
             
-            # Add all changes
-            subprocess.run(
-                [self.git_executable, "add", "."],
-                cwd=str(self.repo_dir),
-                check=True,
-                capture_output=True
-            )
+            if paths is None:
+                # Add all changes
+                subprocess.run(
+                    [self.git_executable, "add", "."],
+                    cwd=str(self.repo_dir),
+                    check=True,
+                    capture_output=True
+                )
+            else:
+                # Stage exactly the changed paths; -A also records deletions
+                paths = self._stageable_paths(paths)
+                if paths:
+                    subprocess.run(
+                        [self.git_executable, "add", "-A", "--pathspec-from-file=-", "--pathspec-file-nul"],
+                        cwd=str(self.repo_dir),
+                        input="\0".join(paths).encode('utf-8'),
+                        check=True,
+                        capture_output=True
+                    )
             
             # Check if there are changes to commit
-            status_result = subprocess.run(
-                [self.git_executable, "status", "--porcelain"],
+            diff_result = subprocess.run(
+                [self.git_executable, "diff", "--cached", "--quiet"],
                 cwd=str(self.repo_dir),
                 capture_output=True,
-                text=True,
                 check=False
             )
             
-            if not status_result.stdout.strip():
+            if diff_result.returncode == 0:
                 self._log("No changes to commit")
                 return
             
@@ -785,6 +1151,26 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"""
             self._log(f"Git operation failed: {e}", "ERROR")
             raise GitSyncError(f"Git operation failed: {e}") from e
 
+    def _stageable_paths(self, paths: List[str]) -> List[str]:
+        """Drop paths that exist neither on disk nor in the index, which git add rejects."""
+        missing = [path for path in paths if not (self.repo_dir / path).exists()]
+        if not missing:
+            return paths
+        # ls-files has no --pathspec-from-file, so pass the paths as arguments in chunks
+        tracked: Set[str] = set()
+        for start in range(0, len(missing), LS_FILES_PATH_CHUNK):
+            tracked_result = subprocess.run(
+                [self.git_executable, "ls-files", "-z", "--", *missing[start:start + LS_FILES_PATH_CHUNK]],
+                cwd=str(self.repo_dir),
+                capture_output=True,
+                check=True
+            )
+            tracked.update(filter(None, tracked_result.stdout.decode('utf-8').split("\0")))
+        # Deleted directories are tracked through the files they contained
+        tracked_missing = {path for path in missing
+                           if path in tracked or any(name.startswith(f"{path}/") for name in tracked)}
+        return [path for path in paths if path not in missing or path in tracked_missing]
+
     async def _configure_remote(self) -> None:
         """Configure Git remote origin."""
         if not self.config.github_repo_url or not self.config.github_token:
@@ -1,6 +1,6 @@
 import logging
 import httpx
-from typing import Optional, Any, Dict, List
+from typing import Optional, Any, Dict, List, AsyncIterator, Tuple
 import asyncio
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 from knowledge_base_agent.config import Config
@@ -14,6 +14,18 @@ import os
 
 # Import backend infrastructure
 from .inference_backends import BackendFactory, InferenceBackend, BackendError
+from .http_session_pool import SessionPoolManager
+from .llm_response_cache import LLMResponseCache, make_cache_key
+from .prompt_prefix import PromptTokenStats, current_prompt_phase
+
+# Model types each pipeline phase sends requests to; see HTTPClient.preload_models
+PHASE_MODEL_TYPES = {
+    'media': ('vision',),
+    'categorization': ('categorization', 'text'),
+    'kb_item': ('text',),
+    'synthesis': ('synthesis',),
+    'chat': ('chat',),
+}
 
 
 class HTTPClient:
@@ -40,6 +52,18 @@ class HTTPClient:
         # Create semaphore for controlling concurrency
         self._semaphore = asyncio.Semaphore(self.max_concurrent)
         
+        # Keep-alive connection pool shared with the inference backends
+        self.session_pool = SessionPoolManager.from_config(config)
+        
+        # Content-addressed cache for repeatable LLM calls (opt-in per call via cache_phase)
+        self.response_cache = LLMResponseCache(config)
+        
+        # Prompt tokens reused from the server-side KV cache, recorded by the backends
+        self.prompt_stats = PromptTokenStats()
+        
+        # Models kept loaded with ollama_phase_keep_alive for the running phase
+        self._pinned_models: set = set()
+        
         # Initialize the inference backend
         self.backend: Optional[InferenceBackend] = None
         self._backend_initialized = False
@@ -67,12 +91,10 @@ class HTTPClient:
             await self._initialize_backend()
         
     async def initialize(self):
-        """Initialize the HTTP client session."""
+        """Initialize the HTTP client by warming the pooled session for the current loop."""
         if not self.initialized:
             try:
-                self.session = aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                )
+                await self.session_pool.get_session()
                 self.initialized = True
                 logging.info("HTTPClient session initialized")
             except Exception as e:
@@ -81,24 +103,67 @@ class HTTPClient:
                 self.initialized = False
         
     async def close(self):
-        """Close the HTTP client session."""
+        """Close the HTTP client session and the pooled connections for the current loop."""
+        await self.session_pool.close()
         if self.session and not self.session.closed:
             await self.session.close()
-            self.initialized = False
-            logging.info("HTTPClient session closed")
+        self.initialized = False
+        logging.info("HTTPClient session closed")
     
     async def _get_session(self):
-        """Get a working session, creating a new one if needed for event loop compatibility."""
-        # Always create a new session for each request to avoid event loop issues
+        """
+        Get the pooled session for the running event loop.
+        
+        Sessions are kept per event loop so that gevent/asyncio loop changes
+        never reuse a session bound to a different (or closed) loop. Callers
+        must hand the session back with _release_session() instead of closing it.
+        """
         try:
-            session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
-            )
-            logging.debug("Created new aiohttp session for current request")
-            return session
+            return await self.session_pool.get_session()
         except Exception as e:
-            logging.error(f"Failed to create new session: {e}")
+            logging.error(f"Failed to get pooled session: {e}")
             raise AIError(f"Failed to create HTTP session: {e}")
+    
+    async def _release_session(self, session):
+        """Return a session obtained from _get_session() to the pool."""
+        await self.session_pool.release_session(session)
+    
+    def get_response_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get LLM response cache statistics for this client.
+        
+        Returns:
+            Dict containing hit, miss and store counts, hit rate and a per-phase breakdown
+        """
+        return self.response_cache.get_stats()
+    
+    def get_prompt_cache_stats(self) -> Dict[str, Any]:
+        """
+        Get prompt prefix reuse statistics for this client.
+        
+        Returns:
+            Dict containing prompt, evaluated and cached token counts, cache hit rate and a per-phase breakdown
+        """
+        return self.prompt_stats.get_stats()
+    
+    def _pinned_options(self, model: str, options: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Keep a model pinned for the running phase loaded between items."""
+        if model in self._pinned_models and 'keep_alive' not in (options or {}):
+            options = {**(options or {}), 'keep_alive': self.config.ollama_phase_keep_alive}
+        return options
+    
+    def pinned_keep_alive(self, model: str) -> Dict[str, Any]:
+        """keep_alive field for raw Ollama payloads, so requests that bypass generate() keep a pinned model loaded."""
+        return self._pinned_options(model, None) or {}
+    
+    def get_pool_stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool statistics.
+        
+        Returns:
+            Dict containing session and connection hit/miss counts
+        """
+        return self.session_pool.get_stats()
             
     async def ensure_session(self):
         """Ensure a session exists."""
@@ -116,19 +181,37 @@ class HTTPClient:
         max_tokens: int = 50000,
         top_p: float = 0.9,
         timeout: Optional[int] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        cache_phase: Optional[str] = None
     ) -> str:
         """
         Unified text generation interface.
         
         This method routes to the appropriate backend based on configuration
         while providing a consistent interface for all consumers.
+        
+        When cache_phase is given (e.g. 'categorization') and caching is enabled
+        for that phase, an identical earlier request is answered from the LLM
+        response cache. The phase also attributes the request's prompt tokens in
+        get_prompt_cache_stats().
         """
+        cache_key = None
+        if self.response_cache.is_enabled_for(cache_phase):
+            cache_key = make_cache_key('generate', model, prompt, {
+                'temperature': temperature, 'max_tokens': max_tokens, 'top_p': top_p, **(options or {})
+            })
+            cached = self.response_cache.get(cache_key, cache_phase)
+            if cached is not None:
+                logging.debug(f"LLM response cache hit for {cache_phase} generate with model {model}")
+                return cached
+        
+        options = self._pinned_options(model, options)
         await self._ensure_backend()
+        phase_token = current_prompt_phase.set(cache_phase)
         
         try:
             logging.debug(f"Routing generate request to {self.backend.backend_name} backend")
-            return await self.backend.generate(
+            response = await self.backend.generate(
                 model=model,
                 prompt=prompt,
                 temperature=temperature,
@@ -137,6 +220,9 @@ class HTTPClient:
                 timeout=timeout,
                 options=options
             )
+            if cache_key:
+                self.response_cache.put(cache_key, cache_phase, model, response)
+            return response
         except BackendError as e:
             # Convert backend errors to AIError for consistency
             logging.error(f"Backend generate error: {e}")
@@ -144,6 +230,8 @@ class HTTPClient:
         except Exception as e:
             logging.error(f"Unexpected error in unified generate: {e}", exc_info=True)
             raise AIError(f"Failed to generate text: {str(e)}") from e
+        finally:
+            current_prompt_phase.reset(phase_token)
     
     async def chat(
         self,
@@ -152,19 +240,37 @@ class HTTPClient:
         temperature: float = 0.7,
         top_p: float = 0.9,
         timeout: Optional[int] = None,
-        options: Optional[Dict[str, Any]] = None
+        options: Optional[Dict[str, Any]] = None,
+        cache_phase: Optional[str] = None
     ) -> str:
         """
         Unified chat completion interface.
         
         This method routes to the appropriate backend based on configuration
         while providing a consistent interface for all consumers.
+        
+        When cache_phase is given and caching is enabled for that phase, an
+        identical earlier request is answered from the LLM response cache. The
+        phase also attributes the request's prompt tokens in
+        get_prompt_cache_stats().
         """
+        cache_key = None
+        if self.response_cache.is_enabled_for(cache_phase):
+            cache_key = make_cache_key('chat', model, messages, {
+                'temperature': temperature, 'top_p': top_p, **(options or {})
+            })
+            cached = self.response_cache.get(cache_key, cache_phase)
+            if cached is not None:
+                logging.debug(f"LLM response cache hit for {cache_phase} chat with model {model}")
+                return cached
+        
+        options = self._pinned_options(model, options)
         await self._ensure_backend()
+        phase_token = current_prompt_phase.set(cache_phase)
         
         try:
             logging.debug(f"Routing chat request to {self.backend.backend_name} backend")
-            return await self.backend.chat(
+            response = await self.backend.chat(
                 model=model,
                 messages=messages,
                 temperature=temperature,
@@ -172,6 +278,9 @@ class HTTPClient:
                 timeout=timeout,
                 options=options
             )
+            if cache_key:
+                self.response_cache.put(cache_key, cache_phase, model, response)
+            return response
         except BackendError as e:
             # Convert backend errors to AIError for consistency
             logging.error(f"Backend chat error: {e}")
@@ -179,6 +288,44 @@ class HTTPClient:
         except Exception as e:
             logging.error(f"Unexpected error in unified chat: {e}", exc_info=True)
             raise AIError(f"Failed to generate chat response: {str(e)}") from e
+        finally:
+            current_prompt_phase.reset(phase_token)
+    
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Unified streaming chat completion interface.
+        
+        Yields response fragments as the configured backend produces them.
+        Streamed responses bypass the LLM response cache, which is only used
+        for pipeline phases.
+        """
+        await self._ensure_backend()
+        
+        try:
+            logging.debug(f"Routing streaming chat request to {self.backend.backend_name} backend")
+            async for fragment in self.backend.chat_stream(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                top_p=top_p,
+                timeout=timeout,
+                options=options
+            ):
+                yield fragment
+        except BackendError as e:
+            logging.error(f"Backend chat stream error: {e}")
+            raise AIError(str(e)) from e
+        except Exception as e:
+            logging.error(f"Unexpected error in unified chat stream: {e}", exc_info=True)
+            raise AIError(f"Failed to stream chat response: {str(e)}") from e
     
     async def embed(
         self,
@@ -209,6 +356,34 @@ class HTTPClient:
             logging.error(f"Unexpected error in unified embed: {e}", exc_info=True)
             raise AIError(f"Failed to generate embedding: {str(e)}") from e
     
+    async def embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Unified batch embedding interface.
+        
+        Sends all texts to the configured backend in a single request where the
+        backend supports it. Returns one embedding per text, in input order.
+        """
+        await self._ensure_backend()
+        
+        try:
+            logging.debug(f"Routing embed_batch request ({len(texts)} texts) to {self.backend.backend_name} backend")
+            return await self.backend.embed_batch(
+                model=model,
+                texts=texts,
+                timeout=timeout
+            )
+        except BackendError as e:
+            logging.error(f"Backend embed_batch error: {e}")
+            raise AIError(str(e)) from e
+        except Exception as e:
+            logging.error(f"Unexpected error in unified embed_batch: {e}", exc_info=True)
+            raise AIError(f"Failed to generate batch embeddings: {str(e)}") from e
+    
     async def get_available_models(self) -> List[Dict[str, str]]:
         """
         Get available models from the configured backend.
@@ -238,13 +413,16 @@ class HTTPClient:
         await self._ensure_backend()
         
         try:
-            return await self.backend.health_check()
+            health = await self.backend.health_check()
+            health["connection_pool"] = self.get_pool_stats()
+            return health
         except Exception as e:
             logging.error(f"Backend health check failed: {e}", exc_info=True)
             return {
                 "status": "unhealthy",
                 "backend": self.backend.backend_name if self.backend else "unknown",
-                "error": str(e)
+                "error": str(e),
+                "connection_pool": self.get_pool_stats()
             }
     
     # ===== BACKWARD COMPATIBILITY LAYER =====
@@ -488,9 +666,8 @@ class HTTPClient:
                             
                         return response_text
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self._release_session(session)
                     
             except asyncio.TimeoutError:
                 logging.error(f"Ollama request timed out after {request_timeout} seconds for model {model}")
@@ -634,9 +811,8 @@ class HTTPClient:
                             
                         return response_text
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self._release_session(session)
                     
             except asyncio.TimeoutError:
                 logging.error(f"Ollama chat request timed out after {request_timeout} seconds for model {model}")
@@ -733,9 +909,8 @@ class HTTPClient:
                         logging.debug(f"Received embedding of dimension {len(embedding)} in {elapsed:.2f}s. Model: {model}")
                         return embedding
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self._release_session(session)
 
             except asyncio.TimeoutError:
                 logging.error(f"Ollama embedding request timed out after {request_timeout} seconds for model {model}")
@@ -776,26 +951,25 @@ class HTTPClient:
             logging.error(f"HTTP GET failed for {url}: {str(e)}")
             raise NetworkError(f"Failed to fetch {url}") from e
         finally:
-            if session and not session.closed:
-                await session.close()
+            await self._release_session(session)
 
     @retry(
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=4, max=10)
     )
     async def post(self, url: str, **kwargs) -> Any:
-        """Make POST request with retry logic."""
-        session = await self._get_session()
-        try:
-            async with session.post(url, **kwargs) as response:
-                response.raise_for_status()
-                return await response.json()
-        except Exception as e:
-            logging.error(f"HTTP POST failed for {url}: {str(e)}")
-            raise NetworkError(f"Failed to post to {url}") from e
-        finally:
-            if session and not session.closed:
-                await session.close()
+        """Make POST request with retry logic, within the client's concurrency limit."""
+        async with self._semaphore:
+            session = await self._get_session()
+            try:
+                async with session.post(url, **kwargs) as response:
+                    response.raise_for_status()
+                    return await response.json()
+            except Exception as e:
+                logging.error(f"HTTP POST failed for {url}: {str(e)}")
+                raise NetworkError(f"Failed to post to {url}") from e
+            finally:
+                await self._release_session(session)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -815,8 +989,7 @@ class HTTPClient:
             logging.error(f"Failed to download media from {url}: {str(e)}")
             raise NetworkError(f"Failed to download media from {url}") from e
         finally:
-            if session and not session.closed:
-                await session.close()
+            await self._release_session(session)
 
     @retry(
         stop=stop_after_attempt(3),
@@ -836,8 +1009,7 @@ class HTTPClient:
             logging.error(f"Failed to expand URL {url}: {str(e)}")
             raise NetworkError(f"Failed to get final URL for {url}") from e
         finally:
-            if session and not session.closed:
-                await session.close()
+            await self._release_session(session)
         
     def _get_optimized_options(self, model: str, task_type: str = "general") -> Dict[str, Any]:
         """
@@ -1038,48 +1210,83 @@ class HTTPClient:
             options=options
         )
 
-    async def preload_models(self) -> Dict[str, bool]:
+    def _phase_models(self, phases: Tuple[str, ...]) -> List[str]:
+        """Models the given pipeline phases send requests to; every text, vision and chat model without phases."""
+        model_types = [t for phase in phases for t in PHASE_MODEL_TYPES[phase]] if phases else ['text', 'vision', 'chat']
+        models = []
+        for model_type in model_types:
+            model = self.config.get_model_for_backend(model_type)
+            if model and model not in models:
+                models.append(model)
+        return models
+    
+    async def _set_model_keep_alive(self, model: str, keep_alive: Any) -> bool:
+        """
+        Load a model, or unload it with keep_alive 0, on every Ollama endpoint.
+        
+        A generate request without a prompt only changes the model's residency,
+        so nothing is evaluated and no KV cache is disturbed.
+        """
+        endpoints = [str(url).rstrip('/') for url in (self.config.inference_endpoints or [self.base_url])]
+        session = await self._get_session()
+        try:
+            ok = True
+            for endpoint in endpoints:
+                async with session.post(
+                    f"{endpoint}/api/generate",
+                    json={"model": model, "keep_alive": keep_alive},
+                    timeout=aiohttp.ClientTimeout(total=max(self.timeout, 60))
+                ) as response:
+                    if response.status != 200:
+                        logging.warning(f"Setting keep_alive={keep_alive} for {model} on {endpoint} returned {response.status}")
+                        ok = False
+            return ok
+        finally:
+            await self._release_session(session)
+    
+    async def preload_models(self, *phases: str) -> Dict[str, bool]:
         """
-        Pre-load models specified in config to improve first-request performance.
+        Load the models of the given pipeline phases and keep them loaded until the next call.
+        
+        Models pinned for the previous phase that the new phase does not use are
+        unloaded first, so phases do not evict each other's models from GPU
+        memory. Requests to a pinned model carry ollama_phase_keep_alive, which
+        keeps its KV cache, and with it the shared prompt prefix, warm between
+        items. Embedding models are never pinned. Pipeline mode passes all of
+        its phases at once. Without phases, the text, vision and chat models are
+        loaded with the default ollama_keep_alive.
+        
+        Args:
+            phases: Keys of PHASE_MODEL_TYPES; none to load every generation model
         
         Returns:
             Dict mapping model names to success status
         """
-        if not hasattr(self.config, 'ollama_enable_model_preloading') or not self.config.ollama_enable_model_preloading:
+        if self.config.inference_backend.lower() != 'ollama':
+            return {}
+        
+        models_to_preload = self._phase_models(phases)
+        phase_label = ', '.join(phases) or 'all'
+        if phases:
+            for model in self._pinned_models - set(models_to_preload):
+                try:
+                    await self._set_model_keep_alive(model, 0)
+                    logging.info(f"Unloaded model {model} before {phase_label} phase")
+                except Exception as e:
+                    logging.warning(f"Failed to unload model {model}: {e}")
+            self._pinned_models = set(models_to_preload)
+        
+        if not self.config.ollama_enable_model_preloading:
             logging.info("Model preloading disabled in config")
             return {}
-            
-        models_to_preload = []
-        if hasattr(self.config, 'text_model'):
-            models_to_preload.append(self.config.text_model)
-        if hasattr(self.config, 'vision_model'):
-            models_to_preload.append(self.config.vision_model)
-        if hasattr(self.config, 'embedding_model'):
-            models_to_preload.append(self.config.embedding_model)
-        if hasattr(self.config, 'chat_model') and self.config.chat_model:
-            models_to_preload.append(self.config.chat_model)
-            
-        # Remove duplicates
-        models_to_preload = list(set(models_to_preload))
         
+        keep_alive = self.config.ollama_phase_keep_alive if phases else self.config.ollama_keep_alive
         results = {}
-        logging.info(f"Pre-loading {len(models_to_preload)} models for improved performance")
+        logging.info(f"Pre-loading {len(models_to_preload)} models for {phase_label} phase")
         
         for model in models_to_preload:
             try:
-                logging.info(f"Pre-loading model: {model}")
-                # Send a minimal request to load the model into memory
-                await self.ollama_generate(
-                    model=model,
-                    prompt="test",
-                    max_tokens=1,
-                    timeout=30,
-                    options={
-                        "keep_alive": self.config.ollama_keep_alive if hasattr(self.config, 'ollama_keep_alive') else "5m"
-                    }
-                )
-                results[model] = True
-                logging.info(f"Successfully pre-loaded model: {model}")
+                results[model] = await self._set_model_keep_alive(model, keep_alive)
             except Exception as e:
                 logging.error(f"Failed to pre-load model {model}: {e}")
                 results[model] = False
@@ -1087,6 +1294,15 @@ class HTTPClient:
         successful = sum(1 for success in results.values() if success)
         logging.info(f"Model pre-loading complete: {successful}/{len(models_to_preload)} models loaded successfully")
         return results
+    
+    async def release_models(self) -> None:
+        """Hand pinned models back to the default ollama_keep_alive at the end of a run."""
+        pinned, self._pinned_models = self._pinned_models, set()
+        for model in pinned:
+            try:
+                await self._set_model_keep_alive(model, self.config.ollama_keep_alive)
+            except Exception as e:
+                logging.warning(f"Failed to release model {model}: {e}")
 
 class OllamaClient:
     """Client for interacting with Ollama API."""
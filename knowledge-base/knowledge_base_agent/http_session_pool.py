@@ -0,0 +1,214 @@
+"""
+Pooled aiohttp Session Management
+
+This module provides a per-event-loop connection pool for outbound HTTP
+traffic (Ollama, LocalAI, media downloads, URL expansion).
+
+aiohttp sessions are bound to the event loop they were created on. Under
+gevent and Celery the agent creates and tears down event loops frequently
+(``asyncio.run`` per task, fresh loops per greenlet), which is why
+``HTTPClient`` historically created a throwaway session per request. The
+``SessionPoolManager`` instead keeps one keep-alive session per live event
+loop and transparently discards sessions whose loop has been closed, so
+connections are reused for as long as the loop that owns them is alive.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional
+
+import aiohttp
+
+
+class SessionPoolManager:
+    """
+    Manages one pooled ``aiohttp.ClientSession`` per running event loop.
+
+    Sessions are created lazily on first use in a loop and reused for every
+    subsequent request made from that loop. Connection reuse is tracked via
+    aiohttp trace hooks so pool effectiveness can be verified at runtime.
+    """
+
+    def __init__(
+        self,
+        timeout: int = 180,
+        limit: int = 100,
+        limit_per_host: int = 16,
+        keepalive_timeout: float = 60.0,
+        dns_cache_ttl: int = 300,
+        enabled: bool = True
+    ):
+        """
+        Initialize the session pool manager.
+
+        Args:
+            timeout: Default total request timeout in seconds
+            limit: Maximum number of simultaneous connections per event loop
+            limit_per_host: Maximum simultaneous connections to a single host
+            keepalive_timeout: Seconds an idle connection is kept open for reuse
+            dns_cache_ttl: Seconds resolved host addresses are cached
+            enabled: When False, a fresh session is created per request (legacy behaviour)
+        """
+        self.timeout = timeout
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_cache_ttl = dns_cache_ttl
+        self.enabled = enabled
+
+        self._sessions: Dict[int, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+        self._stats = {
+            'session_hits': 0,
+            'session_misses': 0,
+            'connection_hits': 0,
+            'connection_misses': 0,
+            'stale_sessions_discarded': 0,
+        }
+
+    @classmethod
+    def from_config(cls, config) -> 'SessionPoolManager':
+        """Create a pool manager using the HTTP pool settings from config."""
+        return cls(
+            timeout=getattr(config, 'request_timeout', 180),
+            limit=getattr(config, 'http_pool_limit', 100),
+            limit_per_host=getattr(config, 'http_pool_limit_per_host', 16),
+            keepalive_timeout=getattr(config, 'http_keepalive_timeout', 60.0),
+            enabled=getattr(config, 'http_pool_enabled', True)
+        )
+
+    def _build_trace_config(self) -> aiohttp.TraceConfig:
+        """Create trace hooks that count new versus reused connections."""
+        trace_config = aiohttp.TraceConfig()
+
+        async def on_connection_create_end(session, ctx, params):
+            self._stats['connection_misses'] += 1
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self._stats['connection_hits'] += 1
+
+        trace_config.on_connection_create_end.append(on_connection_create_end)
+        trace_config.on_connection_reuseconn.append(on_connection_reuseconn)
+        return trace_config
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        """Create a new keep-alive session bound to the running loop."""
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            keepalive_timeout=self.keepalive_timeout,
+            ttl_dns_cache=self.dns_cache_ttl
+        )
+        return aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[self._build_trace_config()]
+        )
+
+    def _discard_entry(self, entry: Dict[str, Any]) -> None:
+        """Drop a session whose event loop is gone without touching that loop."""
+        try:
+            # The owning loop is closed, so the connector can no longer be closed
+            # through aiohttp's async API; detaching leaves its dead transports to
+            # be released when it is garbage collected.
+            entry['session'].detach()
+        except Exception as e:
+            self.logger.debug(f"Ignoring error while discarding stale session: {e}")
+        self._stats['stale_sessions_discarded'] += 1
+
+    def _purge_stale_sessions(self) -> None:
+        """Remove sessions that belong to closed event loops. Caller holds the lock."""
+        for loop_id, entry in list(self._sessions.items()):
+            if entry['loop'].is_closed():
+                self._discard_entry(entry)
+                del self._sessions[loop_id]
+
+    async def get_session(self) -> aiohttp.ClientSession:
+        """
+        Get the pooled session for the running event loop.
+
+        Returns:
+            aiohttp.ClientSession: A session that must be returned with release_session()
+        """
+        loop = asyncio.get_running_loop()
+
+        if not self.enabled:
+            self._stats['session_misses'] += 1
+            return aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+
+        with self._lock:
+            self._purge_stale_sessions()
+
+            entry = self._sessions.get(id(loop))
+            if entry and entry['loop'] is loop and not entry['session'].closed:
+                self._stats['session_hits'] += 1
+                return entry['session']
+
+            session = self._create_session()
+            self._sessions[id(loop)] = {
+                'loop': loop,
+                'session': session,
+                'created_at': time.time()
+            }
+            self._stats['session_misses'] += 1
+            self.logger.debug(f"Created pooled aiohttp session for event loop {id(loop)}")
+            return session
+
+    async def release_session(self, session: Optional[aiohttp.ClientSession]) -> None:
+        """
+        Return a session obtained from get_session().
+
+        Pooled sessions stay open for reuse; unpooled sessions are closed.
+        """
+        if session is None or session.closed:
+            return
+        if not self.enabled:
+            await session.close()
+
+    async def close(self) -> None:
+        """Close the pooled session owned by the running loop and discard stale ones."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            entry = self._sessions.pop(id(loop), None)
+            self._purge_stale_sessions()
+
+        if entry and not entry['session'].closed:
+            await entry['session'].close()
+            self.logger.debug(f"Closed pooled aiohttp session for event loop {id(loop)}")
+
+    def __del__(self):
+        """Discard sessions left behind by event loops that have already closed."""
+        try:
+            with self._lock:
+                self._purge_stale_sessions()
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pool usage statistics.
+
+        Returns:
+            Dict containing session/connection hit and miss counts and the
+            connection reuse ratio.
+        """
+        with self._lock:
+            active_sessions = sum(
+                1 for entry in self._sessions.values()
+                if not entry['loop'].is_closed() and not entry['session'].closed
+            )
+
+        stats = dict(self._stats)
+        total_connections = stats['connection_hits'] + stats['connection_misses']
+        stats['connection_reuse_ratio'] = (
+            stats['connection_hits'] / total_connections if total_connections else 0.0
+        )
+        stats['active_sessions'] = active_sessions
+        stats['enabled'] = self.enabled
+        stats['limit'] = self.limit
+        stats['limit_per_host'] = self.limit_per_host
+        return stats
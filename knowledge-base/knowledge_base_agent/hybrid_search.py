@@ -0,0 +1,376 @@
+"""
+Hybrid Search Module
+
+This module combines full-text ranking with embedding similarity for knowledge
+base retrieval. Full-text candidates come from the SQLite FTS5 tables created
+by ``scripts/sqlite_migrate_fts.py`` (ranked with ``bm25()``) or from
+PostgreSQL ``ts_rank``; vector candidates come from the EmbeddingManager. The
+two ranked lists are merged with reciprocal rank fusion (RRF), which only
+needs ranks, so bm25 and cosine scores never have to be put on one scale.
+
+Each leg only fetches enough candidates to fill the requested page, and only
+the documents on that page are loaded from the database.
+"""
+
+import asyncio
+import logging
+import re
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text
+
+from .config import Config
+from .models import db, KnowledgeBaseItem, SubcategorySynthesis, UnifiedTweet
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RRF_K = 60
+
+DocumentKey = Tuple[str, int]
+
+# Full-text tables per document type (see scripts/sqlite_migrate_fts.py)
+FTS_TABLES = {
+    'kb_item': 'kb_item_fts',
+    'synthesis': 'synthesis_fts',
+}
+
+_fts_table_cache: Dict[Tuple[str, str], bool] = {}
+
+
+def build_fts_match_query(query: str) -> Optional[str]:
+    """
+    Turn free text into a safe FTS5 MATCH expression.
+
+    Each word is quoted so FTS5 operators and punctuation in user input cannot
+    cause syntax errors, and terms are OR-ed so long questions still match;
+    bm25 ranks documents that contain more of the terms higher.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " OR ".join('"' + term.replace('"', '""') + '"' for term in dict.fromkeys(terms))
+
+
+def fts_table_exists(session, table_name: str) -> bool:
+    """Check (once per database) whether an FTS5 table has been created."""
+    cache_key = (str(session.get_bind().url), table_name)
+    if cache_key not in _fts_table_cache:
+        row = session.execute(
+            text("SELECT name FROM sqlite_master WHERE type = 'table' AND name = :name"),
+            {"name": table_name}
+        ).first()
+        _fts_table_cache[cache_key] = row is not None
+    return _fts_table_cache[cache_key]
+
+
+def reciprocal_rank_fusion(
+    ranked_lists: Sequence[Sequence[Hashable]],
+    k: int = DEFAULT_RRF_K
+) -> List[Tuple[Hashable, float]]:
+    """
+    Fuse several ranked lists with reciprocal rank fusion.
+
+    Each key scores ``sum(1 / (k + rank))`` over the lists it appears in, with
+    ranks starting at 1. Ties keep the order in which keys were first seen.
+
+    Returns:
+        List of (key, fused_score) tuples, best first
+    """
+    scores: Dict[Hashable, float] = {}
+    for ranked in ranked_lists:
+        for rank, key in enumerate(ranked, start=1):
+            scores[key] = scores.get(key, 0.0) + 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class HybridSearchEngine:
+    """Runs full-text and vector retrieval together and fuses the rankings."""
+
+    def __init__(self, config: Config, embedding_manager=None):
+        self.config = config
+        self.embedding_manager = embedding_manager
+        self.rrf_k = getattr(config, 'hybrid_search_rrf_k', DEFAULT_RRF_K)
+        self.logger = logging.getLogger(__name__)
+
+    async def search(
+        self,
+        query: str,
+        limit: int = 12,
+        offset: int = 0,
+        doc_types: Optional[Sequence[str]] = None,
+        main_category: Optional[str] = None,
+        sub_category: Optional[str] = None,
+        use_vector: bool = True
+    ) -> List[Dict[str, Any]]:
+        """
+        Search KB items and syntheses with full-text and vector retrieval.
+
+        Args:
+            query: Free-text query
+            limit: Page size
+            offset: Number of fused results to skip
+            doc_types: Restrict to 'kb_item' and/or 'synthesis' (default both)
+            main_category: Only return documents in this main category
+            sub_category: Only return documents in this sub category
+            use_vector: Include the embedding similarity leg
+
+        Returns:
+            List of result dicts (type, id, title, content, category, subcategory,
+            score, rrf_score, text_rank, vector_rank), best first
+        """
+        doc_types = list(doc_types or FTS_TABLES.keys())
+        # Candidates deeper than the page let documents ranked moderately by
+        # both legs overtake documents ranked highly by only one of them
+        depth = 2 * (offset + limit)
+
+        vector_task = None
+        if use_vector and self.embedding_manager is not None:
+            vector_task = asyncio.ensure_future(self._vector_candidates(query, depth))
+            # Let the query embedding request go out before the blocking FTS queries run
+            await asyncio.sleep(0)
+
+        text_candidates: List[Tuple[DocumentKey, float]] = []
+        for doc_type in doc_types:
+            text_candidates.extend(self._text_candidates(query, doc_type, depth, main_category, sub_category))
+        text_candidates.sort(key=lambda item: item[1], reverse=True)
+
+        vector_candidates: List[Tuple[DocumentKey, float]] = []
+        if vector_task is not None:
+            try:
+                vector_candidates = await vector_task
+            except Exception as e:
+                self.logger.warning(f"Vector leg of hybrid search failed, using full-text results only: {e}")
+        allowed_types = set(doc_types) | ({'kb_item_legacy'} if 'kb_item' in doc_types else set())
+        vector_candidates = [(key, score) for key, score in vector_candidates if key[0] in allowed_types]
+
+        text_scores = dict(text_candidates)
+        vector_scores = dict(vector_candidates)
+        text_ranks = {key: rank for rank, (key, _) in enumerate(text_candidates, start=1)}
+        vector_ranks = {key: rank for rank, (key, _) in enumerate(vector_candidates, start=1)}
+
+        fused = reciprocal_rank_fusion(
+            [[key for key, _ in text_candidates], [key for key, _ in vector_candidates]],
+            k=self.rrf_k
+        )
+
+        results: List[Dict[str, Any]] = []
+        skipped = 0
+        position = 0
+        # Hydrate page-sized slices; category filters on vector hits may drop a few
+        while position < len(fused) and len(results) < limit:
+            window = fused[position:position + offset + limit]
+            position += len(window)
+            documents = self._load_documents([key for key, _ in window])
+            for key, rrf_score in window:
+                document = documents.get(key)
+                if not document:
+                    continue
+                if main_category and document['category'] != main_category:
+                    continue
+                if sub_category and document['subcategory'] != sub_category:
+                    continue
+                if skipped < offset:
+                    skipped += 1
+                    continue
+                document.update({
+                    'score': float(vector_scores.get(key, text_scores.get(key, 0.0))),
+                    'rrf_score': rrf_score,
+                    'text_rank': text_ranks.get(key),
+                    'vector_rank': vector_ranks.get(key),
+                })
+                results.append(document)
+                if len(results) >= limit:
+                    break
+
+        self.logger.info(
+            f"Hybrid search for '{query[:50]}' fused {len(text_candidates)} full-text and "
+            f"{len(vector_candidates)} vector candidates into {len(results)} results"
+        )
+        return results
+
+    def _text_candidates(
+        self,
+        query: str,
+        doc_type: str,
+        depth: int,
+        main_category: Optional[str],
+        sub_category: Optional[str]
+    ) -> List[Tuple[DocumentKey, float]]:
+        """Return (key, relevance) for the best full-text matches of one document type."""
+        try:
+            dialect = db.session.get_bind().dialect.name
+            if dialect == 'sqlite':
+                return self._sqlite_text_candidates(query, doc_type, depth, main_category, sub_category)
+            if dialect == 'postgresql':
+                return self._postgres_text_candidates(query, doc_type, depth, main_category, sub_category)
+        except Exception as e:
+            db.session.rollback()
+            self.logger.warning(f"Full-text search over {doc_type} failed: {e}")
+        return []
+
+    def _sqlite_text_candidates(
+        self,
+        query: str,
+        doc_type: str,
+        depth: int,
+        main_category: Optional[str],
+        sub_category: Optional[str]
+    ) -> List[Tuple[DocumentKey, float]]:
+        table = FTS_TABLES[doc_type]
+        match_query = build_fts_match_query(query)
+        if not match_query or not fts_table_exists(db.session, table):
+            return []
+
+        # Narrow by category inside the MATCH so bm25 only ranks eligible rows;
+        # exact equality is re-checked when the page is hydrated
+        if main_category:
+            match_query = f'({match_query}) AND main_category : "{main_category.replace(chr(34), "")}"'
+        if sub_category:
+            match_query = f'({match_query}) AND sub_category : "{sub_category.replace(chr(34), "")}"'
+
+        rows = db.session.execute(
+            text(f"SELECT rowid, bm25({table}) AS rank FROM {table} "
+                 f"WHERE {table} MATCH :query ORDER BY rank LIMIT :depth"),
+            {"query": match_query, "depth": depth}
+        ).all()
+        # bm25() is negative with lower being better; map it onto 0..1
+        return [((doc_type, int(row[0])), -row[1] / (1.0 - row[1])) for row in rows]
+
+    def _postgres_text_candidates(
+        self,
+        query: str,
+        doc_type: str,
+        depth: int,
+        main_category: Optional[str],
+        sub_category: Optional[str]
+    ) -> List[Tuple[DocumentKey, float]]:
+        if doc_type == 'kb_item':
+            table = "unified_tweet"
+            document = ("to_tsvector('english', coalesce(kb_display_title, kb_item_name, '') || ' ' || "
+                        "coalesce(kb_content, ''))")
+            base_filter = "kb_item_created"
+        else:
+            table = "subcategory_synthesis"
+            document = ("to_tsvector('english', coalesce(synthesis_title, '') || ' ' || "
+                        "coalesce(synthesis_content, ''))")
+            base_filter = "TRUE"
+
+        params: Dict[str, Any] = {"query": query, "depth": depth}
+        filters = ""
+        if main_category:
+            filters += " AND main_category = :main_category"
+            params["main_category"] = main_category
+        if sub_category:
+            filters += " AND sub_category = :sub_category"
+            params["sub_category"] = sub_category
+
+        # OR the terms (like the FTS5 query) and normalise ts_rank into 0..1
+        rows = db.session.execute(
+            text(f"SELECT id, ts_rank({document}, q.query, 32) AS score "
+                 f"FROM {table}, (SELECT replace(plainto_tsquery('english', :query)::text, '&', '|')::tsquery AS query) q "
+                 f"WHERE {base_filter} AND {document} @@ q.query{filters} "
+                 "ORDER BY score DESC LIMIT :depth"),
+            params
+        ).all()
+        return [((doc_type, int(row[0])), float(row[1])) for row in rows]
+
+    def add_snippets(self, query: str, results: List[Dict[str, Any]], length: int = 200) -> None:
+        """
+        Attach a highlighted ``snippet`` to each result in a page.
+
+        On SQLite the FTS5 ``snippet()`` of the content column is used for
+        results that matched the text leg; other results fall back to the
+        start of their content.
+        """
+        snippets: Dict[DocumentKey, str] = {}
+        match_query = build_fts_match_query(query)
+        try:
+            if match_query and db.session.get_bind().dialect.name == 'sqlite':
+                for doc_type, table in FTS_TABLES.items():
+                    ids = [r['id'] for r in results if r['type'] == doc_type and r.get('text_rank')]
+                    if not ids or not fts_table_exists(db.session, table):
+                        continue
+                    placeholders = ", ".join(f":id{i}" for i in range(len(ids)))
+                    params: Dict[str, Any] = {f"id{i}": doc_id for i, doc_id in enumerate(ids)}
+                    params["query"] = match_query
+                    rows = db.session.execute(
+                        text(f"SELECT rowid, snippet({table}, 1, '<b>', '</b>', '…', 10) FROM {table} "
+                             f"WHERE {table} MATCH :query AND rowid IN ({placeholders})"),
+                        params
+                    ).all()
+                    snippets.update({(doc_type, int(row[0])): row[1] for row in rows})
+        except Exception as e:
+            db.session.rollback()
+            self.logger.warning(f"Failed to build search snippets: {e}")
+
+        for result in results:
+            result['snippet'] = snippets.get((result['type'], result['id'])) or result.get('content', '')[:length]
+
+    async def _vector_candidates(self, query: str, depth: int) -> List[Tuple[DocumentKey, float]]:
+        """Return (key, similarity) for the nearest embeddings, keyed like the FTS tables."""
+        similar_docs = await self.embedding_manager.find_similar_documents(query, top_k=depth, include_scores=True)
+
+        # Embeddings reference knowledge_base_item ids while the FTS table is keyed
+        # by unified_tweet id; translate through tweet_id with one query
+        kb_ids = [doc['id'] for doc in similar_docs if doc.get('type') == 'kb_item']
+        unified_ids = self._map_kb_item_ids(kb_ids)
+
+        candidates = []
+        for doc in similar_docs:
+            doc_type, doc_id = doc.get('type'), doc.get('id')
+            if doc_type == 'kb_item':
+                key = ('kb_item', unified_ids[doc_id]) if doc_id in unified_ids else ('kb_item_legacy', doc_id)
+            elif doc_type == 'synthesis':
+                key = ('synthesis', doc_id)
+            else:
+                continue
+            candidates.append((key, float(doc.get('score', 0.0))))
+        return candidates
+
+    def _map_kb_item_ids(self, kb_ids: List[int]) -> Dict[int, int]:
+        """Map knowledge_base_item ids to unified_tweet ids."""
+        if not kb_ids:
+            return {}
+        rows = db.session.query(KnowledgeBaseItem.id, UnifiedTweet.id).join(
+            UnifiedTweet, UnifiedTweet.tweet_id == KnowledgeBaseItem.tweet_id
+        ).filter(KnowledgeBaseItem.id.in_(kb_ids)).all()
+        return {kb_id: unified_id for kb_id, unified_id in rows}
+
+    def _load_documents(self, keys: List[DocumentKey]) -> Dict[DocumentKey, Dict[str, Any]]:
+        """Load the documents for a page of results with one IN query per type."""
+        ids_by_type: Dict[str, List[int]] = {}
+        for doc_type, doc_id in keys:
+            ids_by_type.setdefault(doc_type, []).append(doc_id)
+
+        documents: Dict[DocumentKey, Dict[str, Any]] = {}
+        if ids_by_type.get('kb_item'):
+            for tweet in UnifiedTweet.query.filter(UnifiedTweet.id.in_(ids_by_type['kb_item'])).all():
+                documents[('kb_item', tweet.id)] = {
+                    'type': 'kb_item',
+                    'id': tweet.id,
+                    'title': tweet.kb_display_title or tweet.kb_title or tweet.kb_item_name or '',
+                    'content': tweet.kb_content or '',
+                    'category': tweet.main_category or '',
+                    'subcategory': tweet.sub_category or '',
+                }
+        if ids_by_type.get('kb_item_legacy'):
+            for item in KnowledgeBaseItem.query.filter(KnowledgeBaseItem.id.in_(ids_by_type['kb_item_legacy'])).all():
+                documents[('kb_item_legacy', item.id)] = {
+                    'type': 'kb_item',
+                    'id': item.id,
+                    'title': item.display_title or item.title,
+                    'content': item.content or '',
+                    'category': item.main_category or '',
+                    'subcategory': item.sub_category or '',
+                }
+        if ids_by_type.get('synthesis'):
+            for synth in SubcategorySynthesis.query.filter(SubcategorySynthesis.id.in_(ids_by_type['synthesis'])).all():
+                documents[('synthesis', synth.id)] = {
+                    'type': 'synthesis',
+                    'id': synth.id,
+                    'title': synth.synthesis_title,
+                    'content': synth.synthesis_content or '',
+                    'category': synth.main_category or '',
+                    'subcategory': synth.sub_category or '',
+                }
+        return documents
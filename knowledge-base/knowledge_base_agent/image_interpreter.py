@@ -1,37 +1,123 @@
+import asyncio
 import base64
+import hashlib
+import io
 import logging
+import weakref
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Tuple
+from PIL import Image
 from knowledge_base_agent.exceptions import VisionModelError
 from knowledge_base_agent.http_client import HTTPClient
+from knowledge_base_agent.llm_response_cache import make_cache_key
 
-async def interpret_image(http_client: HTTPClient, image_path: Path, vision_model: str) -> str:
-    """Interpret image content using vision model."""
+IMAGE_PROMPT = "Describe this image in detail, focusing on the main subject and any relevant technical details."
+VISION_CACHE_PHASE = 'vision'
+
+# Formats the vision backends accept as-is when no resize is needed
+PASSTHROUGH_FORMATS = {'JPEG', 'PNG', 'WEBP'}
+
+# Descriptions being generated per event loop, so one image shared by several tweets is sent once
+_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, asyncio.Future]]" = weakref.WeakKeyDictionary()
+
+
+def prepare_image(image_path: Path, max_dimension: int = 0) -> Tuple[str, str]:
+    """
+    Hash an image and encode it for upload, downscaling it if needed.
+
+    Blocking; run it in a worker thread.
+
+    Args:
+        image_path: Path to the image file
+        max_dimension: Longest side sent to the vision model in pixels (0 sends the original)
+
+    Returns:
+        Tuple of (sha256 of the original file, base64 of the image to upload)
+    """
+    with open(image_path, 'rb') as f:
+        image_bytes = f.read()
+    content_hash = hashlib.sha256(image_bytes).hexdigest()
+
+    if max_dimension > 0:
+        try:
+            with Image.open(io.BytesIO(image_bytes)) as image:
+                if max(image.size) > max_dimension or image.format not in PASSTHROUGH_FORMATS:
+                    image = image.convert('RGB')
+                    image.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+                    buffer = io.BytesIO()
+                    image.save(buffer, format='JPEG', quality=90)
+                    image_bytes = buffer.getvalue()
+        except Exception as e:
+            # The backend may still understand formats Pillow cannot open
+            logging.warning(f"Could not downscale image {image_path}, sending original: {e}")
+
+    return content_hash, base64.b64encode(image_bytes).decode('utf-8')
+
+
+async def interpret_image(http_client: HTTPClient, image_path: Path, vision_model: str, max_dimension: int = 0) -> str:
+    """
+    Interpret image content using vision model.
+
+    Descriptions are cached by image content and model in the LLM response
+    cache ('vision' phase), so an image seen in another tweet is not sent again.
+    """
     try:
-        # Read and encode image
-        with open(image_path, 'rb') as f:
-            image_bytes = f.read()
-            image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-
-        # Prepare prompt for vision model
-        prompt = "Describe this image in detail, focusing on the main subject and any relevant technical details."
-
-        # Use /api/generate endpoint with image
-        response = await http_client.post(
-            f"{http_client.base_url}/api/generate",
-            json={
-                "model": vision_model,
-                "prompt": prompt,
-                "images": [image_base64],
-                "stream": False
-            }
-        )
-
-        if isinstance(response, dict) and "response" in response:
-            return response["response"].strip()
-        else:
-            raise VisionModelError("Invalid response format from vision model")
+        # Read, hash and encode off the event loop
+        content_hash, image_base64 = await asyncio.to_thread(prepare_image, image_path, max_dimension)
+
+        cache = http_client.response_cache
+        cache_key = None
+        if cache.is_enabled_for(VISION_CACHE_PHASE):
+            cache_key = make_cache_key('vision', vision_model, content_hash, {'prompt': IMAGE_PROMPT})
+            # Descriptions are not validated and retried, so repeats are genuine hits
+            cached = cache.get(cache_key, VISION_CACHE_PHASE, allow_repeat=True)
+            if cached is not None:
+                logging.debug(f"Vision cache hit for image {image_path.name}")
+                return cached
+
+        if cache_key is None:
+            return await _describe(http_client, image_base64, vision_model)
+
+        pending = _inflight.setdefault(asyncio.get_running_loop(), {})
+        if cache_key in pending:
+            return await asyncio.shield(pending[cache_key])
+        future = asyncio.get_running_loop().create_future()
+        pending[cache_key] = future
+        try:
+            description = await _describe(http_client, image_base64, vision_model)
+            cache.put(cache_key, VISION_CACHE_PHASE, vision_model, description)
+            future.set_result(description)
+            return description
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Only the waiters need the exception; don't warn about it going unretrieved
+            future.exception()
+            raise
+        finally:
+            pending.pop(cache_key, None)
 
     except Exception as e:
         logging.error(f"Failed to interpret image {image_path}: {e}")
         raise VisionModelError(f"Failed to interpret image {image_path}: {e}")
+
+
+async def _describe(http_client: HTTPClient, image_base64: str, vision_model: str) -> str:
+    # Use /api/generate endpoint with image
+    response = await http_client.post(
+        f"{http_client.base_url}/api/generate",
+        json={
+            "model": vision_model,
+            "prompt": IMAGE_PROMPT,
+            "images": [image_base64],
+            "stream": False,
+            **http_client.pinned_keep_alive(vision_model)
+        }
+    )
+
+    if isinstance(response, dict) and "response" in response:
+        return response["response"].strip()
+    else:
+        raise VisionModelError("Invalid response format from vision model")
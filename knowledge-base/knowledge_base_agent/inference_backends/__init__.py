@@ -13,6 +13,7 @@ from .errors import (
     BackendModelError
 )
 from .factory import BackendFactory
+from .load_balancer import LoadBalancedBackend
 
 __all__ = [
     'InferenceBackend',
@@ -20,5 +21,6 @@ __all__ = [
     'BackendConnectionError',
     'BackendTimeoutError', 
     'BackendModelError',
-    'BackendFactory'
+    'BackendFactory',
+    'LoadBalancedBackend'
 ]
\ No newline at end of file
@@ -6,7 +6,7 @@ must follow to ensure consistent behavior across different inference engines.
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator
 import logging
 
 
@@ -106,6 +106,45 @@ class InferenceBackend(ABC):
         """
         pass
     
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Generate a chat completion as a stream of text fragments.
+        
+        Backends whose API can stream should override this to yield tokens as
+        the model produces them. The default implementation yields the complete
+        chat() response once so every backend supports the streaming interface.
+        
+        Args:
+            model: The model to use for chat
+            messages: List of message objects with 'role' and 'content' keys
+            temperature: Controls randomness (0.0-1.0)
+            top_p: Nucleus sampling parameter
+            timeout: Request timeout in seconds
+            options: Additional backend-specific options
+            
+        Yields:
+            str: Successive fragments of the response text
+            
+        Raises:
+            BackendError: If the chat generation fails
+        """
+        yield await self.chat(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            timeout=timeout,
+            options=options
+        )
+    
     @abstractmethod
     async def embed(
         self,
@@ -131,6 +170,32 @@ class InferenceBackend(ABC):
         """
         pass
     
+    async def embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for several texts in one operation.
+        
+        Backends whose API accepts a list of inputs should override this to
+        send a single request. The default implementation embeds each text
+        individually so every backend supports the batched interface.
+        
+        Args:
+            model: The embedding model to use
+            texts: The texts to embed
+            timeout: Request timeout in seconds
+        
+        Returns:
+            List[List[float]]: One embedding vector per input text, in input order
+        
+        Raises:
+            BackendError: If the embedding generation fails
+        """
+        return [await self.embed(model=model, text=text, timeout=timeout) for text in texts]
+    
     @abstractmethod
     async def get_available_models(self) -> List[Dict[str, str]]:
         """
@@ -163,6 +228,17 @@ class InferenceBackend(ABC):
         """
         pass
     
+    def _record_prompt_usage(self, prompt_tokens: Optional[int], evaluated_tokens: Optional[int],
+                             eval_seconds: Optional[float] = None) -> None:
+        """
+        Report how many prompt tokens were evaluated versus sent, so the HTTP
+        client can track reuse of the server's KV cache. Either count may be
+        None when the API does not report it.
+        """
+        prompt_stats = getattr(self.session_manager, 'prompt_stats', None)
+        if prompt_stats is not None:
+            prompt_stats.record(prompt_tokens, evaluated_tokens, eval_seconds)
+    
     def __str__(self) -> str:
         """Return string representation of the backend."""
         return f"{self.__class__.__name__}(backend={self.backend_name}, url={self.base_url})"
@@ -6,12 +6,20 @@ appropriate inference backends based on configuration.
 """
 
 import logging
-from typing import Type, Dict, Any, Optional
+from typing import Type, Dict, Any, List, Optional
 
 from .base import InferenceBackend
 from .errors import BackendError, BackendConnectionError
+from .load_balancer import LoadBalancedBackend
 from ..config import Config
 
+# Config fields holding the server URL and the per-server concurrency limit for
+# each backend type, overridden per endpoint when INFERENCE_ENDPOINTS is set
+ENDPOINT_CONFIG_FIELDS = {
+    'ollama': ('ollama_url', 'max_concurrent_requests'),
+    'localai': ('localai_api_url', 'localai_concurrent_requests'),
+}
+
 
 class BackendFactory:
     """
@@ -97,7 +105,13 @@ class BackendFactory:
         
         try:
             # Create and return the backend instance
-            backend = backend_class(config, session_manager)
+            endpoint_urls = getattr(config, 'inference_endpoints', None) or []
+            if endpoint_urls:
+                backend = cls.create_load_balanced_backend(
+                    config, session_manager, selected_backend, endpoint_urls
+                )
+            else:
+                backend = backend_class(config, session_manager)
             logger.info(f"Successfully created {selected_backend} backend: {backend}")
             return backend
             
@@ -130,6 +144,55 @@ class BackendFactory:
                     original_error=e
                 )
     
+    @classmethod
+    def create_load_balanced_backend(
+        cls,
+        config: Config,
+        session_manager: Any,
+        backend_name: str,
+        endpoint_urls: List[str]
+    ) -> LoadBalancedBackend:
+        """
+        Create one backend per endpoint URL behind a load balancer.
+        
+        Args:
+            config: Configuration object
+            session_manager: HTTP session manager shared by all endpoints
+            backend_name: Registered backend type used for every endpoint
+            endpoint_urls: Server URLs; list position is the GPU index hint
+            
+        Returns:
+            LoadBalancedBackend: Balancer routing over the endpoints
+            
+        Raises:
+            BackendError: If the backend type cannot be load balanced
+        """
+        if backend_name not in ENDPOINT_CONFIG_FIELDS:
+            raise BackendError(
+                f"Backend '{backend_name}' does not support multiple endpoints",
+                backend="factory",
+                context={'supported_backends': list(ENDPOINT_CONFIG_FIELDS.keys())}
+            )
+        
+        url_field, concurrency_field = ENDPOINT_CONFIG_FIELDS[backend_name]
+        max_concurrent = getattr(config, 'inference_endpoint_max_concurrent', 1)
+        backend_class = cls._backends[backend_name]
+        
+        endpoints = [
+            backend_class(
+                config.model_copy(update={url_field: url, concurrency_field: max_concurrent}),
+                session_manager
+            )
+            for url in endpoint_urls
+        ]
+        return LoadBalancedBackend(
+            config,
+            session_manager,
+            endpoints,
+            failure_threshold=getattr(config, 'inference_endpoint_failure_threshold', 3),
+            ejection_seconds=getattr(config, 'inference_endpoint_ejection_seconds', 30.0)
+        )
+    
     @classmethod
     def validate_backend_config(cls, config: Config, backend_name: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -0,0 +1,404 @@
+"""
+Load-Balanced Inference Backend
+
+This module spreads inference requests over several servers of the same
+backend type (for example one Ollama instance per GPU, or per host).
+
+Routing rules, in order of preference:
+    1. Model affinity - endpoints that recently served the requested model,
+       so a model is not loaded onto every GPU unless the load requires it
+    2. GPU hint - the endpoint matching ``options['gpu_device']``
+    3. Least outstanding requests relative to the endpoint's concurrency limit
+
+Endpoints that fail with connection or timeout errors repeatedly are ejected
+for a cool-down period and must pass a health probe before they receive
+traffic again.
+"""
+
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set
+
+from .base import InferenceBackend
+from .errors import BackendConnectionError, BackendError, BackendTimeoutError
+
+# Number of most recently routed models assumed to be resident on an endpoint
+MODEL_AFFINITY_DEPTH = 2
+
+
+@dataclass
+class BackendEndpoint:
+    """One inference server behind the load balancer and its routing state."""
+    index: int
+    backend: InferenceBackend
+    max_concurrent: int
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    ejected_until: float = 0.0
+    probing: bool = False
+    recent_models: List[str] = field(default_factory=list)
+    total_requests: int = 0
+    total_failures: int = 0
+
+    @property
+    def url(self) -> str:
+        return self.backend.base_url
+
+    def is_ejected(self, now: float) -> bool:
+        return self.probing or self.ejected_until > now
+
+    def has_capacity(self) -> bool:
+        return self.outstanding < self.max_concurrent
+
+    def note_model(self, model: str) -> None:
+        """Record that a model was routed here (most recent first)."""
+        if model in self.recent_models:
+            self.recent_models.remove(model)
+        self.recent_models.insert(0, model)
+        del self.recent_models[MODEL_AFFINITY_DEPTH:]
+
+
+class LoadBalancedBackend(InferenceBackend):
+    """
+    Inference backend that routes each request to one of several endpoints.
+
+    Each endpoint is a regular backend instance (OllamaBackend, LocalAIBackend)
+    pointing at a different server; the balancer only decides where a request
+    goes and keeps per-endpoint concurrency, health and model affinity state.
+    """
+
+    def __init__(
+        self,
+        config,
+        session_manager,
+        endpoints: List[InferenceBackend],
+        failure_threshold: int = 3,
+        ejection_seconds: float = 30.0
+    ):
+        """
+        Initialize the load balancer.
+
+        Args:
+            config: Configuration object
+            session_manager: HTTP session manager shared by the endpoint backends
+            endpoints: One backend instance per server; list position is the GPU index hint
+            failure_threshold: Consecutive connection/timeout failures before ejection
+            ejection_seconds: How long an ejected endpoint is kept out of rotation
+        """
+        super().__init__(config, session_manager)
+
+        if not endpoints:
+            raise BackendError("Load balancer needs at least one endpoint", "load_balancer")
+
+        self.endpoints = [
+            BackendEndpoint(index=i, backend=backend, max_concurrent=max(1, getattr(backend, 'max_concurrent', 1)))
+            for i, backend in enumerate(endpoints)
+        ]
+        self.failure_threshold = max(1, failure_threshold)
+        self.ejection_seconds = ejection_seconds
+
+        # asyncio primitives are bound to an event loop; keep one condition per loop
+        self._conditions: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Condition]" = weakref.WeakKeyDictionary()
+
+        self.logger.info(
+            f"Initialized load balancer over {len(self.endpoints)} {self.backend_name} endpoints: "
+            f"{[endpoint.url for endpoint in self.endpoints]}"
+        )
+
+    @property
+    def backend_name(self) -> str:
+        """Return the name of the balanced backend type."""
+        return self.endpoints[0].backend.backend_name
+
+    @property
+    def base_url(self) -> str:
+        """Return the endpoint URLs, comma separated."""
+        return ",".join(endpoint.url for endpoint in self.endpoints)
+
+    async def generate(
+        self,
+        model: str,
+        prompt: str,
+        temperature: float = 0.7,
+        max_tokens: int = 50000,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Generate text on the best endpoint for this model."""
+        return await self._dispatch(
+            "generate", model, options,
+            lambda backend: backend.generate(
+                model=model, prompt=prompt, temperature=temperature, max_tokens=max_tokens,
+                top_p=top_p, timeout=timeout, options=options
+            )
+        )
+
+    async def chat(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """Generate a chat completion on the best endpoint for this model."""
+        return await self._dispatch(
+            "chat", model, options,
+            lambda backend: backend.chat(
+                model=model, messages=messages, temperature=temperature,
+                top_p=top_p, timeout=timeout, options=options
+            )
+        )
+
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the best endpoint for this model.
+
+        The endpoint slot is held until the stream finishes. A connection
+        failure is retried on another endpoint only before the first fragment,
+        since after that the caller already has part of the response.
+        """
+        gpu_device = options.get('gpu_device') if options else None
+        tried: Set[int] = set()
+
+        while True:
+            endpoint = await self._acquire(model, gpu_device, tried)
+            started = False
+            try:
+                async for fragment in endpoint.backend.chat_stream(
+                    model=model, messages=messages, temperature=temperature,
+                    top_p=top_p, timeout=timeout, options=options
+                ):
+                    started = True
+                    yield fragment
+            except (BackendConnectionError, BackendTimeoutError) as e:
+                self._record_failure(endpoint)
+                tried.add(endpoint.index)
+                if isinstance(e, BackendConnectionError) and not started and len(tried) < len(self.endpoints):
+                    self.logger.warning(f"chat_stream failed on {endpoint.url}, retrying on another endpoint: {e}")
+                    continue
+                raise
+            else:
+                endpoint.consecutive_failures = 0
+                return
+            finally:
+                await self._release(endpoint)
+
+    async def embed(
+        self,
+        model: str,
+        text: str,
+        timeout: Optional[int] = None
+    ) -> List[float]:
+        """Generate an embedding on the best endpoint for this model."""
+        return await self._dispatch(
+            "embed", model, None,
+            lambda backend: backend.embed(model=model, text=text, timeout=timeout)
+        )
+
+    async def embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """Generate a batch of embeddings on the best endpoint for this model."""
+        return await self._dispatch(
+            "embed_batch", model, None,
+            lambda backend: backend.embed_batch(model=model, texts=texts, timeout=timeout)
+        )
+
+    async def get_available_models(self) -> List[Dict[str, str]]:
+        """Get the available models from the least loaded healthy endpoint."""
+        return await self._dispatch(
+            "get_available_models", None, None,
+            lambda backend: backend.get_available_models()
+        )
+
+    async def health_check(self) -> Dict[str, Any]:
+        """
+        Probe every endpoint and report per-endpoint health.
+
+        Endpoints that fail the probe are ejected; endpoints that pass are
+        readmitted. The balancer is healthy while at least one endpoint is.
+        """
+        await asyncio.gather(*(self._probe(endpoint) for endpoint in self.endpoints))
+        endpoint_stats = self.get_endpoint_stats()
+        healthy = [stats for stats in endpoint_stats if stats['healthy']]
+
+        return {
+            "status": "healthy" if healthy else "unhealthy",
+            "backend": self.backend_name,
+            "api_url": self.base_url,
+            "healthy_endpoints": len(healthy),
+            "total_endpoints": len(endpoint_stats),
+            "endpoints": endpoint_stats
+        }
+
+    def get_endpoint_stats(self) -> List[Dict[str, Any]]:
+        """
+        Get routing statistics for each endpoint.
+
+        Returns:
+            List of dicts with url, health, load and affinity information
+        """
+        now = time.monotonic()
+        return [
+            {
+                'url': endpoint.url,
+                'healthy': not endpoint.is_ejected(now),
+                'outstanding': endpoint.outstanding,
+                'max_concurrent': endpoint.max_concurrent,
+                'recent_models': list(endpoint.recent_models),
+                'total_requests': endpoint.total_requests,
+                'total_failures': endpoint.total_failures
+            }
+            for endpoint in self.endpoints
+        ]
+
+    # ===== ROUTING =====
+
+    async def _dispatch(
+        self,
+        operation: str,
+        model: Optional[str],
+        options: Optional[Dict[str, Any]],
+        call: Callable[[InferenceBackend], Awaitable[Any]]
+    ) -> Any:
+        """
+        Run a request on a selected endpoint.
+
+        Connection failures are retried once on each other endpoint, since the
+        request never reached a model. Timeouts count against the endpoint's
+        health but are not retried, as the work may still be running there.
+        """
+        gpu_device = options.get('gpu_device') if options else None
+        tried: Set[int] = set()
+
+        while True:
+            endpoint = await self._acquire(model, gpu_device, tried)
+            try:
+                result = await call(endpoint.backend)
+            except (BackendConnectionError, BackendTimeoutError) as e:
+                self._record_failure(endpoint)
+                tried.add(endpoint.index)
+                if isinstance(e, BackendConnectionError) and len(tried) < len(self.endpoints):
+                    self.logger.warning(f"{operation} failed on {endpoint.url}, retrying on another endpoint: {e}")
+                    continue
+                raise
+            else:
+                endpoint.consecutive_failures = 0
+                return result
+            finally:
+                await self._release(endpoint)
+
+    def _get_condition(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        condition = self._conditions.get(loop)
+        if condition is None:
+            condition = asyncio.Condition()
+            self._conditions[loop] = condition
+        return condition
+
+    async def _acquire(self, model: Optional[str], gpu_device: Optional[int], exclude: Set[int]) -> BackendEndpoint:
+        """Wait for an endpoint with free capacity and reserve a slot on it."""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                endpoint = self._select_endpoint(model, gpu_device, exclude)
+                if endpoint is not None:
+                    endpoint.outstanding += 1
+                    endpoint.total_requests += 1
+                    if model:
+                        endpoint.note_model(model)
+                    return endpoint
+                # Wake up periodically so ejection expiry is noticed without a release
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=1.0)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, endpoint: BackendEndpoint) -> None:
+        endpoint.outstanding -= 1
+        condition = self._get_condition()
+        async with condition:
+            condition.notify_all()
+
+    def _select_endpoint(
+        self,
+        model: Optional[str],
+        gpu_device: Optional[int],
+        exclude: Set[int]
+    ) -> Optional[BackendEndpoint]:
+        """
+        Pick the endpoint for a request, or None if all eligible endpoints are busy.
+
+        Ejected endpoints whose cool-down has passed are probed in the background.
+        If every endpoint is ejected the balancer fails open and uses them anyway,
+        so a transient outage cannot stall processing for the whole cool-down.
+        """
+        now = time.monotonic()
+        for endpoint in self.endpoints:
+            if endpoint.ejected_until and endpoint.ejected_until <= now and not endpoint.probing:
+                endpoint.probing = True
+                asyncio.ensure_future(self._probe(endpoint))
+
+        eligible = [endpoint for endpoint in self.endpoints if endpoint.index not in exclude]
+        healthy = [endpoint for endpoint in eligible if not endpoint.is_ejected(now)]
+        candidates = [endpoint for endpoint in (healthy or eligible) if endpoint.has_capacity()]
+        if not candidates:
+            return None
+
+        preferred_index = gpu_device % len(self.endpoints) if isinstance(gpu_device, int) else None
+        return min(
+            candidates,
+            key=lambda endpoint: (
+                bool(model) and model not in endpoint.recent_models,
+                preferred_index is not None and endpoint.index != preferred_index,
+                endpoint.outstanding / endpoint.max_concurrent,
+                endpoint.index
+            )
+        )
+
+    def _record_failure(self, endpoint: BackendEndpoint) -> None:
+        endpoint.consecutive_failures += 1
+        endpoint.total_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold and not endpoint.is_ejected(time.monotonic()):
+            endpoint.ejected_until = time.monotonic() + self.ejection_seconds
+            self.logger.warning(
+                f"Ejecting {endpoint.url} for {self.ejection_seconds}s after "
+                f"{endpoint.consecutive_failures} consecutive failures"
+            )
+
+    async def _probe(self, endpoint: BackendEndpoint) -> bool:
+        """Check an endpoint by listing its models; eject or readmit it accordingly."""
+        endpoint.probing = True
+        try:
+            await endpoint.backend.get_available_models()
+        except Exception as e:
+            endpoint.ejected_until = time.monotonic() + self.ejection_seconds
+            self.logger.warning(f"Health probe of {endpoint.url} failed, keeping it ejected: {e}")
+            return False
+        else:
+            if endpoint.ejected_until:
+                self.logger.info(f"Endpoint {endpoint.url} passed its health probe, readmitting")
+            endpoint.ejected_until = 0.0
+            endpoint.consecutive_failures = 0
+            return True
+        finally:
+            endpoint.probing = False
+            condition = self._get_condition()
+            async with condition:
+                condition.notify_all()
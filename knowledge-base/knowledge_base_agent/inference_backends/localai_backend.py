@@ -8,7 +8,10 @@ backend system, using LocalAI's OpenAI-compatible API endpoints.
 import logging
 import time
 import asyncio
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, AsyncIterator
+
+import aiohttp
 
 from .base import InferenceBackend
 from .errors import (
@@ -110,6 +113,30 @@ class LocalAIBackend(InferenceBackend):
             options=options
         )
     
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from LocalAI.
+        
+        Uses the OpenAI-compatible /v1/chat/completions endpoint with server-sent events.
+        """
+        async for fragment in self._localai_chat_stream(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            timeout=timeout,
+            options=options
+        ):
+            yield fragment
+    
     async def embed(
         self,
         model: str,
@@ -127,6 +154,23 @@ class LocalAIBackend(InferenceBackend):
             timeout=timeout
         )
     
+    async def embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with a single LocalAI request.
+        
+        Uses the OpenAI-compatible /v1/embeddings endpoint with a list input.
+        """
+        return await self._localai_embed_batch(
+            model=model,
+            texts=texts,
+            timeout=timeout
+        )
+    
     async def get_available_models(self) -> List[Dict[str, str]]:
         """
         Get list of available models from LocalAI API.
@@ -166,8 +210,7 @@ class LocalAIBackend(InferenceBackend):
                         return models
                         
                 finally:
-                    if session and not session.closed:
-                        await session.close()
+                    await self.session_manager._release_session(session)
                         
         except Exception as e:
             self.logger.error(f"Error fetching LocalAI models: {e}", exc_info=True)
@@ -225,6 +268,25 @@ class LocalAIBackend(InferenceBackend):
                 }
             }
     
+    @staticmethod
+    def _schema_response_format(schema: Dict[str, Any]) -> Dict[str, Any]:
+        """OpenAI-style response_format that constrains output to a JSON schema."""
+        return {"type": "json_schema", "json_schema": {"name": "response", "strict": True, "schema": schema}}
+    
+    def _record_usage(self, result: Dict[str, Any]) -> None:
+        """Report prompt token reuse from the OpenAI-style usage block or llama.cpp timings."""
+        usage = result.get('usage') or {}
+        prompt_tokens = usage.get('prompt_tokens')
+        cached_tokens = (usage.get('prompt_tokens_details') or {}).get('cached_tokens')
+        timings = result.get('timings') or {}
+        evaluated = None
+        if prompt_tokens is not None and cached_tokens is not None:
+            evaluated = prompt_tokens - cached_tokens
+        elif 'prompt_n' in timings:
+            evaluated = timings['prompt_n']
+        eval_ms = timings.get('prompt_ms')
+        self._record_prompt_usage(prompt_tokens, evaluated, eval_ms / 1000 if eval_ms is not None else None)
+    
     async def _localai_generate(
         self,
         model: str,
@@ -272,6 +334,8 @@ class LocalAIBackend(InferenceBackend):
                         if 'top_k' in options:
                             # LocalAI may support top_k as an extension
                             payload['top_k'] = options['top_k']
+                        if options.get('json_schema'):
+                            payload['response_format'] = self._schema_response_format(options['json_schema'])
                     
                     self.logger.debug(f"LocalAI payload: {payload}")
                     
@@ -303,6 +367,7 @@ class LocalAIBackend(InferenceBackend):
                                     self.backend_name
                                 )
                             
+                            self._record_usage(result)
                             response_text = result['choices'][0].get('text', '').strip()
                             
                             if not response_text:
@@ -315,8 +380,7 @@ class LocalAIBackend(InferenceBackend):
                             return response_text
                             
                     finally:
-                        if session and not session.closed:
-                            await session.close()
+                        await self.session_manager._release_session(session)
                 
                 except Exception as e:
                     if attempt == self.max_retries - 1:
@@ -332,6 +396,34 @@ class LocalAIBackend(InferenceBackend):
         # This should never be reached due to the retry logic above
         raise BackendError("Unexpected error in LocalAI generate", self.backend_name)
     
+    def _build_chat_payload(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        top_p: float,
+        options: Optional[Dict[str, Any]],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Build an OpenAI-compatible chat request body from the chat parameters and options."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "top_p": top_p,
+            "stream": stream
+        }
+        
+        # Handle additional options
+        if options:
+            for key in ('max_tokens', 'stop', 'seed', 'frequency_penalty', 'presence_penalty', 'tools', 'tool_choice'):
+                if key in options:
+                    payload[key] = options[key]
+            if options.get('json_schema'):
+                payload['response_format'] = self._schema_response_format(options['json_schema'])
+        
+        return payload
+    
     async def _localai_chat(
         self,
         model: str,
@@ -354,31 +446,7 @@ class LocalAIBackend(InferenceBackend):
                     self.logger.debug(f"Using model: {model}")
                     self.logger.debug(f"Messages preview: {str(messages)[:200]}...")
                     
-                    # OpenAI-compatible chat request format
-                    payload = {
-                        "model": model,
-                        "messages": messages,
-                        "temperature": temperature,
-                        "top_p": top_p,
-                        "stream": False
-                    }
-                    
-                    # Handle additional options
-                    if options:
-                        if 'max_tokens' in options:
-                            payload['max_tokens'] = options['max_tokens']
-                        if 'stop' in options:
-                            payload['stop'] = options['stop']
-                        if 'seed' in options:
-                            payload['seed'] = options['seed']
-                        if 'frequency_penalty' in options:
-                            payload['frequency_penalty'] = options['frequency_penalty']
-                        if 'presence_penalty' in options:
-                            payload['presence_penalty'] = options['presence_penalty']
-                        if 'tools' in options:
-                            payload['tools'] = options['tools']
-                        if 'tool_choice' in options:
-                            payload['tool_choice'] = options['tool_choice']
+                    payload = self._build_chat_payload(model, messages, temperature, top_p, options, stream=False)
                     
                     self.logger.debug(f"LocalAI chat payload: {str(payload)[:500]}...")
                     
@@ -410,6 +478,7 @@ class LocalAIBackend(InferenceBackend):
                                     self.backend_name
                                 )
                             
+                            self._record_usage(result)
                             choice = result['choices'][0]
                             message = choice.get('message', {})
                             response_text = message.get('content', '').strip()
@@ -431,8 +500,7 @@ class LocalAIBackend(InferenceBackend):
                             return response_text
                             
                     finally:
-                        if session and not session.closed:
-                            await session.close()
+                        await self.session_manager._release_session(session)
                 
                 except Exception as e:
                     if attempt == self.max_retries - 1:
@@ -448,6 +516,83 @@ class LocalAIBackend(InferenceBackend):
         # This should never be reached due to the retry logic above
         raise BackendError("Unexpected error in LocalAI chat", self.backend_name)
     
+    async def _localai_chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from LocalAI's server-sent events.
+        
+        Failed attempts are retried only until the first fragment has been
+        yielded; after that the caller has partial output and the error is raised.
+        """
+        request_timeout = timeout or self.timeout
+        api_endpoint = f"{self._base_url}/v1/chat/completions"
+        payload = self._build_chat_payload(model, messages, temperature, top_p, options, stream=True)
+        
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                fragments = 0
+                try:
+                    self.logger.debug(f"LocalAI streaming chat request to {api_endpoint} (attempt {attempt + 1})")
+                    start_time = time.time()
+                    session = await self.session_manager._get_session()
+                    
+                    try:
+                        async with session.post(
+                            api_endpoint,
+                            json=payload,
+                            timeout=aiohttp.ClientTimeout(total=None, sock_read=request_timeout)
+                        ) as response:
+                            if response.status != 200:
+                                error_text = await response.text()
+                                self.logger.error(f"LocalAI chat API error: {response.status} - {error_text}")
+                                raise BackendError(
+                                    f"LocalAI chat API returned status {response.status}",
+                                    self.backend_name,
+                                    error_code=f"HTTP_{response.status}"
+                                )
+                            
+                            async for line in response.content:
+                                line = line.strip()
+                                if not line.startswith(b"data:"):
+                                    continue
+                                data = line[5:].strip()
+                                if data == b"[DONE]":
+                                    break
+                                
+                                choices = json.loads(data).get('choices') or []
+                                content = (choices[0].get('delta') or {}).get('content') if choices else None
+                                if content:
+                                    fragments += 1
+                                    yield content
+                            
+                            if not fragments:
+                                raise BackendError(
+                                    "Empty response from LocalAI chat API",
+                                    self.backend_name
+                                )
+                            
+                            self.logger.debug(f"Streamed {fragments} chat fragments in {time.time() - start_time:.2f}s")
+                            return
+                            
+                    finally:
+                        await self.session_manager._release_session(session)
+                
+                except Exception as e:
+                    if fragments or attempt == self.max_retries - 1:
+                        self.logger.error(f"LocalAI chat stream failed after {attempt + 1} attempts: {e}")
+                        raise translate_http_error(e, self.backend_name, "chat", request_timeout)
+                    else:
+                        wait_time = 2 ** attempt
+                        self.logger.warning(f"LocalAI chat stream attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                        await asyncio.sleep(wait_time)
+    
     async def _localai_embed(
         self,
         model: str,
@@ -531,8 +676,7 @@ class LocalAIBackend(InferenceBackend):
                             return embedding
                             
                     finally:
-                        if session and not session.closed:
-                            await session.close()
+                        await self.session_manager._release_session(session)
                 
                 except Exception as e:
                     if attempt == self.max_retries - 1:
@@ -546,4 +690,92 @@ class LocalAIBackend(InferenceBackend):
                         await asyncio.sleep(wait_time)
         
         # This should never be reached due to the retry logic above
-        raise BackendError("Unexpected error in LocalAI embed", self.backend_name)
\ No newline at end of file
+        raise BackendError("Unexpected error in LocalAI embed", self.backend_name)
+    
+    async def _localai_embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Implementation of LocalAI batch embedding generation using OpenAI-compatible API.
+        """
+        if not texts:
+            return []
+        
+        request_timeout = timeout or self.timeout
+        
+        async with self._semaphore:
+            for attempt in range(self.max_retries):
+                try:
+                    if any(not text or not text.strip() for text in texts):
+                        raise BackendError(
+                            "Cannot generate embedding for empty or whitespace-only content",
+                            self.backend_name
+                        )
+                    
+                    api_endpoint = f"{self._base_url}/v1/embeddings"
+                    self.logger.debug(f"LocalAI batch embed request to {api_endpoint} "
+                                      f"({len(texts)} inputs, attempt {attempt + 1})")
+                    
+                    payload = {
+                        "model": model,
+                        "input": texts
+                    }
+                    
+                    start_time = time.time()
+                    session = await self.session_manager._get_session()
+                    
+                    try:
+                        async with session.post(
+                            api_endpoint,
+                            json=payload,
+                            timeout=request_timeout
+                        ) as response:
+                            if response.status != 200:
+                                error_text = await response.text()
+                                self.logger.error(f"LocalAI batch embedding API error: {response.status} - {error_text}")
+                                raise BackendError(
+                                    f"LocalAI embedding API returned status {response.status}",
+                                    self.backend_name,
+                                    error_code=f"HTTP_{response.status}"
+                                )
+                            
+                            result = await response.json()
+                            elapsed = time.time() - start_time
+                            
+                            data = result.get('data') or []
+                            if len(data) != len(texts):
+                                raise BackendError(
+                                    f"LocalAI embedding API returned {len(data)} embeddings for {len(texts)} inputs",
+                                    self.backend_name
+                                )
+                            
+                            # OpenAI-compatible responses carry an index per input; honour it
+                            ordered = sorted(data, key=lambda item: item.get('index', 0))
+                            embeddings = [item.get('embedding', []) for item in ordered]
+                            
+                            for embedding in embeddings:
+                                if not embedding or len(embedding) < 100:
+                                    raise BackendError(
+                                        f"LocalAI returned invalid embedding of dimension {len(embedding) if embedding else 0}",
+                                        self.backend_name
+                                    )
+                            
+                            self.logger.debug(f"Received {len(embeddings)} embeddings in {elapsed:.2f}s")
+                            return embeddings
+                            
+                    finally:
+                        await self.session_manager._release_session(session)
+                
+                except Exception as e:
+                    if attempt == self.max_retries - 1:
+                        self.logger.error(f"LocalAI batch embed failed after {self.max_retries} attempts: {e}")
+                        raise translate_http_error(e, self.backend_name, "embed_batch", request_timeout)
+                    else:
+                        wait_time = 2 ** attempt
+                        self.logger.warning(f"LocalAI batch embed attempt {attempt + 1} failed, retrying in {wait_time}s: {e}")
+                        await asyncio.sleep(wait_time)
+        
+        raise BackendError("Unexpected error in LocalAI batch embed", self.backend_name)
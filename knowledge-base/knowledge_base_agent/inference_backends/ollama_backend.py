@@ -8,7 +8,8 @@ Ollama functionality in the new backend interface for consistency.
 import logging
 import time
 import asyncio
-from typing import List, Dict, Any, Optional
+import json
+from typing import List, Dict, Any, Optional, AsyncIterator
 import aiohttp
 
 from .base import InferenceBackend
@@ -113,6 +114,31 @@ class OllamaBackend(InferenceBackend):
             options=options
         )
     
+    async def chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from the Ollama API.
+        
+        Uses /api/chat with stream enabled and yields each message fragment
+        as Ollama produces it.
+        """
+        async for fragment in self._ollama_chat_stream(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            top_p=top_p,
+            timeout=timeout,
+            options=options
+        ):
+            yield fragment
+    
     async def embed(
         self,
         model: str,
@@ -131,6 +157,24 @@ class OllamaBackend(InferenceBackend):
             timeout=timeout
         )
     
+    async def embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for several texts with a single Ollama request.
+        
+        Ollama's /api/embed endpoint accepts a list as 'input' and returns
+        one embedding per input in the same order.
+        """
+        return await self._ollama_embed_batch(
+            model=model,
+            texts=texts,
+            timeout=timeout
+        )
+    
     async def get_available_models(self) -> List[Dict[str, str]]:
         """
         Get list of available models from Ollama API.
@@ -171,8 +215,7 @@ class OllamaBackend(InferenceBackend):
                         return models
                         
                 finally:
-                    if session and not session.closed:
-                        await session.close()
+                    await self.session_manager._release_session(session)
                         
         except Exception as e:
             self.logger.error(f"Error fetching Ollama models: {e}", exc_info=True)
@@ -278,6 +321,11 @@ class OllamaBackend(InferenceBackend):
                         else:
                             self.logger.warning(f"JSON mode requested for Ollama model {model}, but not enabled in config (ollama_supports_json_mode=False). Sending as plain text.")
                     
+                    # A JSON schema constrains decoding to exactly the requested fields; unlike
+                    # plain JSON mode, structured outputs need no opt-in from the config
+                    if options.get("json_schema"):
+                        payload["format"] = options["json_schema"]
+                    
                     # Add standard Ollama parameters
                     standard_params = [
                         'seed', 'stop', 'num_keep', 'num_ctx', 'num_batch', 'num_gpu', 'main_gpu',
@@ -333,24 +381,86 @@ class OllamaBackend(InferenceBackend):
                         
                         response_text = result.get("response", "").strip()
                         if not response_text:
-                            if payload.get("format") == "json":
+                            if payload.get("format"):
                                  self.logger.error(f"Ollama API returned empty 'response' field in JSON mode. Full result: {result}")
                                  raise BackendError("Empty 'response' field from Ollama API in JSON mode.", self.backend_name)
                             else:
                                  raise BackendError("Empty response from Ollama API", self.backend_name)
                         
-                        self.logger.debug(f"Received response of length: {len(response_text)} in {elapsed:.2f}s. Model: {model}. JSON mode: {payload.get('format') == 'json'}")
+                        self.logger.debug(f"Received response of length: {len(response_text)} in {elapsed:.2f}s. Model: {model}. JSON mode: {bool(payload.get('format'))}")
+                        
+                        # context holds the prompt and output tokens; prompt_eval_count only the
+                        # prompt tokens past the prefix reused from the KV cache (omitted when 0)
+                        evaluated = result.get("prompt_eval_count", 0)
+                        prompt_tokens = len(result["context"]) - result.get("eval_count", 0) if result.get("context") else None
+                        self._record_prompt_usage(prompt_tokens, evaluated, result.get("prompt_eval_duration", 0) / 1e9)
                         
                         return response_text
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self.session_manager._release_session(session)
                     
             except Exception as e:
                 self.logger.error(f"Error in ollama_generate with model {model}: {str(e)}", exc_info=True)
                 raise translate_http_error(e, self.backend_name, "generate", request_timeout)
     
+    def _build_chat_payload(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        top_p: float,
+        options: Optional[Dict[str, Any]],
+        stream: bool
+    ) -> Dict[str, Any]:
+        """Build an Ollama /api/chat request body from the chat parameters and options."""
+        payload = {
+            "model": model,
+            "messages": messages,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "top_p": top_p
+            }
+        }
+
+        # Add options from the function parameters
+        if options:
+            # Handle JSON mode if enabled
+            if options.get("json_mode") is True:
+                if hasattr(self.config, 'ollama_supports_json_mode') and self.config.ollama_supports_json_mode:
+                    payload["format"] = "json"
+                    self.logger.info(f"Ollama JSON mode enabled for chat with model {model}")
+                else:
+                    self.logger.warning(f"JSON mode requested for Ollama chat model {model}, but not enabled in config")
+            
+            if options.get("json_schema"):
+                payload["format"] = options["json_schema"]
+            
+            # Handle tools for function calling
+            if "tools" in options:
+                payload["tools"] = options["tools"]
+                self.logger.debug(f"Added {len(options['tools'])} tools to chat request")
+            
+            # Add standard Ollama parameters to options
+            standard_params = [
+                'seed', 'num_keep', 'num_ctx', 'num_batch', 'num_gpu', 'main_gpu',
+                'low_vram', 'vocab_only', 'use_mmap', 'use_mlock', 'num_thread', 'repeat_last_n',
+                'repeat_penalty', 'presence_penalty', 'frequency_penalty', 'mirostat', 
+                'mirostat_tau', 'mirostat_eta', 'penalize_newline', 'tfs_z', 'typical_p',
+                'top_k', 'min_p', 'stop', 'num_predict'
+            ]
+            
+            for param in standard_params:
+                if param in options:
+                    payload["options"][param] = options[param]
+            
+            # Handle top-level parameters
+            if "keep_alive" in options:
+                payload["keep_alive"] = options["keep_alive"]
+        
+        return payload
+    
     async def _ollama_chat(
         self,
         model: str,
@@ -374,48 +484,7 @@ class OllamaBackend(InferenceBackend):
                 self.logger.debug(f"Using model: {model}")
                 self.logger.debug(f"Messages preview: {str(messages)[:200]}...")
 
-                payload = {
-                    "model": model,
-                    "messages": messages,
-                    "stream": False,
-                    "options": {
-                        "temperature": temperature,
-                        "top_p": top_p
-                    }
-                }
-
-                # Add options from the function parameters
-                if options:
-                    # Handle JSON mode if enabled
-                    if options.get("json_mode") is True:
-                        if hasattr(self.config, 'ollama_supports_json_mode') and self.config.ollama_supports_json_mode:
-                            payload["format"] = "json"
-                            self.logger.info(f"Ollama JSON mode enabled for chat with model {model}")
-                        else:
-                            self.logger.warning(f"JSON mode requested for Ollama chat model {model}, but not enabled in config")
-                    
-                    # Handle tools for function calling
-                    if "tools" in options:
-                        payload["tools"] = options["tools"]
-                        # Tools require stream=false, which we already set
-                        self.logger.debug(f"Added {len(options['tools'])} tools to chat request")
-                    
-                    # Add standard Ollama parameters to options
-                    standard_params = [
-                        'seed', 'num_keep', 'num_ctx', 'num_batch', 'num_gpu', 'main_gpu',
-                        'low_vram', 'vocab_only', 'use_mmap', 'use_mlock', 'num_thread', 'repeat_last_n',
-                        'repeat_penalty', 'presence_penalty', 'frequency_penalty', 'mirostat', 
-                        'mirostat_tau', 'mirostat_eta', 'penalize_newline', 'tfs_z', 'typical_p',
-                        'top_k', 'min_p', 'stop', 'num_predict'
-                    ]
-                    
-                    for param in standard_params:
-                        if param in options:
-                            payload["options"][param] = options[param]
-                    
-                    # Handle top-level parameters
-                    if "keep_alive" in options:
-                        payload["keep_alive"] = options["keep_alive"]
+                payload = self._build_chat_payload(model, messages, temperature, top_p, options, stream=False)
                 
                 # Log the complete payload for debugging
                 self.logger.debug(f"Complete Ollama chat payload: {str(payload)[:500]}...")
@@ -442,6 +511,9 @@ class OllamaBackend(InferenceBackend):
                             self.logger.error(f"Ollama chat API returned unexpected response format: {result}")
                             raise BackendError("Unexpected response format from Ollama chat API", self.backend_name)
                         
+                        # The chat API does not report the full prompt length, only the evaluated part
+                        self._record_prompt_usage(None, result.get("prompt_eval_count", 0), result.get("prompt_eval_duration", 0) / 1e9)
+                        
                         response_message = result.get("message", {})
                         
                         # Handle tool calls if present
@@ -465,14 +537,76 @@ class OllamaBackend(InferenceBackend):
                         
                         return response_text
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self.session_manager._release_session(session)
                     
             except Exception as e:
                 self.logger.error(f"Error in ollama_chat with model {model}: {str(e)}", exc_info=True)
                 raise translate_http_error(e, self.backend_name, "chat", request_timeout)
     
+    async def _ollama_chat_stream(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float = 0.7,
+        top_p: float = 0.9,
+        timeout: Optional[int] = None,
+        options: Optional[Dict[str, Any]] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream a chat completion from Ollama's newline-delimited JSON response.
+        
+        The request timeout bounds the wait between fragments rather than the
+        whole generation, so long answers are not cut off while tokens flow.
+        """
+        request_timeout = timeout or self.timeout
+        
+        async with self._semaphore:
+            try:
+                api_endpoint = f"{self._base_url}/api/chat"
+                payload = self._build_chat_payload(model, messages, temperature, top_p, options, stream=True)
+                self.logger.debug(f"Sending streaming Ollama chat request to {api_endpoint} with model {model}")
+                
+                start_time = time.time()
+                fragments = 0
+                session = await self.session_manager._get_session()
+                try:
+                    async with session.post(
+                        api_endpoint,
+                        json=payload,
+                        timeout=aiohttp.ClientTimeout(total=None, sock_read=request_timeout)
+                    ) as response:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            self.logger.error(f"Ollama chat API error: {response.status} - {error_text}")
+                            raise BackendError(f"Ollama chat API returned status {response.status}", self.backend_name)
+                        
+                        async for line in response.content:
+                            line = line.strip()
+                            if not line:
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("error"):
+                                raise BackendError(f"Ollama chat stream failed: {chunk['error']}", self.backend_name)
+                            
+                            content = (chunk.get("message") or {}).get("content", "")
+                            if content:
+                                fragments += 1
+                                yield content
+                            if chunk.get("done"):
+                                break
+                        
+                        if not fragments:
+                            raise BackendError("Empty response from Ollama chat API", self.backend_name)
+                        
+                        self.logger.debug(f"Streamed {fragments} chat fragments in {time.time() - start_time:.2f}s. Model: {model}")
+                finally:
+                    await self.session_manager._release_session(session)
+                    
+            except Exception as e:
+                self.logger.error(f"Error in ollama_chat_stream with model {model}: {str(e)}", exc_info=True)
+                raise translate_http_error(e, self.backend_name, "chat", request_timeout)
+    
     async def _ollama_embed(
         self,
         model: str,
@@ -548,10 +682,74 @@ class OllamaBackend(InferenceBackend):
                         self.logger.debug(f"Received embedding of dimension {len(embedding)} in {elapsed:.2f}s. Model: {model}")
                         return embedding
                 finally:
-                    # Always close the session
-                    if session and not session.closed:
-                        await session.close()
+                    # Return the session to the pool
+                    await self.session_manager._release_session(session)
 
             except Exception as e:
                 self.logger.error(f"Error in ollama_embed with model {model}: {str(e)}", exc_info=True)
-                raise translate_http_error(e, self.backend_name, "embed", request_timeout)
\ No newline at end of file
+                raise translate_http_error(e, self.backend_name, "embed", request_timeout)
+    
+    async def _ollama_embed_batch(
+        self,
+        model: str,
+        texts: List[str],
+        timeout: Optional[int] = None
+    ) -> List[List[float]]:
+        """
+        Generate embeddings for a list of inputs using Ollama's /api/embed endpoint.
+        """
+        if not texts:
+            return []
+        
+        request_timeout = timeout or self.timeout
+        async with self._semaphore:
+            try:
+                if any(not text or not text.strip() for text in texts):
+                    raise BackendError("Cannot generate embedding for empty or whitespace-only content", self.backend_name)
+                
+                api_endpoint = f"{self._base_url}/api/embed"
+                total_chars = sum(len(text) for text in texts)
+                self.logger.debug(f"Sending Ollama batch embedding request to {api_endpoint} for model {model} "
+                                  f"({len(texts)} inputs, {total_chars} chars)")
+                
+                payload = {
+                    "model": model,
+                    "input": texts
+                }
+                
+                start_time = time.time()
+                session = await self.session_manager._get_session()
+                try:
+                    async with session.post(
+                        api_endpoint,
+                        json=payload,
+                        timeout=request_timeout
+                    ) as response:
+                        if response.status != 200:
+                            error_text = await response.text()
+                            self.logger.error(f"Ollama batch embedding API error: {response.status} - {error_text}")
+                            raise BackendError(f"Ollama embedding API returned status {response.status}: {error_text}", self.backend_name)
+                        
+                        result = await response.json()
+                        elapsed = time.time() - start_time
+                        
+                        embeddings = result.get("embeddings")
+                        if not isinstance(embeddings, list) or len(embeddings) != len(texts):
+                            received = len(embeddings) if isinstance(embeddings, list) else type(embeddings)
+                            self.logger.error(f"Ollama API returned {received} embeddings for {len(texts)} inputs")
+                            raise BackendError(f"Ollama API returned {received} embeddings for {len(texts)} inputs", self.backend_name)
+                        
+                        for embedding in embeddings:
+                            if not isinstance(embedding, list) or len(embedding) == 0:
+                                raise BackendError("Ollama API returned an empty or non-list embedding in batch", self.backend_name)
+                        
+                        self.logger.debug(f"Received {len(embeddings)} embeddings of dimension {len(embeddings[0])} "
+                                          f"in {elapsed:.2f}s. Model: {model}")
+                        return embeddings
+                finally:
+                    # Return the session to the pool
+                    await self.session_manager._release_session(session)
+            
+            except Exception as e:
+                self.logger.error(f"Error in ollama_embed_batch with model {model}: {str(e)}", exc_info=True)
+                raise translate_http_error(e, self.backend_name, "embed_batch", request_timeout)
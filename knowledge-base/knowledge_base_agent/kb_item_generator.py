@@ -18,6 +18,7 @@ from knowledge_base_agent.naming_utils import normalize_name_for_filesystem
 from knowledge_base_agent.exceptions import AIError
 import re # Import re for the new extraction function
 from knowledge_base_agent.prompts_replacement import LLMPrompts, ReasoningPrompts # Using JSON prompt system
+from knowledge_base_agent.prompt_prefix import assemble_message, assemble_prompt, mark_item_value
 
 def _extract_json_from_text(text: str) -> Optional[str]:
     """
@@ -81,8 +82,11 @@ async def _generate_kb_content_json(
     config: Config
 ) -> Dict[str, Any]:
     """Generates knowledge base content as a structured JSON object from tweet data."""
-    # Use the centralized prompt for the standard path
-    prompt = LLMPrompts.get_kb_item_generation_prompt_standard(context_data)
+    # Use the centralized prompt for the standard path; the per-tweet fields are
+    # moved behind the fixed instructions and schema so that prefix stays cached
+    prompt = assemble_prompt(LLMPrompts.get_kb_item_generation_prompt_standard(
+        {key: mark_item_value(value) for key, value in context_data.items()}
+    ))
     
     # Check if the model supports reasoning mode
     use_reasoning = hasattr(config, 'text_model_thinking') and config.text_model_thinking
@@ -106,7 +110,11 @@ async def _generate_kb_content_json(
         
         messages = [
             ReasoningPrompts.get_system_message(),
-            ReasoningPrompts.get_kb_item_generation_prompt(tweet_text, categories, media_descriptions)
+            assemble_message(ReasoningPrompts.get_kb_item_generation_prompt(
+                mark_item_value(tweet_text),
+                {key: mark_item_value(value) for key, value in categories.items()},
+                mark_item_value(media_descriptions)
+            ))
         ]
         
         current_model = config.get_model_for_backend('text')
@@ -134,7 +142,8 @@ async def _generate_kb_content_json(
                     model=model_to_use,
                     messages=messages,
                     temperature=0.2,
-                    timeout=config.content_generation_timeout # Using the configured timeout
+                    timeout=config.content_generation_timeout, # Using the configured timeout
+                    cache_phase="kb_item"
                 )
 
                 if not raw_response_text:
@@ -239,7 +248,8 @@ async def _generate_kb_content_json(
                         prompt=prompt,
                         temperature=0.2, 
                         options={"json_mode": True},
-                        timeout=config.content_generation_timeout # Using the configured timeout
+                        timeout=config.content_generation_timeout, # Using the configured timeout
+                        cache_phase="kb_item"
                     )
 
                     if not raw_response_text:
@@ -500,8 +510,8 @@ async def create_knowledge_base_item(
         logging.debug(f"KB_ITEM_GEN ({tweet_id}): Raw JSON from LLM: {json.dumps(kb_content_json, indent=2)}")
 
         markdown_content = _convert_kb_json_to_markdown(kb_content_json)
-        display_title = kb_content_json.get("suggested_title", ai_generated_item_name).strip()
-        if not display_title: display_title = ai_generated_item_name
+        display_title = (kb_content_json.get("suggested_title") or "").strip()
+        if not display_title: display_title = tweet_data.get("display_title") or ai_generated_item_name
 
         meta_description = kb_content_json.get("meta_description", "").strip()
         # Fallback for meta_description using the first text segment if it's a thread, or full_text if single
@@ -0,0 +1,280 @@
+"""
+Knowledge Base Table of Contents
+
+The KB UI loads the table of contents (id, title and category of every KB
+item and synthesis) on every page load. This module keeps that TOC in memory
+as a serialized, pre-gzipped JSON document with a strong ETag, built from a
+column projection instead of full ORM rows.
+
+The TOC is patched in place when KB items or syntheses are created, renamed,
+recategorized or deleted through a committed session, and for rows written by
+UnifiedStateManager's bulk path. A version counter in Redis tells other
+processes (the web server when the Celery worker writes) to reload. When Redis
+is unreachable the TOC is reloaded every ``kb_toc_refresh_seconds`` instead.
+"""
+
+import gzip
+import hashlib
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import redis
+from sqlalchemy import event, inspect as sa_inspect
+from sqlalchemy.orm import Session
+
+from .config import Config
+from .models import db, UnifiedTweet, SubcategorySynthesis
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'kb_toc:version'
+
+# Attributes whose change alters an entry of the TOC
+ITEM_TOC_FIELDS = ('tweet_id', 'kb_display_title', 'kb_item_name', 'main_category', 'sub_category',
+                   'kb_item_created', 'markdown_content')
+SYNTHESIS_TOC_FIELDS = ('synthesis_title', 'main_category', 'sub_category')
+
+_SESSION_CHANGES_KEY = 'kb_toc_changes'
+
+
+def _item_entry(row) -> Dict[str, Any]:
+    return {
+        'id': row.id,
+        'title': row.kb_display_title or row.kb_item_name or f'Tweet {row.tweet_id}',
+        'display_title': row.kb_display_title,
+        'main_category': row.main_category,
+        'sub_category': row.sub_category
+    }
+
+
+def _synthesis_entry(row) -> Dict[str, Any]:
+    return {
+        'id': row.id, 'synthesis_title': row.synthesis_title,
+        'main_category': row.main_category, 'sub_category': row.sub_category
+    }
+
+
+def _sort_key(*values: Optional[str]) -> Tuple:
+    # Same order as ORDER BY ... ASC on PostgreSQL, where NULLs sort last
+    return tuple((value is None, value or '') for value in values)
+
+
+class KnowledgeBaseTOC:
+    """Versioned in-memory TOC of KB items and syntheses."""
+
+    def __init__(self, config: Optional[Config] = None):
+        self.refresh_seconds = getattr(config, 'kb_toc_refresh_seconds', 60.0)
+        self._redis_url = getattr(config, 'redis_progress_url', None)
+        self._redis: Optional[redis.Redis] = None
+        self._lock = threading.RLock()
+
+        self._items: Optional[Dict[int, Dict[str, Any]]] = None
+        self._syntheses: Dict[int, Dict[str, Any]] = {}
+        self._stale_item_ids: set = set()
+        self._shared_version: Optional[int] = None
+        self._loaded_at = 0.0
+
+        # Serialized document: (etag, json body, gzipped body)
+        self._document: Optional[Tuple[str, bytes, bytes]] = None
+        self.stats = {"full_loads": 0, "patches": 0, "builds": 0}
+
+    def snapshot(self) -> Tuple[str, bytes, bytes]:
+        """
+        Get the current TOC document.
+
+        Returns:
+            Tuple of (etag, JSON body, gzip-compressed JSON body)
+        """
+        with self._lock:
+            shared_version = self._read_shared_version()
+            if self._items is None or self._needs_reload(shared_version):
+                self._load()
+                self._shared_version = shared_version
+            if self._stale_item_ids:
+                self._reload_items(self._stale_item_ids)
+                self._stale_item_ids = set()
+            if self._document is None:
+                self._document = self._build()
+            return self._document
+
+    def apply_changes(self, items: Dict[int, Optional[Dict[str, Any]]],
+                      syntheses: Dict[int, Optional[Dict[str, Any]]]) -> None:
+        """
+        Patch committed changes into the TOC and notify other processes.
+
+        Args:
+            items: KB item entries by id; None removes the item
+            syntheses: Synthesis entries by id; None removes the synthesis
+        """
+        if not items and not syntheses:
+            return
+        with self._lock:
+            if self._items is not None:
+                for target, changes in ((self._items, items), (self._syntheses, syntheses)):
+                    for row_id, entry in changes.items():
+                        if entry is None:
+                            target.pop(row_id, None)
+                        else:
+                            target[row_id] = entry
+                self._document = None
+                self.stats["patches"] += 1
+            self._bump_shared_version()
+
+    def mark_items_stale(self, item_ids: Iterable[int]) -> None:
+        """Re-read the given KB items on the next snapshot (for writes that bypass ORM events)."""
+        item_ids = set(item_ids)
+        if not item_ids:
+            return
+        with self._lock:
+            if self._items is not None:
+                self._stale_item_ids.update(item_ids)
+                self._document = None
+            self._bump_shared_version()
+
+    def invalidate(self) -> None:
+        """Drop the TOC so the next snapshot reloads it."""
+        with self._lock:
+            self._items = None
+            self._document = None
+            self._bump_shared_version()
+
+    def _needs_reload(self, shared_version: Optional[int]) -> bool:
+        if shared_version is None:
+            return time.monotonic() - self._loaded_at > self.refresh_seconds
+        return shared_version != self._shared_version
+
+    def _item_query(self):
+        # Projection only: markdown_content and the JSON columns are never loaded
+        return db.session.query(
+            UnifiedTweet.id, UnifiedTweet.tweet_id, UnifiedTweet.kb_display_title,
+            UnifiedTweet.kb_item_name, UnifiedTweet.main_category, UnifiedTweet.sub_category
+        ).filter(
+            UnifiedTweet.kb_item_created == True,
+            UnifiedTweet.markdown_content.isnot(None)
+        )
+
+    def _load(self) -> None:
+        self._items = {row.id: _item_entry(row) for row in self._item_query().all()}
+        self._syntheses = {row.id: _synthesis_entry(row) for row in db.session.query(
+            SubcategorySynthesis.id, SubcategorySynthesis.synthesis_title,
+            SubcategorySynthesis.main_category, SubcategorySynthesis.sub_category
+        ).all()}
+        self._stale_item_ids = set()
+        self._document = None
+        self._loaded_at = time.monotonic()
+        self.stats["full_loads"] += 1
+
+    def _reload_items(self, item_ids: set) -> None:
+        rows = self._item_query().filter(UnifiedTweet.id.in_(list(item_ids))).all()
+        found = {row.id: _item_entry(row) for row in rows}
+        for row_id in item_ids:
+            if row_id in found:
+                self._items[row_id] = found[row_id]
+            else:
+                self._items.pop(row_id, None)
+        self._document = None
+
+    def _build(self) -> Tuple[str, bytes, bytes]:
+        items = sorted(self._items.values(),
+                       key=lambda e: _sort_key(e['main_category'], e['sub_category'], e['display_title']))
+        syntheses = sorted(self._syntheses.values(),
+                           key=lambda e: _sort_key(e['main_category'], e['sub_category']))
+        body = json.dumps({'items': items, 'syntheses': syntheses}, separators=(',', ':')).encode('utf-8')
+        etag = hashlib.sha256(body).hexdigest()[:32]
+        # mtime=0 keeps the compressed bytes stable for the same body
+        compressed = gzip.compress(body, compresslevel=6, mtime=0)
+        self.stats["builds"] += 1
+        return etag, body, compressed
+
+    def _client(self) -> Optional[redis.Redis]:
+        if self._redis is None and self._redis_url:
+            self._redis = redis.Redis.from_url(self._redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        return self._redis
+
+    def _read_shared_version(self) -> Optional[int]:
+        try:
+            client = self._client()
+            if client is None:
+                return None
+            return int(client.get(VERSION_KEY) or 0)
+        except redis.RedisError as e:
+            logger.debug(f"KB TOC version unavailable, using refresh interval: {e}")
+            return None
+
+    def _bump_shared_version(self) -> None:
+        try:
+            client = self._client()
+            if client is None:
+                return
+            new_version = client.incr(VERSION_KEY)
+            # Our own change is already applied; anything else since the last read forces a reload
+            if self._shared_version is not None and new_version == self._shared_version + 1:
+                self._shared_version = new_version
+        except redis.RedisError as e:
+            logger.debug(f"Could not publish KB TOC version: {e}")
+
+
+def _toc_entries(session: Session) -> Tuple[Dict[int, Optional[Dict[str, Any]]], Dict[int, Optional[Dict[str, Any]]]]:
+    return session.info.setdefault(_SESSION_CHANGES_KEY, ({}, {}))
+
+
+def _changed(obj, fields: Tuple[str, ...]) -> bool:
+    state = sa_inspect(obj)
+    return any(state.attrs[field].history.has_changes() for field in fields)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_toc_changes(session: Session, flush_context) -> None:
+    """Record TOC-relevant changes of the flush until the transaction commits."""
+    items, syntheses = None, None
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, (UnifiedTweet, SubcategorySynthesis)):
+            continue
+        if items is None:
+            items, syntheses = _toc_entries(session)
+        deleted = obj in session.deleted
+        if isinstance(obj, UnifiedTweet):
+            if deleted:
+                items[obj.id] = None
+            elif obj in session.new or _changed(obj, ITEM_TOC_FIELDS):
+                items[obj.id] = (_item_entry(obj)
+                                 if obj.kb_item_created and obj.markdown_content is not None else None)
+        else:
+            if deleted:
+                syntheses[obj.id] = None
+            elif obj in session.new or _changed(obj, SYNTHESIS_TOC_FIELDS):
+                syntheses[obj.id] = _synthesis_entry(obj)
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_toc_changes(session: Session) -> None:
+    changes = session.info.pop(_SESSION_CHANGES_KEY, None)
+    if changes:
+        # Without a loaded TOC (e.g. in the worker) this only notifies other processes
+        get_kb_toc().apply_changes(*changes)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_toc_changes(session: Session) -> None:
+    session.info.pop(_SESSION_CHANGES_KEY, None)
+
+
+_kb_toc: Optional[KnowledgeBaseTOC] = None
+_kb_toc_lock = threading.Lock()
+
+
+def get_kb_toc(config: Optional[Config] = None) -> KnowledgeBaseTOC:
+    """Return the process-wide KB TOC, creating it on first use."""
+    global _kb_toc
+    with _kb_toc_lock:
+        if _kb_toc is None:
+            if config is None:
+                try:
+                    config = Config.from_env()
+                except Exception as e:
+                    logger.warning(f"KB TOC running without config, using refresh interval only: {e}")
+            _kb_toc = KnowledgeBaseTOC(config)
+        return _kb_toc
@@ -0,0 +1,268 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for LLM completions. A response is stored under the
+sha256 of (request kind, model, prompt or messages, sampling parameters and
+options), so an identical request from a later run, a forced re-run or a
+restart after a crash is answered without calling the model again.
+
+Two tiers are used: a bounded in-process LRU in front of the
+``llm_response_cache`` database table (SQLite or PostgreSQL, whichever the app
+uses). Database entries expire after a TTL and the table is pruned to a
+maximum size by least recent use.
+
+The tiers are shared by the whole process. Each HTTPClient gets its own
+LLMResponseCache view, which never answers the same key twice: callers retry
+identical requests when a response fails validation, and those retries must
+reach the model.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from .config import Config
+from .models import db, LLMResponseCacheEntry
+
+logger = logging.getLogger(__name__)
+
+# Options that affect routing or transport but not the generated text
+NON_SEMANTIC_OPTIONS = {'gpu_device', 'keep_alive'}
+
+# Prune the database table after this many stores
+PRUNE_EVERY_STORES = 100
+
+
+def make_cache_key(kind: str, model: str, payload: Any, params: Dict[str, Any]) -> str:
+    """
+    Build the cache key for one LLM request.
+
+    Args:
+        kind: Request type ('generate' or 'chat')
+        model: Model name
+        payload: Rendered prompt string or chat messages list
+        params: Sampling parameters and backend options
+
+    Returns:
+        Hex sha256 digest
+    """
+    material = {
+        'kind': kind,
+        'model': model,
+        'payload': payload,
+        'params': {key: value for key, value in params.items() if key not in NON_SEMANTIC_OPTIONS and value is not None},
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+_shared_store: Optional["_ResponseStore"] = None
+_shared_store_lock = threading.Lock()
+
+
+class _ResponseStore:
+    """The two storage tiers, shared by every LLMResponseCache in the process."""
+
+    def __init__(self, config: Config):
+        self.memory_entries = max(0, getattr(config, 'llm_cache_memory_entries', 512))
+        self.max_entries = max(1, getattr(config, 'llm_cache_max_entries', 20000))
+        self.ttl = timedelta(hours=getattr(config, 'llm_cache_ttl_hours', 720))
+
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._table_ready = False
+        self._stores_since_prune = 0
+
+    def lookup(self, key: str) -> Tuple[Optional[str], Optional[str]]:
+        """Return (response, tier) where tier is 'memory' or 'database', or (None, None)."""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                response, stored_at = cached
+                if time.monotonic() - stored_at <= self.ttl.total_seconds():
+                    self._memory.move_to_end(key)
+                    return response, 'memory'
+                del self._memory[key]
+
+        response = self._get_persistent(key)
+        if response is None:
+            return None, None
+        with self._lock:
+            self._remember(key, response)
+        return response, 'database'
+
+    def store(self, key: str, phase: str, model: str, response: str) -> None:
+        with self._lock:
+            self._remember(key, response)
+        self._put_persistent(key, phase, model, response)
+
+    def _remember(self, key: str, response: str) -> None:
+        if not self.memory_entries:
+            return
+        self._memory[key] = (response, time.monotonic())
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _open_session(self) -> Session:
+        """Open a session of our own so cache commits never flush the caller's work."""
+        session = Session(db.engine)
+        if not self._table_ready:
+            LLMResponseCacheEntry.__table__.create(session.get_bind(), checkfirst=True)
+            self._table_ready = True
+        return session
+
+    def _get_persistent(self, key: str) -> Optional[str]:
+        try:
+            with self._open_session() as session:
+                entry = session.query(LLMResponseCacheEntry).filter_by(cache_key=key).first()
+                if entry is None:
+                    return None
+                now = datetime.now(timezone.utc)
+                created_at = entry.created_at if entry.created_at.tzinfo else entry.created_at.replace(tzinfo=timezone.utc)
+                if now - created_at > self.ttl:
+                    session.delete(entry)
+                    session.commit()
+                    return None
+                entry.last_used_at = now
+                entry.hit_count = (entry.hit_count or 0) + 1
+                response = entry.response
+                session.commit()
+                return response
+        except Exception as e:
+            logger.debug(f"LLM response cache lookup skipped database tier: {e}")
+            return None
+
+    def _put_persistent(self, key: str, phase: str, model: str, response: str) -> None:
+        try:
+            with self._open_session() as session:
+                now = datetime.now(timezone.utc)
+                entry = session.query(LLMResponseCacheEntry).filter_by(cache_key=key).first()
+                if entry is None:
+                    entry = LLMResponseCacheEntry(cache_key=key, phase=phase, model=model, hit_count=0)
+                    session.add(entry)
+                entry.response = response
+                entry.created_at = now
+                entry.last_used_at = now
+                session.commit()
+
+                self._stores_since_prune += 1
+                if self._stores_since_prune >= PRUNE_EVERY_STORES:
+                    self._stores_since_prune = 0
+                    self._prune(session)
+        except Exception as e:
+            logger.debug(f"LLM response cache store skipped database tier: {e}")
+
+    def _prune(self, session: Session) -> int:
+        """Delete expired entries and the least recently used ones beyond max_entries."""
+        cutoff = datetime.now(timezone.utc) - self.ttl
+        removed = session.query(LLMResponseCacheEntry).filter(
+            LLMResponseCacheEntry.created_at < cutoff
+        ).delete(synchronize_session=False)
+
+        excess = (session.query(func.count(LLMResponseCacheEntry.id)).scalar() or 0) - self.max_entries
+        if excess > 0:
+            oldest_ids = [row[0] for row in session.query(LLMResponseCacheEntry.id).order_by(
+                LLMResponseCacheEntry.last_used_at.asc()
+            ).limit(excess).all()]
+            removed += session.query(LLMResponseCacheEntry).filter(
+                LLMResponseCacheEntry.id.in_(oldest_ids)
+            ).delete(synchronize_session=False)
+        session.commit()
+        if removed:
+            logger.info(f"Pruned {removed} entries from the LLM response cache")
+        return removed
+
+
+def get_shared_store(config: Config) -> _ResponseStore:
+    """Return the process-wide response store, creating it on first use."""
+    global _shared_store
+    with _shared_store_lock:
+        if _shared_store is None:
+            _shared_store = _ResponseStore(config)
+        return _shared_store
+
+
+class LLMResponseCache:
+    """
+    Per-client view of the shared response store.
+
+    Tracks which keys this client has already returned (so validation
+    retries bypass the cache) and counts hits and misses per phase for the
+    run report.
+    """
+
+    def __init__(self, config: Config, store: Optional[_ResponseStore] = None):
+        self.enabled = getattr(config, 'llm_cache_enabled', True)
+        self.disabled_phases = {phase.lower() for phase in getattr(config, 'llm_cache_disabled_phases', [])}
+        self.store = store or get_shared_store(config)
+
+        self._served: Set[str] = set()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def is_enabled_for(self, phase: Optional[str]) -> bool:
+        """Return True if responses for this phase should be cached."""
+        return self.enabled and bool(phase) and phase.lower() not in self.disabled_phases
+
+    def get(self, key: str, phase: str, allow_repeat: bool = False) -> Optional[str]:
+        """
+        Look up a response for a request about to be sent.
+
+        Args:
+            key: Cache key from make_cache_key()
+            phase: Phase name for metrics
+            allow_repeat: Serve keys this client already returned; for callers that never retry on validation
+
+        Returns:
+            The cached response, or None if the model must be called
+        """
+        if key in self._served and not allow_repeat:
+            # Identical request already answered for this client: a validation retry
+            self._count(phase, 'retry_bypasses')
+            return None
+
+        response, tier = self.store.lookup(key)
+        if response is None:
+            self._count(phase, 'misses')
+            return None
+        self._served.add(key)
+        self._count(phase, f'{tier}_hits')
+        return response
+
+    def put(self, key: str, phase: str, model: str, response: str) -> None:
+        """Store a fresh model response."""
+        self._served.add(key)
+        if not response or not response.strip():
+            return
+        self._count(phase, 'stores')
+        self.store.store(key, phase, model, response)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get hit-rate metrics for this client.
+
+        Returns:
+            Dict with overall counts, hit_rate and a per-phase breakdown
+        """
+        by_phase = {phase: dict(counts) for phase, counts in self._stats.items()}
+        totals: Dict[str, int] = {}
+        for counts in by_phase.values():
+            for name, value in counts.items():
+                totals[name] = totals.get(name, 0) + value
+        for counts in [totals, *by_phase.values()]:
+            hits = counts.get('memory_hits', 0) + counts.get('database_hits', 0)
+            lookups = hits + counts.get('misses', 0) + counts.get('retry_bypasses', 0)
+            counts['hit_rate'] = round(hits / lookups, 3) if lookups else 0.0
+        return {'enabled': self.enabled, **totals, 'by_phase': by_phase}
+
+    def _count(self, phase: str, name: str) -> None:
+        counts = self._stats.setdefault(phase, {})
+        counts[name] = counts.get(name, 0) + 1
@@ -1,5 +1,6 @@
+import asyncio
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
 import logging
 from knowledge_base_agent.config import Config
 from knowledge_base_agent.http_client import HTTPClient
@@ -24,59 +25,61 @@ async def process_media(tweet_data: Dict[str, Any], http_client: HTTPClient, con
             logging.debug(f"No media paths found for tweet {tweet_data.get('tweet_id')}, marking media_processed=True")
             return tweet_data
 
-        image_descriptions = []
-        has_unprocessed_media = False
         process_videos = config.process_videos if hasattr(config, 'process_videos') else True
+        max_dimension = getattr(config, 'vision_image_max_dimension', 0)
 
-        for media_path_rel_str in media_paths_rel:
+        async def describe_media(media_path_rel_str: str) -> List[str]:
             # Resolve relative path to absolute path
             media_path_abs = config.resolve_path_from_project_root(media_path_rel_str)
             
             if not media_path_abs.exists():
                 # Log error and continue, or raise? For now, log and skip this media.
                 logging.error(f"Media file not found at resolved path: {media_path_abs} (from relative: {media_path_rel_str}). Skipping this media.")
-                image_descriptions.append(f"Missing media file: {media_path_rel_str}") # Placeholder for missing
-                has_unprocessed_media = True # Consider it unprocessed if linked media is missing
-                continue
+                return [f"Missing media file: {media_path_rel_str}"] # Placeholder for missing
 
             mime_type, _ = guess_type(str(media_path_abs))
             is_video_file = mime_type in VIDEO_MIME_TYPES or media_path_abs.suffix.lower() in {'.mp4', '.mov', '.avi', '.mkv'}
 
             if is_video_file:
+                descriptions = []
                 if process_videos:
                     logging.info(f"Processing video file: {media_path_abs}")
                     try:
                         video_description = await interpret_video(
                             http_client=http_client,
                             video_path=media_path_abs,
-                            vision_model=config.vision_model
+                            vision_model=config.vision_model,
+                            config=config
                         )
                         if video_description:
-                            image_descriptions.append(video_description)
+                            descriptions.append(video_description)
                         else:
-                            image_descriptions.append(f"Unable to analyze video: {media_path_abs.name}")
+                            descriptions.append(f"Unable to analyze video: {media_path_abs.name}")
                     except Exception as e:
                         logging.error(f"Failed to process video {media_path_abs}: {e}")
-                        image_descriptions.append(f"Error analyzing video: {media_path_abs.name}")
+                        descriptions.append(f"Error analyzing video: {media_path_abs.name}")
                 else:
                     logging.info(f"Video processing disabled, skipping video analysis for {media_path_abs}")
-                image_descriptions.append(f"Video file: {media_path_abs.name}")
-                continue
+                descriptions.append(f"Video file: {media_path_abs.name}")
+                return descriptions
 
-            has_unprocessed_media = True
             try:
                 description = await interpret_image(
                     http_client=http_client,
                     image_path=media_path_abs, # Pass absolute path to interpreter
-                    vision_model=config.vision_model
+                    vision_model=config.vision_model,
+                    max_dimension=max_dimension
                 )
                 if description:
-                    image_descriptions.append(description)
-                else:
-                    image_descriptions.append(f"No description generated for image: {media_path_abs.name}")
+                    return [description]
+                return [f"No description generated for image: {media_path_abs.name}"]
             except Exception as e:
                 logging.error(f"Failed to process image {media_path_abs}: {e}")
-                image_descriptions.append(f"Failed to process image: {media_path_abs.name}")
+                return [f"Failed to process image: {media_path_abs.name}"]
+
+        # All media of the thread at once; the HTTP client's semaphore bounds concurrent vision calls
+        results = await asyncio.gather(*(describe_media(path) for path in media_paths_rel))
+        image_descriptions = [description for descriptions in results for description in descriptions]
 
         tweet_data['image_descriptions'] = image_descriptions
         tweet_data['media_processed'] = True 
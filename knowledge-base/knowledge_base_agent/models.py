@@ -288,6 +288,59 @@ class RenderCache(db.Model):
     def __repr__(self):
         return f'<RenderCache {self.document_type}#{self.document_id} {self.content_hash[:8]}>'
 
+
+# ===== LLM RESPONSE CACHE (model responses keyed by request hash) =====
+class LLMResponseCacheEntry(db.Model):
+    __tablename__ = 'llm_response_cache'
+
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), nullable=False, unique=True)  # sha256 of model, prompt and options
+    phase = db.Column(db.String(32), nullable=False)  # 'categorization' | 'kb_item' | 'synthesis'
+    model = db.Column(db.String(200), nullable=False)
+    response = db.Column(db.Text, nullable=False)
+    hit_count = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+    last_used_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_llm_response_cache_last_used', 'last_used_at'),
+    )
+
+    def __repr__(self):
+        return f'<LLMResponseCacheEntry {self.phase} {self.cache_key[:8]}>'
+
+# ===== CATEGORY PRE-CLASSIFIER TRAINING SAMPLES =====
+# Kept apart from the Embedding table so search indexes never load them
+class CategoryEmbeddingSample(db.Model):
+    __tablename__ = 'category_embedding_sample'
+
+    id = db.Column(db.Integer, primary_key=True)
+    tweet_id = db.Column(db.String(50), nullable=False, unique=True)
+    main_category = db.Column(db.String(100), nullable=False)
+    sub_category = db.Column(db.String(100), nullable=False)
+    model = db.Column(db.String(200), nullable=False)
+    embedding = db.Column(db.LargeBinary, nullable=False)  # float32, unit length
+    source = db.Column(db.String(20), nullable=False)  # 'llm' | 'backfill' | 'classifier'
+    created_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('idx_category_embedding_sample_model', 'model', 'source'),
+    )
+
+    def __repr__(self):
+        return f'<CategoryEmbeddingSample {self.tweet_id} {self.main_category}/{self.sub_category}>'
+
+# ===== MATERIALIZED TWEET STATISTICS (see tweet_statistics.py) =====
+class TweetStatisticsCounter(db.Model):
+    __tablename__ = 'tweet_statistics_counter'
+
+    name = db.Column(db.String(150), primary_key=True)  # 'total_tweets', 'media_processed', 'category:<main>', ...
+    value = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), nullable=False, default=datetime.utcnow)
+
+    def __repr__(self):
+        return f'<TweetStatisticsCounter {self.name}={self.value}>'
+
 class ChatSession(db.Model):
     __tablename__ = 'chat_session'
     
@@ -703,7 +756,19 @@ class TweetCache(db.Model):
     
     # Relationships
     processing_queue = db.relationship("TweetProcessingQueue", back_populates="tweet", uselist=False, cascade="all, delete-orphan")
-    
+
+    # Keyset pagination for the tweet explorer: (sort key, id) behind each equality filter it supports
+    # (existing SQLite databases: scripts/sqlite_migrate_explore_indexes.py)
+    __table_args__ = (
+        db.Index('idx_tweet_cache_updated_seek', 'updated_at', 'id'),
+        db.Index('idx_tweet_cache_created_seek', 'created_at', 'id'),
+        db.Index('idx_tweet_cache_main_updated_seek', 'main_category', 'updated_at', 'id'),
+        db.Index('idx_tweet_cache_category_updated_seek', 'main_category', 'sub_category', 'updated_at', 'id'),
+        db.Index('idx_tweet_cache_media_updated_seek', 'media_processed', 'updated_at', 'id'),
+        db.Index('idx_tweet_cache_categorized_updated_seek', 'categories_processed', 'updated_at', 'id'),
+        db.Index('idx_tweet_cache_kb_updated_seek', 'kb_item_created', 'updated_at', 'id'),
+    )
+
     def __repr__(self):
         return f'<TweetCache {self.tweet_id} [{self.main_category}/{self.sub_category}]>'
     
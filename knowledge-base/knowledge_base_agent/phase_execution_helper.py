@@ -6,7 +6,7 @@ for each processing phase, eliminating the need for validation logic
 in ContentProcessor.
 """
 
-from typing import Dict, List, Any, NamedTuple
+from typing import Dict, List, Any, NamedTuple, Optional
 from enum import Enum
 from dataclasses import dataclass
 import logging
@@ -23,6 +23,15 @@ class ProcessingPhase(Enum):
     EMBEDDING = "embedding"
 
 
+# Phases that run once per tweet, in pipeline order
+PER_TWEET_PHASES = [
+    ProcessingPhase.CACHE,
+    ProcessingPhase.MEDIA,
+    ProcessingPhase.LLM,
+    ProcessingPhase.KB_ITEM,
+]
+
+
 @dataclass
 class PhaseExecutionPlan:
     """Execution plan for a specific processing phase."""
@@ -242,6 +251,35 @@ class PhaseExecutionHelper:
 
         return False
     
+    def next_phase_for_tweet(
+        self,
+        tweet_data: Dict[str, Any],
+        force_flags: Dict[str, bool],
+        after: Optional[ProcessingPhase] = None
+    ) -> Optional[ProcessingPhase]:
+        """
+        Find the next per-tweet phase a single tweet needs.
+        
+        Used by the streaming pipeline to route a tweet onwards as soon as one of
+        its phases finishes. Phases the tweet has already completed are skipped.
+        
+        Args:
+            tweet_data: Current data for the tweet
+            force_flags: Dictionary of force reprocessing flags
+            after: Phase the tweet just finished (None to start from the beginning)
+            
+        Returns:
+            The next phase to run, or None if the tweet is done or blocked by a
+            missing prerequisite
+        """
+        start = PER_TWEET_PHASES.index(after) + 1 if after is not None else 0
+        for phase in PER_TWEET_PHASES[start:]:
+            if not self._is_tweet_eligible_for_phase(phase, tweet_data):
+                return None
+            if self._does_tweet_need_processing(phase, tweet_data, force_flags):
+                return phase
+        return None
+    
     def get_phase_dependencies(self, phase: ProcessingPhase) -> List[ProcessingPhase]:
         """Get the phases that must complete before this phase can run."""
         dependencies = {
@@ -10,10 +10,16 @@ Features:
 - Historical log access for completed tasks
 - Real-time log streaming for active tasks
 - Efficient querying and filtering
+- Batched background writes that keep the database off the caller's path
 """
 
+import atexit
 import logging
 import json
+import os
+import queue
+import threading
+import time
 import traceback
 from datetime import datetime, timezone
 from typing import Optional, Dict, Any, List, Union
@@ -22,6 +28,149 @@ from .models import db, TaskLog, CeleryTaskState
 from .config import Config
 
 
+class TaskLogWriter:
+    """
+    Background sink that writes TaskLog rows in batches.
+    
+    Rows are queued by PostgreSQLLogger.log() and inserted by a daemon thread
+    with one multi-row INSERT per batch on a connection of its own, so a log
+    line costs the caller a queue put instead of a commit on the session the
+    pipeline is using. A batch is written when it reaches batch_size rows or
+    its oldest row has waited flush_seconds.
+    """
+    
+    def __init__(self, engine, batch_size: int = 200, flush_seconds: float = 0.5, queue_size: int = 10000):
+        self.engine = engine
+        self.batch_size = max(1, batch_size)
+        self.flush_seconds = flush_seconds
+        self.pid = os.getpid()
+        self.stats = {'queued': 0, 'written': 0, 'batches': 0, 'overflowed': 0, 'failed': 0}
+        
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max(1, queue_size))
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='task-log-writer', daemon=True)
+        self._thread.start()
+    
+    def is_alive(self) -> bool:
+        """Return True if the writer thread is running in this process."""
+        return self.pid == os.getpid() and self._thread.is_alive()
+    
+    def submit(self, row: Dict[str, Any]) -> bool:
+        """
+        Queue a row for writing without blocking.
+        
+        Returns:
+            False if the queue is full or the writer is closed
+        """
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.stats['overflowed'] += 1
+            return False
+        self.stats['queued'] += 1
+        return True
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every row queued before this call has been written.
+        
+        Returns:
+            True if the queue drained within the timeout
+        """
+        if not self.is_alive():
+            return self._queue.empty()
+        drained = threading.Event()
+        try:
+            self._queue.put(drained, timeout=timeout)
+        except queue.Full:
+            return False
+        return drained.wait(timeout)
+    
+    def close(self, timeout: float = 5.0) -> bool:
+        """Stop accepting rows and drain the queue."""
+        self._closed = True
+        return self.flush(timeout)
+    
+    def _run(self) -> None:
+        batch: List[Dict[str, Any]] = []
+        deadline = 0.0
+        while True:
+            timeout = max(0.0, deadline - time.monotonic()) if batch else None
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+            
+            drained = None
+            if isinstance(item, threading.Event):
+                drained = item
+            elif item is not None:
+                if not batch:
+                    deadline = time.monotonic() + self.flush_seconds
+                batch.append(item)
+            
+            if batch and (drained or len(batch) >= self.batch_size or time.monotonic() >= deadline):
+                self._write(batch)
+                batch = []
+            if drained:
+                drained.set()
+    
+    def _write(self, rows: List[Dict[str, Any]]) -> None:
+        try:
+            with self.engine.begin() as connection:
+                connection.execute(TaskLog.__table__.insert(), rows)
+            self.stats['written'] += len(rows)
+            self.stats['batches'] += 1
+        except Exception as e:
+            logging.debug(f"PostgreSQL log batch of {len(rows)} rows failed, retrying row by row: {e}")
+            # One bad row must not lose the rest of the batch
+            for row in rows:
+                try:
+                    with self.engine.begin() as connection:
+                        connection.execute(TaskLog.__table__.insert(), [row])
+                    self.stats['written'] += 1
+                except Exception as row_error:
+                    self.stats['failed'] += 1
+                    logging.debug(f"PostgreSQL logging failed: {row_error}")
+                    logging.debug(f"Original message: [{row['level']}] {row['message']}")
+
+
+_task_log_writers: Dict[Any, TaskLogWriter] = {}
+_task_log_writers_lock = threading.Lock()
+
+
+def get_task_log_writer(engine, config: Optional[Config] = None) -> TaskLogWriter:
+    """
+    Return the process-wide TaskLogWriter for a database engine, starting it on first use.
+    
+    A writer inherited from a parent process (Celery prefork) is replaced,
+    since its thread did not survive the fork.
+    """
+    with _task_log_writers_lock:
+        writer = _task_log_writers.get(engine)
+        if writer is None or not writer.is_alive():
+            writer = TaskLogWriter(
+                engine,
+                batch_size=getattr(config, 'task_log_batch_size', 200),
+                flush_seconds=getattr(config, 'task_log_flush_seconds', 0.5),
+                queue_size=getattr(config, 'task_log_queue_size', 10000)
+            )
+            _task_log_writers[engine] = writer
+        return writer
+
+
+@atexit.register
+def drain_task_log_writers(timeout: float = 5.0) -> None:
+    """Write out every queued log row; called at interpreter shutdown."""
+    with _task_log_writers_lock:
+        writers = list(_task_log_writers.values())
+    for writer in writers:
+        if writer.is_alive() and not writer.close(timeout):
+            logging.warning(f"Timed out draining task log queue; {writer._queue.qsize()} rows not written")
+
+
 class PostgreSQLLogger:
     """
     PostgreSQL-based logger that stores all agent execution logs in the database.
@@ -32,7 +181,10 @@ class PostgreSQLLogger:
         self.task_id = task_id
         self.config = config
         self.sequence_counter = 0
+        self._sequence_lock = threading.Lock()
+        self._overflowing = False
         self._ensure_task_exists()
+        self._writer = self._get_writer()
     
     def _ensure_task_exists(self):
         """Ensure the task exists in CeleryTaskState table."""
@@ -50,10 +202,22 @@ class PostgreSQLLogger:
         except Exception as e:
             logging.error(f"Failed to ensure task exists: {e}")
     
-    def _get_next_sequence_number(self) -> int:
-        """Get the next sequence number for this task."""
-        self.sequence_counter += 1
-        return self.sequence_counter
+    def _get_writer(self) -> Optional[TaskLogWriter]:
+        """Get the background writer for the current app's database."""
+        try:
+            return get_task_log_writer(db.engine, self.config)
+        except Exception as e:
+            logging.error(f"Failed to start task log writer, logs for {self.task_id} go to the Python logger only: {e}")
+            return None
+    
+    def flush(self, timeout: float = 5.0) -> bool:
+        """
+        Wait until every log line logged so far is in the database.
+        
+        Returns:
+            True if all queued lines were written within the timeout
+        """
+        return self._writer.flush(timeout) if self._writer else True
     
     def log(self, message: str, level: str = "INFO", component: Optional[str] = None, 
             phase: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None,
@@ -61,6 +225,9 @@ class PostgreSQLLogger:
         """
         Log a message to PostgreSQL with structured data.
         
+        The row is queued for the background TaskLogWriter; the message is
+        always echoed to the Python logger as well.
+        
         Args:
             message: The log message
             level: Log level (DEBUG, INFO, WARNING, ERROR, CRITICAL)
@@ -70,38 +237,37 @@ class PostgreSQLLogger:
             progress_data: Progress information (counts, percentages, etc.)
             error_data: Error context and traceback information
         """
-        try:
-            log_entry = TaskLog(
-                task_id=self.task_id,
-                timestamp=datetime.now(timezone.utc),
-                level=level.upper(),
-                message=message,
-                component=component,
-                phase=phase,
-                sequence_number=self._get_next_sequence_number(),
-                log_metadata=json.dumps(metadata) if metadata else None,
-                progress_data=json.dumps(progress_data) if progress_data else None,
-                error_data=json.dumps(error_data) if error_data else None
-            )
-            
-            db.session.add(log_entry)
-            db.session.commit()
-            
-            # Also log to Python logging system for immediate visibility
-            python_logger = logging.getLogger(component or 'postgresql_logger')
-            log_level = getattr(logging, level.upper(), logging.INFO)
-            python_logger.log(log_level, f"[{self.task_id}] {message}")
-            
-        except Exception as e:
-            # Fallback to Python logging if database logging fails
-            # Don't print to stderr as it clutters the logs - just use Python logging
-            python_logger = logging.getLogger(component or 'postgresql_logger')
-            log_level = getattr(logging, level.upper(), logging.INFO)
-            python_logger.log(log_level, f"[{self.task_id}] {message}")
+        row = {
+            'task_id': self.task_id,
+            'timestamp': datetime.now(timezone.utc),
+            'level': level.upper(),
+            'message': message,
+            'component': component,
+            'phase': phase,
+            'log_metadata': json.dumps(metadata, default=str) if metadata else None,
+            'progress_data': json.dumps(progress_data, default=str) if progress_data else None,
+            'error_data': json.dumps(error_data, default=str) if error_data else None
+        }
+        
+        if self._writer:
+            # A sequence number is only used once the row is queued, so an
+            # overflow never leaves a gap in the task's sequence
+            with self._sequence_lock:
+                row['sequence_number'] = self.sequence_counter + 1
+                queued = self._writer.submit(row)
+                if queued:
+                    self.sequence_counter += 1
             
-            # Log the PostgreSQL error at debug level to avoid spam
-            logging.debug(f"PostgreSQL logging failed: {e}")
-            logging.debug(f"Original message: [{level}] {message}")
+            if queued:
+                self._overflowing = False
+            elif not self._overflowing:
+                self._overflowing = True
+                logging.warning(f"Task log queue full; logs for {self.task_id} go to the Python logger only until it drains")
+        
+        # Also log to Python logging system for immediate visibility
+        python_logger = logging.getLogger(component or 'postgresql_logger')
+        log_level = getattr(logging, level.upper(), logging.INFO)
+        python_logger.log(log_level, f"[{self.task_id}] {message}")
     
     def log_phase_start(self, phase: str, message: str, total_items: Optional[int] = None):
         """Log the start of a processing phase."""
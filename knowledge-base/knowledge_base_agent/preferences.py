@@ -45,6 +45,9 @@ class UserPreferences:
     # When set to True, it will activate all the granular force flags above
     force_reprocess_content: bool = False  # If True, forces reprocessing all content phases
 
+    # Categorization options
+    fused_categorization: bool = False  # If True, one schema-constrained LLM call returns categories, item name and display title
+
     # Synthesis configuration
     synthesis_mode: str = "comprehensive"  # Options: 'comprehensive', 'technical_deep_dive', 'practical_guide'
     synthesis_min_items: int = 3           # Minimum items required for synthesis generation
@@ -76,7 +79,8 @@ class UserPreferences:
             # force_reprocess_db_sync removed - using unified database approach
             'force_regenerate_synthesis',
             'force_regenerate_embeddings',
-            'force_regenerate_readme'
+            'force_regenerate_readme',
+            'fused_categorization'
         ]
 
         for flag_name in bool_flags:
@@ -0,0 +1,149 @@
+"""
+Prompt Prefix Reuse
+
+Ollama and llama.cpp servers keep the KV cache of the previous request on a
+model slot and only evaluate the prompt tokens after the longest prefix they
+share with it. Categorization, item naming and KB item prompts are mostly
+fixed instructions, but the tweet text sits in the middle of the templates, so
+almost nothing after it can be reused.
+
+``assemble_prompt`` reorders a rendered prompt so that reusable text comes
+first. Callers render the template as usual, with the per-run values (such as
+the category taxonomy) wrapped by ``mark_run_value`` and the per-item values
+(tweet text, media descriptions) wrapped by ``mark_item_value``. The prompt is
+split into blank-line separated paragraphs and regrouped as: unmarked
+paragraphs, per-run paragraphs, per-item paragraphs, then the closing
+instruction paragraph. Markers are removed afterwards. This works the same for
+the legacy templates in prompts.py and the JSON templates.
+
+``PromptTokenStats`` measures how much of each prompt was served from the KV
+cache, per pipeline phase, from the token counts the backend reports.
+"""
+
+import contextvars
+import re
+import threading
+from typing import Any, Dict, List, Mapping, Optional
+
+# Private-use code points wrap marked values; they never occur in tweet text or templates
+RUN_START, RUN_END = '\ue000', '\ue001'
+ITEM_START, ITEM_END = '\ue002', '\ue003'
+_MARKERS = (RUN_START, RUN_END, ITEM_START, ITEM_END)
+_PARAGRAPH_TOKENS = re.compile('\n\n|[\ue000-\ue003]')
+
+# Phase of the LLM request being made, set by HTTPClient from its cache_phase argument
+current_prompt_phase: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar('current_prompt_phase', default=None)
+
+
+def _mark(value: Any, start: str, end: str) -> Any:
+    if isinstance(value, str):
+        return f"{start}{value}{end}" if value else value
+    if isinstance(value, (list, tuple)):
+        return type(value)(_mark(item, start, end) for item in value)
+    return value
+
+
+def mark_run_value(value: Any) -> Any:
+    """Mark a template value that is shared by the prompts of a run, e.g. the category list."""
+    return _mark(value, RUN_START, RUN_END)
+
+
+def mark_item_value(value: Any) -> Any:
+    """Mark a template value that differs for every item, e.g. the tweet text."""
+    return _mark(value, ITEM_START, ITEM_END)
+
+
+def strip_markers(text: str) -> str:
+    for marker in _MARKERS:
+        text = text.replace(marker, '')
+    return text
+
+
+def assemble_prompt(marked_prompt: str) -> str:
+    """
+    Reorder a prompt rendered with marked values so its reusable text comes first.
+
+    The last paragraph stays last when it is unmarked, because templates end
+    with the instruction the model should read right before answering.
+    """
+    paragraphs = _split_paragraphs(marked_prompt)
+    closing: List[str] = []
+    if len(paragraphs) > 1 and _tier(paragraphs[-1]) == 0:
+        closing.append(paragraphs.pop())
+    tiers: List[List[str]] = [[], [], []]
+    for paragraph in paragraphs:
+        tiers[_tier(paragraph)].append(paragraph)
+    return strip_markers('\n\n'.join(tiers[0] + tiers[1] + tiers[2] + closing))
+
+
+def _split_paragraphs(text: str) -> List[str]:
+    """Split on blank lines, except inside a marked value, which may contain blank lines itself."""
+    paragraphs, start, depth = [], 0, 0
+    for match in _PARAGRAPH_TOKENS.finditer(text):
+        token = match.group()
+        if token in (RUN_START, ITEM_START):
+            depth += 1
+        elif token in (RUN_END, ITEM_END):
+            depth -= 1
+        elif depth == 0:
+            paragraphs.append(text[start:match.start()])
+            start = match.end()
+    paragraphs.append(text[start:])
+    return paragraphs
+
+
+def _tier(paragraph: str) -> int:
+    return 2 if ITEM_START in paragraph else 1 if RUN_START in paragraph else 0
+
+
+def assemble_message(message: Mapping[str, str]) -> Dict[str, str]:
+    """assemble_prompt for the content of a chat message."""
+    return {**message, 'content': assemble_prompt(message['content'])}
+
+
+class PromptTokenStats:
+    """
+    Prompt tokens sent, evaluated and reused from the KV cache, per phase.
+
+    Backends report prompt_tokens when they know the full prompt length and
+    evaluated_tokens for the part they actually ran through the model; the
+    difference was reused from the cache.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, prompt_tokens: Optional[int], evaluated_tokens: Optional[int],
+               eval_seconds: Optional[float] = None, phase: Optional[str] = None) -> None:
+        phase = phase or current_prompt_phase.get() or 'other'
+        with self._lock:
+            counts = self._stats.setdefault(phase, {})
+            counts['requests'] = counts.get('requests', 0) + 1
+            if evaluated_tokens is not None:
+                counts['evaluated_tokens'] = counts.get('evaluated_tokens', 0) + evaluated_tokens
+            if eval_seconds is not None:
+                counts['prompt_eval_seconds'] = counts.get('prompt_eval_seconds', 0.0) + eval_seconds
+            if prompt_tokens is not None and evaluated_tokens is not None:
+                counts['measured_requests'] = counts.get('measured_requests', 0) + 1
+                counts['prompt_tokens'] = counts.get('prompt_tokens', 0) + prompt_tokens
+                counts['cached_tokens'] = counts.get('cached_tokens', 0) + max(0, prompt_tokens - evaluated_tokens)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get prompt token metrics.
+
+        Returns:
+            Dict with overall counts, cache_hit_rate (share of measured prompt
+            tokens reused) and a per-phase breakdown
+        """
+        with self._lock:
+            by_phase = {phase: dict(counts) for phase, counts in self._stats.items()}
+        totals: Dict[str, float] = {}
+        for counts in by_phase.values():
+            for name, value in counts.items():
+                totals[name] = totals.get(name, 0) + value
+        for counts in [totals, *by_phase.values()]:
+            prompt_tokens = counts.get('prompt_tokens', 0)
+            counts['cache_hit_rate'] = round(counts.get('cached_tokens', 0) / prompt_tokens, 3) if prompt_tokens else 0.0
+        return {**totals, 'by_phase': by_phase}
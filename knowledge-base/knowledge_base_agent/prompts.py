@@ -70,6 +70,32 @@ class LLMPrompts:
             "Respond ONLY with the JSON object."
         )
     
+    @staticmethod
+    def get_fused_categorization_prompt_standard(context_content: str, formatted_existing_categories: str,
+                                                 requested_fields: str, settled_fields: str = "",
+                                                 is_thread: bool = False) -> str:
+        source_type_indicator = "Tweet Thread Content" if is_thread else "Tweet Content"
+        settled_block = f"{settled_fields}\n\n" if settled_fields else ""
+        return (
+            "You are an expert technical content curator and a seasoned software architect/principal engineer, "
+            "organizing a deeply technical knowledge base. "
+            f"Categorize the {source_type_indicator} below, name it and title it in a single response.\n\n"
+            f"Fields to return:\n{requested_fields}\n\n"
+            "Rules:\n"
+            "- main_category and sub_category: lowercase with underscores and HIGHLY SPECIFIC "
+            "(e.g., \"concurrency_patterns\" / \"thread_synchronization_java\"). Never use generic terms like "
+            "\"software_engineering\", \"programming\", \"devops\", \"cloud_computing\" or \"technology\". "
+            "Reuse an existing category when it fits.\n"
+            "- item_name: 2-4 lowercase words joined by underscores, filesystem-friendly, naming the core technical "
+            "concept (e.g., \"java_atomiclong_vs_synchronized\"). Avoid \"guide\", \"overview\", \"note\" and \"generic\".\n"
+            "- display_title: a human-readable title in Title Case, at most 100 characters "
+            "(e.g., \"Java AtomicLong vs. synchronized Counters\").\n\n"
+            f"Existing Categories:\n{formatted_existing_categories}\n\n"
+            f"{settled_block}"
+            f"{source_type_indicator}:\n---\n{context_content}\n---\n\n"
+            "Respond ONLY with a JSON object containing exactly the requested fields."
+        )
+
     @staticmethod
     def get_chat_prompt() -> str:
         """
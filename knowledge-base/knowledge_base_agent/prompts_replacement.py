@@ -58,6 +58,38 @@ class LLMPrompts:
             from . import prompts as original_prompts
             return original_prompts.LLMPrompts.get_categorization_prompt_standard(context_content, formatted_existing_categories, is_thread)
     
+    @staticmethod
+    def get_fused_categorization_prompt_standard(context_content: str, formatted_existing_categories: str,
+                                                 requested_fields: str, settled_fields: str = "",
+                                                 is_thread: bool = False) -> str:
+        """Generate the single-call categorization, naming and titling prompt for standard models."""
+        manager = LLMPrompts._get_manager()
+        
+        if not isinstance(manager, JsonPromptManager):
+            return manager.get_fused_categorization_prompt_standard(
+                context_content, formatted_existing_categories, requested_fields, settled_fields, is_thread
+            )
+        
+        try:
+            result = manager.render_prompt(
+                "categorization_fused_standard",
+                {
+                    "context_content": context_content,
+                    "formatted_existing_categories": formatted_existing_categories,
+                    "requested_fields": requested_fields,
+                    "settled_fields": settled_fields,
+                    "is_thread": is_thread
+                },
+                "standard"
+            )
+            return result.content
+        except Exception as e:
+            print(f"Warning: JSON prompt failed, falling back to original: {e}")
+            from . import prompts as original_prompts
+            return original_prompts.LLMPrompts.get_fused_categorization_prompt_standard(
+                context_content, formatted_existing_categories, requested_fields, settled_fields, is_thread
+            )
+    
     @staticmethod
     def get_chat_prompt() -> str:
         """Returns the enhanced system prompt for the chat functionality."""
@@ -0,0 +1,152 @@
+"""
+Rendered HTML Cache
+
+Markdown for KB items and syntheses is rendered to HTML when the document is
+written and stored in the ``render_cache`` table, keyed by document and the
+sha256 of its markdown. Readers fetch the HTML by that hash through a small
+in-process LRU, so serving a document costs one indexed lookup, or nothing
+when the LRU already holds it. Markdown is only rendered on read for rows
+written before render-on-write existed.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from typing import Optional, Tuple
+
+import markdown
+
+from .config import Config
+from .models import db, RenderCache
+
+logger = logging.getLogger(__name__)
+
+MARKDOWN_EXTENSIONS = ['extra', 'codehilite']
+
+
+def compute_content_hash(text: Optional[str]) -> Optional[str]:
+    """
+    Hash markdown content for render cache keys.
+
+    Returns:
+        Hex sha256 of the stripped text, or None for empty content
+    """
+    if not text or not text.strip():
+        return None
+    return hashlib.sha256(text.strip().encode('utf-8')).hexdigest()
+
+
+def render_markdown(text: Optional[str]) -> str:
+    """Render markdown to HTML with the extensions used throughout the UI."""
+    return markdown.markdown(text or "", extensions=MARKDOWN_EXTENSIONS)
+
+
+class RenderedHTMLCache:
+    """LRU of rendered HTML in front of the render_cache table."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max(0, max_entries)
+        self._entries: "OrderedDict[Tuple[str, int, str], str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def store(self, document_type: str, document_id: int, content: Optional[str],
+              content_hash: Optional[str] = None) -> Optional[str]:
+        """
+        Render a document that is being written and add its HTML to the session.
+
+        The row is committed with the caller's write. Nothing is rendered if
+        the table already holds HTML for this content.
+
+        Args:
+            document_type: 'kb_item' or 'synthesis'
+            document_id: Primary key of the document
+            content: Markdown content
+            content_hash: Precomputed hash of content, if the caller has one
+
+        Returns:
+            The content hash, or None for empty content
+        """
+        content_hash = content_hash or compute_content_hash(content)
+        if not content_hash:
+            return None
+
+        key = (document_type, document_id, content_hash)
+        with self._lock:
+            cached = key in self._entries
+        if cached or self._get_persistent(key) is not None:
+            return content_hash
+
+        html = render_markdown(content)
+        db.session.add(RenderCache(document_type=document_type, document_id=document_id,
+                                   content_hash=content_hash, html=html))
+        self._remember(key, html)
+        return content_hash
+
+    def get(self, document_type: str, document_id: int, content: Optional[str],
+            content_hash: Optional[str] = None) -> str:
+        """
+        Get the HTML for a document being served.
+
+        Args:
+            document_type: 'kb_item' or 'synthesis'
+            document_id: Primary key of the document
+            content: Markdown content, rendered only if no cached HTML exists
+            content_hash: Stored hash of content; computed if missing
+
+        Returns:
+            Rendered HTML ('' for empty content)
+        """
+        content_hash = content_hash or compute_content_hash(content)
+        if not content_hash:
+            return ""
+
+        key = (document_type, document_id, content_hash)
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+                return html
+
+        html = self._get_persistent(key)
+        if html is None:
+            # Written before render-on-write, or by a path that bypasses it
+            html = render_markdown(content)
+            try:
+                db.session.add(RenderCache(document_type=document_type, document_id=document_id,
+                                           content_hash=content_hash, html=html))
+                db.session.commit()
+            except Exception as e:
+                logger.debug(f"Could not store rendered HTML for {document_type}#{document_id}: {e}")
+                db.session.rollback()
+        self._remember(key, html)
+        return html
+
+    def _get_persistent(self, key: Tuple[str, int, str]) -> Optional[str]:
+        document_type, document_id, content_hash = key
+        row = db.session.query(RenderCache.html).filter_by(
+            document_type=document_type, document_id=document_id, content_hash=content_hash
+        ).first()
+        return row[0] if row else None
+
+    def _remember(self, key: Tuple[str, int, str], html: str) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = html
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_render_cache: Optional[RenderedHTMLCache] = None
+_render_cache_lock = threading.Lock()
+
+
+def get_render_cache(config: Optional[Config] = None) -> RenderedHTMLCache:
+    """Return the process-wide rendered HTML cache, creating it on first use."""
+    global _render_cache
+    with _render_cache_lock:
+        if _render_cache is None:
+            _render_cache = RenderedHTMLCache(getattr(config, 'render_cache_memory_entries', 256))
+        return _render_cache
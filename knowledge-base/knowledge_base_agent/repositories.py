@@ -8,16 +8,34 @@ implementing the repository pattern for clean separation of concerns.
 import logging
 from typing import List, Optional, Dict, Any, Tuple, Union
 from datetime import datetime, timezone, timedelta
-from sqlalchemy import and_, or_, func, text, desc, asc
+from sqlalchemy import (
+    and_, or_, func, text, desc, asc, select, update as sa_update, case, cast, literal, tuple_, type_coerce,
+    DateTime, Float, Integer, JSON, String
+)
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import SQLAlchemyError, IntegrityError
 
 from .database import get_db_session_context, execute_with_retry
+from .hybrid_search import build_fts_match_query, fts_table_exists
 from .models import db, TweetCache, TweetProcessingQueue, CategoryHierarchy, ProcessingStatistics, RuntimeStatistics
+from .tweet_explore import (
+    DEFAULT_COUNT_CACHE_SECONDS, DEFAULT_SORT, EXPLORE_COLUMNS, FLAG_FILTERS, SORT_FIELDS,
+    InvalidCursorError, counter_for_filters, decode_cursor, encode_cursor, explore_count_cache
+)
+from .tweet_statistics import TOTAL as TOTAL_TWEETS_COUNTER, build_statistics, read_tweet_counters
 
 logger = logging.getLogger(__name__)
 
 
+def _json_array_length(dialect_name: str, column):
+    """Length of a JSON list column in SQL, 0 for NULL or non-list values."""
+    if dialect_name == 'postgresql':
+        # The column is json or jsonb depending on how the table was created
+        as_json = cast(column, JSON)
+        return case((func.json_typeof(as_json) == 'array', func.json_array_length(as_json)), else_=0)
+    return func.coalesce(func.json_array_length(column), 0)
+
+
 class BaseRepository:
     """Base repository class with common database operations."""
     
@@ -338,70 +356,15 @@ class TweetCacheRepository(BaseRepository):
         """
         try:
             with self._get_session() as session:
-                # Build base query
-                query = session.query(TweetCache)
-                count_query = session.query(func.count(TweetCache.id))
-                
-                if filters:
-                    # Apply search filter
-                    if 'search' in filters and filters['search']:
-                        search_term = f"%{filters['search']}%"
-                        search_filter = or_(
-                            TweetCache.full_text.ilike(search_term),
-                            TweetCache.display_title.ilike(search_term),
-                            TweetCache.item_name_suggestion.ilike(search_term)
-                        )
-                        query = query.filter(search_filter)
-                        count_query = count_query.filter(search_filter)
-                    
-                    # Apply category filters
-                    if 'main_category' in filters and filters['main_category']:
-                        query = query.filter(TweetCache.main_category == filters['main_category'])
-                        count_query = count_query.filter(TweetCache.main_category == filters['main_category'])
-                    
-                    if 'sub_category' in filters and filters['sub_category']:
-                        query = query.filter(TweetCache.sub_category == filters['sub_category'])
-                        count_query = count_query.filter(TweetCache.sub_category == filters['sub_category'])
-                    
-                    # Apply boolean filters
-                    if 'has_media' in filters:
-                        if filters['has_media']:
-                            query = query.filter(TweetCache.media_processed == True)
-                            count_query = count_query.filter(TweetCache.media_processed == True)
-                        else:
-                            query = query.filter(TweetCache.media_processed == False)
-                            count_query = count_query.filter(TweetCache.media_processed == False)
-                    
-                    if 'has_categories' in filters:
-                        if filters['has_categories']:
-                            query = query.filter(TweetCache.categories_processed == True)
-                            count_query = count_query.filter(TweetCache.categories_processed == True)
-                        else:
-                            query = query.filter(TweetCache.categories_processed == False)
-                            count_query = count_query.filter(TweetCache.categories_processed == False)
-                    
-                    if 'has_kb_item' in filters:
-                        if filters['has_kb_item']:
-                            query = query.filter(TweetCache.kb_item_created == True)
-                            count_query = count_query.filter(TweetCache.kb_item_created == True)
-                        else:
-                            query = query.filter(TweetCache.kb_item_created == False)
-                            count_query = count_query.filter(TweetCache.kb_item_created == False)
-                    
-                    # Apply date filters
-                    if 'created_after' in filters and filters['created_after']:
-                        query = query.filter(TweetCache.created_at >= filters['created_after'])
-                        count_query = count_query.filter(TweetCache.created_at >= filters['created_after'])
-                    
-                    if 'created_before' in filters and filters['created_before']:
-                        query = query.filter(TweetCache.created_at <= filters['created_before'])
-                        count_query = count_query.filter(TweetCache.created_at <= filters['created_before'])
+                query, rank = self._apply_tweet_filters(session, session.query(TweetCache), filters or {})
                 
                 # Get total count
-                total_count = count_query.scalar()
+                total_count = query.with_entities(func.count(TweetCache.id)).scalar()
                 
                 # Apply sorting
-                if hasattr(TweetCache, sort_by):
+                if sort_by == 'relevance' and rank is not None:
+                    query = query.order_by(asc(rank))
+                elif hasattr(TweetCache, sort_by):
                     sort_column = getattr(TweetCache, sort_by)
                     if sort_order.lower() == 'desc':
                         query = query.order_by(desc(sort_column))
@@ -425,6 +388,156 @@ class TweetCacheRepository(BaseRepository):
             self._handle_db_error("get filtered tweets", e)
             return [], 0
     
+    def explore_tweets(self, filters: Dict[str, Any] = None, limit: int = 50, cursor: Optional[str] = None,
+                       sort_by: str = 'updated_at', sort_order: str = 'desc', offset: int = 0,
+                       count_cache_seconds: Optional[float] = None,
+                       resync_seconds: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Get one page of the tweet explorer as projected rows.
+        
+        Pages after the first are fetched by passing the previous page's
+        next_cursor, which seeks on the (sort key, id) indexes instead of
+        skipping rows. offset is only applied without a cursor, for clients
+        that still page by number. Totals come from the tweet statistics
+        counters when the filters allow it and are cached otherwise.
+        
+        Args:
+            filters: Dictionary of filter criteria (see get_filtered_tweets)
+            limit: Maximum number of tweets to return
+            cursor: next_cursor of the previous page
+            sort_by: One of updated_at, created_at, tweet_id, main_category or relevance (searches only)
+            sort_order: Sort order ('asc' or 'desc'), ignored for relevance
+            offset: Number of tweets to skip when no cursor is given
+            count_cache_seconds: How long a filtered total is reused (defaults to 30 seconds)
+            resync_seconds: Maximum tweet statistics counter age before a recount
+            
+        Returns:
+            Dictionary with 'tweets' (dicts of EXPLORE_COLUMNS plus media_count and
+            thread_length), 'next_cursor' (None on the last page) and 'total_count'
+            
+        Raises:
+            InvalidCursorError: If the cursor is malformed or was issued for another sort
+        """
+        filters = filters or {}
+        sort_order = 'desc' if sort_order.lower() == 'desc' else 'asc'
+        try:
+            with self._get_session() as session:
+                dialect = session.bind.dialect.name
+                query = session.query(
+                    *[getattr(TweetCache, column) for column in EXPLORE_COLUMNS],
+                    _json_array_length(dialect, TweetCache.all_downloaded_media_for_thread).label('media_count'),
+                    _json_array_length(dialect, TweetCache.thread_tweets).label('thread_length')
+                )
+                query, rank = self._apply_tweet_filters(session, query, filters)
+                total_count = self._explore_total_count(session, query, filters, count_cache_seconds, resync_seconds)
+                
+                if sort_by == 'relevance' and rank is not None:
+                    # Best match first; rank is lower-is-better on every backend
+                    sort_key, sort_order = rank, 'asc'
+                else:
+                    sort_by = sort_by if sort_by in SORT_FIELDS and sort_by != 'relevance' else DEFAULT_SORT
+                    sort_key = (func.coalesce(TweetCache.main_category, '') if sort_by == 'main_category'
+                                else getattr(TweetCache, sort_by))
+                descending = sort_order == 'desc'
+                # SQLite keeps timestamps as text whose precision depends on the writer; seeking
+                # on the stored text rather than a re-encoded datetime never skips or repeats rows
+                stored_key = type_coerce(sort_key, String) if isinstance(sort_key.type, DateTime) else sort_key
+                
+                if cursor:
+                    value, row_id = decode_cursor(cursor, sort_by, sort_order)
+                    bound = literal(value, String) if isinstance(value, str) else literal(value, sort_key.type)
+                    seek = tuple_(sort_key, TweetCache.id)
+                    query = query.filter(seek < tuple_(bound, row_id) if descending else seek > tuple_(bound, row_id))
+                elif offset:
+                    query = query.offset(offset)
+                
+                direction = desc if descending else asc
+                rows = query.add_columns(stored_key.label('sort_key')).order_by(
+                    direction(sort_key), direction(TweetCache.id)
+                ).limit(limit + 1).all()
+                
+                tweets = [dict(row._mapping) for row in rows[:limit]]
+                next_cursor = None
+                if len(rows) > limit:
+                    next_cursor = encode_cursor(sort_by, sort_order, tweets[-1]['sort_key'], tweets[-1]['id'])
+                for tweet in tweets:
+                    del tweet['sort_key']
+                
+                return {'tweets': tweets, 'next_cursor': next_cursor, 'total_count': total_count}
+        except InvalidCursorError:
+            raise
+        except Exception as e:
+            self._handle_db_error("explore tweets", e)
+    
+    def _explore_total_count(self, session: Session, query, filters: Dict[str, Any],
+                             count_cache_seconds: Optional[float], resync_seconds: Optional[float]) -> int:
+        """Total for an explorer filter set, without a COUNT(*) on every page."""
+        counter = counter_for_filters(filters)
+        if counter is not None:
+            name, complement = counter
+            counters = read_tweet_counters(session, resync_seconds)
+            value = counters.get(name, 0)
+            return counters.get(TOTAL_TWEETS_COUNTER, 0) - value if complement else value
+        
+        total_count = explore_count_cache.get(filters)
+        if total_count is None:
+            total_count = query.with_entities(func.count(TweetCache.id)).scalar()
+            ttl = DEFAULT_COUNT_CACHE_SECONDS if count_cache_seconds is None else count_cache_seconds
+            explore_count_cache.set(filters, total_count, ttl)
+        return total_count
+    
+    def _apply_tweet_filters(self, session: Session, query, filters: Dict[str, Any]):
+        """
+        Apply get_filtered_tweets/explore_tweets filter criteria to a query.
+        
+        Returns the filtered query and, for searches, a lower-is-better rank
+        expression (None otherwise). Searches use the tweet_cache_fts table on
+        SQLite and the to_tsvector('english', full_text) GIN index on
+        PostgreSQL, falling back to LIKE matching.
+        """
+        rank = None
+        search = filters.get('search')
+        if search:
+            fts_hits = self._full_text_hits(session, search)
+            if fts_hits is not None:
+                query = query.join(fts_hits, fts_hits.c.id == TweetCache.id)
+                # bm25() is lower-is-better
+                rank = fts_hits.c.rank
+            elif session.bind.dialect.name == 'postgresql':
+                document = func.to_tsvector('english', TweetCache.full_text)
+                ts_query = func.plainto_tsquery('english', search)
+                query = query.filter(document.bool_op('@@')(ts_query))
+                rank = -func.ts_rank(document, ts_query, type_=Float)
+            else:
+                search_term = f"%{search}%"
+                query = query.filter(or_(
+                    TweetCache.full_text.ilike(search_term),
+                    TweetCache.display_title.ilike(search_term),
+                    TweetCache.item_name_suggestion.ilike(search_term)
+                ))
+        
+        # Apply category filters
+        if filters.get('main_category'):
+            query = query.filter(TweetCache.main_category == filters['main_category'])
+        if filters.get('sub_category'):
+            query = query.filter(TweetCache.sub_category == filters['sub_category'])
+        
+        # Apply boolean filters
+        for name, (flag, _counter) in FLAG_FILTERS.items():
+            if name in filters and filters[name] is not None:
+                column = getattr(TweetCache, flag)
+                # A NULL flag was never set, so it matches False; this also keeps the
+                # page rows in line with the counter complement used for the total
+                query = query.filter(column == True if filters[name] else column.isnot(True))
+        
+        # Apply date filters
+        if filters.get('created_after'):
+            query = query.filter(TweetCache.created_at >= filters['created_after'])
+        if filters.get('created_before'):
+            query = query.filter(TweetCache.created_at <= filters['created_before'])
+        
+        return query, rank
+    
     def get_by_processing_status(self, status_filters: Dict[str, bool], 
                                limit: int = 100, offset: int = 0) -> List[TweetCache]:
         """
@@ -477,6 +590,23 @@ class TweetCacheRepository(BaseRepository):
         except Exception as e:
             self._handle_db_error("get tweets by category", e)
     
+    def _full_text_hits(self, session: Session, search_term: str):
+        """
+        Build a bm25-ranked CTE of tweet_cache rows matching a search term.
+
+        Returns None when the database is not SQLite or the tweet_cache_fts table
+        from scripts/sqlite_migrate_fts.py does not exist, so callers can fall
+        back to LIKE matching.
+        """
+        match_query = build_fts_match_query(search_term)
+        if not match_query or session.bind.dialect.name != 'sqlite' or not fts_table_exists(session, 'tweet_cache_fts'):
+            return None
+        # MATERIALIZED stops SQLite flattening the CTE, which bm25() does not allow
+        return text(
+            "SELECT rowid AS id, bm25(tweet_cache_fts) AS rank "
+            "FROM tweet_cache_fts WHERE tweet_cache_fts MATCH :fts_query"
+        ).bindparams(fts_query=match_query).columns(id=Integer, rank=Float).cte('fts_hits').prefix_with('MATERIALIZED')
+    
     def full_text_search(self, search_term: str, limit: int = 100, 
                         offset: int = 0) -> List[TweetCache]:
         """
@@ -493,13 +623,19 @@ class TweetCacheRepository(BaseRepository):
         try:
             with self._get_session() as session:
                 # Use database-specific full-text search
-                if session.bind.dialect.name == 'postgresql':
+                fts_hits = self._full_text_hits(session, search_term)
+                if fts_hits is not None:
+                    # SQLite FTS5, ranked by bm25 (lower is better)
+                    query = session.query(TweetCache).join(
+                        fts_hits, fts_hits.c.id == TweetCache.id
+                    ).order_by(asc(fts_hits.c.rank))
+                elif session.bind.dialect.name == 'postgresql':
                     # PostgreSQL full-text search
                     query = session.query(TweetCache).filter(
                         func.to_tsvector('english', TweetCache.full_text).match(search_term)
                     )
                 else:
-                    # SQLite LIKE search
+                    # SQLite LIKE search (tweet_cache_fts not created yet)
                     query = session.query(TweetCache).filter(
                         TweetCache.full_text.contains(search_term)
                     )
@@ -706,67 +842,22 @@ class TweetCacheRepository(BaseRepository):
     
     # ===== STATISTICS AND REPORTING =====
     
-    def get_processing_statistics(self) -> Dict[str, Any]:
+    def get_processing_statistics(self, resync_seconds: Optional[float] = None) -> Dict[str, Any]:
         """
         Get comprehensive processing statistics.
         
+        Served from the materialized tweet_statistics_counter table, which is
+        recounted in a single aggregate query only when it is stale.
+        
+        Args:
+            resync_seconds: Maximum counter age before a recount (defaults to one hour)
+        
         Returns:
             Dictionary with processing statistics
         """
         try:
             with self._get_session() as session:
-                total_tweets = session.query(TweetCache).count()
-                
-                # Processing completion stats
-                cache_complete = session.query(TweetCache).filter_by(cache_complete=True).count()
-                media_processed = session.query(TweetCache).filter_by(media_processed=True).count()
-                categories_processed = session.query(TweetCache).filter_by(categories_processed=True).count()
-                kb_items_created = session.query(TweetCache).filter_by(kb_item_created=True).count()
-                
-                # Fully processed tweets
-                fully_processed = session.query(TweetCache).filter(
-                    and_(
-                        TweetCache.cache_complete == True,
-                        TweetCache.media_processed == True,
-                        TweetCache.categories_processed == True,
-                        TweetCache.kb_item_created == True
-                    )
-                ).count()
-                
-                # Reprocessing stats
-                needs_reprocessing = session.query(TweetCache).filter(
-                    or_(
-                        TweetCache.force_reprocess_pipeline == True,
-                        TweetCache.force_recache == True
-                    )
-                ).count()
-                
-                # Category distribution
-                category_stats = session.query(
-                    TweetCache.main_category,
-                    func.count(TweetCache.id).label('count')
-                ).filter(
-                    TweetCache.main_category.isnot(None)
-                ).group_by(TweetCache.main_category).all()
-                
-                return {
-                    'total_tweets': total_tweets,
-                    'processing_completion': {
-                        'cache_complete': cache_complete,
-                        'media_processed': media_processed,
-                        'categories_processed': categories_processed,
-                        'kb_items_created': kb_items_created,
-                        'fully_processed': fully_processed,
-                        'completion_rate': (fully_processed / total_tweets * 100) if total_tweets > 0 else 0
-                    },
-                    'reprocessing': {
-                        'needs_reprocessing': needs_reprocessing,
-                        'reprocessing_rate': (needs_reprocessing / total_tweets * 100) if total_tweets > 0 else 0
-                    },
-                    'categories': {
-                        category: count for category, count in category_stats
-                    }
-                }
+                return build_statistics(read_tweet_counters(session, resync_seconds))
         except Exception as e:
             self._handle_db_error("get processing statistics", e)
     
@@ -1702,42 +1793,43 @@ class CategoryRepository(BaseRepository):
         """
         try:
             with self._get_session() as session:
-                # Get actual counts from knowledge base items
                 from .models import KnowledgeBaseItem
                 
-                count_query = session.query(
+                # One UPDATE ... FROM: per-category counts joined onto every category row,
+                # so categories without items are reset to zero in the same statement
+                item_counts = session.query(
                     KnowledgeBaseItem.main_category,
                     KnowledgeBaseItem.sub_category,
-                    func.count(KnowledgeBaseItem.id).label('count')
+                    func.count(KnowledgeBaseItem.id).label('item_count')
                 ).group_by(
                     KnowledgeBaseItem.main_category,
                     KnowledgeBaseItem.sub_category
-                ).all()
-                
-                updated_counts = {}
+                ).subquery()
+                categories = CategoryHierarchy.__table__.alias('counted_category')
+                new_counts = select(
+                    categories.c.id,
+                    func.coalesce(item_counts.c.item_count, 0).label('item_count')
+                ).select_from(
+                    categories.outerjoin(item_counts, and_(
+                        item_counts.c.main_category == categories.c.main_category,
+                        item_counts.c.sub_category == categories.c.sub_category
+                    ))
+                ).subquery()
+                session.execute(
+                    sa_update(CategoryHierarchy)
+                    .where(CategoryHierarchy.id == new_counts.c.id)
+                    .values(item_count=new_counts.c.item_count, last_updated=datetime.now(timezone.utc))
+                    .execution_options(synchronize_session=False)
+                )
                 
-                # Update each category's item count
-                for main_cat, sub_cat, count in count_query:
-                    category = session.query(CategoryHierarchy).filter_by(
-                        main_category=main_cat,
-                        sub_category=sub_cat
-                    ).first()
-                    
-                    if category:
-                        category.item_count = count
-                        category.last_updated = datetime.now(timezone.utc)
-                        updated_counts[f"{main_cat}/{sub_cat}"] = count
-                
-                # Set zero counts for categories with no items
-                all_categories = session.query(CategoryHierarchy).all()
-                for category in all_categories:
-                    key = f"{category.main_category}/{category.sub_category}"
-                    if key not in updated_counts:
-                        category.item_count = 0
-                        category.last_updated = datetime.now(timezone.utc)
-                        updated_counts[key] = 0
-                
-                return updated_counts
+                return {
+                    f"{main_cat}/{sub_cat}": count
+                    for main_cat, sub_cat, count in session.query(
+                        CategoryHierarchy.main_category,
+                        CategoryHierarchy.sub_category,
+                        CategoryHierarchy.item_count
+                    )
+                }
         except Exception as e:
             self._handle_db_error("refresh all item counts", e)
     
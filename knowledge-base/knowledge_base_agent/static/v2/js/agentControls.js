@@ -259,6 +259,12 @@ class AgentControlManager {
                 }
             }
         });
+
+        // Restore categorization options
+        const fusedBtn = document.querySelector('[data-pref="fused_categorization"]');
+        if (fusedBtn && preferences.fused_categorization) {
+            fusedBtn.classList.add('active');
+        }
     }
 
     initSocketListeners() {
@@ -465,6 +471,9 @@ class AgentControlManager {
             // Legacy/combined flag
             force_reprocess_content: forceFlags.force_reprocess_content || false,
 
+            // Categorization options
+            fused_categorization: document.querySelector('[data-pref="fused_categorization"]')?.classList.contains('active') || false,
+
             // Additional options that might be configurable in the future
             synthesis_mode: "comprehensive",
             synthesis_min_items: 3,
@@ -558,6 +567,12 @@ class AgentControlManager {
             }
         });
 
+        // Restore categorization options
+        const fusedCategorizationBtn = document.querySelector('[data-pref="fused_categorization"]');
+        if (fusedCategorizationBtn) {
+            fusedCategorizationBtn.classList.toggle('active', Boolean(preferences.fused_categorization));
+        }
+
         // Update execution plan after restoring preferences
         this.executionPlanManager.updateExecutionPlan(preferences);
     }
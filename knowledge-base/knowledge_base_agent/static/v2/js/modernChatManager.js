@@ -1061,19 +1061,28 @@ class ModernChatManager extends BaseManager {
                 if (sres && Array.isArray(sres.results)) searchHits = sres.results.slice(0, 8);
             } catch (_) {}
 
-            const response = await this.apiCall('/chat/enhanced', {
-                method: 'POST',
-                body: {
-                    message: message,
-                    session_id: this.currentSessionId,
-                    model: this.selectedModel,
-                    use_knowledge_base: true,
-                    include_embeddings: true,
-                    search_context: searchHits
-                },
-                errorMessage: 'Failed to send message',
-                timeout: 120000 // 2 minute timeout for knowledge base queries
-            });
+            const requestBody = {
+                message: message,
+                session_id: this.currentSessionId,
+                model: this.selectedModel,
+                use_knowledge_base: true,
+                include_embeddings: true,
+                search_context: searchHits
+            };
+            let response;
+            try {
+                // Stream tokens as they are generated
+                response = await this.streamChatResponse(requestBody);
+            } catch (streamError) {
+                // Only fall back when the stream was never accepted, or the message would be stored twice
+                if (!streamError.fallback) throw streamError;
+                response = await this.apiCall('/chat/enhanced', {
+                    method: 'POST',
+                    body: requestBody,
+                    errorMessage: 'Failed to send message',
+                    timeout: 120000 // 2 minute timeout for knowledge base queries
+                });
+            }
             const responseTime = Date.now() - startTime;
             // Add assistant response to UI
             this.addMessageToUI({
@@ -1084,6 +1093,8 @@ class ModernChatManager extends BaseManager {
                 context_stats: response.context_stats || {},
                 performance_metrics: {
                     response_time: responseTime,
+                    time_to_first_token: response.performance_metrics?.time_to_first_token_ms,
+                    tokens_per_second: response.performance_metrics?.tokens_per_second,
                     tokens_used: response.context_stats?.total_tokens || 0,
                     sources_count: response.sources?.length || 0,
                     embedding_matches: response.context_stats?.embedding_matches || 0
@@ -1103,6 +1114,82 @@ class ModernChatManager extends BaseManager {
             this.isTyping = false;
         }
     }
+    /**
+     * Send a chat message to the streaming endpoint and show the answer while it is generated.
+     * Resolves with the final 'done' event, shaped like the /chat/enhanced response.
+     */
+    async streamChatResponse(body) {
+        let res;
+        try {
+            res = await fetch(`${this.apiService?.baseURL || '/api'}/chat/enhanced/stream`, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json', 'Accept': 'text/event-stream' },
+                body: JSON.stringify(body)
+            });
+        } catch (error) {
+            error.fallback = true;
+            throw error;
+        }
+        if (!res.ok || !res.body) {
+            const error = new Error(`Streaming chat failed with status ${res.status}`);
+            error.fallback = true;
+            throw error;
+        }
+        const reader = res.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let liveText = null;
+        let result = null;
+        try {
+            while (!result) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+                let boundary;
+                while (!result && (boundary = buffer.indexOf('\n\n')) !== -1) {
+                    const frame = buffer.slice(0, boundary);
+                    buffer = buffer.slice(boundary + 2);
+                    const eventName = /^event: (.*)$/m.exec(frame)?.[1];
+                    const dataLine = /^data: (.*)$/m.exec(frame)?.[1];
+                    if (!eventName || !dataLine) continue;
+                    const data = JSON.parse(dataLine);
+                    if (eventName === 'token') {
+                        if (!liveText) {
+                            this.hideTypingIndicator();
+                            liveText = this.createStreamingMessage();
+                        }
+                        liveText.textContent += data.content;
+                        this.scrollToBottom();
+                    } else if (eventName === 'done') {
+                        result = data;
+                    } else if (eventName === 'error') {
+                        throw new Error(data.error || 'Streaming chat failed');
+                    }
+                }
+            }
+        } finally {
+            reader.cancel().catch(() => {});
+            // The streamed text is replaced by the fully rendered message
+            liveText?.closest('.message')?.remove();
+        }
+        if (!result) throw new Error('Chat stream ended before the response was complete');
+        return result;
+    }
+    createStreamingMessage() {
+        const welcomeMessage = this.elements.chatMessages.querySelector('.welcome-message');
+        if (welcomeMessage) {
+            welcomeMessage.remove();
+        }
+        this.elements.chatMessages.insertAdjacentHTML('beforeend', this.messageRenderer.createMessageHTML({
+            role: 'assistant',
+            content: '',
+            created_at: new Date().toISOString()
+        }, true));
+        const messages = this.elements.chatMessages.querySelectorAll('.assistant-message');
+        const textElement = messages[messages.length - 1].querySelector('.message-text');
+        textElement.classList.add('streaming');
+        return textElement;
+    }
     addMessageToUI(message) {
         const messageHTML = this.messageRenderer.createMessageHTML(message);
         // Remove welcome message if present
@@ -1655,6 +1742,18 @@ class MessageRenderer {
                             <span class="label">Response Time:</span>
                             <span class="value">${this.chatManager.durationFormatter.format(metrics.response_time || 0)}</span>
                         </div>
+                        ${metrics.time_to_first_token ? `
+                        <div class="metric">
+                            <span class="label">First Token:</span>
+                            <span class="value">${this.chatManager.durationFormatter.format(metrics.time_to_first_token)}</span>
+                        </div>
+                        ` : ''}
+                        ${metrics.tokens_per_second ? `
+                        <div class="metric">
+                            <span class="label">Tokens/sec:</span>
+                            <span class="value">${metrics.tokens_per_second}</span>
+                        </div>
+                        ` : ''}
                         <div class="metric">
                             <span class="label">Tokens Used:</span>
                             <span class="value">${metrics.tokens_used || 0}</span>
@@ -0,0 +1,65 @@
+/**
+ * Progress Delta Merge
+ *
+ * The server coalesces progress_update / phase_update events and, after the
+ * first full state, sends only the fields that changed (marked `delta: true`).
+ * Both types share the task_progress event, so each coalesced payload carries
+ * its originating `type` and deltas merge only onto states of that type.
+ * This wraps Socket.IO listeners for those events so every handler still
+ * receives the complete, merged state.
+ */
+(function () {
+    'use strict';
+
+    const MERGED_EVENTS = new Set(['progress_update', 'phase_update', 'phase_status_update', 'task_progress']);
+    const BATCH_SUFFIX = '_batch';
+    const lastState = new Map();
+
+    function stateKey(eventName, data) {
+        return `${eventName}|${data.type || ''}|${data.task_id || ''}|${data.phase_id || data.operation || ''}`;
+    }
+
+    function merge(eventName, data) {
+        if (!data || typeof data !== 'object') {
+            return data;
+        }
+        const key = stateKey(eventName, data);
+        const merged = data.delta ? Object.assign({}, lastState.get(key), data) : Object.assign({}, data);
+        delete merged.delta;
+        lastState.set(key, merged);
+        return merged;
+    }
+
+    function installProgressDeltaMerge(io) {
+        const proto = io && io.Socket && io.Socket.prototype;
+        if (!proto || proto.__progressDeltaMerge) {
+            return;
+        }
+
+        const originalOn = proto.on;
+        proto.on = function (eventName, handler) {
+            const isBatch = typeof eventName === 'string' && eventName.endsWith(BATCH_SUFFIX);
+            const baseName = isBatch ? eventName.slice(0, -BATCH_SUFFIX.length) : eventName;
+            if (!MERGED_EVENTS.has(baseName) || typeof handler !== 'function') {
+                return originalOn.call(this, eventName, handler);
+            }
+
+            const wrapped = isBatch
+                ? (data, ...rest) => handler(
+                    data && Array.isArray(data.events)
+                        ? Object.assign({}, data, { events: data.events.map(event => merge(baseName, event)) })
+                        : data,
+                    ...rest)
+                : (data, ...rest) => handler(merge(eventName, data), ...rest);
+            // Lets socket.off(eventName, handler) find the wrapper
+            wrapped.fn = handler;
+            return originalOn.call(this, eventName, wrapped);
+        };
+        proto.__progressDeltaMerge = true;
+    }
+
+    window.installProgressDeltaMerge = installProgressDeltaMerge;
+    if (window.io) {
+        installProgressDeltaMerge(window.io);
+    }
+})();
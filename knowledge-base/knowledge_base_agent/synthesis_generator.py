@@ -28,6 +28,7 @@ from .naming_utils import (
     generate_short_name,
 )
 from .synthesis_tracker import SynthesisDependencyTracker
+from .render_cache import get_render_cache
 from .stats_manager import update_phase_stats
 
 
@@ -463,7 +464,8 @@ class SynthesisGenerator:
                 temperature=0.7,
                 max_tokens=getattr(self.config, 'max_synthesis_tokens', 4000),
                 timeout=synthesis_timeout,
-                options={"json_mode": True}
+                options={"json_mode": True},
+                cache_phase="synthesis"
             )
             
             self.logger.info(f"Completed synthesis JSON generation for '{target_name}'")
@@ -512,7 +514,8 @@ class SynthesisGenerator:
                 prompt=prompt,
                 temperature=0.7,
                 max_tokens=getattr(self.config, 'max_synthesis_tokens', 4000),
-                timeout=synthesis_timeout
+                timeout=synthesis_timeout,
+                cache_phase="synthesis"
             )
             
             self.logger.info(f"Completed synthesis markdown generation for '{target_name}'")
@@ -586,6 +589,14 @@ class SynthesisGenerator:
             
             db.session.commit()
             
+            # Render the markdown now so the synthesis endpoint never has to
+            try:
+                get_render_cache(self.config).store('synthesis', db_synthesis.id, synthesis_markdown)
+                db.session.commit()
+            except Exception as e:
+                self.logger.warning(f"Failed to render synthesis for '{target_name}' on write: {e}")
+                db.session.rollback()
+            
             # Update dependency tracking
             self.dependency_tracker.update_synthesis_dependencies(db_synthesis.id, source_items)
             
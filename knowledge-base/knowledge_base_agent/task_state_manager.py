@@ -562,7 +562,8 @@ class TaskStateManager:
             'execution_time': run_report.get('execution_time'),
             'processed_count': run_report.get('processed_count', 0),
             'error_count': run_report.get('error_count', 0),
-            'phase_count': len(run_report.get('phase_statuses', {}))
+            'phase_count': len(run_report.get('phase_statuses', {})),
+            'llm_cache_hit_rate': run_report.get('llm_cache', {}).get('hit_rate')
         }
     
     def _format_duration(self, seconds: float) -> str:
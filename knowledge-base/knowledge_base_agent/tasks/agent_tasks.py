@@ -338,6 +338,10 @@ def run_agent_task(self, task_id: str, preferences_dict: Dict[str, Any]):
             logging.error(f"Error during task cleanup: {cleanup_error}", exc_info=True)
             # Don't raise - we don't want cleanup errors to mask the original error
         
+        # Write out task log lines still queued for the database
+        from ..unified_logging import cleanup_task_logger
+        cleanup_task_logger(task_id)
+        
         # Remove log handler
         if log_handler:
             root_logger.removeHandler(log_handler)
@@ -515,6 +519,7 @@ def _generate_task_run_report(agent, preferences: UserPreferences, result: Dict[
     preference_summary.append(f"Skip Embedding Generation: {preferences.skip_embedding_generation}")
     preference_summary.append(f"Skip README Generation: {preferences.skip_readme_generation}")
     preference_summary.append(f"Skip Git Push: {preferences.skip_git_push}")
+    preference_summary.append(f"Fused Categorization: {preferences.fused_categorization}")
     
     # Add force flags if any are enabled
     force_flags = []
@@ -540,6 +545,28 @@ def _generate_task_run_report(agent, preferences: UserPreferences, result: Dict[
     else:
         preference_summary.append("Force Flags: None")
     
+    # LLM response cache effectiveness for this run
+    llm_cache_stats = {}
+    http_client = getattr(agent, 'http_client', None)
+    if http_client is not None and hasattr(http_client, 'get_response_cache_stats'):
+        llm_cache_stats = http_client.get_response_cache_stats()
+    cache_hits = llm_cache_stats.get('memory_hits', 0) + llm_cache_stats.get('database_hits', 0)
+    cache_lookups = cache_hits + llm_cache_stats.get('misses', 0) + llm_cache_stats.get('retry_bypasses', 0)
+    cache_summary = [
+        f"{phase}: {counts.get('hit_rate', 0.0):.0%} hit rate"
+        for phase, counts in llm_cache_stats.get('by_phase', {}).items()
+    ]
+    
+    # Share of prompt tokens the inference server reused from its KV cache
+    prompt_cache_stats = {}
+    if http_client is not None and hasattr(http_client, 'get_prompt_cache_stats'):
+        prompt_cache_stats = http_client.get_prompt_cache_stats()
+    prompt_cache_summary = [
+        f"{phase}: {counts.get('cached_tokens', 0)}/{counts.get('prompt_tokens', 0)} tokens "
+        f"({counts.get('cache_hit_rate', 0.0):.0%}), {counts.get('prompt_eval_seconds', 0.0):.1f}s prompt eval"
+        for phase, counts in prompt_cache_stats.get('by_phase', {}).items()
+    ]
+    
     # Build log lines for output
     log_lines = [
         "=" * 80,
@@ -556,6 +583,15 @@ def _generate_task_run_report(agent, preferences: UserPreferences, result: Dict[
         "📊 PHASE EXECUTION RESULTS:",
         *[f"  {phase}" for phase in phase_summary],
         "",
+        f"🗄️ LLM RESPONSE CACHE: {cache_hits}/{cache_lookups} lookups served "
+        f"({llm_cache_stats.get('hit_rate', 0.0):.0%})",
+        *[f"  • {line}" for line in cache_summary],
+        "",
+        f"🧠 PROMPT PREFIX CACHE: {prompt_cache_stats.get('cached_tokens', 0)}/"
+        f"{prompt_cache_stats.get('prompt_tokens', 0)} prompt tokens reused "
+        f"({prompt_cache_stats.get('cache_hit_rate', 0.0):.0%})",
+        *[f"  • {line}" for line in prompt_cache_summary],
+        "",
         "🎯 FINAL STATUS: " + ("SUCCESS" if error_count == 0 else f"COMPLETED WITH {error_count} ERRORS"),
         "=" * 80
     ]
@@ -570,6 +606,8 @@ def _generate_task_run_report(agent, preferences: UserPreferences, result: Dict[
         'phase_statuses': phase_statuses,
         'preferences': asdict(preferences),
         'force_flags': force_flags,
+        'llm_cache': llm_cache_stats,
+        'prompt_cache': prompt_cache_stats,
         'log_lines': log_lines,
         'final_status': 'SUCCESS' if error_count == 0 else 'COMPLETED_WITH_ERRORS'
     }
@@ -48,19 +48,22 @@ def process_chat_task(self, task_id: str, session_id: str, message: str, context
         
         # Initialize chat components
         http_client = HTTPClient(config)
-        embedding_manager = EmbeddingManager(config, http_client)
-        chat_manager = ChatManager(config, http_client, embedding_manager)
-        
-        # Update progress
-        progress_manager.update_progress(task_id, 25, "chat_processing", "Initializing chat components")
-        
-        # Process chat (identical to current implementation)
-        progress_manager.update_progress(task_id, 50, "chat_processing", "Processing chat query")
-        response = await chat_manager.get_response(message, context)
-        
-        progress_manager.update_progress(task_id, 100, "chat_processing", "Chat processing completed")
-        
-        return response
+        try:
+            embedding_manager = EmbeddingManager(config, http_client)
+            chat_manager = ChatManager(config, http_client, embedding_manager)
+            
+            # Update progress
+            progress_manager.update_progress(task_id, 25, "chat_processing", "Initializing chat components")
+            
+            # Process chat (identical to current implementation)
+            progress_manager.update_progress(task_id, 50, "chat_processing", "Processing chat query")
+            response = await chat_manager.get_response(message, context)
+            
+            progress_manager.update_progress(task_id, 100, "chat_processing", "Chat processing completed")
+            
+            return response
+        finally:
+            await http_client.close()
     
     try:
         progress_manager.log_message(task_id, f"💬 Starting chat processing for session {session_id}", "INFO")
@@ -132,38 +135,41 @@ def update_embeddings_index_task(self, task_id: str, content_paths: Optional[lis
         
         # Initialize embedding manager
         http_client = HTTPClient(config)
-        embedding_manager = EmbeddingManager(config, http_client)
-        
-        # Update progress
-        progress_manager.update_progress(task_id, 25, "update_embeddings_index", "Initializing embedding manager")
-        
-        # Update embeddings index
-        progress_manager.update_progress(task_id, 50, "update_embeddings_index", "Updating embeddings index")
-        
-        if content_paths:
-            # Update specific content paths
-            updated_count = 0
-            for i, path in enumerate(content_paths):
-                try:
-                    await embedding_manager.update_embedding_for_path(path)
-                    updated_count += 1
-                    progress_manager.update_progress(
-                        task_id, 
-                        50 + int((i + 1) / len(content_paths) * 40), 
-                        "update_embeddings_index",
-                        f"Updated embeddings for {i+1}/{len(content_paths)} paths"
-                    )
-                except Exception as e:
-                    progress_manager.log_message(task_id, f"Failed to update embeddings for {path}: {e}", "ERROR")
+        try:
+            embedding_manager = EmbeddingManager(config, http_client)
             
-            result = {'updated_paths': updated_count, 'total_paths': len(content_paths)}
-        else:
-            # Full index update
-            result = await embedding_manager.rebuild_index()
+            # Update progress
+            progress_manager.update_progress(task_id, 25, "update_embeddings_index", "Initializing embedding manager")
             
-        progress_manager.update_progress(task_id, 100, "update_embeddings_index", "Embeddings index update completed")
-        
-        return result
+            # Update embeddings index
+            progress_manager.update_progress(task_id, 50, "update_embeddings_index", "Updating embeddings index")
+            
+            if content_paths:
+                # Update specific content paths
+                updated_count = 0
+                for i, path in enumerate(content_paths):
+                    try:
+                        await embedding_manager.update_embedding_for_path(path)
+                        updated_count += 1
+                        progress_manager.update_progress(
+                            task_id, 
+                            50 + int((i + 1) / len(content_paths) * 40), 
+                            "update_embeddings_index",
+                            f"Updated embeddings for {i+1}/{len(content_paths)} paths"
+                        )
+                    except Exception as e:
+                        progress_manager.log_message(task_id, f"Failed to update embeddings for {path}: {e}", "ERROR")
+                
+                result = {'updated_paths': updated_count, 'total_paths': len(content_paths)}
+            else:
+                # Full index update
+                result = await embedding_manager.rebuild_index()
+                
+            progress_manager.update_progress(task_id, 100, "update_embeddings_index", "Embeddings index update completed")
+            
+            return result
+        finally:
+            await http_client.close()
     
     try:
         progress_manager.log_message(task_id, "🧠 Starting embeddings index update", "INFO")
@@ -234,22 +240,25 @@ def search_knowledge_base_task(self, task_id: str, query: str, max_results: int
         
         # Initialize embedding manager
         http_client = HTTPClient(config)
-        embedding_manager = EmbeddingManager(config, http_client)
-        
-        # Update progress
-        progress_manager.update_progress(task_id, 25, "search_knowledge_base", "Initializing search components")
-        
-        # Perform search
-        progress_manager.update_progress(task_id, 50, "search_knowledge_base", "Searching knowledge base")
-        results = await embedding_manager.search_similar_content(
-            query, 
-            max_results=max_results,
-            similarity_threshold=similarity_threshold
-        )
-        
-        progress_manager.update_progress(task_id, 100, "search_knowledge_base", "Search completed")
-        
-        return results
+        try:
+            embedding_manager = EmbeddingManager(config, http_client)
+            
+            # Update progress
+            progress_manager.update_progress(task_id, 25, "search_knowledge_base", "Initializing search components")
+            
+            # Perform search
+            progress_manager.update_progress(task_id, 50, "search_knowledge_base", "Searching knowledge base")
+            results = await embedding_manager.search_similar_content(
+                query, 
+                max_results=max_results,
+                similarity_threshold=similarity_threshold
+            )
+            
+            progress_manager.update_progress(task_id, 100, "search_knowledge_base", "Search completed")
+            
+            return results
+        finally:
+            await http_client.close()
     
     try:
         progress_manager.log_message(task_id, f"🔍 Starting knowledge base search for: {query[:50]}...", "INFO")
@@ -323,19 +332,22 @@ def generate_chat_context_task(self, task_id: str, query: str, search_results: l
         
         # Initialize chat components
         http_client = HTTPClient(config)
-        embedding_manager = EmbeddingManager(config, http_client)
-        chat_manager = ChatManager(config, http_client, embedding_manager)
-        
-        # Update progress
-        progress_manager.update_progress(task_id, 25, "generate_chat_context", "Initializing context generation")
-        
-        # Generate context
-        progress_manager.update_progress(task_id, 50, "generate_chat_context", "Generating chat context")
-        context = await chat_manager.generate_context_from_search_results(query, search_results)
-        
-        progress_manager.update_progress(task_id, 100, "generate_chat_context", "Context generation completed")
-        
-        return context
+        try:
+            embedding_manager = EmbeddingManager(config, http_client)
+            chat_manager = ChatManager(config, http_client, embedding_manager)
+            
+            # Update progress
+            progress_manager.update_progress(task_id, 25, "generate_chat_context", "Initializing context generation")
+            
+            # Generate context
+            progress_manager.update_progress(task_id, 50, "generate_chat_context", "Generating chat context")
+            context = await chat_manager.generate_context_from_search_results(query, search_results)
+            
+            progress_manager.update_progress(task_id, 100, "generate_chat_context", "Context generation completed")
+            
+            return context
+        finally:
+            await http_client.close()
     
     try:
         progress_manager.log_message(task_id, f"📝 Starting context generation for query: {query[:50]}...", "INFO")
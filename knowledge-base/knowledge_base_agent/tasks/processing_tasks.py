@@ -294,29 +294,32 @@ def generate_embeddings_task(self, task_id: str, content_ids: List[str], prefere
         
         # Initialize embedding manager
         http_client = HTTPClient(config)
-        embedding_manager = EmbeddingManager(config, http_client)
-        
-        # Generate embeddings for content IDs
-        generated_count = 0
-        for i, content_id in enumerate(content_ids):
-            progress_manager.update_progress(
-                task_id, 
-                int((i + 1) / len(content_ids) * 100), 
-                "generate_embeddings",
-                f"Generating embeddings {i+1}/{len(content_ids)}: {content_id}"
-            )
+        try:
+            embedding_manager = EmbeddingManager(config, http_client)
             
-            try:
-                await embedding_manager.generate_embeddings_for_content(
-                    content_id, 
-                    force_regenerate=preferences.force_regenerate_embeddings
+            # Generate embeddings for content IDs
+            generated_count = 0
+            for i, content_id in enumerate(content_ids):
+                progress_manager.update_progress(
+                    task_id, 
+                    int((i + 1) / len(content_ids) * 100), 
+                    "generate_embeddings",
+                    f"Generating embeddings {i+1}/{len(content_ids)}: {content_id}"
                 )
-                generated_count += 1
-                progress_manager.log_message(task_id, f"Generated embeddings for {content_id}", "INFO")
-            except Exception as e:
-                progress_manager.log_message(task_id, f"Failed to generate embeddings for {content_id}: {e}", "ERROR")
-        
-        return generated_count
+                
+                try:
+                    await embedding_manager.generate_embeddings_for_content(
+                        content_id, 
+                        force_regenerate=preferences.force_regenerate_embeddings
+                    )
+                    generated_count += 1
+                    progress_manager.log_message(task_id, f"Generated embeddings for {content_id}", "INFO")
+                except Exception as e:
+                    progress_manager.log_message(task_id, f"Failed to generate embeddings for {content_id}: {e}", "ERROR")
+            
+            return generated_count
+        finally:
+            await http_client.close()
     
     try:
         progress_manager.log_message(task_id, f"🧠 Starting embedding generation for {len(content_ids)} items", "INFO")
@@ -0,0 +1,134 @@
+"""
+Tweet Explorer Queries
+
+Helpers behind TweetCacheRepository.explore_tweets and /api/v2/tweets/explore.
+
+Pages are addressed with keyset cursors instead of OFFSET. A cursor holds the
+sort key and id of the last row of a page; the next page seeks past that pair
+on the (sort key, id) indexes declared on TweetCache, so a deep page costs the
+same as the first one. Rows are projected to the columns the list view shows.
+
+Totals are not counted on every page either. Filters that map onto one of the
+materialized tweet statistics counters are answered from them, and any other
+total is cached per filter set for ``explore_count_cache_seconds``.
+"""
+
+import base64
+import binascii
+import json
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from .tweet_statistics import CATEGORY_PREFIX, TOTAL
+
+# Columns loaded for each explorer row; media_count and thread_length are computed in SQL
+EXPLORE_COLUMNS = (
+    'id', 'tweet_id', 'bookmarked_tweet_id', 'is_thread', 'display_title', 'main_category', 'sub_category',
+    'source', 'cache_complete', 'media_processed', 'categories_processed', 'kb_item_created', 'urls_expanded',
+    'db_synced', 'force_reprocess_pipeline', 'force_recache', 'reprocess_requested_at', 'reprocess_requested_by',
+    'recategorization_attempts', 'kb_item_path', 'created_at', 'updated_at',
+)
+
+SORT_FIELDS = ('updated_at', 'created_at', 'tweet_id', 'main_category', 'relevance')
+DEFAULT_SORT = 'updated_at'
+
+# Boolean filter -> (TweetCache flag, tweet statistics counter)
+FLAG_FILTERS = {
+    'has_media': ('media_processed', 'media_processed'),
+    'has_categories': ('categories_processed', 'categories_processed'),
+    'has_kb_item': ('kb_item_created', 'kb_items_created'),
+}
+
+DEFAULT_COUNT_CACHE_SECONDS = 30.0
+
+
+class InvalidCursorError(ValueError):
+    """Raised for a cursor that is malformed or was issued for another sort."""
+
+
+def encode_cursor(sort_by: str, sort_order: str, value: Any, row_id: int) -> str:
+    """Encode the sort key and id of the last row on a page as an opaque cursor."""
+    if isinstance(value, datetime):
+        value = {'datetime': value.isoformat()}
+    payload = json.dumps([sort_by, sort_order, value, row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> Tuple[Any, int]:
+    """Return the (sort key, id) pair a cursor seeks past."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        cursor_sort, cursor_order, value, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        if isinstance(value, dict):
+            value = datetime.fromisoformat(value['datetime'])
+        row_id = int(row_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError, KeyError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {e}") from e
+    if (cursor_sort, cursor_order) != (sort_by, sort_order):
+        raise InvalidCursorError(f"Cursor was issued for sort {cursor_sort} {cursor_order}")
+    return value, row_id
+
+
+def counter_for_filters(filters: Mapping[str, Any]) -> Optional[Tuple[str, bool]]:
+    """
+    Return (counter name, complement) when the filtered total is a tweet
+    statistics counter, or total_tweets minus one when complement is True.
+    A complement also counts tweets whose flag is NULL, which the explorer's
+    False filter (IS NOT TRUE) matches as well.
+    """
+    active = {key: value for key, value in filters.items() if value is not None and value != ''}
+    if not active:
+        return TOTAL, False
+    if len(active) != 1:
+        return None
+    key, value = next(iter(active.items()))
+    if key == 'main_category':
+        return CATEGORY_PREFIX + value, False
+    if key in FLAG_FILTERS:
+        return FLAG_FILTERS[key][1], not value
+    return None
+
+
+def _filters_key(filters: Mapping[str, Any]) -> Tuple:
+    return tuple(sorted((key, value.isoformat() if isinstance(value, datetime) else value)
+                        for key, value in filters.items()))
+
+
+class ExploreCountCache:
+    """Filtered explorer totals, each kept for a fixed number of seconds."""
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple, Tuple[float, int]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, filters: Mapping[str, Any]) -> Optional[int]:
+        key = _filters_key(filters)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, filters: Mapping[str, Any], count: int, ttl_seconds: float) -> None:
+        if ttl_seconds <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                self._entries = {key: entry for key, entry in self._entries.items() if entry[0] > now}
+                if len(self._entries) >= self.max_entries:
+                    self._entries.pop(min(self._entries, key=lambda key: self._entries[key][0]))
+            self._entries[_filters_key(filters)] = (now + ttl_seconds, count)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+explore_count_cache = ExploreCountCache()
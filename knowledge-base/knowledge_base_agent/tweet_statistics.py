@@ -0,0 +1,277 @@
+"""
+Tweet Processing Statistics
+
+The dashboard polls tweet processing statistics. Instead of counting the
+tweet cache table on every poll, the counts are served from the small
+``tweet_statistics_counter`` table.
+
+The counters are computed in one aggregate pass over the tweet table: a
+conditional ``SUM(CASE ...)`` per processing flag, grouped by main category.
+After that they are kept current incrementally. Flag transitions flushed
+through any session become counter deltas, which are applied once the
+transaction commits. Bulk UPDATE/DELETE statements against the tweet table
+carry no per-row history, so they mark the counters stale instead and the
+next read recomputes them. Counters are also recomputed after
+``tweet_stats_resync_seconds`` to bound drift from writes made outside the ORM.
+"""
+
+import logging
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, Optional
+
+from sqlalchemy import and_, case, event, func, or_, inspect as sa_inspect
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import TweetCache, TweetStatisticsCounter
+
+logger = logging.getLogger(__name__)
+
+TOTAL = 'total_tweets'
+FULLY_PROCESSED = 'fully_processed'
+NEEDS_REPROCESSING = 'needs_reprocessing'
+CATEGORY_PREFIX = 'category:'
+# Present only while the counters are a valid snapshot; its updated_at is the last full recount
+SNAPSHOT = '__snapshot__'
+
+# Processing flag -> counter name
+FLAG_COUNTERS = {
+    'cache_complete': 'cache_complete',
+    'media_processed': 'media_processed',
+    'categories_processed': 'categories_processed',
+    'kb_item_created': 'kb_items_created',
+}
+REPROCESS_FLAGS = ('force_reprocess_pipeline', 'force_recache')
+TRACKED_FIELDS = tuple(FLAG_COUNTERS) + REPROCESS_FLAGS + ('main_category',)
+
+DEFAULT_RESYNC_SECONDS = 3600.0
+
+_SESSION_CHANGES_KEY = 'tweet_stats_changes'
+
+_table_ready = False
+
+
+def tweet_counters(values: Mapping[str, Any]) -> Dict[str, int]:
+    """Return the counters one tweet with these field values contributes to."""
+    counters = {TOTAL: 1}
+    for flag, name in FLAG_COUNTERS.items():
+        if values.get(flag):
+            counters[name] = 1
+    if all(values.get(flag) for flag in FLAG_COUNTERS):
+        counters[FULLY_PROCESSED] = 1
+    if any(values.get(flag) for flag in REPROCESS_FLAGS):
+        counters[NEEDS_REPROCESSING] = 1
+    if values.get('main_category') is not None:
+        counters[CATEGORY_PREFIX + values['main_category']] = 1
+    return counters
+
+
+def compute_tweet_counters(session: Session) -> Dict[str, int]:
+    """Count every statistic in a single aggregate query over the tweet table."""
+    def flag_sum(condition):
+        return func.sum(case((condition, 1), else_=0))
+
+    fully_processed = and_(*[getattr(TweetCache, flag) == True for flag in FLAG_COUNTERS])
+    needs_reprocessing = or_(*[getattr(TweetCache, flag) == True for flag in REPROCESS_FLAGS])
+    rows = session.query(
+        TweetCache.main_category,
+        func.count(TweetCache.id),
+        *[flag_sum(getattr(TweetCache, flag) == True) for flag in FLAG_COUNTERS],
+        flag_sum(fully_processed),
+        flag_sum(needs_reprocessing),
+    ).group_by(TweetCache.main_category).all()
+
+    names = [TOTAL] + list(FLAG_COUNTERS.values()) + [FULLY_PROCESSED, NEEDS_REPROCESSING]
+    counters = Counter({name: 0 for name in names})
+    for main_category, *values in rows:
+        for name, value in zip(names, values):
+            counters[name] += int(value or 0)
+        if main_category is not None:
+            counters[CATEGORY_PREFIX + main_category] = int(values[0] or 0)
+    return dict(counters)
+
+
+def build_statistics(counters: Mapping[str, int]) -> Dict[str, Any]:
+    """Shape counters into the response of TweetCacheRepository.get_processing_statistics."""
+    total_tweets = counters.get(TOTAL, 0)
+    fully_processed = counters.get(FULLY_PROCESSED, 0)
+    needs_reprocessing = counters.get(NEEDS_REPROCESSING, 0)
+    return {
+        'total_tweets': total_tweets,
+        'processing_completion': {
+            **{name: counters.get(name, 0) for name in FLAG_COUNTERS.values()},
+            'fully_processed': fully_processed,
+            'completion_rate': (fully_processed / total_tweets * 100) if total_tweets > 0 else 0
+        },
+        'reprocessing': {
+            'needs_reprocessing': needs_reprocessing,
+            'reprocessing_rate': (needs_reprocessing / total_tweets * 100) if total_tweets > 0 else 0
+        },
+        'categories': {
+            name[len(CATEGORY_PREFIX):]: value
+            for name, value in counters.items() if name.startswith(CATEGORY_PREFIX) and value > 0
+        }
+    }
+
+
+def _ensure_table(bind) -> None:
+    global _table_ready
+    if not _table_ready:
+        TweetStatisticsCounter.__table__.create(bind, checkfirst=True)
+        _table_ready = True
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def read_tweet_counters(session: Session, resync_seconds: Optional[float] = None) -> Dict[str, int]:
+    """
+    Return the materialized counters, recomputing them first when they are
+    missing, marked stale or older than resync_seconds.
+    """
+    bind = session.get_bind(TweetStatisticsCounter.__mapper__)
+    _ensure_table(bind)
+    max_age = DEFAULT_RESYNC_SECONDS if resync_seconds is None else resync_seconds
+    rows = session.query(TweetStatisticsCounter.name, TweetStatisticsCounter.value,
+                         TweetStatisticsCounter.updated_at).all()
+    snapshot = next((row for row in rows if row.name == SNAPSHOT), None)
+    now = datetime.now(timezone.utc)
+    if snapshot is not None and (now - _as_utc(snapshot.updated_at)).total_seconds() <= max_age:
+        return {row.name: row.value for row in rows if row.name != SNAPSHOT}
+
+    counters = compute_tweet_counters(session)
+    _store_snapshot(bind, counters)
+    return counters
+
+
+def _store_snapshot(bind, counters: Mapping[str, int]) -> None:
+    """Replace the counters table with a fresh recount, in its own transaction."""
+    now = datetime.now(timezone.utc)
+    try:
+        with Session(bind) as session:
+            session.query(TweetStatisticsCounter).delete(synchronize_session=False)
+            session.add_all([TweetStatisticsCounter(name=name, value=value, updated_at=now)
+                             for name, value in counters.items()])
+            session.add(TweetStatisticsCounter(name=SNAPSHOT, value=0, updated_at=now))
+            session.commit()
+    except SQLAlchemyError as e:
+        # Another process stored the same recount first; its rows are just as current
+        logger.debug(f"Tweet statistics snapshot not stored: {e}")
+
+
+def mark_tweet_counters_stale(bind) -> None:
+    """Force the next read to recount, e.g. after a raw SQL write to the tweet table."""
+    try:
+        _ensure_table(bind)
+        with Session(bind) as session:
+            session.query(TweetStatisticsCounter).filter_by(name=SNAPSHOT).delete(synchronize_session=False)
+            session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not mark tweet statistics stale: {e}")
+
+
+def _apply_counter_deltas(bind, deltas: Mapping[str, int]) -> None:
+    try:
+        _ensure_table(bind)
+        with Session(bind) as session:
+            if session.query(TweetStatisticsCounter.name).filter_by(name=SNAPSHOT).first() is None:
+                return
+            now = datetime.now(timezone.utc)
+            missing = False
+            # Sorted so concurrent writers lock counter rows in the same order
+            for name in sorted(deltas):
+                updated = session.query(TweetStatisticsCounter).filter_by(name=name).update(
+                    {'value': TweetStatisticsCounter.value + deltas[name], 'updated_at': now},
+                    synchronize_session=False
+                )
+                missing = missing or not updated
+            if missing:
+                # First tweet of a new category: let the next read recount rather than race on inserts
+                session.query(TweetStatisticsCounter).filter_by(name=SNAPSHOT).delete(synchronize_session=False)
+            session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Could not update tweet statistics counters, marking them stale: {e}")
+        mark_tweet_counters_stale(bind)
+
+
+# --- Session hooks -------------------------------------------------------
+
+def _session_changes(session: Session) -> Dict[str, Any]:
+    return session.info.setdefault(_SESSION_CHANGES_KEY, {'deltas': Counter(), 'stale': False})
+
+
+def _field_values(obj, before: bool) -> Optional[Dict[str, Any]]:
+    """Field values before or after the pending changes, or None if a prior value is unknown."""
+    state = sa_inspect(obj)
+    values = {}
+    for field in TRACKED_FIELDS:
+        history = state.attrs[field].history
+        if before and history.deleted:
+            values[field] = history.deleted[0]
+        elif before and history.added:
+            return None
+        else:
+            # Loads expired attributes, which before_flush allows
+            values[field] = getattr(obj, field)
+    return values
+
+
+def _track_previous_value(target, value, oldvalue, initiator) -> None:
+    pass
+
+
+# active_history loads the old value when a tracked attribute is set while expired, so it appears in history
+for _field in TRACKED_FIELDS:
+    event.listen(getattr(TweetCache, _field), 'set', _track_previous_value, active_history=True)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_counter_deltas(session: Session, flush_context, instances) -> None:
+    """Turn pending tweet flag transitions into counter deltas until the transaction commits."""
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if not isinstance(obj, TweetCache):
+            continue
+        if obj in session.new:
+            _session_changes(session)['deltas'].update(tweet_counters(_field_values(obj, before=False)))
+            continue
+        state = sa_inspect(obj)
+        if obj not in session.deleted and not any(state.attrs[field].history.has_changes() for field in TRACKED_FIELDS):
+            continue
+        changes = _session_changes(session)
+        before = _field_values(obj, before=True)
+        if before is None:
+            changes['stale'] = True
+            continue
+        changes['deltas'].subtract(tweet_counters(before))
+        if obj not in session.deleted:
+            changes['deltas'].update(tweet_counters(_field_values(obj, before=False)))
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _detect_bulk_tweet_writes(orm_execute_state) -> None:
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and mapper.local_table is TweetCache.__table__:
+        _session_changes(orm_execute_state.session)['stale'] = True
+
+
+@event.listens_for(Session, 'after_commit')
+def _apply_counter_changes(session: Session) -> None:
+    changes = session.info.pop(_SESSION_CHANGES_KEY, None)
+    if not changes:
+        return
+    bind = session.get_bind(TweetStatisticsCounter.__mapper__)
+    if changes['stale']:
+        mark_tweet_counters_stale(bind)
+        return
+    deltas = {name: delta for name, delta in changes['deltas'].items() if delta}
+    if deltas:
+        _apply_counter_deltas(bind, deltas)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_counter_changes(session: Session) -> None:
+    session.info.pop(_SESSION_CHANGES_KEY, None)
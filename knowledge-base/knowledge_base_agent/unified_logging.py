@@ -529,6 +529,8 @@ def get_unified_logger(task_id: str, config: Optional[Config] = None) -> Enhance
 
 
 def cleanup_task_logger(task_id: str):
-    """Clean up logger for completed task."""
+    """Clean up logger for completed task, writing out its queued log lines first."""
     if task_id in _task_loggers:
-        del _task_loggers[task_id]
\ No newline at end of file
+        logger = _task_loggers.pop(task_id)
+        if not logger.postgresql_logger.flush():
+            print(f"[POSTGRESQL_LOGGER_ERROR] Timed out writing queued logs for task {task_id}", file=sys.stderr)
\ No newline at end of file
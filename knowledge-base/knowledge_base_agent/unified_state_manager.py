@@ -6,15 +6,24 @@ No legacy code, no backward compatibility - just clean, unified operations.
 """
 
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 from datetime import datetime, timezone
 
+from sqlalchemy import inspect as sa_inspect
+
 from .models import db, UnifiedTweet
 from .config import Config
+from .render_cache import compute_content_hash, get_render_cache
+from .kb_toc import ITEM_TOC_FIELDS, get_kb_toc
 from .exceptions import StateError, StateManagerError
 
 logger = logging.getLogger(__name__)
 
+TIMESTAMP_FIELDS = ['created_at', 'updated_at', 'cached_at', 'processed_at', 'kb_generated_at', 'reprocess_requested_at']
+
 
 class UnifiedStateManager:
     """
@@ -37,6 +46,15 @@ class UnifiedStateManager:
             "validation_fixes": 0,
             "errors": 0
         }
+        
+        # Write-behind unit of work (see write_behind())
+        self.write_batch_size = max(1, getattr(config, 'state_write_batch_size', 200))
+        self.write_flush_seconds = getattr(config, 'state_write_flush_seconds', 2.0)
+        self._write_behind_depth = 0
+        self._pending_updates: Dict[str, Dict[str, Any]] = {}
+        self._last_flush = time.monotonic()
+        self._write_lock = threading.RLock()
+        self.write_stats = {"queued_updates": 0, "flushed_tweets": 0, "commits": 0}
     
     def initialize(self) -> Dict[str, Any]:
         """
@@ -95,40 +113,91 @@ class UnifiedStateManager:
             logger.error(f"❌ Failed to get processing state: {e}")
             raise StateManagerError(f"Failed to get processing state: {e}")
     
+    @contextmanager
+    def write_behind(self) -> Iterator["UnifiedStateManager"]:
+        """
+        Coalesce tweet updates made inside the block and write them in batches.
+        
+        While active, update_tweet_data() and update_tweets_data_batch() only
+        record the changes (later updates to the same tweet merge into earlier
+        ones). Pending updates are written with one bulk UPDATE and one commit
+        per STATE_WRITE_BATCH_SIZE tweets, whenever that many are pending or
+        STATE_WRITE_FLUSH_SECONDS have passed, on flush_pending_updates(), before
+        reads that query the table, and when the block exits.
+        """
+        self._write_behind_depth += 1
+        try:
+            yield self
+        finally:
+            self._write_behind_depth -= 1
+            if self._write_behind_depth == 0:
+                self.flush_pending_updates()
+    
+    def queue_tweet_update(self, tweet_id: str, updates: Dict[str, Any]) -> None:
+        """
+        Record an update for the next batched flush.
+        
+        Args:
+            tweet_id: Tweet ID to update
+            updates: Dictionary of field updates, merged into any pending ones
+        """
+        with self._write_lock:
+            self._pending_updates.setdefault(tweet_id, {}).update(updates)
+            self.write_stats["queued_updates"] += 1
+            
+            if (len(self._pending_updates) >= self.write_batch_size
+                    or time.monotonic() - self._last_flush >= self.write_flush_seconds):
+                self.flush_pending_updates()
+    
+    def flush_pending_updates(self) -> int:
+        """
+        Write all pending updates.
+        
+        Returns:
+            Number of tweets updated
+        """
+        with self._write_lock:
+            self._last_flush = time.monotonic()
+            if not self._pending_updates:
+                return 0
+            
+            pending, self._pending_updates = self._pending_updates, {}
+            tweet_ids = list(pending)
+            updated = 0
+            for start in range(0, len(tweet_ids), self.write_batch_size):
+                chunk = {tweet_id: pending[tweet_id] for tweet_id in tweet_ids[start:start + self.write_batch_size]}
+                updated += self._write_updates_bulk(chunk)
+            return updated
+    
     def update_tweet_data(self, tweet_id: str, updates: Dict[str, Any]) -> bool:
         """
         Update tweet data in the unified model.
         
+        Inside write_behind() the update is queued and written with the next batch.
+        
         Args:
             tweet_id: Tweet ID to update
             updates: Dictionary of field updates
             
         Returns:
-            True if successful, False otherwise
+            True if successful (or queued), False otherwise
         """
+        if self._write_behind_depth:
+            self.queue_tweet_update(tweet_id, updates)
+            return True
+        return self._write_update(tweet_id, updates)
+    
+    def _write_update(self, tweet_id: str, updates: Dict[str, Any]) -> bool:
+        """Write one tweet's updates through the ORM and commit."""
         try:
             tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
             if not tweet:
                 logger.error(f"Tweet {tweet_id} not found in unified table")
                 return False
             
-            # Apply updates with proper type conversion
-            for field, value in updates.items():
-                if hasattr(tweet, field):
-                    # Handle datetime fields that might come as strings
-                    if field in ['created_at', 'updated_at', 'cached_at', 'processed_at', 'kb_generated_at', 'reprocess_requested_at']:
-                        if isinstance(value, str):
-                            # Skip string timestamps - let SQLAlchemy handle them automatically
-                            continue
-                        elif value is None:
-                            setattr(tweet, field, value)
-                        else:
-                            # Assume it's already a datetime object
-                            setattr(tweet, field, value)
-                    else:
-                        setattr(tweet, field, value)
-                else:
-                    logger.warning(f"Field {field} not found in UnifiedTweet model")
+            self._apply_updates(tweet, updates)
+            if 'markdown_content' in updates:
+                tweet.content_hash = self._render_on_write(tweet.id, tweet.content_hash, tweet.markdown_content)
             
             # Update timestamp
             tweet.updated_at = datetime.now(timezone.utc)
@@ -142,6 +211,108 @@ class UnifiedStateManager:
             db.session.rollback()
             return False
     
+    def update_tweets_data_batch(self, updates_by_tweet: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Update several tweets with one bulk UPDATE and a single commit.
+        
+        Inside write_behind() the updates are queued like update_tweet_data().
+        
+        Args:
+            updates_by_tweet: Tweet ID -> dictionary of field updates
+            
+        Returns:
+            Number of tweets updated (or queued)
+        """
+        if self._write_behind_depth:
+            for tweet_id, updates in updates_by_tweet.items():
+                self.queue_tweet_update(tweet_id, updates)
+            return len(updates_by_tweet)
+        return self._write_updates_bulk(updates_by_tweet)
+    
+    def _write_updates_bulk(self, updates_by_tweet: Dict[str, Dict[str, Any]]) -> int:
+        """Write updates for many tweets with bulk_update_mappings and one commit."""
+        if not updates_by_tweet:
+            return 0
+        
+        try:
+            id_rows = db.session.query(UnifiedTweet.id, UnifiedTweet.tweet_id, UnifiedTweet.content_hash).filter(
+                UnifiedTweet.tweet_id.in_(list(updates_by_tweet.keys()))
+            ).all()
+            
+            missing = set(updates_by_tweet) - {tweet_id for _, tweet_id, _ in id_rows}
+            if missing:
+                logger.error(f"{len(missing)} tweets not found in unified table: {sorted(missing)[:5]}")
+            
+            now = datetime.now(timezone.utc)
+            mappings = []
+            for row_id, tweet_id, content_hash in id_rows:
+                mapping = self._column_updates(updates_by_tweet[tweet_id])
+                if 'markdown_content' in mapping:
+                    mapping['content_hash'] = self._render_on_write(row_id, content_hash, mapping['markdown_content'])
+                mapping['id'] = row_id
+                mapping['updated_at'] = now
+                mappings.append(mapping)
+            
+            db.session.bulk_update_mappings(UnifiedTweet, mappings)
+            db.session.commit()
+            # Bulk mappings bypass the ORM events that keep the TOC current
+            get_kb_toc(self.config).mark_items_stale(
+                m['id'] for m in mappings if any(field in m for field in ITEM_TOC_FIELDS)
+            )
+            self.write_stats["flushed_tweets"] += len(mappings)
+            self.write_stats["commits"] += 1
+            logger.debug(f"✅ Updated {len(mappings)} tweets in one batch")
+            return len(mappings)
+            
+        except Exception as e:
+            logger.warning(f"⚠️ Batch update of {len(updates_by_tweet)} tweets failed, retrying one by one: {e}")
+            db.session.rollback()
+            # One bad value must not lose the rest of the batch
+            return sum(self._write_update(tweet_id, updates) for tweet_id, updates in updates_by_tweet.items())
+    
+    def _render_on_write(self, row_id: int, previous_hash: Optional[str], markdown_content: Optional[str]) -> Optional[str]:
+        """Render changed KB item markdown into the render cache; returns the new content hash."""
+        content_hash = compute_content_hash(markdown_content)
+        if content_hash and content_hash != previous_hash:
+            try:
+                get_render_cache(self.config).store('kb_item', row_id, markdown_content, content_hash)
+            except Exception as e:
+                # The API renders on read if this fails
+                logger.warning(f"⚠️ Failed to render KB item {row_id} on write: {e}")
+        return content_hash
+    
+    def _column_updates(self, updates: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter updates down to UnifiedTweet columns, with the same rules as _apply_updates."""
+        columns = {attr.key for attr in sa_inspect(UnifiedTweet).column_attrs}
+        mapping = {}
+        for field, value in updates.items():
+            if field not in columns or field == 'id':
+                continue
+            if field in TIMESTAMP_FIELDS and isinstance(value, str):
+                # Skip string timestamps - let SQLAlchemy handle them automatically
+                continue
+            mapping[field] = value
+        return mapping
+    
+    def _apply_updates(self, tweet: UnifiedTweet, updates: Dict[str, Any]) -> None:
+        """Apply field updates to a tweet with proper type conversion."""
+        for field, value in updates.items():
+            if hasattr(tweet, field):
+                # Handle datetime fields that might come as strings
+                if field in TIMESTAMP_FIELDS:
+                    if isinstance(value, str):
+                        # Skip string timestamps - let SQLAlchemy handle them automatically
+                        continue
+                    elif value is None:
+                        setattr(tweet, field, value)
+                    else:
+                        # Assume it's already a datetime object
+                        setattr(tweet, field, value)
+                else:
+                    setattr(tweet, field, value)
+            else:
+                logger.warning(f"Field {field} not found in UnifiedTweet model")
+    
     def get_tweets_for_phase(self, phase: str) -> List[UnifiedTweet]:
         """
         Get tweets that need processing for a specific phase.
@@ -153,6 +324,7 @@ class UnifiedStateManager:
             List of UnifiedTweet objects ready for processing
         """
         try:
+            self.flush_pending_updates()
             if phase == "cache":
                 return UnifiedTweet.query.filter_by(cache_complete=False).all()
             elif phase == "media":
@@ -181,6 +353,7 @@ class UnifiedStateManager:
     def get_tweets_needing_reprocessing(self) -> List[UnifiedTweet]:
         """Get tweets that need reprocessing."""
         try:
+            self.flush_pending_updates()
             return UnifiedTweet.query.filter(
                 (UnifiedTweet.force_reprocess_pipeline == True) |
                 (UnifiedTweet.force_recache == True)
@@ -202,6 +375,7 @@ class UnifiedStateManager:
             True if successful, False otherwise
         """
         try:
+            self.flush_pending_updates()
             tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
             if not tweet:
                 logger.error(f"Tweet {tweet_id} not found")
@@ -249,6 +423,7 @@ class UnifiedStateManager:
     def get_processing_statistics(self) -> Dict[str, Any]:
         """Get comprehensive processing statistics."""
         try:
+            self.flush_pending_updates()
             stats = {
                 "total_tweets": UnifiedTweet.query.count(),
                 "cache_complete": UnifiedTweet.query.filter_by(cache_complete=True).count(),
@@ -287,6 +462,7 @@ class UnifiedStateManager:
             Dictionary mapping tweet_id to tweet data
         """
         try:
+            self.flush_pending_updates()
             all_tweets = UnifiedTweet.query.all()
             tweets_dict = {}
             
@@ -308,6 +484,7 @@ class UnifiedStateManager:
             List of tweet IDs that need processing
         """
         try:
+            self.flush_pending_updates()
             unprocessed_tweets = UnifiedTweet.query.filter_by(processing_complete=False).all()
             tweet_ids = [tweet.tweet_id for tweet in unprocessed_tweets]
             logger.debug(f"✅ Found {len(tweet_ids)} unprocessed tweets")
@@ -324,6 +501,7 @@ class UnifiedStateManager:
             List of tweet IDs that are fully processed
         """
         try:
+            self.flush_pending_updates()
             processed_tweets = UnifiedTweet.query.filter_by(processing_complete=True).all()
             tweet_ids = [tweet.tweet_id for tweet in processed_tweets]
             logger.debug(f"✅ Found {len(tweet_ids)} processed tweets")
@@ -343,6 +521,7 @@ class UnifiedStateManager:
             True if successful, False otherwise
         """
         try:
+            self.flush_pending_updates()
             added_count = 0
             for tweet_id in tweet_ids:
                 tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
@@ -378,7 +557,12 @@ class UnifiedStateManager:
         try:
             tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
             if tweet:
-                return self._tweet_to_dict(tweet)
+                tweet_dict = self._tweet_to_dict(tweet)
+                # Read-your-writes for updates still queued by write_behind()
+                for field, value in self._pending_updates.get(tweet_id, {}).items():
+                    if field in tweet_dict:
+                        tweet_dict[field] = value
+                return tweet_dict
             else:
                 logger.warning(f"Tweet {tweet_id} not found")
                 return None
@@ -397,6 +581,7 @@ class UnifiedStateManager:
             Dictionary with processing state information
         """
         try:
+            self.flush_pending_updates()
             tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
             if not tweet:
                 return {"fully_processed": False, "exists": False}
@@ -427,6 +612,7 @@ class UnifiedStateManager:
             True if successful, False otherwise
         """
         try:
+            self.flush_pending_updates()
             tweet = UnifiedTweet.query.filter_by(tweet_id=tweet_id).first()
             if not tweet:
                 logger.error(f"Tweet {tweet_id} not found in unified table")
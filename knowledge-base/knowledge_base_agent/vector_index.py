@@ -0,0 +1,309 @@
+"""
+In-Memory Embedding Index
+
+This module provides a process-resident similarity index for embeddings stored
+in the SQL ``embedding`` table. It is used by the EmbeddingManager when the
+Chroma vector store is not available.
+
+Vectors are kept in a single contiguous, pre-normalized float32 matrix so a
+query is one matrix-vector product followed by ``np.argpartition`` for the
+top-k. The index is loaded once per worker process, kept in sync with the
+database incrementally, and persisted as a ``.npy`` file that is memory-mapped
+on startup so new workers do not need to decode every embedding row.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import func
+
+from .models import db, Embedding
+
+DocumentKey = Tuple[str, int]
+
+
+class EmbeddingIndex:
+    """
+    Brute-force cosine similarity index over SQL-stored embeddings for one model.
+
+    Rows are L2-normalized on insert so cosine similarity reduces to a dot
+    product. The index tracks the embedding count and latest ``created_at`` for
+    its model and re-syncs from the database when either changes.
+    """
+
+    def __init__(self, model: str, index_path: Optional[str] = None):
+        """
+        Initialize an empty index.
+
+        Args:
+            model: Embedding model whose vectors this index holds
+            index_path: Directory used to persist the index; None disables persistence
+        """
+        self.model = model
+        self.index_path = Path(index_path) if index_path else None
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.RLock()
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._size = 0
+        self._keys: List[DocumentKey] = []
+        self._positions: Dict[DocumentKey, int] = {}
+        self._signature: Optional[Tuple[int, Optional[str]]] = None
+        self._latest: Optional[str] = None
+        self._loaded = False
+
+    @property
+    def size(self) -> int:
+        """Number of vectors in the index."""
+        return self._size
+
+    @property
+    def dimension(self) -> int:
+        """Dimension of the indexed vectors (0 when empty)."""
+        return self._matrix.shape[1] if self._matrix.ndim == 2 else 0
+
+    def _file_stem(self) -> Optional[Path]:
+        if not self.index_path:
+            return None
+        safe_model = re.sub(r'[^A-Za-z0-9_.-]+', '_', self.model)
+        return self.index_path / safe_model
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        norms[norms == 0] = 1e-9
+        return vectors / norms
+
+    @staticmethod
+    def _format_timestamp(value) -> Optional[str]:
+        return value.isoformat() if value is not None else None
+
+    def _db_signature(self) -> Tuple[int, Optional[str]]:
+        """Return (row count, latest created_at) for this model's embeddings."""
+        count, latest = db.session.query(
+            func.count(Embedding.id), func.max(Embedding.created_at)
+        ).filter(Embedding.model == self.model).one()
+        return int(count or 0), self._format_timestamp(latest)
+
+    def ensure_current(self) -> None:
+        """Load, sync or rebuild the index so it matches the database."""
+        with self._lock:
+            signature = self._db_signature()
+            if self._loaded and signature == self._signature:
+                return
+
+            if not self._loaded:
+                self._loaded = True
+                if self._load_from_disk(signature):
+                    return
+                self.rebuild(signature)
+                return
+
+            self._sync_since(self._latest)
+            if self._size != signature[0]:
+                # Rows were deleted elsewhere; incremental sync cannot see that
+                self.rebuild(signature)
+                return
+            self._signature = signature
+            self.persist()
+
+    def rebuild(self, signature: Optional[Tuple[int, Optional[str]]] = None) -> None:
+        """Rebuild the whole index from the embedding table."""
+        with self._lock:
+            rows = db.session.query(
+                Embedding.document_type, Embedding.document_id, Embedding.embedding, Embedding.created_at
+            ).filter(Embedding.model == self.model).all()
+
+            self._matrix = np.zeros((0, 0), dtype=np.float32)
+            self._size = 0
+            self._keys = []
+            self._positions = {}
+            self._latest = None
+            self._apply_rows(rows)
+            self._signature = signature or self._db_signature()
+            self._loaded = True
+            self.logger.info(f"Built embedding index for model '{self.model}' with {self._size} vectors")
+            self.persist()
+
+    def _sync_since(self, latest: Optional[str]) -> None:
+        """Apply rows written since the last sync."""
+        query = db.session.query(
+            Embedding.document_type, Embedding.document_id, Embedding.embedding, Embedding.created_at
+        ).filter(Embedding.model == self.model)
+        if latest is not None:
+            query = query.filter(Embedding.created_at > datetime.fromisoformat(latest))
+        rows = query.all()
+        if rows:
+            self.logger.debug(f"Syncing {len(rows)} changed embeddings into index for model '{self.model}'")
+            self._apply_rows(rows)
+
+    def _apply_rows(self, rows) -> None:
+        items = []
+        for doc_type, doc_id, embedding_bytes, created_at in rows:
+            items.append((doc_type, doc_id, np.frombuffer(embedding_bytes, dtype=np.float32)))
+            stamp = self._format_timestamp(created_at)
+            if stamp is not None and (self._latest is None or stamp > self._latest):
+                self._latest = stamp
+        self.upsert_many(items)
+
+    def upsert_many(self, items: List[Tuple[str, int, List[float]]]) -> None:
+        """
+        Insert or replace vectors in the index.
+
+        Args:
+            items: (document_type, document_id, vector) tuples
+        """
+        if not items:
+            return
+
+        with self._lock:
+            vectors = self._normalize(np.vstack([np.asarray(vector, dtype=np.float32) for _, _, vector in items]))
+            dimension = vectors.shape[1]
+
+            if self._size and dimension != self.dimension:
+                self.logger.warning(
+                    f"Embedding dimension changed from {self.dimension} to {dimension}; resetting index"
+                )
+                self._matrix = np.zeros((0, 0), dtype=np.float32)
+                self._size = 0
+                self._keys = []
+                self._positions = {}
+
+            new_count = sum(1 for doc_type, doc_id, _ in items if (doc_type, doc_id) not in self._positions)
+            self._reserve(self._size + new_count, dimension)
+
+            for (doc_type, doc_id, _), vector in zip(items, vectors):
+                key = (doc_type, doc_id)
+                position = self._positions.get(key)
+                if position is None:
+                    position = self._size
+                    self._positions[key] = position
+                    self._keys.append(key)
+                    self._size += 1
+                self._matrix[position] = vector
+
+    def _reserve(self, capacity: int, dimension: int) -> None:
+        """Grow the backing matrix (amortized doubling) and make it writable."""
+        current_capacity = self._matrix.shape[0] if self._matrix.ndim == 2 else 0
+        writable = self._matrix.flags.writeable and not isinstance(self._matrix, np.memmap)
+        if capacity <= current_capacity and writable and self.dimension == dimension:
+            return
+
+        if capacity > current_capacity:
+            new_capacity = max(capacity, current_capacity * 2, 64)
+        else:
+            new_capacity = current_capacity
+        matrix = np.zeros((new_capacity, dimension), dtype=np.float32)
+        if self._size:
+            matrix[:self._size] = self._matrix[:self._size]
+        self._matrix = matrix
+
+    def search(self, query_vector: List[float], top_k: int) -> List[Tuple[str, int, float]]:
+        """
+        Find the most similar documents to a query vector.
+
+        Returns:
+            List of (document_type, document_id, score) tuples, best first
+        """
+        with self._lock:
+            if not self._size or top_k <= 0:
+                return []
+            query = self._normalize(np.asarray(query_vector, dtype=np.float32))
+            if query.shape[0] != self.dimension:
+                self.logger.warning(
+                    f"Query dimension {query.shape[0]} does not match index dimension {self.dimension}"
+                )
+                return []
+
+            scores = self._matrix[:self._size] @ query
+            k = min(top_k, self._size)
+            if k < self._size:
+                candidates = np.argpartition(-scores, k - 1)[:k]
+            else:
+                candidates = np.arange(self._size)
+            ordered = candidates[np.argsort(-scores[candidates])]
+            return [(self._keys[i][0], self._keys[i][1], float(scores[i])) for i in ordered]
+
+    def persist(self) -> None:
+        """Write the index to disk atomically so other workers can memory-map it."""
+        stem = self._file_stem()
+        if stem is None:
+            return
+        with self._lock:
+            try:
+                stem.parent.mkdir(parents=True, exist_ok=True)
+                matrix_path = stem.with_suffix('.npy')
+                meta_path = stem.with_suffix('.json')
+                tmp_matrix = stem.with_suffix('.npy.tmp')
+                tmp_meta = stem.with_suffix('.json.tmp')
+
+                with open(tmp_matrix, 'wb') as f:
+                    np.save(f, np.ascontiguousarray(self._matrix[:self._size]))
+                with open(tmp_meta, 'w', encoding='utf-8') as f:
+                    json.dump({
+                        'model': self.model,
+                        'dimension': self.dimension,
+                        'keys': [[doc_type, doc_id] for doc_type, doc_id in self._keys],
+                        'signature': list(self._signature) if self._signature else None,
+                        'latest': self._latest,
+                    }, f)
+                os.replace(tmp_matrix, matrix_path)
+                os.replace(tmp_meta, meta_path)
+            except Exception as e:
+                self.logger.warning(f"Failed to persist embedding index to {stem}: {e}")
+
+    def _load_from_disk(self, signature: Tuple[int, Optional[str]]) -> bool:
+        """Memory-map a persisted index if it matches the database signature."""
+        stem = self._file_stem()
+        if stem is None:
+            return False
+        matrix_path = stem.with_suffix('.npy')
+        meta_path = stem.with_suffix('.json')
+        if not matrix_path.exists() or not meta_path.exists():
+            return False
+
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('model') != self.model or tuple(meta.get('signature') or ()) != tuple(signature):
+                return False
+
+            matrix = np.load(matrix_path, mmap_mode='r')
+            keys = [(doc_type, int(doc_id)) for doc_type, doc_id in meta.get('keys', [])]
+            if matrix.shape[0] != len(keys):
+                return False
+
+            self._matrix = matrix
+            self._size = len(keys)
+            self._keys = keys
+            self._positions = {key: i for i, key in enumerate(keys)}
+            self._signature = signature
+            self._latest = meta.get('latest')
+            self.logger.info(f"Loaded embedding index for model '{self.model}' from {matrix_path} ({self._size} vectors)")
+            return True
+        except Exception as e:
+            self.logger.warning(f"Failed to load persisted embedding index from {matrix_path}: {e}")
+            return False
+
+
+_indexes: Dict[Tuple[str, Optional[str]], EmbeddingIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_embedding_index(model: str, index_path: Optional[str] = None) -> EmbeddingIndex:
+    """Return the process-wide index for a model, creating it on first use."""
+    key = (model, str(index_path) if index_path else None)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = EmbeddingIndex(model, index_path)
+            _indexes[key] = index
+        return index
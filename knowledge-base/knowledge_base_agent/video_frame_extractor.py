@@ -0,0 +1,212 @@
+"""
+Video Keyframe Extraction
+
+Extracts keyframes for the vision model without blocking the event loop:
+ffprobe/ffmpeg run through ``asyncio.create_subprocess_exec`` with a cap on
+concurrent processes. ffmpeg's scene-change score selects the candidate
+frames, falling back to fixed intervals for videos with no cuts, and frames
+that look alike by difference hash are dropped before the vision model sees
+them. Results are cached on disk under the media cache, keyed by the sha256 of
+the video file, so rerunning the media phase does not extract again.
+"""
+
+import asyncio
+import hashlib
+import logging
+import shutil
+import tempfile
+import weakref
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from PIL import Image
+
+from .config import Config
+
+logger = logging.getLogger(__name__)
+
+FRAME_CACHE_SUBDIR = 'video_frames'
+COMPLETE_MARKER = '.complete'
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def video_content_hash(video_path: Path) -> str:
+    """Return the hex sha256 of a video file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(video_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def difference_hash(image_path: Path, hash_size: int = 8) -> int:
+    """Perceptual difference hash (dHash) of an image as a hash_size**2 bit integer."""
+    with Image.open(image_path) as image:
+        pixels = list(image.convert('L').resize((hash_size + 1, hash_size), Image.LANCZOS).getdata())
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def select_distinct_frames(frame_hashes: List[Tuple[Path, int]], max_distance: int, max_frames: int) -> List[Path]:
+    """
+    Drop near-duplicate frames and thin the rest to at most max_frames.
+
+    Args:
+        frame_hashes: (frame path, difference hash) in video order
+        max_distance: Frames within this Hamming distance of a kept frame are duplicates
+        max_frames: Maximum frames to return
+
+    Returns:
+        Kept frame paths in video order, evenly spread when thinned
+    """
+    kept: List[Tuple[Path, int]] = []
+    for path, frame_hash in frame_hashes:
+        if all(bin(frame_hash ^ other).count('1') > max_distance for _, other in kept):
+            kept.append((path, frame_hash))
+
+    paths = [path for path, _ in kept]
+    if max_frames <= 0 or len(paths) <= max_frames:
+        return paths
+    if max_frames == 1:
+        return paths[:1]
+    step = (len(paths) - 1) / (max_frames - 1)
+    return [paths[round(i * step)] for i in range(max_frames)]
+
+
+class VideoFrameExtractor:
+    """Async, cached scene-change keyframe extraction."""
+
+    def __init__(self, config: Config):
+        self.cache_root = Path(config.media_cache_dir) / FRAME_CACHE_SUBDIR
+        self.max_frames = max(1, getattr(config, 'video_max_keyframes', 5))
+        self.scene_threshold = getattr(config, 'video_scene_threshold', 0.3)
+        self.duplicate_distance = getattr(config, 'video_frame_duplicate_distance', 6)
+        self.max_processes = max(1, getattr(config, 'video_max_ffmpeg_processes', 2))
+        self.process_timeout = getattr(config, 'video_ffmpeg_timeout_seconds', 300.0)
+        # Semaphores bind to the loop they are first awaited on
+        self._semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+        self.stats = {"cache_hits": 0, "extractions": 0, "candidate_frames": 0, "kept_frames": 0}
+
+    async def extract(self, video_path: Path, max_frames: Optional[int] = None) -> List[Path]:
+        """
+        Get distinct keyframes of a video, from the cache when available.
+
+        Args:
+            video_path: Path to the video file
+            max_frames: Override for the configured maximum number of keyframes
+
+        Returns:
+            Frame image paths in video order (empty if extraction failed)
+        """
+        max_frames = max_frames or self.max_frames
+        try:
+            content_hash = await asyncio.to_thread(video_content_hash, video_path)
+            frame_dir = self.cache_root / content_hash
+            if (frame_dir / COMPLETE_MARKER).exists():
+                self.stats["cache_hits"] += 1
+                return sorted(frame_dir.glob('*.jpg'))[:max_frames]
+
+            self.cache_root.mkdir(parents=True, exist_ok=True)
+            work_dir = Path(tempfile.mkdtemp(prefix=f'.{content_hash[:12]}-', dir=self.cache_root))
+            try:
+                frames = await self._extract_into(video_path, work_dir, max_frames)
+                if not frames:
+                    return []
+                return await asyncio.to_thread(self._publish, work_dir, frame_dir, frames)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        except Exception as e:
+            logger.error(f"Error extracting frames from video {video_path}: {e}")
+            return []
+
+    async def _extract_into(self, video_path: Path, work_dir: Path, max_frames: int) -> List[Path]:
+        self.stats["extractions"] += 1
+        # Extra candidates leave room for the duplicates that are dropped below
+        candidate_limit = max_frames * 4
+        scene_filter = f"select='eq(n,0)+gt(scene,{self.scene_threshold})',scale='min(1280,iw)':-2"
+        await self._run(["ffmpeg", "-v", "error", "-i", str(video_path), "-vf", scene_filter,
+                         "-vsync", "vfr", "-frames:v", str(candidate_limit), "-q:v", "2",
+                         str(work_dir / "scene_%03d.jpg")])
+        candidates = sorted(work_dir.glob('scene_*.jpg'))
+
+        if len(candidates) < min(2, max_frames):
+            # No cuts (screen recordings, talking heads): sample at fixed intervals instead
+            interval = await self._sampling_interval(video_path, max_frames)
+            await self._run(["ffmpeg", "-v", "error", "-i", str(video_path),
+                             "-vf", f"fps=1/{interval},scale='min(1280,iw)':-2",
+                             "-frames:v", str(max_frames), "-q:v", "2", str(work_dir / "interval_%03d.jpg")])
+            candidates += sorted(work_dir.glob('interval_*.jpg'))
+
+        if not candidates:
+            return []
+        hashes = await asyncio.to_thread(lambda: [(path, difference_hash(path)) for path in candidates])
+        frames = select_distinct_frames(hashes, self.duplicate_distance, max_frames)
+        self.stats["candidate_frames"] += len(candidates)
+        self.stats["kept_frames"] += len(frames)
+        logger.info(f"Kept {len(frames)} of {len(candidates)} candidate keyframes from video {video_path.name}")
+        return frames
+
+    async def _sampling_interval(self, video_path: Path, max_frames: int) -> float:
+        output = await self._run(["ffprobe", "-v", "error", "-show_entries", "format=duration",
+                                  "-of", "default=noprint_wrappers=1:nokey=1", str(video_path)])
+        try:
+            # Ensure at least 1 second between frames
+            return max(1.0, float(output.strip()) / (max_frames + 1))
+        except (ValueError, AttributeError):
+            logger.warning(f"Invalid duration for video {video_path}, using default interval")
+            return 1.0
+
+    def _publish(self, work_dir: Path, frame_dir: Path, frames: List[Path]) -> List[Path]:
+        """Move the kept frames into the cache directory in one rename."""
+        staging = Path(tempfile.mkdtemp(prefix=f'.{frame_dir.name[:12]}-publish-', dir=self.cache_root))
+        for index, frame in enumerate(frames, start=1):
+            frame.rename(staging / f"frame_{index:03d}.jpg")
+        (staging / COMPLETE_MARKER).touch()
+        try:
+            staging.rename(frame_dir)
+        except OSError:
+            # Another task cached the same video first
+            shutil.rmtree(staging, ignore_errors=True)
+            if not (frame_dir / COMPLETE_MARKER).exists():
+                raise
+        return sorted(frame_dir.glob('*.jpg'))
+
+    async def _run(self, cmd: List[str]) -> Optional[str]:
+        """Run a command under the process limit; returns stdout, or None on failure."""
+        async with self._semaphore():
+            process = await asyncio.create_subprocess_exec(
+                *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=self.process_timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+                logger.error(f"{cmd[0]} timed out after {self.process_timeout}s")
+                return None
+        if process.returncode != 0:
+            logger.error(f"{cmd[0]} failed: {stderr.decode('utf-8', errors='replace').strip()}")
+            return None
+        return stdout.decode('utf-8', errors='replace')
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_processes)
+        return semaphore
+
+
+_extractor: Optional[VideoFrameExtractor] = None
+
+
+def get_frame_extractor(config: Config) -> VideoFrameExtractor:
+    """Return the process-wide frame extractor, creating it on first use."""
+    global _extractor
+    if _extractor is None:
+        _extractor = VideoFrameExtractor(config)
+    return _extractor
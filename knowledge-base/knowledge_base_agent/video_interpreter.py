@@ -1,91 +1,30 @@
 import base64
 import logging
-import tempfile
-import os
-import subprocess
 from pathlib import Path
 from typing import Optional, List, Tuple
+from knowledge_base_agent.config import Config
 from knowledge_base_agent.exceptions import VisionModelError
 from knowledge_base_agent.http_client import HTTPClient
+from knowledge_base_agent.video_frame_extractor import get_frame_extractor
 
-async def extract_frames(video_path: Path, num_frames: int = 5) -> List[Path]:
+async def extract_frames(video_path: Path, config: Config, num_frames: Optional[int] = None) -> List[Path]:
     """
-    Extract representative frames from a video using ffmpeg.
+    Extract distinct scene keyframes from a video using ffmpeg.
+    
+    Frames are cached under the media cache by the video's content hash and
+    must not be deleted by the caller.
     
     Args:
         video_path: Path to the video file
-        num_frames: Number of frames to extract (default: 5)
+        config: Configuration providing the media cache directory and extraction limits
+        num_frames: Maximum number of frames to extract (default: VIDEO_MAX_KEYFRAMES)
         
     Returns:
         List of paths to extracted frame images
     """
-    try:
-        # Create a temporary directory to store the frames
-        temp_dir = Path(tempfile.mkdtemp())
-        frame_pattern = temp_dir / "frame_%03d.jpg"
-        
-        # Calculate the frame extraction interval based on video duration
-        # First, get video duration using ffprobe
-        duration_cmd = [
-            "ffprobe", 
-            "-v", "error", 
-            "-show_entries", "format=duration", 
-            "-of", "default=noprint_wrappers=1:nokey=1", 
-            str(video_path)
-        ]
-        
-        duration_result = subprocess.run(
-            duration_cmd, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        if duration_result.returncode != 0:
-            logging.error(f"Failed to get video duration: {duration_result.stderr}")
-            # Fallback to fixed interval extraction
-            interval = 1.0
-        else:
-            try:
-                duration = float(duration_result.stdout.strip())
-                # Extract frames at regular intervals across the video
-                # Ensure at least 1 second between frames
-                interval = max(1.0, duration / (num_frames + 1))
-            except (ValueError, ZeroDivisionError):
-                logging.error("Invalid duration value, using default interval")
-                interval = 1.0
-        
-        # Extract frames at calculated intervals
-        extract_cmd = [
-            "ffmpeg",
-            "-i", str(video_path),
-            "-vf", f"fps=1/{interval}",
-            "-vframes", str(num_frames),
-            "-q:v", "2",  # High quality
-            str(frame_pattern)
-        ]
-        
-        extract_result = subprocess.run(
-            extract_cmd,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
-        
-        if extract_result.returncode != 0:
-            logging.error(f"Failed to extract video frames: {extract_result.stderr}")
-            return []
-        
-        # Get the extracted frame paths
-        frames = sorted(list(temp_dir.glob("*.jpg")))
-        logging.info(f"Extracted {len(frames)} frames from video {video_path}")
-        return frames
-        
-    except Exception as e:
-        logging.error(f"Error extracting frames from video {video_path}: {e}")
-        return []
+    return await get_frame_extractor(config).extract(video_path, num_frames)
 
-async def interpret_video(http_client: HTTPClient, video_path: Path, vision_model: str) -> str:
+async def interpret_video(http_client: HTTPClient, video_path: Path, vision_model: str, config: Config) -> str:
     """
     Interpret video content by extracting frames and using the vision model.
     
@@ -93,13 +32,14 @@ async def interpret_video(http_client: HTTPClient, video_path: Path, vision_mode
         http_client: HTTP client for making requests
         video_path: Path to the video file
         vision_model: Name of the vision model to use
+        config: Configuration for keyframe extraction and caching
         
     Returns:
         String description of the video content
     """
     try:
         # Extract frames from the video
-        frames = await extract_frames(video_path)
+        frames = await extract_frames(video_path, config)
         
         if not frames:
             logging.error(f"No frames could be extracted from video {video_path}")
@@ -119,8 +59,8 @@ async def interpret_video(http_client: HTTPClient, video_path: Path, vision_mode
             except Exception as e:
                 logging.error(f"Failed to read frame {frame_path}: {e}")
         
-        # First, get descriptions of individual frames
-        for i, image_base64 in enumerate(frame_images):
+        # First, get descriptions of individual frames; a single frame is covered by the overall description
+        for i, image_base64 in enumerate(frame_images if len(frame_images) > 1 else []):
             try:
                 # Prepare prompt for vision model for a single frame
                 single_frame_prompt = f"Describe frame {i+1} of this video, focusing on the visible content."
@@ -132,7 +72,8 @@ async def interpret_video(http_client: HTTPClient, video_path: Path, vision_mode
                         "model": vision_model,
                         "prompt": single_frame_prompt,
                         "images": [image_base64],
-                        "stream": False
+                        "stream": False,
+                        **http_client.pinned_keep_alive(vision_model)
                     }
                 )
                 
@@ -165,7 +106,8 @@ async def interpret_video(http_client: HTTPClient, video_path: Path, vision_mode
                         "model": vision_model,
                         "prompt": prompt,
                         "images": frames_to_send,
-                        "stream": False
+                        "stream": False,
+                        **http_client.pinned_keep_alive(vision_model)
                     }
                 )
                 
@@ -181,17 +123,6 @@ async def interpret_video(http_client: HTTPClient, video_path: Path, vision_mode
         else:
             overall_description = "No frames available for overall description."
         
-        # Clean up temporary files
-        for frame in frames:
-            try:
-                frame.unlink()
-            except:
-                pass
-        try:
-            frames[0].parent.rmdir()
-        except:
-            pass
-        
         # Combine descriptions into a complete video analysis
         result = f"Video Content Analysis - {video_path.name}:\n\n"
         result += f"{overall_description}\n\n"
@@ -517,6 +517,8 @@ def handle_connect(auth=None):
     global _background_tasks_started
     
     logging.info("Client connected")
+    if realtime_manager:
+        realtime_manager.client_connected()
     
     # Start background tasks on first client connection only
     if not _background_tasks_started:
@@ -587,6 +589,8 @@ def handle_clear_server_logs():
 def handle_disconnect():
     """SocketIO: Handle client disconnection (notification only)."""
     logging.info("Client disconnected")
+    if realtime_manager:
+        realtime_manager.client_disconnected()
 
 @socketio.on('join_task')
 def handle_join_task(data):
@@ -1,26 +1,18 @@
 #!/usr/bin/env python3
 """
-Backfill content_hash for UnifiedTweet and SubcategorySynthesis and warm render cache.
+Backfill content_hash for UnifiedTweet and warm the render cache for KB items and syntheses.
+
+New writes are rendered when they are stored; this only covers older rows.
 
 Usage:
   PYTHONPATH="/path/to/repo" ./venv/bin/python scripts/backfill_content_hash_and_warm_cache.py --limit 1000
 """
 import argparse
-import hashlib
 from typing import Optional
 
 from knowledge_base_agent.web import app
 from knowledge_base_agent.models import db, UnifiedTweet, SubcategorySynthesis, RenderCache
-import markdown
-
-
-def sha256_text(text: Optional[str]) -> Optional[str]:
-    if not text:
-        return None
-    s = text.strip()
-    if not s:
-        return None
-    return hashlib.sha256(s.encode('utf-8')).hexdigest()
+from knowledge_base_agent.render_cache import compute_content_hash as sha256_text, render_markdown
 
 
 def backfill(limit: Optional[int]):
@@ -41,7 +33,7 @@ def backfill(limit: Optional[int]):
             if ch:
                 rc = db.session.query(RenderCache).filter_by(document_type='kb_item', document_id=ut.id, content_hash=ch).first()
                 if not rc:
-                    html = markdown.markdown(ut.markdown_content or "", extensions=['extra', 'codehilite'])
+                    html = render_markdown(ut.markdown_content)
                     db.session.add(RenderCache(document_type='kb_item', document_id=ut.id, content_hash=ch, html=html))
                     warmed += 1
 
@@ -50,15 +42,13 @@ def backfill(limit: Optional[int]):
         if isinstance(limit, int) and limit > 0:
             q2 = q2.limit(limit)
         for syn in q2.all():
+            # syn.content_hash tracks the source items for staleness checks, so only the render key is hashed here
             ch = sha256_text(syn.synthesis_content)
-            if ch and syn.content_hash != ch:
-                syn.content_hash = ch
-                changed += 1
             # Warm render cache
             if ch:
                 rc = db.session.query(RenderCache).filter_by(document_type='synthesis', document_id=syn.id, content_hash=ch).first()
                 if not rc:
-                    html = markdown.markdown(syn.synthesis_content or "", extensions=['extra', 'codehilite'])
+                    html = render_markdown(syn.synthesis_content)
                     db.session.add(RenderCache(document_type='synthesis', document_id=syn.id, content_hash=ch, html=html))
                     warmed += 1
 
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+SQLite migration for the tweet explorer:
+- Create the (sort key, id) composite indexes declared on TweetCache, which
+  keyset pagination in /api/v2/tweets/explore seeks on
+- ANALYZE tweet_cache so the planner picks them
+
+Search uses tweet_cache_fts, created by scripts/sqlite_migrate_fts.py.
+
+Run with backend stopped:
+  ./venv/bin/python scripts/sqlite_migrate_explore_indexes.py
+"""
+import sqlite3
+from pathlib import Path
+
+DB_PATH = Path(__file__).resolve().parents[1] / 'instance' / 'knowledge_base.db'
+
+INDEXES = {
+    'idx_tweet_cache_updated_seek': ('updated_at', 'id'),
+    'idx_tweet_cache_created_seek': ('created_at', 'id'),
+    'idx_tweet_cache_main_updated_seek': ('main_category', 'updated_at', 'id'),
+    'idx_tweet_cache_category_updated_seek': ('main_category', 'sub_category', 'updated_at', 'id'),
+    'idx_tweet_cache_media_updated_seek': ('media_processed', 'updated_at', 'id'),
+    'idx_tweet_cache_categorized_updated_seek': ('categories_processed', 'updated_at', 'id'),
+    'idx_tweet_cache_kb_updated_seek': ('kb_item_created', 'updated_at', 'id'),
+}
+
+
+def main():
+    if not DB_PATH.exists():
+        raise SystemExit(f"DB not found: {DB_PATH}")
+
+    conn = sqlite3.connect(str(DB_PATH))
+    conn.isolation_level = None
+    cur = conn.cursor()
+
+    try:
+        cur.execute("BEGIN")
+        for name, columns in INDEXES.items():
+            cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON tweet_cache({', '.join(columns)})")
+        cur.execute("ANALYZE tweet_cache")
+        conn.commit()
+        print({'success': True, 'db_path': str(DB_PATH), 'indexes': list(INDEXES)})
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == '__main__':
+    main()
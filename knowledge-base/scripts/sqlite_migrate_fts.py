@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-SQLite FTS5 migration for Knowledge Base and Synthesis search.
+SQLite FTS5 migration for Knowledge Base, Synthesis and tweet cache search.
 
 Creates FTS5 virtual tables and triggers to keep them in sync,
 and performs an initial population from existing data.
@@ -26,65 +26,79 @@ def main():
         cur.execute("PRAGMA foreign_keys=OFF")
         cur.execute("BEGIN")
 
-        # Recreate FTS tables from scratch to avoid issues with contentless FTS5 bulk delete
-        # (Contentless FTS5 tables cannot be cleared using DELETE statements.)
-        cur.execute("DROP TABLE IF EXISTS kb_item_fts")
-        cur.execute("DROP TABLE IF EXISTS synthesis_fts")
-
-        # Create FTS tables
+        # Recreate FTS tables from scratch. Earlier versions of this script created
+        # contentless tables (content=''), which return NULL for every column and
+        # reject the UPDATE/DELETE statements issued by the sync triggers.
+        for name in ('kb_item_fts', 'synthesis_fts', 'tweet_cache_fts'):
+            cur.execute(f"DROP TABLE IF EXISTS {name}")
+        for name in ('kb_item_fts_ai', 'kb_item_fts_au', 'kb_item_fts_ad',
+                     'synthesis_fts_ai', 'synthesis_fts_au', 'synthesis_fts_ad',
+                     'tweet_cache_fts_ai', 'tweet_cache_fts_au', 'tweet_cache_fts_ad'):
+            cur.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+        # KB items and syntheses: the FTS rowid is the source row id, so bm25()
+        # ranked rowids can be joined straight back to the source tables.
         cur.execute(
             """
-            CREATE VIRTUAL TABLE IF NOT EXISTS kb_item_fts USING fts5(
-              id UNINDEXED,
+            CREATE VIRTUAL TABLE kb_item_fts USING fts5(
               title,
               content,
               main_category,
-              sub_category,
-              combined,
-              content=''
+              sub_category
             )
             """
         )
 
         cur.execute(
             """
-            CREATE VIRTUAL TABLE IF NOT EXISTS synthesis_fts USING fts5(
-              id UNINDEXED,
+            CREATE VIRTUAL TABLE synthesis_fts USING fts5(
               title,
               content,
               main_category,
-              sub_category,
-              combined,
-              content=''
+              sub_category
             )
             """
         )
 
-        # Triggers for unified_tweet
+        # Explore search over tweet_cache: external-content table reading the
+        # indexed columns from tweet_cache itself, so no text is stored twice.
+        cur.execute(
+            """
+            CREATE VIRTUAL TABLE tweet_cache_fts USING fts5(
+              full_text,
+              display_title,
+              item_name_suggestion,
+              content='tweet_cache',
+              content_rowid='id'
+            )
+            """
+        )
+
+        # Triggers for unified_tweet (only finished KB items are indexed)
         cur.executescript(
             """
-            CREATE TRIGGER IF NOT EXISTS kb_item_fts_ai AFTER INSERT ON unified_tweet BEGIN
-              INSERT INTO kb_item_fts(id,title,content,main_category,sub_category,combined)
+            CREATE TRIGGER kb_item_fts_ai AFTER INSERT ON unified_tweet WHEN new.kb_item_created = 1 BEGIN
+              INSERT INTO kb_item_fts(rowid,title,content,main_category,sub_category)
               VALUES (new.id,
                       COALESCE(new.kb_display_title, new.kb_item_name, ''),
-                      COALESCE(new.markdown_content, ''),
+                      COALESCE(new.kb_content, ''),
                       COALESCE(new.main_category, ''),
-                      COALESCE(new.sub_category, ''),
-                      printf('%s %s %s %s', COALESCE(new.kb_display_title, new.kb_item_name, ''), COALESCE(new.markdown_content, ''), COALESCE(new.main_category, ''), COALESCE(new.sub_category, '')));
+                      COALESCE(new.sub_category, ''));
             END;
 
-            CREATE TRIGGER IF NOT EXISTS kb_item_fts_au AFTER UPDATE ON unified_tweet BEGIN
-              UPDATE kb_item_fts SET
-                title=COALESCE(new.kb_display_title, new.kb_item_name, ''),
-                content=COALESCE(new.markdown_content, ''),
-                main_category=COALESCE(new.main_category, ''),
-                sub_category=COALESCE(new.sub_category, ''),
-                combined=printf('%s %s %s %s', COALESCE(new.kb_display_title, new.kb_item_name, ''), COALESCE(new.markdown_content, ''), COALESCE(new.main_category, ''), COALESCE(new.sub_category, ''))
-              WHERE id=new.id;
+            CREATE TRIGGER kb_item_fts_au AFTER UPDATE ON unified_tweet BEGIN
+              DELETE FROM kb_item_fts WHERE rowid=old.id;
+              INSERT INTO kb_item_fts(rowid,title,content,main_category,sub_category)
+              SELECT new.id,
+                     COALESCE(new.kb_display_title, new.kb_item_name, ''),
+                     COALESCE(new.kb_content, ''),
+                     COALESCE(new.main_category, ''),
+                     COALESCE(new.sub_category, '')
+              WHERE new.kb_item_created = 1;
             END;
 
-            CREATE TRIGGER IF NOT EXISTS kb_item_fts_ad AFTER DELETE ON unified_tweet BEGIN
-              DELETE FROM kb_item_fts WHERE id=old.id;
+            CREATE TRIGGER kb_item_fts_ad AFTER DELETE ON unified_tweet BEGIN
+              DELETE FROM kb_item_fts WHERE rowid=old.id;
             END;
             """
         )
@@ -92,28 +106,49 @@ def main():
         # Triggers for subcategory_synthesis
         cur.executescript(
             """
-            CREATE TRIGGER IF NOT EXISTS synthesis_fts_ai AFTER INSERT ON subcategory_synthesis BEGIN
-              INSERT INTO synthesis_fts(id,title,content,main_category,sub_category,combined)
+            CREATE TRIGGER synthesis_fts_ai AFTER INSERT ON subcategory_synthesis BEGIN
+              INSERT INTO synthesis_fts(rowid,title,content,main_category,sub_category)
+              VALUES (new.id,
+                      COALESCE(new.synthesis_title, ''),
+                      COALESCE(new.synthesis_content, ''),
+                      COALESCE(new.main_category, ''),
+                      COALESCE(new.sub_category, ''));
+            END;
+
+            CREATE TRIGGER synthesis_fts_au AFTER UPDATE ON subcategory_synthesis BEGIN
+              DELETE FROM synthesis_fts WHERE rowid=old.id;
+              INSERT INTO synthesis_fts(rowid,title,content,main_category,sub_category)
               VALUES (new.id,
                       COALESCE(new.synthesis_title, ''),
                       COALESCE(new.synthesis_content, ''),
                       COALESCE(new.main_category, ''),
-                      COALESCE(new.sub_category, ''),
-                      printf('%s %s %s %s', COALESCE(new.synthesis_title, ''), COALESCE(new.synthesis_content, ''), COALESCE(new.main_category, ''), COALESCE(new.sub_category, '')));
+                      COALESCE(new.sub_category, ''));
             END;
 
-            CREATE TRIGGER IF NOT EXISTS synthesis_fts_au AFTER UPDATE ON subcategory_synthesis BEGIN
-              UPDATE synthesis_fts SET
-                title=COALESCE(new.synthesis_title, ''),
-                content=COALESCE(new.synthesis_content, ''),
-                main_category=COALESCE(new.main_category, ''),
-                sub_category=COALESCE(new.sub_category, ''),
-                combined=printf('%s %s %s %s', COALESCE(new.synthesis_title, ''), COALESCE(new.synthesis_content, ''), COALESCE(new.main_category, ''), COALESCE(new.sub_category, ''))
-              WHERE id=new.id;
+            CREATE TRIGGER synthesis_fts_ad AFTER DELETE ON subcategory_synthesis BEGIN
+              DELETE FROM synthesis_fts WHERE rowid=old.id;
             END;
+            """
+        )
 
-            CREATE TRIGGER IF NOT EXISTS synthesis_fts_ad AFTER DELETE ON subcategory_synthesis BEGIN
-              DELETE FROM synthesis_fts WHERE id=old.id;
+        # Triggers for tweet_cache (external content needs the old values on delete)
+        cur.executescript(
+            """
+            CREATE TRIGGER tweet_cache_fts_ai AFTER INSERT ON tweet_cache BEGIN
+              INSERT INTO tweet_cache_fts(rowid,full_text,display_title,item_name_suggestion)
+              VALUES (new.id, new.full_text, new.display_title, new.item_name_suggestion);
+            END;
+
+            CREATE TRIGGER tweet_cache_fts_au AFTER UPDATE OF full_text, display_title, item_name_suggestion ON tweet_cache BEGIN
+              INSERT INTO tweet_cache_fts(tweet_cache_fts,rowid,full_text,display_title,item_name_suggestion)
+              VALUES ('delete', old.id, old.full_text, old.display_title, old.item_name_suggestion);
+              INSERT INTO tweet_cache_fts(rowid,full_text,display_title,item_name_suggestion)
+              VALUES (new.id, new.full_text, new.display_title, new.item_name_suggestion);
+            END;
+
+            CREATE TRIGGER tweet_cache_fts_ad AFTER DELETE ON tweet_cache BEGIN
+              INSERT INTO tweet_cache_fts(tweet_cache_fts,rowid,full_text,display_title,item_name_suggestion)
+              VALUES ('delete', old.id, old.full_text, old.display_title, old.item_name_suggestion);
             END;
             """
         )
@@ -121,32 +156,31 @@ def main():
         # Initial population
         cur.execute(
             """
-            INSERT INTO kb_item_fts(id,title,content,main_category,sub_category,combined)
+            INSERT INTO kb_item_fts(rowid,title,content,main_category,sub_category)
             SELECT id,
                    COALESCE(kb_display_title, kb_item_name, ''),
-                   COALESCE(markdown_content, ''),
+                   COALESCE(kb_content, ''),
                    COALESCE(main_category, ''),
-                   COALESCE(sub_category, ''),
-                   printf('%s %s %s %s', COALESCE(kb_display_title, kb_item_name, ''), COALESCE(markdown_content, ''), COALESCE(main_category, ''), COALESCE(sub_category, ''))
+                   COALESCE(sub_category, '')
             FROM unified_tweet
-            WHERE kb_item_created=1 AND markdown_content IS NOT NULL
+            WHERE kb_item_created=1
             """
         )
 
         cur.execute(
             """
-            INSERT INTO synthesis_fts(id,title,content,main_category,sub_category,combined)
+            INSERT INTO synthesis_fts(rowid,title,content,main_category,sub_category)
             SELECT id,
                    COALESCE(synthesis_title, ''),
                    COALESCE(synthesis_content, ''),
                    COALESCE(main_category, ''),
-                   COALESCE(sub_category, ''),
-                   printf('%s %s %s %s', COALESCE(synthesis_title, ''), COALESCE(synthesis_content, ''), COALESCE(main_category, ''), COALESCE(sub_category, ''))
+                   COALESCE(sub_category, '')
             FROM subcategory_synthesis
-            WHERE synthesis_content IS NOT NULL
             """
         )
 
+        cur.execute("INSERT INTO tweet_cache_fts(tweet_cache_fts) VALUES ('rebuild')")
+
         conn.commit()
         print({'success': True, 'db_path': str(DB_PATH)})
     except Exception:
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Tests for content-addressed incremental backups
+
+Tests that unchanged files are neither re-read nor re-stored, that restores
+replay the manifest chain, that validation works from stored chunk hashes
+and that cleanup keeps parents and chunks still in use.
+"""
+
+import os
+from datetime import datetime, timedelta
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.backup_chunk_store import IncrementalBackupEngine
+from knowledge_base_agent.backup_manager import BackupManager
+
+
+class _StubConfig:
+    backup_incremental = True
+    backup_chunk_size_mb = 1
+    backup_compression_workers = 2
+    backup_max_chain_length = 14
+
+    def __init__(self, root):
+        self.backup_directory = str(root / 'backups')
+        self.data_directory = str(root / 'data')
+        self.media_directory = str(root / 'media')
+        self.log_directory = str(root / 'logs')
+
+
+def _tree(root):
+    return {path.relative_to(root).as_posix(): path.read_bytes() for path in root.rglob('*') if path.is_file()}
+
+
+class TestIncrementalBackupEngine:
+    """Test the chunk store and manifest chain."""
+
+    def test_only_changed_content_is_read_and_stored(self, tmp_path):
+        """Test that a delta backup reads changed files only and reuses stored chunks."""
+        media = tmp_path / 'media'
+        media.mkdir()
+        (media / 'keep.bin').write_bytes(os.urandom(3000))
+        (media / 'edit.bin').write_bytes(os.urandom(3000))
+        (media / 'drop.bin').write_bytes(b'drop me')
+        engine = IncrementalBackupEngine(tmp_path / 'backups', chunk_size=1024, workers=2)
+
+        _, _, first = engine.create('first', {'media': (media, lambda path: True)}, {})
+        assert first['files_changed'] == 3
+        assert first['new_chunks'] == 3 + 3 + 1
+
+        (media / 'edit.bin').write_bytes((media / 'edit.bin').read_bytes()[:2048] + b'changed tail')
+        (media / 'drop.bin').unlink()
+        (media / 'nested').mkdir()
+        (media / 'nested' / 'copy.bin').write_bytes((media / 'keep.bin').read_bytes())
+        _, _, second = engine.create('second', {'media': (media, lambda path: True)}, {}, parent_id='first')
+
+        assert second['files_unchanged'] == 1
+        assert second['files_changed'] == 2
+        assert second['files_deleted'] == 1
+        # The copy and the unchanged prefix of the edited file are already stored
+        assert second['new_chunks'] == 1
+        assert engine.load('second')['full'] is False
+        assert engine.chain('second') == ['first', 'second']
+
+        restored = tmp_path / 'restored'
+        engine.restore_tree('second', 'media', restored)
+        assert _tree(restored) == _tree(media)
+        assert engine.validate('second', deep=True) == []
+
+    def test_long_chains_start_over_with_a_full_manifest(self, tmp_path):
+        """Test that max_chain_length bounds how many manifests a restore reads."""
+        data = tmp_path / 'data'
+        data.mkdir()
+        (data / 'a.json').write_text('{}')
+        engine = IncrementalBackupEngine(tmp_path / 'backups', workers=1, max_chain_length=2)
+        directories = {'json_files': (data, lambda path: True)}
+
+        engine.create('b1', directories, {})
+        engine.create('b2', directories, {}, parent_id='b1')
+        engine.create('b3', directories, {}, parent_id='b2')
+        assert engine.chain('b2') == ['b1', 'b2']
+        assert engine.chain('b3') == ['b3']
+
+
+class TestBackupManagerChunked:
+    """Test BackupManager with chunked storage."""
+
+    def test_backup_validate_restore_and_cleanup(self, tmp_path):
+        """Test a delta backup end to end, including chunk garbage collection."""
+        (tmp_path / 'data').mkdir()
+        (tmp_path / 'data' / 'state.json').write_text('{"a": 1}')
+        (tmp_path / 'media').mkdir()
+        (tmp_path / 'media' / 'video.mp4').write_bytes(os.urandom(4096))
+        manager = BackupManager(_StubConfig(tmp_path))
+        components = ['json_files', 'media']
+
+        first = manager.create_backup('daily', components=components)
+        (tmp_path / 'data' / 'state.json').write_text('{"a": 2, "b": 3}')
+        second = manager.create_backup('daily', components=components)
+
+        assert first != second
+        second_info = manager.get_backup_info(second)
+        assert second_info.storage == 'chunked'
+        assert second_info.parent_backup_id == first
+        assert manager.validate_backup(second).is_valid
+
+        target = tmp_path / 'restored_data'
+        result = manager.restore_backup(second, components=['json_files'], target_directory=str(target),
+                                        create_rollback=False)
+        assert result.success
+        assert (target / 'state.json').read_text() == '{"a": 2, "b": 3}'
+
+        # The parent of an unexpired backup survives its own expiry
+        first_info = manager.get_backup_info(first)
+        first_info.retention_date = datetime.now() - timedelta(days=1)
+        manager._save_backup_metadata(first_info)
+        stats = manager.cleanup_expired_backups()
+        assert stats['retained_as_parent'] == 1
+        assert first in manager.list_backups()
+
+        # Once both expire, every chunk goes with them
+        second_info.retention_date = datetime.now() - timedelta(days=1)
+        manager._save_backup_metadata(second_info)
+        stats = manager.cleanup_expired_backups()
+        assert stats['successfully_deleted'] == 2
+        assert list(manager.chunk_engine.store.all_hashes()) == []
+
+    def test_missing_chunk_fails_validation(self, tmp_path):
+        """Test that validation notices a lost chunk without reading archives."""
+        (tmp_path / 'media').mkdir()
+        (tmp_path / 'media' / 'image.png').write_bytes(b'png bytes')
+        manager = BackupManager(_StubConfig(tmp_path))
+        backup_id = manager.create_backup('manual', components=['media'])
+
+        for chunk_hash in list(manager.chunk_engine.store.all_hashes()):
+            manager.chunk_engine.store.path(chunk_hash).unlink()
+        result = manager.validate_backup(backup_id)
+        assert not result.is_valid
+        assert result.checksum_verified
+        assert not result.content_verified
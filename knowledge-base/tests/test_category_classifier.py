@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Tests for CategoryPreClassifier
+
+Tests threshold calibration, backfill from already-categorized tweets,
+confident assignment without the categorization prompt, candidate narrowing
+and incremental learning from LLM results.
+"""
+
+import asyncio
+import json
+
+import numpy as np
+import pytest
+from flask import Flask
+from sqlalchemy.schema import CreateTable
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import ai_categorization
+from knowledge_base_agent.ai_categorization import categorize_and_name_content
+from knowledge_base_agent.category_classifier import (
+    CategoryPrediction, CategoryPreClassifier, calibrate_margin_threshold
+)
+from knowledge_base_agent.models import db, CategoryEmbeddingSample, UnifiedTweet
+
+VOCABULARY = ['python', 'code', 'library', 'sourdough', 'bread', 'oven', 'docker', 'container']
+
+
+class _StubConfig:
+    inference_backend = 'ollama'
+    content_generation_timeout = 30
+    category_preclassifier_target_precision = 0.95
+    category_preclassifier_candidates = 2
+    category_preclassifier_min_samples = 5
+    category_preclassifier_backfill_limit = 100
+    category_preclassifier_recalibrate_every = 1
+
+    def get_model_for_backend(self, purpose):
+        return f'{purpose}-model'
+
+
+class _StubHTTPClient:
+    """Embeds text as word counts over a small vocabulary and records prompts."""
+
+    def __init__(self, response=None):
+        self.config = _StubConfig()
+        self.response = response
+        self.prompts = []
+        self.embed_calls = 0
+
+    @staticmethod
+    def _vector(text):
+        words = text.lower().split()
+        # A small constant component keeps every vector non-zero
+        return [float(words.count(word)) for word in VOCABULARY] + [0.1]
+
+    async def embed(self, model, text, timeout=None):
+        self.embed_calls += 1
+        return self._vector(text)
+
+    async def embed_batch(self, model, texts, timeout=None):
+        self.embed_calls += 1
+        return [self._vector(text) for text in texts]
+
+    async def generate(self, model, prompt, **kwargs):
+        self.prompts.append(prompt)
+        return self.response
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a temporary SQLite database with tweets categorized in three categories."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        # CreateTable skips the indexes, which models.py declares twice for this table
+        with db.engine.begin() as connection:
+            connection.execute(CreateTable(UnifiedTweet.__table__))
+        texts = {
+            ('programming', 'python'): ['python code', 'python library', 'python code library', 'code python'],
+            ('cooking', 'baking'): ['sourdough bread', 'bread oven', 'sourdough oven bread', 'oven bread'],
+            ('devops', 'containers'): ['docker container', 'container docker code', 'docker', 'container'],
+        }
+        tweet_number = 0
+        for (main_category, sub_category), samples in texts.items():
+            for repeat in range(4):
+                for text in samples:
+                    tweet_number += 1
+                    db.session.add(UnifiedTweet(
+                        tweet_id=str(tweet_number), full_text=text, categories_processed=True,
+                        main_category=main_category, sub_category=sub_category
+                    ))
+        db.session.commit()
+        yield
+        db.session.remove()
+
+
+class TestThresholdCalibration:
+    """Test the precision-targeted margin threshold."""
+
+    def test_lowest_margin_reaching_target_precision(self):
+        """Test that the threshold stops above the first run of mistakes."""
+        margins = np.array([0.9, 0.8, 0.7, 0.6, 0.5, 0.4])
+        correct = np.array([True, True, True, True, False, False])
+        assert calibrate_margin_threshold(margins, correct, 0.95) == 0.6
+        assert calibrate_margin_threshold(margins, correct, 0.6) == 0.4
+        assert calibrate_margin_threshold(margins, ~correct, 0.95) is None
+
+    def test_tied_margins_are_not_split(self):
+        """Test that a threshold never accepts only part of a tie."""
+        margins = np.array([0.5, 0.5, 0.5])
+        correct = np.array([True, True, False])
+        assert calibrate_margin_threshold(margins, correct, 0.95) is None
+
+
+class TestCategoryPreClassifier:
+    """Test training, prediction and learning."""
+
+    def test_backfill_accepts_confident_and_narrows_ambiguous(self, app_context):
+        """Test that clear tweets are assigned and ambiguous ones get candidates."""
+        http_client = _StubHTTPClient()
+        classifier = CategoryPreClassifier(_StubConfig(), http_client)
+
+        clear = asyncio.run(classifier.predict('python code library', 'new-1'))
+        assert classifier.get_stats()['samples'] == 48
+        assert classifier.threshold is not None
+        assert clear.accepted
+        assert (clear.main_category, clear.sub_category) == ('programming', 'python')
+
+        ambiguous = asyncio.run(classifier.predict('python docker', 'new-2'))
+        assert not ambiguous.accepted
+        assert ambiguous.narrow_prompt
+        assert set(ambiguous.candidates) == {('programming', 'python'), ('devops', 'containers')}
+
+        # A restarted classifier trains from the stored samples without embedding them again
+        restarted_client = _StubHTTPClient()
+        restarted = CategoryPreClassifier(_StubConfig(), restarted_client)
+        asyncio.run(restarted.ensure_loaded())
+        assert restarted.get_stats()['samples'] == 48
+        assert restarted_client.embed_calls == 0
+
+    def test_learns_llm_results_but_not_its_own(self, app_context):
+        """Test that only LLM-decided categories become training samples."""
+        classifier = CategoryPreClassifier(_StubConfig(), _StubHTTPClient())
+        prediction = asyncio.run(classifier.predict('python docker', 'new-1'))
+        classifier.learn('new-1', 'devops', 'containers', prediction)
+        assert classifier.get_stats()['samples'] == 49
+        assert classifier.get_stats()['learned'] == 1
+
+        confident = asyncio.run(classifier.predict('sourdough bread', 'new-2'))
+        classifier.learn('new-2', confident.main_category, confident.sub_category, confident, source='classifier')
+        assert classifier.get_stats()['samples'] == 49
+
+        sources = {sample.tweet_id: sample.source for sample in CategoryEmbeddingSample.query.filter(
+            CategoryEmbeddingSample.tweet_id.in_(['new-1', 'new-2'])).all()}
+        assert sources == {'new-1': 'llm', 'new-2': 'classifier'}
+
+    def test_recategorized_tweet_replaces_its_sample(self, app_context):
+        """Test that a corrected label moves the tweet's contribution to the new category."""
+        classifier = CategoryPreClassifier(_StubConfig(), _StubHTTPClient())
+        prediction = asyncio.run(classifier.predict('python docker', 'new-1'))
+        classifier.learn('new-1', 'devops', 'containers', prediction)
+        counts_before = dict(classifier._counts)
+
+        classifier.learn('new-1', 'programming', 'python', prediction)
+        assert classifier.get_stats()['samples'] == 49
+        assert classifier._counts[('devops', 'containers')] == counts_before[('devops', 'containers')] - 1
+        assert classifier._counts[('programming', 'python')] == counts_before[('programming', 'python')] + 1
+        assert [key for sample_id, _, key in classifier._reservoir if sample_id == 'new-1'] in (
+            [], [('programming', 'python')])
+        classifier.calibrate()
+
+
+class _StubPreClassifier:
+    def __init__(self, prediction):
+        self.prediction = prediction
+        self.learned = []
+
+    async def predict(self, text, tweet_id):
+        return self.prediction
+
+    def learn(self, tweet_id, main_category, sub_category, prediction=None, source='llm'):
+        self.learned.append((tweet_id, main_category, sub_category, source))
+
+
+class _StubCategoryManager:
+    def __init__(self, prediction):
+        self.preclassifier = _StubPreClassifier(prediction)
+        self.named = []
+
+    def get_categories(self):
+        return {'programming': ['python', 'rust'], 'cooking': ['baking'], 'devops': ['containers']}
+
+    async def generate_item_name(self, text, main_category, sub_category, tweet_id):
+        self.named.append(tweet_id)
+        return 'python_packaging_tips'
+
+
+def _prediction(accepted, narrow_prompt=False):
+    return CategoryPrediction(
+        main_category='programming', sub_category='python', similarity=0.9, confidence=0.4,
+        accepted=accepted, candidates=[('programming', 'python'), ('devops', 'containers')],
+        narrow_prompt=narrow_prompt, embedding=np.ones(3, dtype=np.float32)
+    )
+
+
+class TestCategorizationIntegration:
+    """Test categorize_and_name_content with a pre-classifier."""
+
+    def test_confident_prediction_skips_categorization_prompt(self):
+        """Test that an accepted prediction only needs an item name."""
+        http_client = _StubHTTPClient()
+        category_manager = _StubCategoryManager(_prediction(accepted=True))
+
+        result = asyncio.run(categorize_and_name_content(
+            http_client, {'full_text': 'python packaging'}, 'm', '1', category_manager, max_retries=1
+        ))
+        assert result == ('programming', 'python', 'python_packaging_tips')
+        assert http_client.prompts == []
+        assert category_manager.preclassifier.learned == [('1', 'programming', 'python', 'classifier')]
+
+    def test_uncertain_prediction_lists_only_candidates(self, monkeypatch):
+        """Test that the LLM sees the candidate categories and its answer is learned."""
+        monkeypatch.setattr(ai_categorization.LLMPrompts, 'get_categorization_prompt_standard',
+                            staticmethod(lambda context_content, formatted_existing_categories, is_thread=False:
+                                         formatted_existing_categories))
+        response = json.dumps({'main_category': 'devops', 'sub_category': 'containers', 'item_name': 'docker_tips'})
+        http_client = _StubHTTPClient(response)
+        category_manager = _StubCategoryManager(_prediction(accepted=False, narrow_prompt=True))
+
+        result = asyncio.run(categorize_and_name_content(
+            http_client, {'full_text': 'python in docker'}, 'm', '2', category_manager, max_retries=1
+        ))
+        assert result == ('devops', 'containers', 'docker_tips')
+        assert http_client.prompts == ['- programming: python\n- devops: containers']
+        assert category_manager.named == []
+        assert category_manager.preclassifier.learned == [('2', 'devops', 'containers', 'llm')]
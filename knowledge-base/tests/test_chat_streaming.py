@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Tests for token-streaming chat
+
+Tests that backends stream fragments from Ollama's NDJSON responses, that the
+load balancer fails over before the first fragment, that fragments are
+coalesced into chunks and that ChatManager overlaps retrieval with prompt
+assembly and records time-to-first-token.
+"""
+
+import asyncio
+import json
+import socket
+
+from aiohttp import web
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.chat_manager import ChatManager, TokenCoalescer
+from knowledge_base_agent.http_session_pool import SessionPoolManager
+from knowledge_base_agent.inference_backends.load_balancer import LoadBalancedBackend
+from knowledge_base_agent.inference_backends.ollama_backend import OllamaBackend
+
+
+class _StubBackendConfig:
+    request_timeout = 5
+    max_retries = 1
+    max_concurrent_requests = 1
+    ollama_supports_json_mode = False
+
+    def __init__(self, url):
+        self.ollama_url = url
+
+
+class _StubSessionManager:
+    def __init__(self):
+        self.pool = SessionPoolManager()
+
+    async def _get_session(self):
+        return await self.pool.get_session()
+
+    async def _release_session(self, session):
+        await self.pool.release_session(session)
+
+
+async def _start_streaming_server(fragments):
+    """Start a stub Ollama server whose /api/chat streams the given fragments."""
+    async def chat(request):
+        payload = await request.json()
+        assert payload['stream'] is True
+        response = web.StreamResponse()
+        await response.prepare(request)
+        for fragment in fragments:
+            await response.write(json.dumps({'message': {'content': fragment}, 'done': False}).encode() + b'\n')
+        await response.write(json.dumps({'message': {'content': ''}, 'done': True}).encode() + b'\n')
+        await response.write_eof()
+        return response
+
+    async def tags(request):
+        return web.json_response({'models': [{'name': 'm'}]})
+
+    app = web.Application()
+    app.router.add_post('/api/chat', chat)
+    app.router.add_get('/api/tags', tags)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+def _unused_url():
+    """Return a URL on a local port with nothing listening."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+async def _collect(stream):
+    return [fragment async for fragment in stream]
+
+
+class TestBackendStreaming:
+    """Test chat_stream on the Ollama backend and the load balancer."""
+
+    def test_ollama_backend_yields_fragments(self):
+        """Test that each NDJSON message fragment is yielded as it arrives."""
+        async def run():
+            runner, url = await _start_streaming_server(['Hel', 'lo', ' world'])
+            session_manager = _StubSessionManager()
+            try:
+                backend = OllamaBackend(_StubBackendConfig(url), session_manager)
+                messages = [{'role': 'user', 'content': 'hi'}]
+                return await _collect(backend.chat_stream(model='m', messages=messages))
+            finally:
+                await session_manager.pool.close()
+                await runner.cleanup()
+
+        assert asyncio.run(run()) == ['Hel', 'lo', ' world']
+
+    def test_balancer_fails_over_before_first_fragment(self):
+        """Test that an unreachable endpoint is skipped and its slot released."""
+        async def run():
+            runner, url = await _start_streaming_server(['ok'])
+            session_manager = _StubSessionManager()
+            try:
+                endpoints = [OllamaBackend(_StubBackendConfig(endpoint_url), session_manager)
+                             for endpoint_url in [_unused_url(), url]]
+                balancer = LoadBalancedBackend(None, session_manager, endpoints, failure_threshold=1)
+                messages = [{'role': 'user', 'content': 'hi'}]
+                fragments = await _collect(balancer.chat_stream(model='m', messages=messages, options={'gpu_device': 0}))
+                return fragments, balancer.get_endpoint_stats()
+            finally:
+                await session_manager.pool.close()
+                await runner.cleanup()
+
+        fragments, stats = asyncio.run(run())
+        assert fragments == ['ok']
+        assert [endpoint['outstanding'] for endpoint in stats] == [0, 0]
+        assert not stats[0]['healthy']
+
+
+class TestTokenCoalescer:
+    """Test grouping of streamed fragments into chunks."""
+
+    def test_first_fragment_is_immediate_then_chunks_by_size(self):
+        """Test that later fragments wait until max_chars have accumulated."""
+        coalescer = TokenCoalescer(max_chars=6, max_delay=60)
+        assert coalescer.add('A') == 'A'
+        assert coalescer.add('bc') is None
+        assert coalescer.add('def') is None
+        assert coalescer.add('g') == 'bcdefg'
+        assert coalescer.add('h') is None
+        assert coalescer.flush() == 'h'
+        assert coalescer.flush() is None
+        assert coalescer.chunks == 3
+
+
+class _StubChatConfig:
+    text_model = 'text-model'
+    chat_model = 'chat-model'
+    chat_timeout = 30
+    chat_stream_flush_chars = 8
+    chat_stream_flush_ms = 60000
+
+    def get_model_for_backend(self, purpose):
+        return 'chat-model'
+
+
+class _StubHTTPClient:
+    def __init__(self, fragments):
+        self.fragments = fragments
+
+    async def chat_stream(self, model, messages, **kwargs):
+        for fragment in self.fragments:
+            await asyncio.sleep(0.001)
+            yield fragment
+
+
+class _StubSearchEngine:
+    def __init__(self, order):
+        self.order = order
+
+    async def search(self, query, limit=12):
+        self.order.append('search started')
+        await asyncio.sleep(0.01)
+        self.order.append('search finished')
+        return [{'title': 'Doc', 'content': 'Streaming details', 'type': 'kb_item', 'id': 1,
+                 'category': 'AI', 'subcategory': 'LLMs', 'score': 0.9}]
+
+
+class TestStreamChatQuery:
+    """Test ChatManager.stream_chat_query."""
+
+    def test_events_metrics_and_overlapped_retrieval(self, monkeypatch):
+        """Test the event sequence and that retrieval runs during prompt assembly."""
+        order = []
+        fragments = ['The', ' answer', ' is', ' to', ' stream', ' tokens', '.']
+        manager = ChatManager(_StubChatConfig(), _StubHTTPClient(fragments), embedding_manager=None)
+        manager.search_engine = _StubSearchEngine(order)
+        manager.response_formatter = None
+        monkeypatch.setattr(manager, '_get_specialized_prompt',
+                            lambda query_type: order.append('prompt assembled') or 'System prompt')
+
+        async def run():
+            return [event async for event in manager.stream_chat_query('How do I stream tokens?')]
+
+        events = asyncio.run(run())
+        assert order == ['search started', 'prompt assembled', 'search finished']
+
+        names = [event['event'] for event in events]
+        assert names[0] == 'sources' and names[-1] == 'done'
+        assert events[0]['sources'][0]['title'] == 'Doc'
+        tokens = [event['content'] for event in events if event['event'] == 'token']
+        # First fragment alone, then chunks of at least 8 characters, then the remainder
+        assert tokens[0] == 'The'
+        assert ''.join(tokens) == ''.join(fragments)
+        assert len(tokens) < len(fragments)
+
+        done = events[-1]
+        assert done['response'] == 'The answer is to stream tokens.'
+        metrics = done['performance_metrics']
+        assert metrics['streamed'] is True
+        assert metrics['stream_chunks'] == len(tokens)
+        assert 0 < metrics['time_to_first_token_ms'] <= metrics['retrieval_time_ms'] + metrics['response_time_ms']
+        assert metrics['tokens_per_second'] > 0
+
+    def test_backend_failure_becomes_error_event(self):
+        """Test that a failing stream ends with an error event instead of raising."""
+        class _FailingHTTPClient:
+            async def chat_stream(self, model, messages, **kwargs):
+                raise RuntimeError('backend down')
+                yield
+
+        manager = ChatManager(_StubChatConfig(), _FailingHTTPClient(), embedding_manager=None)
+
+        async def run():
+            return [event async for event in manager.stream_chat_query('hi', use_knowledge_base=False)]
+
+        events = asyncio.run(run())
+        assert [event['event'] for event in events] == ['sources', 'error']
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming pipeline mode of StreamlinedContentProcessor
+
+Tests per-tweet phase routing in PhaseExecutionHelper, that tweets reach
+KB item generation before every tweet has been cached, and that the LLM phase
+persists categorizations in batches as they complete.
+"""
+
+import asyncio
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import content_processor as cp_module
+from knowledge_base_agent.content_processor import StreamlinedContentProcessor
+from knowledge_base_agent.phase_execution_helper import PhaseExecutionHelper, PhaseExecutionPlan, ProcessingPhase
+from knowledge_base_agent.progress import ProcessingStats
+from knowledge_base_agent.shared_globals import stop_flag
+
+
+NO_FORCE = {
+    'force_recache_tweets': False,
+    'force_reprocess_media': False,
+    'force_reprocess_llm': False,
+    'force_reprocess_kb_item': False,
+}
+
+
+class _StubConfig:
+    text_model = 'stub-text'
+    num_gpus_available = 1
+    pipeline_mode = True
+    pipeline_queue_size = 2
+    pipeline_cache_workers = 1
+    pipeline_media_workers = 1
+    pipeline_kb_item_workers = 1
+    llm_result_batch_size = 2
+    llm_result_flush_seconds = 60.0
+
+
+class _StubHTTPClient:
+    config = _StubConfig()
+
+
+class _StubStateManager:
+    def __init__(self, tweets):
+        self.tweets = tweets
+        self.updates = []
+        self.batches = []
+
+    def get_tweet(self, tweet_id):
+        return dict(self.tweets[tweet_id])
+
+    def update_tweet_data(self, tweet_id, data):
+        self.tweets[tweet_id] = dict(data)
+        self.updates.append(tweet_id)
+
+    def update_tweets_data_batch(self, updates_by_tweet):
+        for tweet_id, data in updates_by_tweet.items():
+            self.tweets[tweet_id] = dict(data)
+        self.batches.append(sorted(updates_by_tweet))
+        return len(updates_by_tweet)
+
+
+class _StubPreferences:
+    force_recache_tweets = False
+    force_reprocess_media = False
+    force_reprocess_llm = False
+    force_reprocess_kb_item = False
+
+
+class TestNextPhaseForTweet:
+    """Test per-tweet routing decisions."""
+
+    def test_routes_to_first_incomplete_phase(self):
+        helper = PhaseExecutionHelper()
+
+        assert helper.next_phase_for_tweet({}, NO_FORCE) == ProcessingPhase.CACHE
+        cached = {'cache_complete': True, 'media_processed': True}
+        assert helper.next_phase_for_tweet(cached, NO_FORCE) == ProcessingPhase.LLM
+        assert helper.next_phase_for_tweet(cached, NO_FORCE, after=ProcessingPhase.LLM) is None
+
+    def test_blocked_and_finished_tweets_leave_pipeline(self):
+        helper = PhaseExecutionHelper()
+
+        failed_media = {'cache_complete': True, 'media_processed': True, '_media_error': 'boom'}
+        assert helper.next_phase_for_tweet(failed_media, NO_FORCE, after=ProcessingPhase.MEDIA) is None
+        done = {'cache_complete': True, 'media_processed': True, 'categories_processed': True,
+                'main_category': 'a', 'item_name_suggestion': 'b', 'kb_item_created': True}
+        assert helper.next_phase_for_tweet(done, NO_FORCE) is None
+        assert helper.next_phase_for_tweet(done, dict(NO_FORCE, force_reprocess_kb_item=True)) == ProcessingPhase.KB_ITEM
+
+
+class TestStreamingPipeline:
+    """Test that tweets flow through stages independently."""
+
+    def test_first_kb_item_is_created_before_caching_finishes(self, monkeypatch):
+        tweet_ids = [f't{i}' for i in range(6)]
+        state_manager = _StubStateManager({tweet_id: {'tweet_id': tweet_id} for tweet_id in tweet_ids})
+        events = []
+
+        async def fake_cache_tweets(ids, config, http_client, state_manager, force_recache=False):
+            await asyncio.sleep(0.01)
+            for tweet_id in ids:
+                state_manager.tweets[tweet_id]['cache_complete'] = True
+                events.append(('cache', tweet_id))
+
+        async def fake_process_media(tweet_data, http_client, config, force_reprocess=False):
+            events.append(('media', tweet_data['tweet_id']))
+            return dict(tweet_data, media_processed=True)
+
+        async def fake_categorize(tweet_id, tweet_data, category_manager, preferences, gpu_device):
+            if tweet_id == 't3':
+                raise RuntimeError('model unavailable')
+            return 'main', 'sub', f'item-{tweet_id}'
+
+        async def fake_generate_kb_item(tweet_id, tweet_data):
+            tweet_data['kb_item_created'] = True
+            events.append(('kb', tweet_id))
+
+        monkeypatch.setattr(cp_module, 'cache_tweets', fake_cache_tweets)
+        monkeypatch.setattr(cp_module, 'process_media', fake_process_media)
+        monkeypatch.setattr(cp_module, 'update_phase_stats', lambda **kwargs: None)
+
+        processor = StreamlinedContentProcessor(
+            config=_StubConfig(), http_client=_StubHTTPClient(), state_manager=state_manager
+        )
+        processor.validate_tweet_data_integrity = lambda tweet_id, data: (True, [])
+        processor._process_single_categorization = fake_categorize
+        processor._generate_kb_item = fake_generate_kb_item
+        processor.retry_manager.should_retry = lambda *args: False
+        emitted = []
+        processor.phase_emitter_func = lambda *args, **kwargs: emitted.append(args)
+
+        tweets_data_map = {tweet_id: state_manager.get_tweet(tweet_id) for tweet_id in tweet_ids}
+        stats = ProcessingStats(start_time=None)
+        stop_flag.clear()
+        asyncio.run(processor._execute_pipeline(tweets_data_map, NO_FORCE, _StubPreferences(), stats, None))
+
+        first_kb = events.index(next(e for e in events if e[0] == 'kb'))
+        last_cache = max(i for i, e in enumerate(events) if e[0] == 'cache')
+        assert first_kb < last_cache
+
+        assert sorted(t for kind, t in events if kind == 'kb') == [t for t in tweet_ids if t != 't3']
+        assert tweets_data_map['t3']['_llm_error'] == 'model unavailable'
+        assert stats.error_count == 1
+
+        completed = {args[0]: args for args in emitted if args[1] == 'completed'}
+        assert completed['tweet_caching'][4:7] == (6, 6, 0)
+        assert completed['llm_processing'][4:7] == (5, 6, 1)
+        assert completed['kb_item_generation'][4:7] == (5, 5, 0)
+
+
+class TestLLMPhaseStreaming:
+    """Test completion-order categorization with batched persistence."""
+
+    def _make_processor(self, state_manager, monkeypatch):
+        monkeypatch.setattr(cp_module, 'update_phase_stats', lambda **kwargs: None)
+        monkeypatch.setattr(cp_module, 'load_processing_stats', lambda: {})
+        processor = StreamlinedContentProcessor(
+            config=_StubConfig(), http_client=_StubHTTPClient(), state_manager=state_manager
+        )
+        processor.phase_emitter_func = None
+        return processor
+
+    def _plan(self, tweet_ids):
+        return PhaseExecutionPlan(ProcessingPhase.LLM, len(tweet_ids), list(tweet_ids), [], [])
+
+    def test_results_are_persisted_in_batches(self, monkeypatch):
+        tweet_ids = [f't{i}' for i in range(5)]
+        state_manager = _StubStateManager({tweet_id: {'tweet_id': tweet_id} for tweet_id in tweet_ids})
+        processor = self._make_processor(state_manager, monkeypatch)
+
+        async def fake_categorize(tweet_id, tweet_data, category_manager, preferences, gpu_device):
+            return 'main', 'sub', f'item-{tweet_id}'
+
+        processor._process_single_categorization = fake_categorize
+        emitted = []
+        processor.phase_emitter_func = lambda *args, **kwargs: emitted.append(args)
+
+        tweets_data_map = {tweet_id: state_manager.get_tweet(tweet_id) for tweet_id in tweet_ids}
+        stats = ProcessingStats(start_time=None)
+        stop_flag.clear()
+        asyncio.run(processor._execute_llm_phase(self._plan(tweet_ids), tweets_data_map, _StubPreferences(), stats, None))
+
+        assert [len(batch) for batch in state_manager.batches] == [2, 2, 1]
+        assert state_manager.updates == []
+        assert all(state_manager.tweets[t]['categories_processed'] for t in tweet_ids)
+
+        progress = [args[4] for args in emitted if args[1] == 'active' and len(args) > 4]
+        assert progress[1:] == [1, 2, 3, 4, 5]
+
+    def test_stop_flag_ends_phase_and_flushes_finished_results(self, monkeypatch):
+        tweet_ids = [f't{i}' for i in range(20)]
+        state_manager = _StubStateManager({tweet_id: {'tweet_id': tweet_id} for tweet_id in tweet_ids})
+        processor = self._make_processor(state_manager, monkeypatch)
+        started = []
+
+        async def fake_categorize(tweet_id, tweet_data, category_manager, preferences, gpu_device):
+            started.append(tweet_id)
+            if tweet_id == 't2':
+                stop_flag.set()
+                await asyncio.sleep(10)
+            return 'main', 'sub', f'item-{tweet_id}'
+
+        processor._process_single_categorization = fake_categorize
+
+        tweets_data_map = {tweet_id: state_manager.get_tweet(tweet_id) for tweet_id in tweet_ids}
+        stop_flag.clear()
+        try:
+            asyncio.run(asyncio.wait_for(
+                processor._execute_llm_phase(self._plan(tweet_ids), tweets_data_map, _StubPreferences(),
+                                             ProcessingStats(start_time=None), None),
+                timeout=5
+            ))
+        finally:
+            stop_flag.clear()
+
+        assert started == ['t0', 't1', 't2']
+        assert [t for batch in state_manager.batches for t in batch] == ['t0', 't1']
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for batched embedding generation in EmbeddingManager
+
+Tests token-budget batch packing and the split-on-failure fallback used by
+generate_all_embeddings.
+"""
+
+import asyncio
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.embedding_manager import EmbeddingManager
+
+
+class _StubConfig:
+    """Minimal config exposing the settings EmbeddingManager reads."""
+
+    embedding_batch_size = 4
+    embedding_batch_token_budget = 100
+    max_concurrent_requests = 2
+    vector_store_path = None
+
+    def get_model_for_backend(self, model_type):
+        return 'stub-embed'
+
+
+class _StubHTTPClient:
+    """Records batch requests and fails any batch containing a poisoned text."""
+
+    def __init__(self):
+        self.batch_calls = []
+        self.single_calls = []
+
+    async def embed_batch(self, model, texts, timeout=None):
+        self.batch_calls.append(list(texts))
+        if any('poison' in text for text in texts):
+            raise RuntimeError('bad input in batch')
+        return [[float(len(text))] * 128 for text in texts]
+
+    async def embed(self, model, text, timeout=None):
+        self.single_calls.append(text)
+        if 'poison' in text:
+            raise RuntimeError('bad input')
+        return [float(len(text))] * 128
+
+
+def _item(doc_id, content):
+    return {'type': 'kb_item', 'id': doc_id, 'content': content, 'title': str(doc_id), 'document': None}
+
+
+class TestEmbeddingBatching:
+    """Test batch construction and fallback behaviour."""
+
+    def test_batches_respect_item_limit_and_token_budget(self):
+        """Test that batches close on either the item cap or the token budget."""
+        manager = EmbeddingManager(_StubConfig(), _StubHTTPClient())
+
+        short_items = [_item(i, 'x' * 20) for i in range(6)]
+        long_items = [_item(100 + i, 'y' * 400) for i in range(2)]
+        batches = manager._build_embedding_batches(short_items + long_items)
+
+        assert [len(batch) for batch in batches] == [4, 2, 1, 1]
+        assert [item['id'] for batch in batches for item in batch] == [
+            item['id'] for item in short_items + long_items
+        ]
+
+    def test_failed_batch_is_split_until_bad_item_isolated(self):
+        """Test that one bad document does not fail the rest of its batch."""
+        http_client = _StubHTTPClient()
+        manager = EmbeddingManager(_StubConfig(), http_client)
+        batch = [_item(1, 'alpha'), _item(2, 'poison'), _item(3, 'gamma'), _item(4, 'delta')]
+
+        async def run():
+            manager._generate_embedding_with_retry = lambda content: http_client.embed('stub-embed', content)
+            return await manager._embed_batch_with_fallback(batch)
+
+        results = asyncio.run(run())
+
+        assert [item['id'] for item, _, _ in results] == [1, 2, 3, 4]
+        failed = [item['id'] for item, vector, error in results if error is not None]
+        assert failed == [2]
+        assert all(len(vector) == 128 for _, vector, error in results if error is None)
+        assert http_client.batch_calls[0] == ['alpha', 'poison', 'gamma', 'delta']
+        assert ['gamma', 'delta'] in http_client.batch_calls
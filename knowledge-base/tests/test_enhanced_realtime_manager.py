@@ -19,7 +19,7 @@ sys.path.append('.')
 
 from knowledge_base_agent.enhanced_realtime_manager import (
     EventValidator, EventRouter, RateLimiter, ConnectionHealthMonitor,
-    EnhancedRealtimeManager, EventBatch, RateLimitConfig
+    EnhancedRealtimeManager, EventBatch, RateLimitConfig, ProgressEventCompactor
 )
 
 
@@ -303,6 +303,88 @@ class TestConnectionHealthMonitor:
         assert monitor.consecutive_failures == 0
 
 
+def _progress_event(task_id='t1', phase_id='llm', processed=0, status='in_progress', event_type='phase_update'):
+    return {
+        'type': event_type,
+        'task_id': task_id,
+        'data': {'task_id': task_id, 'phase_id': phase_id, 'status': status,
+                 'processed_count': processed, 'total_count': 1000, 'message': 'Categorizing'},
+        'socketio_events': ['phase_update']
+    }
+
+
+class TestProgressEventCompactor:
+    """Test ProgressEventCompactor functionality."""
+    
+    def test_superseded_progress_collapses_to_latest(self):
+        """Test that a window of updates per task and phase emits one event each."""
+        compactor = ProgressEventCompactor()
+        for processed in range(500):
+            assert compactor.offer(_progress_event(processed=processed))
+            assert compactor.offer(_progress_event(phase_id='embed', processed=processed))
+        
+        events = compactor.drain(force=True)
+        assert sorted((e['data']['phase_id'], e['data']['processed_count']) for e in events) == [
+            ('embed', 499), ('llm', 499)
+        ]
+        assert compactor.stats['events_coalesced'] == 998
+    
+    def test_log_lines_and_terminal_states_pass_through(self):
+        """Test that only non-terminal progress is held back."""
+        compactor = ProgressEventCompactor()
+        assert not compactor.offer({'type': 'log_message', 'data': {'message': 'hi', 'level': 'INFO'}})
+        
+        compactor.offer(_progress_event(processed=10))
+        compactor.offer(_progress_event(processed=20, event_type='progress_update'))
+        assert not compactor.offer(_progress_event(processed=1000, status='completed'))
+        # The pending states the terminal one supersedes are gone
+        assert compactor.drain(force=True) == []
+    
+    def test_later_emissions_are_deltas(self):
+        """Test that only changed fields follow the first full state."""
+        compactor = ProgressEventCompactor(full_state_every=3)
+        compactor.offer(_progress_event(processed=1))
+        first = compactor.drain(force=True)[0]['data']
+        assert 'delta' not in first and first['total_count'] == 1000
+        
+        compactor.offer(_progress_event(processed=2))
+        second = compactor.drain(force=True)[0]['data']
+        assert second == {'processed_count': 2, 'type': 'phase_update', 'task_id': 't1', 'phase_id': 'llm',
+                          'status': 'in_progress', 'delta': True}
+        
+        compactor.offer(_progress_event(processed=3))
+        compactor.drain(force=True)
+        compactor.offer(_progress_event(processed=4))
+        assert 'delta' not in compactor.drain(force=True)[0]['data']
+        
+        # A new client gets full states
+        compactor.client_connected()
+        compactor.offer(_progress_event(processed=5))
+        assert 'delta' not in compactor.drain(force=True)[0]['data']
+    
+    def test_emissions_carry_their_event_type(self):
+        """Test that progress and phase states for one phase stay apart on the shared event."""
+        compactor = ProgressEventCompactor()
+        compactor.offer(_progress_event(processed=1))
+        compactor.offer(_progress_event(processed=1, event_type='progress_update'))
+        compactor.drain(force=True)
+        
+        compactor.offer(_progress_event(processed=2, event_type='progress_update'))
+        delta = compactor.drain(force=True)[0]['data']
+        assert delta['delta'] and delta['type'] == 'progress_update'
+    
+    def test_window_grows_with_clients(self):
+        """Test that more clients stretch the window up to its maximum."""
+        compactor = ProgressEventCompactor(min_window_seconds=0.1, max_window_seconds=1.0)
+        base = compactor.current_window()
+        for _ in range(50):
+            compactor.client_connected()
+        assert compactor.current_window() > base
+        for _ in range(1000):
+            compactor.client_connected()
+        assert compactor.current_window() == 1.0
+
+
 class TestEnhancedRealtimeManager:
     """Test EnhancedRealtimeManager functionality."""
     
@@ -410,6 +492,26 @@ class TestEnhancedRealtimeManager:
         assert realtime_manager.stats['events_validated'] == 1
         assert realtime_manager.stats['events_rate_limited'] == 1
     
+    def test_progress_is_coalesced_until_terminal_state(self, realtime_manager):
+        """Test that a burst of progress reaches the batch only as its final state."""
+        realtime_manager._add_to_batch = Mock()
+        for processed in range(100):
+            realtime_manager._handle_redis_message({
+                'channel': 'task_phase_updates',
+                'data': json.dumps({'type': 'phase_update', 'task_id': 't1', 'phase_id': 'llm',
+                                    'status': 'in_progress', 'processed_count': processed, 'total_count': 100})
+            })
+        assert not realtime_manager._add_to_batch.called
+        
+        realtime_manager._handle_redis_message({
+            'channel': 'task_phase_updates',
+            'data': json.dumps({'type': 'phase_update', 'task_id': 't1', 'phase_id': 'llm',
+                                'status': 'completed', 'processed_count': 100, 'total_count': 100})
+        })
+        realtime_manager._add_to_batch.assert_called_once()
+        assert realtime_manager._add_to_batch.call_args[0][0]['data']['status'] == 'completed'
+        assert realtime_manager.compactor.drain(force=True) == []
+    
     def test_event_buffering(self, realtime_manager):
         """Test event buffering during connection issues."""
         # Enable buffering
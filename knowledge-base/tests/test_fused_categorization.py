@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Tests for fused categorization
+
+Tests that one schema-constrained call returns the category, item name and
+display title, and that only the fields failing validation are requested again.
+"""
+
+import asyncio
+import json
+
+from aiohttp import web
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.ai_categorization import (
+    FUSED_CATEGORIZATION_FIELDS, categorize_name_and_title_content, fused_categorization_schema, parse_fused_response
+)
+from knowledge_base_agent.http_session_pool import SessionPoolManager
+from knowledge_base_agent.inference_backends.ollama_backend import OllamaBackend
+from knowledge_base_agent.prompt_prefix import PromptTokenStats
+
+TWEET = {'full_text': 'Tuning autovacuum thresholds for write-heavy PostgreSQL tables'}
+
+
+class _StubConfig:
+    inference_backend = 'ollama'
+    content_generation_timeout = 30
+
+    def get_model_for_backend(self, purpose):
+        return f'{purpose}-model'
+
+
+class _StubHTTPClient:
+    """Replies with the queued responses and records each request's options."""
+
+    def __init__(self, *responses):
+        self.config = _StubConfig()
+        self.responses = list(responses)
+        self.requests = []
+
+    async def generate(self, model, prompt, **kwargs):
+        self.requests.append({'prompt': prompt, **kwargs})
+        return json.dumps(self.responses.pop(0))
+
+
+class _StubBackendConfig:
+    request_timeout = 5
+    max_retries = 1
+    max_concurrent_requests = 1
+    ollama_supports_json_mode = False
+
+    def __init__(self, url):
+        self.ollama_url = url
+
+
+class _StubSessionManager:
+    def __init__(self):
+        self.pool = SessionPoolManager()
+        self.prompt_stats = PromptTokenStats()
+
+    async def _get_session(self):
+        return await self.pool.get_session()
+
+    async def _release_session(self, session):
+        await self.pool.release_session(session)
+
+
+class _StubCategoryManager:
+    preclassifier = None
+
+    def get_categories(self):
+        return {'database_internals': ['postgresql_mvcc_vacuum_process']}
+
+
+def _categorize(http_client, max_retries=3):
+    return asyncio.run(categorize_name_and_title_content(
+        http_client, TWEET, '1', _StubCategoryManager(), max_retries=max_retries
+    ))
+
+
+class TestFusedCategorization:
+    """Test categorize_name_and_title_content."""
+
+    def test_single_call_returns_all_fields(self):
+        """Test that a valid response needs one request constrained by the schema."""
+        http_client = _StubHTTPClient({
+            'main_category': 'database_internals', 'sub_category': 'postgresql_mvcc_vacuum_process',
+            'item_name': 'autovacuum_write_heavy_tuning', 'display_title': 'Tuning Autovacuum for Write-Heavy Tables',
+        })
+        result = _categorize(http_client)
+        assert result == ('database_internals', 'postgresql_mvcc_vacuum_process',
+                          'autovacuum_write_heavy_tuning', 'Tuning Autovacuum for Write-Heavy Tables')
+        assert len(http_client.requests) == 1
+        schema = http_client.requests[0]['options']['json_schema']
+        assert schema['required'] == list(FUSED_CATEGORIZATION_FIELDS)
+        assert http_client.requests[0]['cache_phase'] == 'categorization'
+
+    def test_only_invalid_fields_are_requested_again(self):
+        """Test that the repair request asks for the invalid item name with the rest settled."""
+        http_client = _StubHTTPClient(
+            {'main_category': 'database_internals', 'sub_category': 'postgresql_mvcc_vacuum_process',
+             'item_name': 'vacuum_guide', 'display_title': 'Tuning Autovacuum'},
+            {'item_name': 'autovacuum_threshold_tuning'},
+        )
+        result = _categorize(http_client)
+        assert result[2:] == ('autovacuum_threshold_tuning', 'Tuning Autovacuum')
+        repair = http_client.requests[1]
+        assert repair['options']['json_schema']['required'] == ['item_name']
+        assert '- display_title: Tuning Autovacuum' in repair['prompt']
+
+    def test_naming_fields_fall_back_after_retries(self):
+        """Test that a name and title are derived when the model never produces valid ones."""
+        http_client = _StubHTTPClient(
+            {'main_category': 'database_internals', 'sub_category': 'vacuum', 'item_name': 'x', 'display_title': ''},
+            {'item_name': 'note', 'display_title': 'ab'},
+        )
+        result = _categorize(http_client, max_retries=2)
+        assert result[:2] == ('database_internals', 'vacuum')
+        assert result[2] == 'tuning_autovacuum_thresholds_write'
+        assert result[3]
+
+
+class TestOllamaSchema:
+    """Test that Ollama receives the schema."""
+
+    def test_schema_is_sent_without_json_mode_opt_in(self):
+        """Test that the schema becomes the request format on the default configuration."""
+        async def scenario():
+            payloads = []
+
+            async def generate(request):
+                payloads.append(await request.json())
+                return web.json_response({'response': '{}'})
+
+            app = web.Application()
+            app.router.add_post('/api/generate', generate)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            session_manager = _StubSessionManager()
+            try:
+                backend = OllamaBackend(_StubBackendConfig(f"http://127.0.0.1:{port}"), session_manager)
+                await backend.generate(model='m', prompt='p',
+                                       options={'json_schema': fused_categorization_schema(['item_name'])})
+            finally:
+                await session_manager.pool.close()
+                await runner.cleanup()
+            return payloads[0]
+
+        payload = asyncio.run(scenario())
+        assert payload['format']['required'] == ['item_name']
+
+
+class TestParseFusedResponse:
+    """Test parse_fused_response."""
+
+    def test_fields_are_validated_independently(self):
+        """Test that one bad field does not discard the others."""
+        valid, invalid = parse_fused_response(
+            '```json\n{"main_category": "Database Internals", "sub_category": "", "display_title": "  Vacuum  Tuning "}\n```',
+            ['main_category', 'sub_category', 'display_title'], '1'
+        )
+        assert valid == {'main_category': 'database_internals', 'display_title': 'Vacuum Tuning'}
+        assert invalid == ['sub_category']
+
+    def test_unparseable_response_requests_every_field(self):
+        """Test that a non-JSON answer is treated as all fields missing."""
+        assert parse_fused_response('not json', ['item_name'], '1') == ({}, ['item_name'])
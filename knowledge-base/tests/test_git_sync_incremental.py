@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental GitSyncManager exports
+
+Tests that the manifest limits writes to changed documents, that renames
+and deletions remove the old paths, that media is linked rather than copied
+and that only changed paths are staged.
+"""
+
+import asyncio
+import subprocess
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy.schema import CreateTable
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.git_sync_manager import GitSyncManager
+from knowledge_base_agent.models import db, KnowledgeBaseItem, SubcategorySynthesis, UnifiedTweet
+
+
+class _StubConfig:
+    github_user_name = 'Test User'
+    github_user_email = 'test@example.com'
+    github_repo_url = None
+    github_token = None
+    git_export_incremental = True
+
+    def __init__(self, knowledge_base_dir):
+        self.knowledge_base_dir = knowledge_base_dir
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Provide a GitSyncManager over a temporary SQLite database and export repository."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        KnowledgeBaseItem.__table__.create(db.engine, checkfirst=True)
+        SubcategorySynthesis.__table__.create(db.engine, checkfirst=True)
+        # CreateTable skips the indexes, which models.py declares twice for this table
+        with db.engine.begin() as connection:
+            connection.execute(CreateTable(UnifiedTweet.__table__))
+
+        manager = GitSyncManager(_StubConfig(tmp_path / 'repo'))
+
+        async def simple_readme(kb_stats, synthesis_stats, media_stats):
+            (manager.repo_dir / "README.md").write_text(f"{kb_stats['total_items']} items\n")
+
+        async def no_push():
+            return None
+
+        monkeypatch.setattr(manager, '_generate_comprehensive_readme', simple_readme)
+        monkeypatch.setattr(manager, '_push_to_remote', no_push)
+        yield manager
+        db.session.remove()
+
+
+def _add_item(title, media_path=None, when=None):
+    when = when or datetime(2024, 1, 1)
+    item = KnowledgeBaseItem(title=title, content=f"Content of {title}", main_category='AI', sub_category='LLMs',
+                             item_name=title, created_at=when, last_updated=when,
+                             kb_media_paths=f'["{media_path}"]' if media_path else None)
+    db.session.add(item)
+    db.session.commit()
+    return item
+
+
+def _committed_files(manager, revision='HEAD'):
+    result = subprocess.run(['git', 'show', '--no-renames', '--name-only', '--format=', revision],
+                            cwd=manager.repo_dir, capture_output=True, text=True, check=True)
+    return set(result.stdout.split())
+
+
+class TestIncrementalGitExport:
+    """Test manifest-driven incremental exports."""
+
+    def test_only_changed_items_are_written_and_staged(self, manager, tmp_path):
+        """Test that a second export touches just the changed, renamed and deleted items."""
+        image = tmp_path / 'diagram.png'
+        image.write_bytes(b'png bytes')
+        first = _add_item('First', media_path=image)
+        second = _add_item('Second')
+        third = _add_item('Third')
+        _add_item('Fourth')
+        asyncio.run(manager.export_database_to_git("initial"))
+
+        item_dir = manager.repo_dir / 'knowledge-base/ai/llms/first'
+        assert (item_dir / 'README.md').exists()
+        # Media is hardlinked, not copied
+        assert (item_dir / 'diagram.png').samefile(image)
+        untouched = manager.repo_dir / 'knowledge-base/ai/llms/fourth/README.md'
+        untouched_mtime = untouched.stat().st_mtime_ns
+
+        later = datetime(2024, 2, 1)
+        first.content, first.last_updated = 'New content', later
+        second.item_name, second.last_updated = 'Second Renamed', later
+        db.session.delete(third)
+        db.session.commit()
+        asyncio.run(manager.export_database_to_git("update"))
+
+        assert 'New content' in (item_dir / 'README.md').read_text()
+        assert (manager.repo_dir / 'knowledge-base/ai/llms/second-renamed/README.md').exists()
+        assert not (manager.repo_dir / 'knowledge-base/ai/llms/second').exists()
+        assert not (manager.repo_dir / 'knowledge-base/ai/llms/third').exists()
+        assert _committed_files(manager) == {
+            'README.md',
+            'knowledge-base/ai/llms/first/README.md',
+            'knowledge-base/ai/llms/second-renamed/README.md',
+            'knowledge-base/ai/llms/second/README.md',
+            'knowledge-base/ai/llms/third/README.md',
+        }
+        assert untouched.stat().st_mtime_ns == untouched_mtime
+
+    def test_unchanged_database_makes_no_commit(self, manager):
+        """Test that an export with nothing changed writes and commits nothing."""
+        _add_item('Only')
+        asyncio.run(manager.export_database_to_git("initial"))
+        head = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=manager.repo_dir,
+                              capture_output=True, text=True, check=True).stdout
+        readme = manager.repo_dir / 'knowledge-base/ai/llms/only/README.md'
+        mtime = readme.stat().st_mtime_ns
+
+        asyncio.run(manager.export_database_to_git("again"))
+        assert readme.stat().st_mtime_ns == mtime
+        assert subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=manager.repo_dir,
+                              capture_output=True, text=True, check=True).stdout == head
+
+    def test_render_failure_only_fails_that_item(self, manager, monkeypatch):
+        """Test that a row that cannot be rendered is counted as failed and the rest still export."""
+        _add_item('Good')
+        broken = _add_item('Broken')
+        generate = manager._generate_kb_item_markdown
+
+        def failing_generate(kb_item):
+            if kb_item.id == broken.id:
+                raise AttributeError("'NoneType' object has no attribute 'strftime'")
+            return generate(kb_item)
+
+        monkeypatch.setattr(manager, '_generate_kb_item_markdown', failing_generate)
+        manifest = {'documents': {}, 'media': {}}
+        changed_paths = set()
+        stats = asyncio.run(manager._sync_knowledge_base_items(manifest, changed_paths))
+
+        assert (stats['exported_files'], stats['failed_exports']) == (1, 1)
+        assert changed_paths == {'knowledge-base/ai/llms/good'}
+        # Not recorded in the manifest, so the next export retries it
+        assert f"kb:{broken.id}" not in manifest['documents']
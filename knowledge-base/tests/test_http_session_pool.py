@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Tests for SessionPoolManager
+
+Tests per-event-loop session reuse, keep-alive connection reuse tracking,
+and safe handling of sessions whose event loop has been closed.
+"""
+
+import asyncio
+
+import pytest
+from aiohttp import web
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.http_session_pool import SessionPoolManager
+
+
+async def _start_stub_server():
+    """Start a local HTTP server that answers every request with JSON."""
+    async def handler(request):
+        return web.json_response({'ok': True})
+
+    app = web.Application()
+    app.router.add_route('*', '/{tail:.*}', handler)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}"
+
+
+class TestSessionPoolManager:
+    """Test SessionPoolManager functionality."""
+
+    def test_session_reused_within_loop(self):
+        """Test that the same session is returned for repeated requests in one loop."""
+        pool = SessionPoolManager()
+
+        async def run():
+            first = await pool.get_session()
+            await pool.release_session(first)
+            second = await pool.get_session()
+            await pool.release_session(second)
+            assert first is second
+            assert not first.closed
+            await pool.close()
+            assert first.closed
+
+        asyncio.run(run())
+
+        stats = pool.get_stats()
+        assert stats['session_misses'] == 1
+        assert stats['session_hits'] == 1
+
+    def test_connections_reused_with_keepalive(self):
+        """Test that keep-alive connections are reused and counted as hits."""
+        pool = SessionPoolManager()
+
+        async def run():
+            runner, base_url = await _start_stub_server()
+            try:
+                for _ in range(5):
+                    session = await pool.get_session()
+                    try:
+                        async with session.get(f"{base_url}/api/tags") as response:
+                            assert response.status == 200
+                            await response.json()
+                    finally:
+                        await pool.release_session(session)
+            finally:
+                await pool.close()
+                await runner.cleanup()
+
+        asyncio.run(run())
+
+        stats = pool.get_stats()
+        assert stats['connection_misses'] == 1
+        assert stats['connection_hits'] == 4
+        assert stats['connection_reuse_ratio'] == pytest.approx(0.8)
+
+    def test_new_session_per_event_loop(self):
+        """Test that a closed loop's session is discarded and not reused."""
+        pool = SessionPoolManager()
+        sessions = []
+
+        async def grab():
+            session = await pool.get_session()
+            sessions.append(session)
+            await pool.release_session(session)
+
+        asyncio.run(grab())
+        asyncio.run(grab())
+
+        assert sessions[0] is not sessions[1]
+        assert sessions[0].closed
+        stats = pool.get_stats()
+        assert stats['session_misses'] == 2
+        assert stats['stale_sessions_discarded'] == 1
+        assert stats['active_sessions'] == 0
+
+    def test_disabled_pool_closes_sessions(self):
+        """Test legacy per-request sessions when pooling is disabled."""
+        pool = SessionPoolManager(enabled=False)
+
+        async def run():
+            first = await pool.get_session()
+            await pool.release_session(first)
+            second = await pool.get_session()
+            await pool.release_session(second)
+            assert first is not second
+            assert first.closed and second.closed
+
+        asyncio.run(run())
+
+        stats = pool.get_stats()
+        assert stats['enabled'] is False
+        assert stats['session_misses'] == 2
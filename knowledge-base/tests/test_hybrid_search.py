@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for hybrid search
+
+Tests reciprocal rank fusion, FTS5 query construction, and fusing bm25
+full-text hits with vector hits in HybridSearchEngine.
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from flask import Flask
+from sqlalchemy import text
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.models import db, SubcategorySynthesis
+from knowledge_base_agent.hybrid_search import (
+    HybridSearchEngine, build_fts_match_query, reciprocal_rank_fusion
+)
+
+
+class _StubConfig:
+    hybrid_search_rrf_k = 60
+
+
+class _StubEmbeddingManager:
+    """Returns a fixed vector ranking regardless of the query."""
+
+    def __init__(self, ranked_ids):
+        self.ranked_ids = ranked_ids
+
+    async def find_similar_documents(self, query, top_k=12, include_scores=True):
+        return [{'type': 'synthesis', 'id': doc_id, 'score': 0.9 - 0.1 * i}
+                for i, doc_id in enumerate(self.ranked_ids[:top_k])]
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a Flask app context with syntheses indexed in synthesis_fts."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        SubcategorySynthesis.__table__.create(db.engine)
+        db.session.execute(text(
+            "CREATE VIRTUAL TABLE synthesis_fts USING fts5(title, content, main_category, sub_category)"
+        ))
+        now = datetime.now(timezone.utc)
+        docs = [
+            (1, 'Async IO', 'asyncio event loop and coroutines', 'programming', 'python'),
+            (2, 'Vacuum', 'postgres vacuum tuning', 'databases', 'postgres'),
+            (3, 'Event sourcing', 'event loop free design of event stores', 'architecture', 'patterns'),
+            (4, 'Bread', 'sourdough hydration', 'cooking', 'baking'),
+        ]
+        for doc_id, title, content, main, sub in docs:
+            synthesis = SubcategorySynthesis(main, sub, title, content, 1, now, now)
+            synthesis.id = doc_id
+            db.session.add(synthesis)
+            db.session.execute(
+                text("INSERT INTO synthesis_fts(rowid, title, content, main_category, sub_category) "
+                     "VALUES (:id, :title, :content, :main, :sub)"),
+                {'id': doc_id, 'title': title, 'content': content, 'main': main, 'sub': sub}
+            )
+        db.session.commit()
+        yield
+        db.session.remove()
+
+
+class TestHybridSearch:
+    """Test hybrid search building blocks and fusion."""
+
+    def test_reciprocal_rank_fusion_rewards_agreement(self):
+        """Test that a key ranked by both lists beats keys ranked by one."""
+        fused = reciprocal_rank_fusion([['a', 'b', 'c'], ['b', 'c', 'd']], k=60)
+
+        assert [key for key, _ in fused] == ['b', 'c', 'a', 'd']
+        assert fused[0][1] == pytest.approx(1 / 62 + 1 / 61)
+
+    def test_build_fts_match_query_quotes_terms(self):
+        """Test that user input cannot inject FTS5 syntax."""
+        assert build_fts_match_query('NEAR(foo) "bar" -baz foo') == '"near" OR "foo" OR "bar" OR "baz"'
+        assert build_fts_match_query('?!') is None
+
+    def test_search_fuses_text_and_vector_rankings(self, app_context):
+        """Test fused ordering, pagination and category filtering."""
+        engine = HybridSearchEngine(_StubConfig(), _StubEmbeddingManager([4, 1, 2]))
+
+        results = asyncio.run(engine.search('event loop', limit=2, doc_types=['synthesis']))
+        # 1 is found by both legs; 3 (text rank 1) and 4 (vector rank 1) tie
+        assert [r['id'] for r in results] == [1, 3]
+        assert results[0]['text_rank'] == 2 and results[0]['vector_rank'] == 2
+        assert results[0]['title'] == 'Async IO'
+
+        next_page = asyncio.run(engine.search('event loop', limit=2, offset=2, doc_types=['synthesis']))
+        assert [r['id'] for r in next_page] == [4, 2]
+
+        filtered = asyncio.run(engine.search('event loop', limit=5, main_category='architecture'))
+        assert [r['id'] for r in filtered] == [3]
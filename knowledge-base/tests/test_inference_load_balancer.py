@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Tests for LoadBalancedBackend
+
+Tests least-outstanding routing, model affinity, GPU hints and ejection of
+failing endpoints, using Ollama backends pointed at local stub servers.
+"""
+
+import asyncio
+import socket
+
+from aiohttp import web
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.http_session_pool import SessionPoolManager
+from knowledge_base_agent.inference_backends.load_balancer import LoadBalancedBackend
+from knowledge_base_agent.inference_backends.ollama_backend import OllamaBackend
+
+
+class _StubConfig:
+    request_timeout = 5
+    max_retries = 1
+    max_concurrent_requests = 1
+    ollama_supports_json_mode = False
+
+    def __init__(self, url):
+        self.ollama_url = url
+
+
+class _StubSessionManager:
+    def __init__(self):
+        self.pool = SessionPoolManager()
+
+    async def _get_session(self):
+        return await self.pool.get_session()
+
+    async def _release_session(self, session):
+        await self.pool.release_session(session)
+
+
+async def _start_stub_server(name, log, delay=0.0):
+    """Start a stub Ollama server that records requests and tracks concurrency."""
+    state = {'active': 0, 'peak': 0}
+
+    async def generate(request):
+        payload = await request.json()
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        log.append((name, payload['model']))
+        await asyncio.sleep(delay)
+        state['active'] -= 1
+        return web.json_response({'response': f"{name}:{payload['model']}"})
+
+    async def tags(request):
+        return web.json_response({'models': [{'name': 'm'}]})
+
+    app = web.Application()
+    app.router.add_post('/api/generate', generate)
+    app.router.add_get('/api/tags', tags)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"http://127.0.0.1:{port}", state
+
+
+def _unused_url():
+    """Return a URL on a local port with nothing listening."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}"
+
+
+def _balancer(session_manager, urls, **kwargs):
+    endpoints = [OllamaBackend(_StubConfig(url), session_manager) for url in urls]
+    return LoadBalancedBackend(_StubConfig(urls[0]), session_manager, endpoints, **kwargs)
+
+
+class TestLoadBalancedBackend:
+    """Test request routing across several stub endpoints."""
+
+    def test_concurrent_requests_spread_across_endpoints(self):
+        """Test that busy endpoints overflow to idle ones within per-endpoint limits."""
+        log = []
+
+        async def run():
+            runner_a, url_a, state_a = await _start_stub_server('a', log, delay=0.05)
+            runner_b, url_b, state_b = await _start_stub_server('b', log, delay=0.05)
+            session_manager = _StubSessionManager()
+            try:
+                balancer = _balancer(session_manager, [url_a, url_b])
+                await asyncio.gather(*(balancer.generate('m', f'prompt {i}') for i in range(6)))
+                return state_a, state_b
+            finally:
+                await session_manager.pool.close()
+                await runner_a.cleanup()
+                await runner_b.cleanup()
+
+        state_a, state_b = asyncio.run(run())
+
+        assert sorted(name for name, _ in log).count('a') == 3
+        assert sorted(name for name, _ in log).count('b') == 3
+        assert state_a['peak'] == 1 and state_b['peak'] == 1
+
+    def test_model_affinity_and_gpu_hint(self):
+        """Test that a model stays on the endpoint that loaded it unless a GPU is requested."""
+        log = []
+
+        async def run():
+            runner_a, url_a, _ = await _start_stub_server('a', log)
+            runner_b, url_b, _ = await _start_stub_server('b', log)
+            session_manager = _StubSessionManager()
+            try:
+                balancer = _balancer(session_manager, [url_a, url_b])
+                await balancer.generate('vision', 'describe')
+                await balancer.generate('text', 'categorize', options={'gpu_device': 1})
+                await balancer.generate('vision', 'describe', options={'gpu_device': 1})
+                await balancer.generate('text', 'categorize')
+            finally:
+                await session_manager.pool.close()
+                await runner_a.cleanup()
+                await runner_b.cleanup()
+
+        asyncio.run(run())
+
+        assert log == [('a', 'vision'), ('b', 'text'), ('a', 'vision'), ('b', 'text')]
+
+    def test_unreachable_endpoint_is_ejected_and_retried_elsewhere(self):
+        """Test that connection failures are retried and the endpoint leaves rotation."""
+        log = []
+
+        async def run():
+            runner, url, _ = await _start_stub_server('up', log)
+            session_manager = _StubSessionManager()
+            try:
+                balancer = _balancer(session_manager, [_unused_url(), url],
+                                     failure_threshold=1, ejection_seconds=60)
+                responses = [await balancer.generate('m', 'hello') for _ in range(3)]
+                health = await balancer.health_check()
+                return balancer, responses, health
+            finally:
+                await session_manager.pool.close()
+                await runner.cleanup()
+
+        balancer, responses, health = asyncio.run(run())
+
+        assert responses == ['up:m'] * 3
+        down, up = balancer.get_endpoint_stats()
+        assert down['healthy'] is False and down['total_requests'] == 1
+        assert up['total_requests'] == 3
+        assert health['status'] == 'healthy' and health['healthy_endpoints'] == 1
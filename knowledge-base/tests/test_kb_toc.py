@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Tests for KnowledgeBaseTOC
+
+Tests the projection load, ETag stability, incremental patching from
+committed sessions and the stale-id path used by bulk writes.
+"""
+
+import gzip
+import json
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy.schema import CreateTable
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import kb_toc as toc_module
+from knowledge_base_agent.kb_toc import KnowledgeBaseTOC
+from knowledge_base_agent.models import db, UnifiedTweet, SubcategorySynthesis
+
+
+class _StubConfig:
+    kb_toc_refresh_seconds = 3600.0
+    redis_progress_url = None
+
+
+@pytest.fixture
+def toc(tmp_path, monkeypatch):
+    """Provide a fresh process-wide TOC over a temporary SQLite database with two KB items."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        # CreateTable skips the indexes, which models.py declares twice for this table
+        with db.engine.begin() as connection:
+            connection.execute(CreateTable(UnifiedTweet.__table__))
+        SubcategorySynthesis.__table__.create(db.engine, checkfirst=True)
+        for i, category in enumerate(['b', 'a']):
+            db.session.add(UnifiedTweet(tweet_id=str(i), full_text=f'tweet {i}', kb_item_created=True,
+                                        markdown_content=f'# {i}', main_category=category, sub_category='x',
+                                        kb_display_title=f'Item {i}'))
+        # Not a KB item yet
+        db.session.add(UnifiedTweet(tweet_id='2', full_text='tweet 2'))
+        db.session.commit()
+
+        instance = KnowledgeBaseTOC(_StubConfig())
+        monkeypatch.setattr(toc_module, '_kb_toc', instance)
+        yield instance
+        db.session.remove()
+
+
+def _document(toc):
+    etag, body, compressed = toc.snapshot()
+    assert gzip.decompress(compressed) == body
+    return etag, json.loads(body)
+
+
+class TestKnowledgeBaseTOC:
+    """Test KnowledgeBaseTOC functionality."""
+
+    def test_snapshot_is_sorted_and_cached(self, toc):
+        """Test that the TOC is loaded once and keeps its ETag while nothing changes."""
+        etag, document = _document(toc)
+        assert [item['title'] for item in document['items']] == ['Item 1', 'Item 0']
+        assert document['syntheses'] == []
+
+        assert _document(toc)[0] == etag
+        assert toc.stats['full_loads'] == 1
+        assert toc.stats['builds'] == 1
+
+    def test_committed_changes_patch_without_reload(self, toc):
+        """Test that creating, renaming and deleting rows patches the loaded TOC."""
+        etag, _ = _document(toc)
+
+        tweet = UnifiedTweet.query.filter_by(tweet_id='0').first()
+        tweet.kb_display_title = 'Renamed'
+        db.session.delete(UnifiedTweet.query.filter_by(tweet_id='1').first())
+        now = datetime.utcnow()
+        db.session.add(SubcategorySynthesis('a', 'x', 'Synthesis', '# s', 1, now, now))
+        db.session.commit()
+
+        new_etag, document = _document(toc)
+        assert new_etag != etag
+        assert [item['title'] for item in document['items']] == ['Renamed']
+        assert [s['synthesis_title'] for s in document['syntheses']] == ['Synthesis']
+        assert toc.stats['full_loads'] == 1
+
+    def test_rolled_back_changes_are_ignored(self, toc):
+        """Test that flushed but rolled back changes never reach the TOC."""
+        etag, _ = _document(toc)
+        UnifiedTweet.query.filter_by(tweet_id='0').first().kb_display_title = 'Never'
+        db.session.flush()
+        db.session.rollback()
+        assert _document(toc)[0] == etag
+
+    def test_stale_items_are_reread(self, toc):
+        """Test that ids marked stale by bulk writes are re-read on the next snapshot."""
+        _document(toc)
+        db.session.bulk_update_mappings(UnifiedTweet, [
+            {'id': UnifiedTweet.query.filter_by(tweet_id='2').first().id,
+             'kb_item_created': True, 'markdown_content': '# 2', 'kb_item_name': 'bulk'}
+        ])
+        db.session.commit()
+        assert len(_document(toc)[1]['items']) == 2
+
+        toc.mark_items_stale([UnifiedTweet.query.filter_by(tweet_id='2').first().id])
+        titles = [item['title'] for item in _document(toc)[1]['items']]
+        assert 'bulk' in titles
+        assert toc.stats['full_loads'] == 1
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for LLMResponseCache
+
+Tests cache key construction, memory and database tiers, retry bypass,
+TTL and size eviction, per-phase opt-out and hit-rate metrics.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from flask import Flask
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import llm_response_cache as cache_module
+from knowledge_base_agent.llm_response_cache import LLMResponseCache, _ResponseStore, make_cache_key
+from knowledge_base_agent.models import db, LLMResponseCacheEntry
+
+
+class _StubConfig:
+    llm_cache_enabled = True
+    llm_cache_memory_entries = 8
+    llm_cache_max_entries = 2
+    llm_cache_ttl_hours = 1.0
+    llm_cache_disabled_phases = ['synthesis']
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a Flask app context backed by a temporary SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        yield
+        db.session.remove()
+
+
+class TestLLMResponseCache:
+    """Test LLMResponseCache functionality."""
+
+    def test_cache_key_ignores_routing_options(self):
+        """Test that only options affecting the output change the key."""
+        base = make_cache_key('generate', 'm', 'prompt', {'temperature': 0.2, 'gpu_device': 0})
+        assert base == make_cache_key('generate', 'm', 'prompt', {'temperature': 0.2, 'gpu_device': 1})
+        assert base != make_cache_key('generate', 'm', 'prompt', {'temperature': 0.3})
+        assert base != make_cache_key('chat', 'm', 'prompt', {'temperature': 0.2})
+
+    def test_database_tier_survives_restart_and_retries_bypass(self, app_context):
+        """Test that a new process reads stored responses and retries reach the model."""
+        config = _StubConfig()
+        first_run = LLMResponseCache(config, _ResponseStore(config))
+        key = make_cache_key('generate', 'm', 'categorize this', {})
+
+        assert first_run.get(key, 'categorization') is None
+        first_run.put(key, 'categorization', 'm', '{"main_category": "a"}')
+        # The same client asking again is a validation retry
+        assert first_run.get(key, 'categorization') is None
+
+        restarted = LLMResponseCache(config, _ResponseStore(config))
+        assert restarted.get(key, 'categorization') == '{"main_category": "a"}'
+        assert restarted.get(key, 'categorization') is None
+
+        next_run = LLMResponseCache(config, restarted.store)
+        assert next_run.get(key, 'categorization') == '{"main_category": "a"}'
+
+        stats = restarted.get_stats()
+        assert stats['database_hits'] == 1 and stats['retry_bypasses'] == 1
+        assert stats['by_phase']['categorization']['hit_rate'] == 0.5
+        assert next_run.get_stats()['memory_hits'] == 1
+
+    def test_ttl_and_size_eviction(self, app_context, monkeypatch):
+        """Test that expired entries miss and the table is pruned to max_entries."""
+        monkeypatch.setattr(cache_module, 'PRUNE_EVERY_STORES', 1)
+        config = _StubConfig()
+        store = _ResponseStore(config)
+        cache = LLMResponseCache(config, store)
+
+        for i in range(4):
+            cache.put(f'key{i}', 'kb_item', 'm', f'response {i}')
+        assert sorted(entry.cache_key for entry in LLMResponseCacheEntry.query.all()) == ['key2', 'key3']
+
+        stale = LLMResponseCacheEntry.query.filter_by(cache_key='key3').first()
+        stale.created_at = datetime.now(timezone.utc) - timedelta(hours=2)
+        db.session.commit()
+        assert LLMResponseCache(config, _ResponseStore(config)).get('key3', 'kb_item') is None
+
+    def test_disabled_phase(self):
+        """Test per-phase opt-out."""
+        cache = LLMResponseCache(_StubConfig(), _ResponseStore(_StubConfig()))
+        assert cache.is_enabled_for('categorization')
+        assert not cache.is_enabled_for('synthesis')
+        assert not cache.is_enabled_for(None)
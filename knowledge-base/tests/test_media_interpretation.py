@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Tests for concurrent media interpretation
+
+Tests image downscaling before upload, the content-hash vision cache,
+in-flight sharing of identical images and concurrent per-thread processing.
+"""
+
+import asyncio
+import base64
+import io
+import shutil
+
+from PIL import Image
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.http_client import HTTPClient
+from knowledge_base_agent.image_interpreter import interpret_image, prepare_image
+from knowledge_base_agent.media_processor import process_media
+
+
+class _StubResponseCache:
+    """In-memory stand-in for LLMResponseCache."""
+
+    def __init__(self):
+        self.entries = {}
+
+    def is_enabled_for(self, phase):
+        return True
+
+    def get(self, key, phase, allow_repeat=False):
+        return self.entries.get(key)
+
+    def put(self, key, phase, model, response):
+        self.entries[key] = response
+
+
+class _StubHTTPClient:
+    """Vision backend that takes a fixed time per request, with a concurrency limit."""
+
+    base_url = 'http://vision'
+    pinned_keep_alive = HTTPClient.pinned_keep_alive
+    _pinned_options = HTTPClient._pinned_options
+
+    def __init__(self, delay=0.05, max_concurrent=4, pinned_models=()):
+        self.config = _StubConfig(None)
+        self.response_cache = _StubResponseCache()
+        self.delay = delay
+        self.requests = []
+        self.payloads = []
+        self._pinned_models = set(pinned_models)
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def post(self, url, json):
+        async with self._semaphore:
+            self.requests.append(json['images'][0])
+            self.payloads.append(json)
+            await asyncio.sleep(self.delay)
+            return {'response': f"description {len(self.requests)}"}
+
+
+class _StubConfig:
+    vision_model = 'vision-model'
+    ollama_phase_keep_alive = '30m'
+    vision_image_max_dimension = 64
+    process_videos = False
+
+    def __init__(self, root):
+        self.root = root
+
+    def resolve_path_from_project_root(self, path):
+        return self.root / path
+
+
+def _write_image(path, size=(200, 100), color='red'):
+    Image.new('RGB', size, color).save(path, format='PNG')
+    return path
+
+
+class TestMediaInterpretation:
+    """Test media interpretation functionality."""
+
+    def test_large_images_are_downscaled_and_hash_the_original(self, tmp_path):
+        """Test that uploads are bounded in size while the cache key follows the file."""
+        image = _write_image(tmp_path / 'big.png')
+        content_hash, encoded = prepare_image(image, max_dimension=64)
+
+        with Image.open(io.BytesIO(base64.b64decode(encoded))) as uploaded:
+            assert max(uploaded.size) == 64
+        assert content_hash == prepare_image(image)[0]
+        # Small images in supported formats go up unchanged
+        small = _write_image(tmp_path / 'small.png', size=(32, 16))
+        assert base64.b64decode(prepare_image(small, 64)[1]) == small.read_bytes()
+
+    def test_identical_images_are_described_once(self, tmp_path):
+        """Test that copies of an image share one request, in flight and afterwards."""
+        first = _write_image(tmp_path / 'a.png')
+        second = shutil.copy(first, tmp_path / 'b.png')
+        client = _StubHTTPClient()
+
+        async def run():
+            together = await asyncio.gather(
+                interpret_image(client, first, 'vision-model'),
+                interpret_image(client, second, 'vision-model'),
+            )
+            later = await interpret_image(client, first, 'vision-model')
+            other_model = await interpret_image(client, first, 'other-model')
+            return together, later, other_model
+
+        together, later, other_model = asyncio.run(run())
+        assert together == ['description 1', 'description 1']
+        assert later == 'description 1'
+        assert other_model == 'description 2'
+        assert len(client.requests) == 2
+
+    def test_pinned_vision_model_stays_loaded(self, tmp_path):
+        """Test that requests to the pinned vision model carry the phase keep_alive."""
+        image = _write_image(tmp_path / 'a.png')
+        client = _StubHTTPClient(pinned_models={'vision-model'})
+
+        async def run():
+            await interpret_image(client, image, 'vision-model')
+            await interpret_image(client, image, 'other-model')
+
+        asyncio.run(run())
+        assert client.payloads[0]['keep_alive'] == '30m'
+        assert 'keep_alive' not in client.payloads[1]
+
+    def test_thread_media_is_interpreted_concurrently_in_order(self, tmp_path):
+        """Test that a thread takes about as long as its slowest image and keeps media order."""
+        colors = ['red', 'green', 'blue', 'white']
+        paths = [_write_image(tmp_path / f"{color}.png", color=color).name for color in colors]
+        paths.insert(2, 'missing.png')
+        client = _StubHTTPClient(delay=0.2, max_concurrent=4)
+        tweet_data = {'tweet_id': '1', 'all_downloaded_media_for_thread': paths}
+
+        async def run():
+            loop = asyncio.get_running_loop()
+            started = loop.time()
+            result = await process_media(tweet_data, client, _StubConfig(tmp_path))
+            return result, loop.time() - started
+
+        result, elapsed = asyncio.run(run())
+        assert elapsed < 0.6
+        assert len(client.requests) == 4
+        assert result['media_processed'] is True
+        assert result['image_descriptions'][2] == 'Missing media file: missing.png'
+        assert len(result['image_descriptions']) == 5
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Tests for prompt prefix reuse
+
+Tests that assembled prompts keep the per-item text last without losing any
+of it, and that backend token counts turn into per-phase KV cache hit rates.
+"""
+
+import asyncio
+
+from aiohttp import web
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.http_session_pool import SessionPoolManager
+from knowledge_base_agent.json_prompt_manager import JsonPromptManager
+from knowledge_base_agent.inference_backends.ollama_backend import OllamaBackend
+from knowledge_base_agent.prompt_prefix import (
+    PromptTokenStats, assemble_message, assemble_prompt, current_prompt_phase, mark_item_value, mark_run_value
+)
+from knowledge_base_agent.prompts import LLMPrompts
+
+
+class _StubConfig:
+    request_timeout = 5
+    max_retries = 1
+    max_concurrent_requests = 1
+    ollama_supports_json_mode = False
+
+    def __init__(self, url):
+        self.ollama_url = url
+
+
+class _StubSessionManager:
+    def __init__(self):
+        self.pool = SessionPoolManager()
+        self.prompt_stats = PromptTokenStats()
+
+    async def _get_session(self):
+        return await self.pool.get_session()
+
+    async def _release_session(self, session):
+        await self.pool.release_session(session)
+
+
+def _categorization_prompt(tweet_text):
+    return assemble_prompt(LLMPrompts.get_categorization_prompt_standard(
+        context_content=mark_item_value(tweet_text),
+        formatted_existing_categories=mark_run_value("- databases/postgres\n\n- devops/ci"),
+    ))
+
+
+class TestAssemblePrompt:
+    """Test assemble_prompt."""
+
+    def test_prompts_for_different_tweets_share_everything_before_the_tweet(self):
+        """Test that the tweet moves behind the instructions and categories, blank lines included."""
+        first = _categorization_prompt("Vacuum tuning\n\nfor write-heavy tables")
+        second = _categorization_prompt("GitHub Actions OIDC")
+        shared = first.index("Tweet Content:")
+        assert first[:shared] == second[:shared]
+        assert first[:shared].index("Instructions:") < first[:shared].index("- devops/ci")
+        assert "---\nVacuum tuning\n\nfor write-heavy tables\n---" in first
+        assert first.endswith("Respond ONLY with the JSON object.")
+
+        original = LLMPrompts.get_categorization_prompt_standard(
+            "GitHub Actions OIDC", "- databases/postgres\n\n- devops/ci"
+        )
+        assert sorted(second.split('\n\n')) == sorted(original.split('\n\n'))
+
+    def test_kb_item_prompts_share_everything_before_the_tweet(self):
+        """Test that the JSON KB item templates split into paragraphs, so the tweet moves last."""
+        manager = JsonPromptManager()
+
+        def standard(tweet_text):
+            context_data = {'tweet_text': tweet_text, 'main_category': 'databases',
+                            'sub_category': 'postgres', 'item_name': 'vacuum_tuning'}
+            return assemble_prompt(manager.render_prompt(
+                "kb_item_generation_standard",
+                {'context_data': {key: mark_item_value(value) for key, value in context_data.items()}},
+                "standard"
+            ).content)
+
+        def reasoning(tweet_text):
+            return assemble_message(manager.render_prompt(
+                "kb_item_generation_reasoning",
+                {'tweet_text': mark_item_value(tweet_text),
+                 'categories': {'main_category': mark_item_value('databases'),
+                                'sub_category': mark_item_value('postgres'),
+                                'item_name': mark_item_value('vacuum_tuning')},
+                 'media_descriptions': []},
+                "reasoning"
+            ).content)['content']
+
+        for render in (standard, reasoning):
+            first = render("Vacuum tuning\n\nfor write-heavy tables")
+            second = render("HOT updates")
+            shared = first.index("Vacuum tuning")
+            assert first[:shared] == second[:shared]
+            # The fixed instructions, not the tweet, open the prompt
+            assert shared > len(first) // 2
+
+    def test_unmarked_prompt_is_unchanged(self):
+        """Test that a prompt without marked values passes through as is."""
+        prompt = "Intro\n\nBody\n\nAnswer now."
+        assert assemble_prompt(prompt) == prompt
+
+
+class TestPromptTokenStats:
+    """Test prompt token accounting."""
+
+    def test_ollama_generate_reports_cached_prefix_per_phase(self):
+        """Test that context length minus output and evaluated tokens is counted as reused."""
+        async def scenario():
+            async def generate(request):
+                return web.json_response({
+                    'response': 'ok', 'context': list(range(130)), 'eval_count': 30,
+                    'prompt_eval_count': 25, 'prompt_eval_duration': 500_000_000,
+                })
+
+            app = web.Application()
+            app.router.add_post('/api/generate', generate)
+            runner = web.AppRunner(app)
+            await runner.setup()
+            site = web.TCPSite(runner, '127.0.0.1', 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            session_manager = _StubSessionManager()
+            try:
+                backend = OllamaBackend(_StubConfig(f"http://127.0.0.1:{port}"), session_manager)
+                token = current_prompt_phase.set('categorization')
+                try:
+                    await backend.generate(model='m', prompt='p')
+                finally:
+                    current_prompt_phase.reset(token)
+                await backend.generate(model='m', prompt='p')
+            finally:
+                await session_manager.pool.close()
+                await runner.cleanup()
+            return session_manager.prompt_stats.get_stats()
+
+        stats = asyncio.run(scenario())
+        categorization = stats['by_phase']['categorization']
+        assert (categorization['prompt_tokens'], categorization['cached_tokens']) == (100, 75)
+        assert categorization['cache_hit_rate'] == 0.75
+        assert categorization['prompt_eval_seconds'] == 0.5
+        assert stats['by_phase']['other']['requests'] == 1
+        assert stats['cached_tokens'] == 150 and stats['cache_hit_rate'] == 0.75
+
+    def test_requests_without_prompt_length_do_not_skew_hit_rate(self):
+        """Test that chat-style reports without a prompt length only count evaluated tokens."""
+        stats = PromptTokenStats()
+        stats.record(None, 400, phase='kb_item')
+        stats.record(200, 50, phase='kb_item')
+        kb_item = stats.get_stats()['by_phase']['kb_item']
+        assert kb_item['requests'] == 2 and kb_item['evaluated_tokens'] == 450
+        assert kb_item['cache_hit_rate'] == 0.75
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Tests for RenderedHTMLCache
+
+Tests render-on-write, hash reuse, the LRU in front of the render_cache
+table and the render-on-read fallback for older rows.
+"""
+
+import pytest
+from flask import Flask
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import render_cache as render_module
+from knowledge_base_agent.render_cache import RenderedHTMLCache, compute_content_hash
+from knowledge_base_agent.models import db, RenderCache
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a Flask app context backed by a temporary SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        RenderCache.__table__.create(db.engine, checkfirst=True)
+        yield
+        db.session.remove()
+
+
+class TestRenderedHTMLCache:
+    """Test RenderedHTMLCache functionality."""
+
+    def test_content_hash_ignores_surrounding_whitespace(self):
+        """Test that hashes match the backfill script and skip empty content."""
+        assert compute_content_hash("# Title\n") == compute_content_hash("  # Title")
+        assert compute_content_hash("   ") is None
+        assert compute_content_hash(None) is None
+
+    def test_store_renders_once_and_get_reads_without_rendering(self, app_context, monkeypatch):
+        """Test that written documents are served from the table without re-rendering."""
+        writer = RenderedHTMLCache(max_entries=8)
+        content_hash = writer.store('kb_item', 1, "# Title")
+        db.session.commit()
+        assert content_hash == compute_content_hash("# Title")
+        # Storing unchanged content again does not render or add a row
+        writer.store('kb_item', 1, "# Title")
+        db.session.commit()
+        assert db.session.query(RenderCache).count() == 1
+
+        def _fail_render(text):
+            raise AssertionError("rendered on read")
+
+        monkeypatch.setattr(render_module, 'render_markdown', _fail_render)
+        # A fresh process only has the table
+        reader = RenderedHTMLCache(max_entries=8)
+        html = reader.get('kb_item', 1, "# Title", content_hash)
+        assert '<h1>Title</h1>' in html
+
+    def test_lru_serves_repeat_reads_and_evicts_oldest(self, app_context):
+        """Test that the LRU answers repeat reads and stays within its bound."""
+        cache = RenderedHTMLCache(max_entries=1)
+        cache.get('synthesis', 1, "first")
+        db.session.query(RenderCache).delete()
+        db.session.commit()
+        # Still served from memory after the row is gone
+        assert cache.get('synthesis', 1, "first") == '<p>first</p>'
+
+        cache.get('synthesis', 2, "second")
+        assert len(cache._entries) == 1
+        assert ('synthesis', 2, compute_content_hash("second")) in cache._entries
+
+    def test_get_renders_and_stores_rows_missing_from_table(self, app_context):
+        """Test that documents written before render-on-write are rendered once."""
+        cache = RenderedHTMLCache(max_entries=0)
+        assert cache.get('kb_item', 7, "") == ""
+        assert cache.get('kb_item', 7, "*old*") == '<p><em>old</em></p>'
+        assert db.session.query(RenderCache).filter_by(document_id=7).count() == 1
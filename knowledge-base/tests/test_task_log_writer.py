@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for the batched TaskLog writer
+
+Tests that PostgreSQLLogger queues rows for the background TaskLogWriter,
+which inserts them in batches on its own connection, keeps sequence numbers
+gap-free when the queue overflows and drains on flush.
+"""
+
+import logging
+import threading
+import time
+
+import pytest
+from flask import Flask
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.models import db, CeleryTaskState, TaskLog
+from knowledge_base_agent.postgresql_logging import PostgreSQLLogger, TaskLogWriter
+
+
+class _StubConfig:
+    task_log_batch_size = 20
+    task_log_flush_seconds = 60.0
+    task_log_queue_size = 100
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a Flask app context backed by a temporary SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        CeleryTaskState.__table__.create(db.engine)
+        TaskLog.__table__.create(db.engine)
+        yield
+        db.session.remove()
+
+
+def _sequence_numbers(task_id):
+    return [row.sequence_number for row in TaskLog.query.filter_by(task_id=task_id).order_by(TaskLog.sequence_number)]
+
+
+class TestTaskLogWriter:
+    """Test the background TaskLog writer."""
+
+    def test_log_lines_are_written_in_batches(self, app_context):
+        """Test that many log lines become a few multi-row inserts after flush."""
+        task_logger = PostgreSQLLogger('task-batch', _StubConfig())
+        for i in range(45):
+            task_logger.log(f'Processing item {i + 1}/45', phase='llm_processing', progress_data={'processed_count': i + 1})
+
+        assert task_logger.flush()
+        assert _sequence_numbers('task-batch') == list(range(1, 46))
+        assert task_logger._writer.stats['batches'] == 3
+
+        first = TaskLog.query.filter_by(task_id='task-batch', sequence_number=1).first().to_dict()
+        assert first['message'] == 'Processing item 1/45' and first['progress_data'] == {'processed_count': 1}
+
+    def test_overflow_goes_to_python_logger_without_sequence_gaps(self, app_context, monkeypatch, caplog):
+        """Test that rows rejected by a full queue do not use up sequence numbers."""
+        release = threading.Event()
+        original_write = TaskLogWriter._write
+
+        def blocked_write(self, rows):
+            release.wait(5)
+            original_write(self, rows)
+
+        monkeypatch.setattr(TaskLogWriter, '_write', blocked_write)
+        task_logger = PostgreSQLLogger('task-overflow', _StubConfig())
+        writer = TaskLogWriter(db.engine, batch_size=1, flush_seconds=60.0, queue_size=2)
+        task_logger._writer = writer
+
+        task_logger.log('line 1')
+        for _ in range(100):
+            if writer._queue.empty():
+                break
+            time.sleep(0.01)
+        task_logger.log('line 2')
+        task_logger.log('line 3')
+        with caplog.at_level(logging.INFO):
+            task_logger.log('line 4 overflows')
+        assert '[task-overflow] line 4 overflows' in caplog.text
+        assert 'Task log queue full' in caplog.text
+
+        release.set()
+        assert writer.flush()
+        task_logger.log('line 5')
+        assert writer.close()
+
+        messages = [row.message for row in TaskLog.query.filter_by(task_id='task-overflow').order_by(TaskLog.sequence_number)]
+        assert messages == ['line 1', 'line 2', 'line 3', 'line 5']
+        assert _sequence_numbers('task-overflow') == [1, 2, 3, 4]
+        assert writer.stats['overflowed'] == 1
@@ -332,29 +332,29 @@ class TestTweetCacheRepository:
     
     # ===== STATISTICS TESTS =====
     
+    @patch('knowledge_base_agent.repositories.read_tweet_counters')
     @patch('knowledge_base_agent.repositories.get_db_session_context')
-    def test_get_processing_statistics(self, mock_get_session, repository):
+    def test_get_processing_statistics(self, mock_get_session, mock_read_counters, repository):
         """Test getting processing statistics."""
         mock_session = MagicMock()
         mock_get_session.return_value.__enter__.return_value = mock_session
         
-        # Mock count queries
-        mock_session.query.return_value.count.return_value = 100  # total tweets
-        mock_session.query.return_value.filter_by.return_value.count.return_value = 80  # various counts
-        mock_session.query.return_value.filter.return_value.count.return_value = 75  # fully processed
-        
-        # Mock category stats
-        mock_session.query.return_value.filter.return_value.group_by.return_value.all.return_value = [
-            ('Technology', 50), ('Science', 30)
-        ]
+        # Mock materialized counters
+        mock_read_counters.return_value = {
+            'total_tweets': 100, 'cache_complete': 80, 'media_processed': 80,
+            'categories_processed': 80, 'kb_items_created': 80, 'fully_processed': 75,
+            'needs_reprocessing': 5, 'category:Technology': 50, 'category:Science': 30
+        }
         
         result = repository.get_processing_statistics()
         
+        mock_read_counters.assert_called_once_with(mock_session, None)
         assert 'total_tweets' in result
         assert 'processing_completion' in result
         assert 'reprocessing' in result
         assert 'categories' in result
         assert result['processing_completion']['completion_rate'] == 75.0
+        assert result['categories'] == {'Technology': 50, 'Science': 30}
     
     # ===== ERROR HANDLING TESTS =====
     
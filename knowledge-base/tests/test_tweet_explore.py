@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Tests for the tweet explorer query engine
+
+Tests keyset pagination across tied sort keys, column projection, FTS5
+relevance paging, cursor validation and counter-backed or cached totals.
+"""
+
+from contextlib import contextmanager
+
+import pytest
+from flask import Flask
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import repositories
+from knowledge_base_agent import tweet_explore
+from knowledge_base_agent import tweet_statistics
+from knowledge_base_agent.models import db, TweetCache
+from knowledge_base_agent.repositories import TweetCacheRepository
+from knowledge_base_agent.tweet_explore import InvalidCursorError, decode_cursor, encode_cursor
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    """Provide a temporary SQLite database with nine tweets and a tweet_cache_fts table."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    monkeypatch.setattr(tweet_statistics, '_table_ready', False)
+    monkeypatch.setattr(tweet_explore, 'explore_count_cache', tweet_explore.ExploreCountCache())
+    monkeypatch.setattr(repositories, 'explore_count_cache', tweet_explore.explore_count_cache)
+
+    @contextmanager
+    def session_context():
+        session = Session(db.engine)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(repositories, 'get_db_session_context', session_context)
+    with app.app_context():
+        db.metadata.create_all(db.engine, tables=[TweetCache.__table__])
+        for index in range(9):
+            db.session.add(TweetCache(
+                tweet_id=f'{index:02d}', bookmarked_tweet_id=str(index),
+                full_text='python tips' if index % 3 == 0 else 'sourdough bread',
+                main_category='AI' if index < 5 else 'Cooking', kb_item_created=index % 2 == 0,
+                all_downloaded_media_for_thread=['a.jpg'] * index, thread_tweets=[{}, {}]
+            ))
+        db.session.commit()
+        with db.engine.begin() as connection:
+            # Text timestamps as CURRENT_TIMESTAMP writes them, all tied, so pages must tie-break on id
+            connection.execute(text("UPDATE tweet_cache SET updated_at = '2026-01-01 12:00:00'"))
+            connection.execute(text(
+                "CREATE VIRTUAL TABLE tweet_cache_fts USING fts5("
+                "full_text, display_title, item_name_suggestion, content='tweet_cache', content_rowid='id')"
+            ))
+            connection.execute(text("INSERT INTO tweet_cache_fts(tweet_cache_fts) VALUES ('rebuild')"))
+        yield
+        db.session.remove()
+
+
+def _walk(repository, page_size, **kwargs):
+    pages, cursor = [], None
+    while True:
+        result = repository.explore_tweets(limit=page_size, cursor=cursor, **kwargs)
+        pages.append([tweet['tweet_id'] for tweet in result['tweets']])
+        cursor = result['next_cursor']
+        if cursor is None:
+            return pages
+
+
+def _count_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'count(' in statement.lower() and 'tweet_cache' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+class TestExploreTweets:
+    """Test TweetCacheRepository.explore_tweets."""
+
+    def test_keyset_pages_cover_every_tweet_once(self, app_context):
+        """Test that cursors walk tied and untied sort keys without gaps or repeats."""
+        repository = TweetCacheRepository()
+        pages = _walk(repository, 4)
+        assert pages == [['08', '07', '06', '05'], ['04', '03', '02', '01'], ['00']]
+
+        pages = _walk(repository, 2, sort_by='main_category', sort_order='asc', filters={'has_kb_item': True})
+        assert sum(pages, []) == ['00', '02', '04', '06', '08']
+
+    def test_rows_are_projected(self, app_context):
+        """Test that list rows carry counts instead of the JSON and text columns."""
+        tweet = TweetCacheRepository().explore_tweets(limit=1, sort_by='tweet_id', sort_order='asc')['tweets'][0]
+        assert set(tweet) == set(tweet_explore.EXPLORE_COLUMNS) | {'media_count', 'thread_length'}
+        assert (tweet['tweet_id'], tweet['media_count'], tweet['thread_length']) == ('00', 0, 2)
+
+    def test_search_pages_by_relevance(self, app_context):
+        """Test that FTS5 matches page by bm25 rank and id."""
+        repository = TweetCacheRepository()
+        pages = _walk(repository, 2, filters={'search': 'python'}, sort_by='relevance')
+        assert sorted(sum(pages, [])) == ['00', '03', '06']
+        assert len(pages) == 2
+        assert repository.explore_tweets(filters={'search': 'python'})['total_count'] == 3
+
+    def test_cursor_must_match_sort(self, app_context):
+        """Test that malformed cursors and cursors of another sort are rejected."""
+        repository = TweetCacheRepository()
+        cursor = repository.explore_tweets(limit=1)['next_cursor']
+        with pytest.raises(InvalidCursorError):
+            repository.explore_tweets(cursor=cursor, sort_by='created_at')
+        with pytest.raises(InvalidCursorError):
+            repository.explore_tweets(cursor='not-a-cursor')
+        assert decode_cursor(encode_cursor('tweet_id', 'asc', '07', 8), 'tweet_id', 'asc') == ('07', 8)
+
+    def test_totals_from_counters_or_cache(self, app_context):
+        """Test that totals skip COUNT(*) when counters or a cached count answer them."""
+        repository = TweetCacheRepository()
+        assert repository.explore_tweets(limit=1)['total_count'] == 9
+        assert repository.explore_tweets(filters={'has_kb_item': False}, limit=1)['total_count'] == 4
+        assert repository.explore_tweets(filters={'main_category': 'Cooking'}, limit=1)['total_count'] == 4
+
+        statements = _count_queries()
+        filters = {'main_category': 'AI', 'has_kb_item': True}
+        first = repository.explore_tweets(filters=filters, limit=1)
+        second = repository.explore_tweets(filters=filters, limit=1, cursor=first['next_cursor'])
+        assert first['total_count'] == second['total_count'] == 3
+        assert len(statements) == 1
+
+    def test_false_flag_total_matches_paged_rows_with_null_flags(self, app_context):
+        """Test that tweets with a NULL flag are both counted and paged by a False filter."""
+        with db.engine.begin() as connection:
+            connection.execute(text("UPDATE tweet_cache SET kb_item_created = NULL WHERE tweet_id = '01'"))
+        repository = TweetCacheRepository()
+        pages = _walk(repository, 2, filters={'has_kb_item': False})
+        assert sorted(sum(pages, [])) == ['01', '03', '05', '07']
+        assert repository.explore_tweets(filters={'has_kb_item': False}, limit=1)['total_count'] == 4
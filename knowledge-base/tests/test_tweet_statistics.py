@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for materialized tweet statistics
+
+Tests the single-pass aggregate, incremental counter updates from flushed
+flag transitions, staleness after bulk writes, and the single-statement
+category item count refresh.
+"""
+
+from contextlib import contextmanager
+from datetime import datetime
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateTable
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent import repositories
+from knowledge_base_agent import tweet_statistics
+from knowledge_base_agent.models import (
+    db, CategoryHierarchy, KnowledgeBaseItem, TweetCache, TweetProcessingQueue, TweetStatisticsCounter
+)
+from knowledge_base_agent.repositories import CategoryRepository, TweetCacheRepository
+
+
+@pytest.fixture
+def app_context(tmp_path, monkeypatch):
+    """Provide a temporary SQLite database with four tweets, for the repositories too."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    monkeypatch.setattr(tweet_statistics, '_table_ready', False)
+
+    @contextmanager
+    def session_context():
+        session = Session(db.engine)
+        try:
+            yield session
+            session.commit()
+        finally:
+            session.close()
+
+    monkeypatch.setattr(repositories, 'get_db_session_context', session_context)
+    with app.app_context():
+        # CreateTable skips the indexes, which models.py declares twice for some tables
+        with db.engine.begin() as connection:
+            # Deleting a tweet cascades to its processing queue entry, so that table is needed too
+            for model in (TweetCache, TweetProcessingQueue, CategoryHierarchy, KnowledgeBaseItem):
+                connection.execute(CreateTable(model.__table__))
+        flags = [
+            dict(cache_complete=True, media_processed=True, categories_processed=True, kb_item_created=True, main_category='AI'),
+            dict(cache_complete=True, media_processed=True, categories_processed=True, main_category='AI'),
+            dict(cache_complete=True, force_recache=True, main_category='Web'),
+            dict(),
+        ]
+        for index, values in enumerate(flags):
+            db.session.add(TweetCache(tweet_id=str(index), bookmarked_tweet_id=str(index), **values))
+        db.session.commit()
+        yield
+        db.session.remove()
+
+
+def _tweet_table_queries():
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if 'tweet_cache' in statement:
+            statements.append(statement)
+
+    event.listen(db.engine, 'before_cursor_execute', record)
+    return statements
+
+
+class TestTweetStatistics:
+    """Test the materialized tweet statistics counters."""
+
+    def test_single_aggregate_query_then_served_from_counters(self, app_context):
+        """Test that the first read scans the tweet table once and later reads not at all."""
+        statements = _tweet_table_queries()
+        repository = TweetCacheRepository()
+
+        stats = repository.get_processing_statistics()
+        assert len(statements) == 1
+        assert stats['total_tweets'] == 4
+        assert stats['processing_completion']['cache_complete'] == 3
+        assert stats['processing_completion']['categories_processed'] == 2
+        assert stats['processing_completion']['kb_items_created'] == 1
+        assert stats['processing_completion']['fully_processed'] == 1
+        assert stats['reprocessing']['needs_reprocessing'] == 1
+        assert stats['categories'] == {'AI': 2, 'Web': 1}
+
+        assert repository.get_processing_statistics() == stats
+        assert len(statements) == 1
+
+    def test_flag_transitions_update_counters_incrementally(self, app_context):
+        """Test that committed ORM changes adjust the counters without a recount."""
+        repository = TweetCacheRepository()
+        repository.get_processing_statistics()
+
+        tweet = TweetCache.query.filter_by(tweet_id='1').first()
+        tweet.kb_item_created = True
+        db.session.add(TweetCache(tweet_id='9', bookmarked_tweet_id='9', cache_complete=True, main_category='Web'))
+        db.session.delete(TweetCache.query.filter_by(tweet_id='3').first())
+        db.session.commit()
+        # Expired by the commit; the old value is loaded when the attribute is set
+        tweet.main_category = 'Web'
+        db.session.commit()
+
+        statements = _tweet_table_queries()
+        stats = repository.get_processing_statistics()
+        assert [s for s in statements if s.lstrip().upper().startswith('SELECT')] == []
+        assert stats['total_tweets'] == 4
+        assert stats['processing_completion']['kb_items_created'] == 2
+        assert stats['processing_completion']['fully_processed'] == 2
+        assert stats['processing_completion']['cache_complete'] == 4
+        assert stats['categories'] == {'AI': 1, 'Web': 3}
+        assert stats == tweet_statistics.build_statistics(tweet_statistics.compute_tweet_counters(db.session))
+
+    def test_bulk_update_and_rollback(self, app_context):
+        """Test that bulk updates force a recount and rolled back changes are ignored."""
+        repository = TweetCacheRepository()
+        repository.get_processing_statistics()
+
+        tweet = TweetCache.query.filter_by(tweet_id='3').first()
+        tweet.media_processed = True
+        db.session.flush()
+        db.session.rollback()
+        assert TweetStatisticsCounter.query.filter_by(name='media_processed').first().value == 2
+
+        repository.bulk_set_reprocessing_flags(['0', '1'], 'force_reprocess_pipeline')
+        assert TweetStatisticsCounter.query.filter_by(name=tweet_statistics.SNAPSHOT).first() is None
+        assert repository.get_processing_statistics()['reprocessing']['needs_reprocessing'] == 3
+
+
+class TestRefreshAllItemCounts:
+    """Test CategoryRepository.refresh_all_item_counts."""
+
+    def test_single_update_sets_counts_and_zeroes(self, app_context):
+        """Test that all category counts, including empty ones, come from one UPDATE."""
+        now = datetime.now()
+        for main_category, sub_category, item_count in [('AI', 'LLMs', 7), ('AI', 'Agents', 3), ('Web', 'CSS', 1)]:
+            db.session.add(CategoryHierarchy(main_category=main_category, sub_category=sub_category, item_count=item_count))
+        for index, sub_category in enumerate(['LLMs', 'LLMs', 'CSS']):
+            main_category = 'Web' if sub_category == 'CSS' else 'AI'
+            db.session.add(KnowledgeBaseItem(title=f'item {index}', content='c', main_category=main_category,
+                                             sub_category=sub_category, created_at=now, last_updated=now))
+        db.session.commit()
+
+        updates = []
+        event.listen(db.engine, 'before_cursor_execute',
+                     lambda conn, cursor, statement, *args: updates.append(statement)
+                     if statement.lstrip().upper().startswith('UPDATE') else None)
+
+        counts = CategoryRepository().refresh_all_item_counts()
+        assert counts == {'AI/LLMs': 2, 'AI/Agents': 0, 'Web/CSS': 1}
+        assert len(updates) == 1
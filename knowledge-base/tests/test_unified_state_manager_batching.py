@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Tests for UnifiedStateManager write-behind batching
+
+Tests that updates queued inside write_behind() are coalesced per tweet,
+written with one commit per batch, visible to get_tweet() before the flush,
+and written when the block exits.
+"""
+
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.schema import CreateTable
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.models import db, UnifiedTweet
+from knowledge_base_agent.unified_state_manager import UnifiedStateManager
+
+
+class _StubConfig:
+    state_write_batch_size = 3
+    state_write_flush_seconds = 3600.0
+
+
+@pytest.fixture
+def state_manager(tmp_path):
+    """Provide a state manager over a temporary SQLite database with five tweets."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        # CreateTable skips the indexes, which models.py declares twice for this table
+        with db.engine.begin() as connection:
+            connection.execute(CreateTable(UnifiedTweet.__table__))
+        for i in range(5):
+            db.session.add(UnifiedTweet(tweet_id=str(i), full_text=f'tweet {i}'))
+        db.session.commit()
+        yield UnifiedStateManager(_StubConfig())
+        db.session.remove()
+
+
+def _count_commits():
+    commits = []
+    event.listen(db.engine, 'commit', lambda conn: commits.append(1))
+    return commits
+
+
+class TestWriteBehind:
+    """Test the batched write path of UnifiedStateManager."""
+
+    def test_updates_are_coalesced_and_batched(self, state_manager):
+        """Test that many updates become one bulk write per batch."""
+        commits = _count_commits()
+
+        with state_manager.write_behind():
+            for i in range(2):
+                state_manager.update_tweet_data(str(i), {'cache_complete': True})
+                state_manager.update_tweet_data(str(i), {'media_processed': True, 'categories': ['ignored']})
+            assert commits == []
+            assert state_manager.get_tweet('0')['media_processed'] is True
+
+            # The third distinct tweet fills the batch
+            state_manager.update_tweets_data_batch({'2': {'main_category': 'a'}})
+            assert len(commits) == 1
+
+            state_manager.update_tweet_data('3', {'main_category': 'b'})
+            state_manager.update_tweet_data('missing', {'main_category': 'c'})
+            assert len(commits) == 1
+        assert len(commits) == 2
+
+        tweets = {tweet.tweet_id: tweet for tweet in UnifiedTweet.query.all()}
+        assert tweets['0'].cache_complete and tweets['0'].media_processed
+        assert tweets['1'].cache_complete and tweets['1'].media_processed
+        assert tweets['2'].main_category == 'a' and tweets['3'].main_category == 'b'
+        assert not tweets['4'].cache_complete
+        assert state_manager.write_stats == {'queued_updates': 7, 'flushed_tweets': 4, 'commits': 2}
+
+    def test_queries_and_errors_flush_pending_updates(self, state_manager):
+        """Test that table queries see queued updates and an error still writes them."""
+        with pytest.raises(RuntimeError):
+            with state_manager.write_behind():
+                state_manager.update_tweet_data('4', {'processing_complete': True})
+                assert state_manager.get_processed_tweets() == ['4']
+                state_manager.update_tweet_data('0', {'main_category': 'kept'})
+                raise RuntimeError('phase failed')
+
+        assert UnifiedTweet.query.filter_by(tweet_id='0').first().main_category == 'kept'
+
+    def test_updates_write_through_outside_write_behind(self, state_manager):
+        """Test that update_tweet_data commits immediately without write_behind()."""
+        commits = _count_commits()
+        assert state_manager.update_tweet_data('1', {'main_category': 'now'})
+        assert len(commits) == 1
+        assert UnifiedTweet.query.filter_by(tweet_id='1').first().main_category == 'now'
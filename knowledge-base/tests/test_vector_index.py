@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Tests for EmbeddingIndex
+
+Tests top-k search over SQL-stored embeddings, incremental sync after new
+rows are written, and memory-mapped loading of a persisted index.
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pytest
+from flask import Flask
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.models import db, Embedding
+from knowledge_base_agent.vector_index import EmbeddingIndex
+
+
+@pytest.fixture
+def app_context(tmp_path):
+    """Provide a Flask app context backed by a temporary SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'test.db'}"
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    db.init_app(app)
+    with app.app_context():
+        Embedding.__table__.create(db.engine)
+        yield
+        db.session.remove()
+
+
+def _add_embedding(doc_id, vector, created_at, model='stub-embed'):
+    db.session.add(Embedding(
+        document_id=doc_id,
+        document_type='kb_item',
+        embedding=np.asarray(vector, dtype=np.float32).tobytes(),
+        model=model,
+        created_at=created_at
+    ))
+    db.session.commit()
+
+
+class TestEmbeddingIndex:
+    """Test EmbeddingIndex functionality."""
+
+    def test_search_returns_top_k_by_cosine_similarity(self, app_context):
+        """Test that search ranks documents by cosine similarity."""
+        now = datetime.now(timezone.utc)
+        _add_embedding(1, [1.0, 0.0, 0.0], now)
+        _add_embedding(2, [0.7, 0.7, 0.0], now)
+        _add_embedding(3, [0.0, 0.0, 5.0], now)
+        _add_embedding(4, [9.0, 9.0, 9.0], now, model='other-model')
+
+        index = EmbeddingIndex('stub-embed')
+        index.ensure_current()
+        hits = index.search([2.0, 0.1, 0.0], top_k=2)
+
+        assert index.size == 3
+        assert [doc_id for _, doc_id, _ in hits] == [1, 2]
+        assert hits[0][2] == pytest.approx(0.99875, abs=1e-4)
+
+    def test_incremental_sync_picks_up_new_rows(self, app_context):
+        """Test that rows written after the first load are synced in."""
+        now = datetime.now(timezone.utc)
+        _add_embedding(1, [1.0, 0.0], now)
+
+        index = EmbeddingIndex('stub-embed')
+        index.ensure_current()
+        assert index.size == 1
+
+        _add_embedding(2, [0.0, 1.0], now + timedelta(seconds=1))
+        index.ensure_current()
+
+        assert index.size == 2
+        assert index.search([0.0, 1.0], top_k=1)[0][1] == 2
+
+    def test_persisted_index_is_memory_mapped_on_load(self, app_context, tmp_path):
+        """Test that a fresh index loads the persisted matrix instead of rebuilding."""
+        now = datetime.now(timezone.utc)
+        _add_embedding(1, [1.0, 0.0], now)
+        _add_embedding(2, [0.0, 1.0], now)
+
+        EmbeddingIndex('stub-embed', tmp_path / 'index').ensure_current()
+
+        loaded = EmbeddingIndex('stub-embed', tmp_path / 'index')
+        loaded.rebuild = lambda *args, **kwargs: pytest.fail("index was rebuilt instead of loaded")
+        loaded.ensure_current()
+
+        assert isinstance(loaded._matrix, np.memmap)
+        assert loaded.search([0.1, 1.0], top_k=1)[0][1] == 2
+
+        # Writes after loading copy the read-only mapping into memory
+        loaded.upsert_many([('kb_item', 3, [1.0, 1.0])])
+        assert loaded.size == 3
+        assert not isinstance(loaded._matrix, np.memmap)
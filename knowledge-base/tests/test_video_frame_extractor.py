@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Tests for VideoFrameExtractor
+
+Tests near-duplicate filtering, frame thinning, the content-hash frame
+cache and the scene/interval fallback without running ffmpeg.
+"""
+
+import asyncio
+from pathlib import Path
+
+from PIL import Image
+
+import sys
+sys.path.append('.')
+
+from knowledge_base_agent.video_frame_extractor import (
+    VideoFrameExtractor, difference_hash, select_distinct_frames
+)
+
+
+class _StubConfig:
+    def __init__(self, media_cache_dir):
+        self.media_cache_dir = media_cache_dir
+    video_max_keyframes = 3
+    video_scene_threshold = 0.3
+    video_frame_duplicate_distance = 6
+    video_max_ffmpeg_processes = 1
+    video_ffmpeg_timeout_seconds = 5.0
+
+
+def _write_frame(path: Path, split: int) -> Path:
+    """Write a 64x64 frame that is white left of `split` and black right of it."""
+    image = Image.new('L', (64, 64), 255)
+    image.paste(0, (split, 0, 64, 64))
+    image.convert('RGB').save(path)
+    return path
+
+
+class _FakeFFmpegExtractor(VideoFrameExtractor):
+    """Extractor whose ffmpeg writes prepared frames instead of decoding a video."""
+
+    def __init__(self, config, scene_splits, interval_splits=()):
+        super().__init__(config)
+        self.scene_splits = scene_splits
+        self.interval_splits = interval_splits
+        self.commands = []
+
+    async def _run(self, cmd):
+        self.commands.append(cmd[0])
+        if cmd[0] == 'ffprobe':
+            return "12.0\n"
+        pattern = Path(cmd[-1])
+        splits = self.scene_splits if pattern.name.startswith('scene_') else self.interval_splits
+        for index, split in enumerate(splits, start=1):
+            _write_frame(pattern.parent / (pattern.name % index), split)
+        return ""
+
+
+class TestVideoFrameExtractor:
+    """Test VideoFrameExtractor functionality."""
+
+    def test_near_duplicates_are_dropped_and_rest_thinned(self, tmp_path):
+        """Test that similar frames collapse and the remainder is evenly spread."""
+        frames = [_write_frame(tmp_path / f"{i}.jpg", split) for i, split in enumerate([8, 8, 24, 40, 56])]
+        hashes = [(path, difference_hash(path)) for path in frames]
+        assert hashes[0][1] == hashes[1][1]
+
+        assert select_distinct_frames(hashes, 6, 10) == [frames[0], frames[2], frames[3], frames[4]]
+        assert select_distinct_frames(hashes, 6, 2) == [frames[0], frames[4]]
+
+    def test_frames_are_cached_by_content_hash(self, tmp_path):
+        """Test that a second extraction of the same video runs no processes."""
+        video = tmp_path / "clip.mp4"
+        video.write_bytes(b"not really a video")
+        extractor = _FakeFFmpegExtractor(_StubConfig(tmp_path / "cache"), scene_splits=[8, 8, 24, 40, 56])
+
+        frames = asyncio.run(extractor.extract(video))
+        assert len(frames) == 3
+        assert all(frame.exists() for frame in frames)
+        assert extractor.commands == ['ffmpeg']
+
+        copy = tmp_path / "copy.mp4"
+        copy.write_bytes(video.read_bytes())
+        assert asyncio.run(extractor.extract(copy)) == frames
+        assert extractor.commands == ['ffmpeg']
+        assert extractor.stats['cache_hits'] == 1
+        # Only the published frame directory is left behind
+        assert len(list((tmp_path / "cache" / "video_frames").iterdir())) == 1
+
+    def test_videos_without_cuts_fall_back_to_intervals(self, tmp_path):
+        """Test that a single scene frame triggers interval sampling."""
+        video = tmp_path / "static.mp4"
+        video.write_bytes(b"static")
+        extractor = _FakeFFmpegExtractor(_StubConfig(tmp_path / "cache"), scene_splits=[8], interval_splits=[8, 32])
+
+        frames = asyncio.run(extractor.extract(video))
+        assert extractor.commands == ['ffmpeg', 'ffprobe', 'ffmpeg']
+        assert len(frames) == 2